@@ -2,19 +2,19 @@ import asyncio
 from typing import Dict, List
 from datetime import datetime
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
 
 class ComplianceAgent:
     def __init__(self):
         self.compliance_frameworks = ["SOC2", "PCI-DSS", "NIST", "ISO27001"]
         self.policy_violations = []
-        self.bedrock_client = BedrockLLMClient()
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def check_compliance_impact(self, event: Dict) -> Dict:
         """Check compliance impact using Bedrock Claude AI agent"""
         query = f"Analyze compliance impact for security event: {event}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
         # Combine AI analysis with rule-based compliance checking
         violations = self._identify_violations(event)
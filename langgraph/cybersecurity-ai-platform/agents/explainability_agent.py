@@ -1,22 +1,23 @@
 import asyncio
 from typing import Dict, List, Any
 from datetime import datetime
+from uuid import uuid4
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
 
 class ExplainabilityAgent:
     def __init__(self):
         self.decision_logs = []
         self.audit_trail = {}
-        self.bedrock_client = BedrockLLMClient()
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def explain_decisions(self, workflow_result: Dict) -> Dict:
         """Generate explanations for AI decisions using Claude"""
         query = f"Explain the reasoning behind these security decisions: {workflow_result}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
-        explanation_id = f"EXP-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        explanation_id = f"EXP-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid4().hex[:8]}"
         
         explanation = {
             "id": explanation_id,
@@ -1,24 +1,29 @@
 import asyncio
+from contextvars import ContextVar
 from typing import Dict, List
 from datetime import datetime
+from uuid import uuid4
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
+
+# Event under investigation, read by the agent's tools. A context variable rather than
+# instance state, so concurrent investigations on the shared agent each see their own event
+_current_event: ContextVar[Dict] = ContextVar("forensics_current_event", default={})
 
 class ForensicsAgent:
     def __init__(self):
         self.evidence_chain = []
         self.analysis_results = {}
-        self.bedrock_client = BedrockLLMClient()
-        self.current_event = {}
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def collect_evidence(self, event: Dict) -> Dict:
         """Collect digital evidence using AI agent"""
-        self.current_event = event
+        _current_event.set(event)
         query = f"Plan evidence collection for security event: {event}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
-        evidence_id = f"EVD-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        evidence_id = f"EVD-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid4().hex[:8]}"
         
         evidence = {
             "id": evidence_id,
@@ -39,8 +44,9 @@ class ForensicsAgent:
         if not evidence:
             return {"error": "Evidence not found"}
         
+        _current_event.set(evidence["event"])
         query = f"Analyze digital artifacts: {evidence['artifacts']}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
         analysis = {
             "evidence_id": evidence_id,
@@ -167,12 +173,12 @@ class ForensicsAgent:
             Tool(
                 name="extract_indicators",
                 description="Extract indicators of compromise from artifacts list",
-                func=lambda artifacts: str(self._extract_indicators({"event": self.current_event}))
+                func=lambda artifacts: str(self._extract_indicators({"event": _current_event.get()}))
             ),
             Tool(
                 name="assess_attribution",
                 description="Assess threat actor attribution from indicators",
-                func=lambda indicators: str(self._assess_attribution({"event": self.current_event}))
+                func=lambda indicators: str(self._assess_attribution({"event": _current_event.get()}))
             )
         ]
         
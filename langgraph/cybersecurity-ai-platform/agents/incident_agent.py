@@ -1,22 +1,23 @@
 import asyncio
 from typing import Dict, List
 from datetime import datetime
+from uuid import uuid4
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
 
 class IncidentResponseAgent:
     def __init__(self):
         self.active_incidents = []
         self.playbooks = {}
-        self.bedrock_client = BedrockLLMClient()
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def create_incident(self, event: Dict) -> Dict:
         """Create incident using AI agent"""
         query = f"Create incident response plan for: {event}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
-        incident_id = f"INC-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        incident_id = f"INC-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid4().hex[:8]}"
         severity = self._determine_severity(event)
         
         incident = {
@@ -1,18 +1,18 @@
 import asyncio
 from typing import Dict, List, Optional
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
 import ast
 
 class IntentParserAgent:
     def __init__(self):
-        self.bedrock_client = BedrockLLMClient()
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def parse_intent(self, user_input: str) -> Dict:
         """Parse user intent and determine which agents to call"""
         query = f"Parse this security query and determine required agents: {user_input}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
         # Extract structured response from AI output
         intent_data = self._extract_intent_from_ai_output(ai_result["output"], user_input)
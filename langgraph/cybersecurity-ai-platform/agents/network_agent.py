@@ -2,18 +2,18 @@ import asyncio
 from typing import Dict, List
 from netmiko import ConnectHandler
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
 
 class NetworkSecurityAgent:
     def __init__(self):
         self.device_configs = {}
-        self.bedrock_client = BedrockLLMClient()
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def assess_network_impact(self, event: Dict) -> Dict:
         """Assess network impact using AI agent"""
         query = f"Analyze network security impact: {event}"
-        result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
         # Parse AI response and combine with rule-based analysis
         source_ip = event.get("source_ip", "unknown")
@@ -1,20 +1,43 @@
 import asyncio
-from typing import Dict, List
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
 from datetime import datetime
 from langchain.tools import Tool
-from core.bedrock_client import BedrockLLMClient
+from core.bedrock_client import get_bedrock_client
+
+# Description patterns in precedence order; the first match decides the threat type
+THREAT_PATTERNS = [
+    ("Web Application Attack", re.compile("sql injection|sqli|union select|drop table")),
+    ("Brute Force Attack", re.compile("brute force|failed login|multiple attempts")),
+    ("Malware", re.compile("malware|trojan|virus|c&c|command and control")),
+    ("Data Exfiltration", re.compile("data breach|exfiltration|data transfer")),
+]
+
+EVENT_TYPE_THREATS = {
+    "intrusion": "Brute Force Attack",
+    "web_attack": "Web Application Attack",
+    "malware": "Malware",
+    "data_breach": "Data Exfiltration",
+}
+
+SEVERITY_BASE_SCORES = {"critical": 8, "high": 7, "medium": 5, "low": 3}
+THREAT_TYPE_SEVERITY_BONUS = {"Malware": 1, "Data Exfiltration": 2}
+
+REMOTE_ACCESS_PROTOCOLS = {"SSH", "RDP", "TELNET"}
+WEB_PROTOCOLS = {"HTTP", "HTTPS"}
 
 class ThreatDetectionAgent:
     def __init__(self):
         self.threat_intelligence_feeds = []
         self.ioc_database = {}
-        self.bedrock_client = BedrockLLMClient()
+        self.bedrock_client = get_bedrock_client()
         self.agent = self._create_agent()
         
     async def analyze_threat(self, event: Dict) -> Dict:
         """Analyze threat using Bedrock Claude AI agent"""
         query = f"Analyze security threat: {event}"
-        ai_result = await asyncio.to_thread(self.agent.invoke, {"input": query})
+        ai_result = await self.bedrock_client.ainvoke(self.agent, {"input": query})
         
         # Combine AI analysis with rule-based threat detection
         threat_type = self._classify_threat_type(event)
@@ -32,17 +55,28 @@ class ThreatDetectionAgent:
     
     async def correlate_threats(self, events: List[Dict]) -> Dict:
         """Correlate multiple threat events"""
-        correlations = []
-        
-        for i, event1 in enumerate(events):
-            for event2 in events[i+1:]:
-                if self._are_related(event1, event2):
-                    correlations.append({
-                        "event1": event1,
-                        "event2": event2,
-                        "correlation_type": "ip_based",
-                        "confidence": 0.8
-                    })
+        # Hash-index events by IP so only events sharing an address are paired,
+        # instead of testing every pair with _are_related
+        by_source = defaultdict(list)
+        by_destination = defaultdict(list)
+        pairs = []
+        
+        for j, event in enumerate(events):
+            related = set(by_source[event.get("source_ip")]) | set(by_destination[event.get("destination_ip")])
+            pairs.extend((i, j) for i in related)
+            by_source[event.get("source_ip")].append(j)
+            by_destination[event.get("destination_ip")].append(j)
+        
+        pairs.sort()
+        correlations = [
+            {
+                "event1": events[i],
+                "event2": events[j],
+                "correlation_type": "ip_based",
+                "confidence": 0.8
+            }
+            for i, j in pairs
+        ]
         
         return {
             "correlations": correlations,
@@ -50,53 +84,47 @@ class ThreatDetectionAgent:
             "threat_actor_attribution": self._assess_attribution(events)
         }
     
+    def classify_threat_types(self, events: List[Dict]) -> List[str]:
+        """Rule-based threat type for each event in a batch"""
+        threat_types = []
+        for event in events:
+            description = event.get("description", "").lower()
+            threat_type = next((name for name, pattern in THREAT_PATTERNS if pattern.search(description)), None)
+            if threat_type is None:
+                threat_type = EVENT_TYPE_THREATS.get(event.get("event_type", "").lower(), "Unknown Threat")
+            threat_types.append(threat_type)
+        return threat_types
+    
+    def calculate_threat_severities(self, events: List[Dict], threat_types: Optional[List[str]] = None) -> List[int]:
+        """Rule-based severity score for each event in a batch"""
+        if threat_types is None:
+            threat_types = self.classify_threat_types(events)
+        return [
+            min(SEVERITY_BASE_SCORES.get(event.get("severity", "medium").lower(), 5)
+                + THREAT_TYPE_SEVERITY_BONUS.get(threat_type, 0), 10)
+            for event, threat_type in zip(events, threat_types)
+        ]
+    
+    def identify_attack_vectors(self, events: List[Dict]) -> List[str]:
+        """Rule-based attack vector for each event in a batch"""
+        vectors = []
+        for event in events:
+            protocol = event.get("protocol", "").upper()
+            if protocol in REMOTE_ACCESS_PROTOCOLS:
+                vectors.append("Remote Access")
+            elif protocol in WEB_PROTOCOLS or "web" in event.get("description", "").lower():
+                vectors.append("Web-based")
+            else:
+                vectors.append("Network-based")
+        return vectors
+    
     def _classify_threat_type(self, event: Dict) -> str:
         """Classify threat type based on event characteristics"""
-        description = event.get("description", "").lower()
-        event_type = event.get("event_type", "").lower()
-        
-        # Enhanced pattern matching
-        if any(term in description for term in ["sql injection", "sqli", "union select", "drop table"]):
-            return "Web Application Attack"
-        elif any(term in description for term in ["brute force", "failed login", "multiple attempts"]):
-            return "Brute Force Attack"
-        elif any(term in description for term in ["malware", "trojan", "virus", "c&c", "command and control"]):
-            return "Malware"
-        elif any(term in description for term in ["data breach", "exfiltration", "data transfer"]):
-            return "Data Exfiltration"
-        elif event_type == "intrusion":
-            return "Brute Force Attack"
-        elif event_type == "web_attack":
-            return "Web Application Attack"
-        elif event_type == "malware":
-            return "Malware"
-        elif event_type == "data_breach":
-            return "Data Exfiltration"
-        else:
-            return "Unknown Threat"
+        return self.classify_threat_types([event])[0]
     
     def _calculate_threat_severity(self, event: Dict) -> int:
         """Calculate threat severity score"""
-        base_score = 5
-        
-        severity = event.get("severity", "medium").lower()
-        if severity == "critical":
-            base_score = 8
-        elif severity == "high":
-            base_score = 7
-        elif severity == "medium":
-            base_score = 5
-        elif severity == "low":
-            base_score = 3
-        
-        # Adjust based on threat type
-        threat_type = self._classify_threat_type(event)
-        if threat_type == "Malware":
-            base_score += 1
-        elif threat_type == "Data Exfiltration":
-            base_score += 2
-        
-        return min(base_score, 10)
+        return self.calculate_threat_severities([event])[0]
     
     def _calculate_confidence(self, event: Dict) -> float:
         """Calculate confidence in threat assessment"""
@@ -129,17 +157,7 @@ class ThreatDetectionAgent:
     
     def _identify_attack_vector(self, event: Dict) -> str:
         """Identify attack vector"""
-        protocol = event.get("protocol", "").upper()
-        description = event.get("description", "").lower()
-        
-        if protocol in ["SSH", "RDP", "TELNET"]:
-            return "Remote Access"
-        elif protocol in ["HTTP", "HTTPS"] or "web" in description:
-            return "Web-based"
-        elif "network" in description or "lateral" in description:
-            return "Network-based"
-        else:
-            return "Network-based"
+        return self.identify_attack_vectors([event])[0]
     
     def _get_recommended_response(self, severity_score: int) -> str:
         """Get recommended response based on severity"""
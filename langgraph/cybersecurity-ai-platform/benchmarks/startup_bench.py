@@ -0,0 +1,112 @@
+"""
+Cold-start benchmark for the security console and the orchestrators.
+
+Each target runs in a fresh interpreter so module imports and client
+construction are measured from scratch. For every target it reports import
+time, construction time, the time to materialize every agent (what the first
+full analysis pays), and how many boto3 clients were created:
+
+    python benchmarks/startup_bench.py --targets console langgraph intelligent --repeat 3
+
+No Bedrock calls are made; only clients and LangChain agent executors are built.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TARGETS = {
+    "console": (
+        "sys.path.insert(0, os.path.join(ROOT, 'examples', 'intent-classifier'))\n"
+        "from interactive_security_console import SecurityConsole",
+        "SecurityConsole()",
+    ),
+    "langgraph": (
+        "from core.langgraph_orchestrator import LangGraphOrchestrator",
+        "LangGraphOrchestrator()",
+    ),
+    "intelligent": (
+        "from core.intelligent_orchestrator import IntelligentOrchestrator",
+        "IntelligentOrchestrator()",
+    ),
+}
+
+PROBE = """
+import json, os, sys, time
+ROOT = {root!r}
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import botocore.session
+clients = []
+_create_client = botocore.session.Session.create_client
+def counting_create_client(self, service_name, *args, **kwargs):
+    clients.append(service_name)
+    return _create_client(self, service_name, *args, **kwargs)
+botocore.session.Session.create_client = counting_create_client
+
+start = time.perf_counter()
+{import_code}
+imported = time.perf_counter()
+instance = {construct_code}
+constructed = time.perf_counter()
+clients_at_construct = len(clients)
+from core.agent_registry import AGENT_CLASSES, get_agent
+for name in AGENT_CLASSES:
+    agent = get_agent(name)
+    if hasattr(getattr(agent, "agent", None), "executor"):
+        agent.agent.executor
+materialized = time.perf_counter()
+
+print(json.dumps({{
+    "import": imported - start,
+    "construct": constructed - imported,
+    "materialize": materialized - constructed,
+    "clients_at_construct": clients_at_construct,
+    "clients_total": len(clients),
+}}))
+"""
+
+
+def run_target(name: str) -> dict:
+    import_code, construct_code = TARGETS[name]
+    code = PROBE.format(root=PROJECT_ROOT, import_code=import_code, construct_code=construct_code)
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cybersecurity platform cold-start benchmark")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    summary = {}
+    for name in args.targets:
+        runs = [run_target(name) for _ in range(args.repeat)]
+        summary[name] = {
+            key: statistics.median(run[key] for run in runs)
+            for key in runs[0]
+        }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{'target':>12} | {'import':>9} | {'construct':>9} | {'all agents':>10} | {'boto3 clients':>13}")
+    for name, result in summary.items():
+        print(f"{name:>12} | {result['import'] * 1000:>7.0f}ms | {result['construct'] * 1000:>7.0f}ms | "
+              f"{result['materialize'] * 1000:>8.0f}ms | "
+              f"{int(result['clients_at_construct'])} -> {int(result['clients_total']):<8}")
+
+
+if __name__ == "__main__":
+    main()
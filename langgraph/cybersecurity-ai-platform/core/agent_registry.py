@@ -0,0 +1,64 @@
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+# name -> (module, class); modules are imported on first use so importing an
+# orchestrator doesn't pull in LangChain/boto3 for agents it never calls
+AGENT_CLASSES = {
+    "intent_parser": ("agents.intent_parser_agent", "IntentParserAgent"),
+    "network": ("agents.network_agent", "NetworkSecurityAgent"),
+    "threat": ("agents.threat_agent", "ThreatDetectionAgent"),
+    "compliance": ("agents.compliance_agent", "ComplianceAgent"),
+    "incident": ("agents.incident_agent", "IncidentResponseAgent"),
+    "forensics": ("agents.forensics_agent", "ForensicsAgent"),
+    "explainability": ("agents.explainability_agent", "ExplainabilityAgent"),
+}
+
+_shared_lock = threading.Lock()
+_shared_instances: Dict[str, Any] = {}
+
+
+class AgentRegistry(Mapping):
+    """
+    Process-wide agent instances, constructed on first access.
+
+    Both orchestrators (and anything else in the process) look agents up
+    here, so each agent class is instantiated at most once and all of them
+    share the Bedrock client from ``get_bedrock_client``.
+    """
+
+    def __init__(self, names=None):
+        self.names = list(names or AGENT_CLASSES)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.names:
+            raise KeyError(name)
+        instance = _shared_instances.get(name)
+        if instance is None:
+            with _shared_lock:
+                instance = _shared_instances.get(name)
+                if instance is None:
+                    module_name, class_name = AGENT_CLASSES[name]
+                    agent_class = getattr(importlib.import_module(module_name), class_name)
+                    instance = _shared_instances[name] = agent_class()
+        return instance
+
+    def __contains__(self, name: object) -> bool:
+        # Don't construct the agent just to answer a membership test
+        return name in self.names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def loaded(self) -> Dict[str, Any]:
+        """Agents in this view that have already been constructed"""
+        return {name: _shared_instances[name] for name in self.names if name in _shared_instances}
+
+
+def get_agent(name: str) -> Any:
+    """Shared instance of the agent registered as ``name``"""
+    return AgentRegistry([name])[name]
@@ -1,32 +1,116 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
 import boto3
+from botocore.config import Config
 from langchain_aws import ChatBedrock
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.tools import Tool
 from langchain.prompts import PromptTemplate
 
+# Every agent shares one bedrock-runtime client per region, so the HTTP
+# connection pool has to be sized for all agents running concurrently
+MAX_POOL_CONNECTIONS = int(os.environ.get("BEDROCK_MAX_POOL_CONNECTIONS", "50"))
+# Threads running the blocking AgentExecutor.invoke calls
+MAX_AGENT_WORKERS = int(os.environ.get("BEDROCK_AGENT_WORKERS", "16"))
+
+# Re-entrant: building a shared BedrockLLMClient fetches the shared runtime client
+_registry_lock = threading.RLock()
+_clients: Dict[str, "BedrockLLMClient"] = {}
+_runtime_clients: Dict[str, object] = {}
+_agent_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_runtime_client(region_name: str):
+    """Process-wide bedrock-runtime boto3 client for ``region_name``"""
+    with _registry_lock:
+        client = _runtime_clients.get(region_name)
+        if client is None:
+            client = boto3.client(
+                "bedrock-runtime",
+                region_name=region_name,
+                verify=False,
+                config=Config(
+                    max_pool_connections=MAX_POOL_CONNECTIONS,
+                    tcp_keepalive=True,
+                    retries={"max_attempts": 4, "mode": "adaptive"},
+                    read_timeout=120
+                )
+            )
+            _runtime_clients[region_name] = client
+        return client
+
+
+def get_bedrock_client(region_name: str = "us-east-1") -> "BedrockLLMClient":
+    """Shared ``BedrockLLMClient`` for ``region_name``; agents should use this instead of constructing their own"""
+    with _registry_lock:
+        client = _clients.get(region_name)
+        if client is None:
+            client = _clients[region_name] = BedrockLLMClient(region_name)
+    return client
+
+
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all agents for blocking LangChain calls"""
+    global _agent_executor
+    with _registry_lock:
+        if _agent_executor is None:
+            _agent_executor = ThreadPoolExecutor(max_workers=MAX_AGENT_WORKERS, thread_name_prefix="bedrock-agent")
+        return _agent_executor
+
+
+class LazyAgentExecutor:
+    """Builds the wrapped ``AgentExecutor`` on first ``invoke`` rather than at agent construction"""
+
+    def __init__(self, factory: Callable[[], AgentExecutor]):
+        self._factory = factory
+        self._executor: Optional[AgentExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> AgentExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+        return self._executor
+
+    def invoke(self, inputs: Dict, **kwargs) -> Dict:
+        return self.executor.invoke(inputs, **kwargs)
+
+
 class BedrockLLMClient:
     def __init__(self, region_name="us-east-1"):
-        import os
         import urllib3
-        
+
         # Disable SSL warnings for testing
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         os.environ['AWS_DEFAULT_REGION'] = region_name
         os.environ['PYTHONHTTPSVERIFY'] = '0'
-        
-        self.bedrock = boto3.client(
-            "bedrock-runtime", 
-            region_name=region_name,
-            verify=False
-        )
+
+        self.bedrock = _get_runtime_client(region_name)
         self.llm = ChatBedrock(
             client=self.bedrock,
             model_id="anthropic.claude-3-sonnet-20240229-v1:0",
             model_kwargs={"max_tokens": 1000, "temperature": 0.1}
         )
-    
-    def create_agent(self, tools: list, system_prompt: str) -> AgentExecutor:
-        """Create a LangChain agent with Bedrock Claude"""
+
+    async def ainvoke(self, agent, inputs: Dict) -> Dict:
+        """Run ``agent.invoke(inputs)`` on the shared agent thread pool, in the caller's context"""
+        loop = asyncio.get_running_loop()
+        # Like asyncio.to_thread, carry context variables (e.g. the event a tool works on) into the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(get_agent_executor(), context.run, agent.invoke, inputs)
+
+    def create_agent(self, tools: list, system_prompt: str) -> LazyAgentExecutor:
+        """Create a LangChain agent with Bedrock Claude; it is built on first use"""
+        return LazyAgentExecutor(lambda: self._build_agent(tools, system_prompt))
+
+    def _build_agent(self, tools: list, system_prompt: str) -> AgentExecutor:
         prompt = PromptTemplate.from_template(
             f"{system_prompt}\n\n"
             "You have access to the following tools:\n{tools}\n\n"
@@ -42,6 +126,6 @@ class BedrockLLMClient:
             "Question: {input}\n"
             "Thought: {agent_scratchpad}"
         )
-        
+
         agent = create_react_agent(self.llm, tools, prompt)
-        return AgentExecutor(agent=agent, tools=tools, verbose=True, max_iterations=3, handle_parsing_errors=True)
\ No newline at end of file
+        return AgentExecutor(agent=agent, tools=tools, verbose=True, max_iterations=3, handle_parsing_errors=True)
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+@dataclass
+class DAGNode:
+    """A unit of work that runs once all of its dependencies have finished."""
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    # Evaluated against upstream results; a falsy value skips the node
+    condition: Optional[Callable[[Dict[str, Any]], bool]] = None
+    # Result recorded when the node is skipped
+    skipped_result: Any = field(default_factory=dict)
+
+
+class DAGExecutor:
+    """
+    Runs ``DAGNode``s concurrently, honouring their dependencies.
+
+    Independent nodes fan out immediately and a node fans in once every
+    dependency has produced a result, so end-to-end latency tracks the
+    slowest path instead of the sum of all nodes. At most ``max_concurrency``
+    nodes run at once, and each node is bounded by its own timeout (or
+    ``default_timeout``). A failed or timed-out node records
+    ``{"error": ...}`` as its result; downstream nodes still run and decide
+    for themselves how to treat it.
+    """
+
+    def __init__(self, nodes: List[DAGNode], max_concurrency: int = 4, default_timeout: Optional[float] = 120):
+        self.nodes = {node.name: node for node in nodes}
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self._validate()
+
+    def _validate(self):
+        for node in self.nodes.values():
+            for dep in node.depends_on:
+                if dep not in self.nodes:
+                    raise ValueError(f"Node '{node.name}' depends on unknown node '{dep}'")
+
+        # Kahn's algorithm; anything left over is part of a cycle
+        indegree = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for other in self.nodes.values():
+                if name in other.depends_on:
+                    indegree[other.name] -= 1
+                    if indegree[other.name] == 0:
+                        ready.append(other.name)
+        if visited != len(self.nodes):
+            raise ValueError("DAG contains a cycle")
+
+    async def run(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute the DAG.
+
+        Every node receives a dict holding ``context`` plus the results of
+        the nodes that have finished so far, keyed by node name. Returns the
+        results of all nodes and stores per-node wall times in ``timings``.
+        """
+        results: Dict[str, Any] = dict(context or {})
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        done = {name: asyncio.Event() for name in self.nodes}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def execute(node: DAGNode):
+            try:
+                for dep in node.depends_on:
+                    await done[dep].wait()
+
+                try:
+                    skip = node.condition is not None and not node.condition(results)
+                except Exception as e:
+                    self.errors[node.name] = str(e)
+                    results[node.name] = {"error": str(e)}
+                    return
+                if skip:
+                    results[node.name] = node.skipped_result
+                    return
+
+                timeout = node.timeout if node.timeout is not None else self.default_timeout
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        results[node.name] = await asyncio.wait_for(node.run(results), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        self.errors[node.name] = f"{node.name} timed out after {timeout}s"
+                        results[node.name] = {"error": self.errors[node.name], "timed_out": True}
+                    except Exception as e:
+                        self.errors[node.name] = str(e)
+                        results[node.name] = {"error": str(e)}
+                    finally:
+                        self.timings[node.name] = time.perf_counter() - start
+            finally:
+                done[node.name].set()
+
+        await asyncio.gather(*(execute(node) for node in self.nodes.values()))
+        return results
@@ -0,0 +1,228 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# Sentinel pushed by the reader task once the source iterator is exhausted
+_END_OF_STREAM = object()
+
+
+def event_timestamp(event: Dict, default: float) -> float:
+    """Epoch seconds for an event's ``timestamp`` (epoch number or ISO-8601 string), else ``default``"""
+    value = event.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class SlidingWindowCorrelator:
+    """
+    Correlates each incoming event with recent events sharing its source or
+    destination IP.
+
+    Events are hash-indexed by IP, so a lookup only touches events that share
+    an address instead of every event in the window. Entries older than
+    ``window_seconds`` are evicted in arrival order as new events come in.
+    Missing and ``"unknown"`` addresses are not indexed.
+    """
+
+    def __init__(self, window_seconds: float = 300, max_matches_per_event: int = 50):
+        self.window_seconds = window_seconds
+        self.max_matches_per_event = max_matches_per_event
+        self.window: deque = deque()  # (timestamp, seq, event)
+        self.by_source: Dict[str, deque] = defaultdict(deque)
+        self.by_destination: Dict[str, deque] = defaultdict(deque)
+        self.seq = 0
+
+    @staticmethod
+    def _key(ip: Optional[str]) -> Optional[str]:
+        return ip if ip and ip != "unknown" else None
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self.window and self.window[0][0] < cutoff:
+            _, seq, event = self.window.popleft()
+            for index, ip in ((self.by_source, self._key(event.get("source_ip"))),
+                              (self.by_destination, self._key(event.get("destination_ip")))):
+                if ip is None:
+                    continue
+                entries = index[ip]
+                if entries and entries[0][0] == seq:
+                    entries.popleft()
+                if not entries:
+                    del index[ip]
+
+    def add(self, event: Dict, timestamp: float) -> List[Dict]:
+        """Index ``event`` and return its correlations with events still in the window"""
+        self._evict(timestamp)
+
+        source = self._key(event.get("source_ip"))
+        destination = self._key(event.get("destination_ip"))
+        matches: Dict[int, Dict[str, Any]] = {}
+        for field, ip, index in (("source_ip", source, self.by_source),
+                                 ("destination_ip", destination, self.by_destination)):
+            if ip is None or ip not in index:
+                continue
+            for seq, other in index[ip]:
+                match = matches.setdefault(seq, {"event": other, "shared": []})
+                match["shared"].append(field)
+
+        correlations = [
+            {
+                "event1": match["event"],
+                "event2": event,
+                "correlation_type": "ip_based",
+                "shared_fields": match["shared"],
+                "confidence": 0.9 if len(match["shared"]) == 2 else 0.8
+            }
+            # Most recent first, capped so one noisy address can't blow up a batch
+            for _, match in sorted(matches.items(), reverse=True)[:self.max_matches_per_event]
+        ]
+
+        self.seq += 1
+        self.window.append((timestamp, self.seq, event))
+        if source is not None:
+            self.by_source[source].append((self.seq, event))
+        if destination is not None:
+            self.by_destination[destination].append((self.seq, event))
+        return correlations
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+
+class SecurityEventPipeline:
+    """
+    Streaming entry point for high-volume event feeds (e.g. a SIEM export).
+
+    Events are pulled from an async iterator into micro-batches of up to
+    ``batch_size`` events, or whatever arrived within ``max_batch_wait``
+    seconds. Each batch is scored with the threat agent's rule-based batch
+    scorers and correlated over a sliding time window; only events whose
+    severity reaches ``severity_threshold`` are escalated to the LLM agents,
+    at most ``max_concurrent_escalations`` at a time.
+    """
+
+    def __init__(self,
+                 threat_agent,
+                 escalate: Callable[[Dict], Awaitable[Dict]],
+                 batch_size: int = 500,
+                 max_batch_wait: float = 1.0,
+                 severity_threshold: int = 8,
+                 window_seconds: float = 300,
+                 max_concurrent_escalations: int = 4,
+                 max_escalations_per_batch: int = 20,
+                 escalation_timeout: float = 180):
+        self.threat_agent = threat_agent
+        self.escalate = escalate
+        self.batch_size = batch_size
+        self.max_batch_wait = max_batch_wait
+        self.severity_threshold = severity_threshold
+        self.max_escalations_per_batch = max_escalations_per_batch
+        self.escalation_timeout = escalation_timeout
+        self.correlator = SlidingWindowCorrelator(window_seconds=window_seconds)
+        self.semaphore = asyncio.Semaphore(max_concurrent_escalations)
+        self.stats = {"events": 0, "batches": 0, "correlations": 0, "escalated": 0, "escalations_deferred": 0}
+
+    async def _read(self, events: AsyncIterator[Dict], queue: asyncio.Queue) -> None:
+        try:
+            async for event in events:
+                await queue.put(event)
+        finally:
+            await queue.put(_END_OF_STREAM)
+
+    async def _batches(self, events: AsyncIterator[Dict]) -> AsyncIterator[List[Dict]]:
+        # The bounded queue applies backpressure to the source while a batch is being processed
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        reader = asyncio.create_task(self._read(events, queue))
+        try:
+            finished = False
+            while not finished:
+                item = await queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.max_batch_wait
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is _END_OF_STREAM:
+                        finished = True
+                        break
+                    batch.append(item)
+                yield batch
+            # Surface errors raised by the source iterator
+            await reader
+        finally:
+            if not reader.done():
+                reader.cancel()
+
+    async def _escalate(self, event: Dict) -> Dict:
+        async with self.semaphore:
+            try:
+                return await asyncio.wait_for(self.escalate(event), timeout=self.escalation_timeout)
+            except asyncio.TimeoutError:
+                return {"error": f"Escalation timed out after {self.escalation_timeout}s", "timed_out": True}
+            except Exception as e:
+                return {"error": str(e)}
+
+    async def process_batch(self, batch: List[Dict]) -> Dict:
+        """Score, correlate and selectively escalate one micro-batch"""
+        start = time.perf_counter()
+        threat_types = self.threat_agent.classify_threat_types(batch)
+        severities = self.threat_agent.calculate_threat_severities(batch, threat_types)
+        attack_vectors = self.threat_agent.identify_attack_vectors(batch)
+
+        now = time.time()
+        scored = []
+        correlations = []
+        for event, threat_type, severity, vector in zip(batch, threat_types, severities, attack_vectors):
+            correlations.extend(self.correlator.add(event, event_timestamp(event, now)))
+            scored.append({
+                "event": event,
+                "threat_type": threat_type,
+                "severity_score": severity,
+                "attack_vector": vector,
+                "escalated": False
+            })
+
+        # Highest severity first, so the per-batch cap keeps the most urgent events
+        candidates = sorted((item for item in scored if item["severity_score"] >= self.severity_threshold),
+                            key=lambda item: item["severity_score"], reverse=True)
+        selected = candidates[:self.max_escalations_per_batch]
+        for item in selected:
+            item["escalated"] = True
+        analyses = await asyncio.gather(*(self._escalate(item["event"]) for item in selected))
+        escalations = [{"event": item["event"], "severity_score": item["severity_score"], "analysis": analysis}
+                       for item, analysis in zip(selected, analyses)]
+
+        self.stats["events"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["correlations"] += len(correlations)
+        self.stats["escalated"] += len(selected)
+        self.stats["escalations_deferred"] += len(candidates) - len(selected)
+
+        return {
+            "batch_size": len(batch),
+            "scored_events": scored,
+            "correlations": correlations,
+            "escalations": escalations,
+            "escalations_deferred": len(candidates) - len(selected),
+            "processing_time": time.perf_counter() - start
+        }
+
+    async def process_stream(self, events: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """Consume ``events`` and yield one result per micro-batch"""
+        async for batch in self._batches(events):
+            yield await self.process_batch(batch)
@@ -1,26 +1,29 @@
 import asyncio
-from typing import Dict, List, Optional
-from agents.intent_parser_agent import IntentParserAgent
-from agents.network_agent import NetworkSecurityAgent
-from agents.threat_agent import ThreatDetectionAgent
-from agents.compliance_agent import ComplianceAgent
-from agents.incident_agent import IncidentResponseAgent
-from agents.forensics_agent import ForensicsAgent
-from agents.explainability_agent import ExplainabilityAgent
+from typing import AsyncIterator, Dict, List, Optional
+from core.agent_registry import AgentRegistry, get_agent
+from core.dag_executor import DAGExecutor, DAGNode
+from core.event_pipeline import SecurityEventPipeline
+
+# Agents that only read the structured event and can run side by side
+EVENT_AGENTS = {
+    "network": ("network_analysis", lambda agent, event: agent.assess_network_impact(event)),
+    "threat": ("threat_analysis", lambda agent, event: agent.analyze_threat(event)),
+    "compliance": ("compliance_impact", lambda agent, event: agent.check_compliance_impact(event)),
+    "incident": ("incident_details", lambda agent, event: agent.create_incident(event)),
+    "forensics": ("forensics_status", lambda agent, event: agent.collect_evidence(event)),
+}
 
 class IntelligentOrchestrator:
-    def __init__(self):
-        self.intent_parser = IntentParserAgent()
-        
-        # Individual agents for selective execution
-        self.agents = {
-            "network": NetworkSecurityAgent(),
-            "threat": ThreatDetectionAgent(),
-            "compliance": ComplianceAgent(),
-            "incident": IncidentResponseAgent(),
-            "forensics": ForensicsAgent(),
-            "explainability": ExplainabilityAgent()
-        }
+    def __init__(self, max_concurrency: int = 5, agent_timeout: float = 120):
+        self.max_concurrency = max_concurrency
+        self.agent_timeout = agent_timeout
+        
+        # Individual agents for selective execution; shared process-wide and constructed on first use
+        self.agents = AgentRegistry(["network", "threat", "compliance", "incident", "forensics", "explainability"])
+    
+    @property
+    def intent_parser(self):
+        return get_agent("intent_parser")
     
     async def process_user_query(self, user_input: str) -> Dict:
         """Process user query with intent-based routing"""
@@ -35,6 +38,21 @@ class IntelligentOrchestrator:
             # Use selective agent execution
             return await self._execute_selective_agents(intent_result)
     
+    async def process_event_stream(self, events: AsyncIterator[Dict], **pipeline_options) -> AsyncIterator[Dict]:
+        """
+        Process a stream of already-structured events in micro-batches.
+        
+        Intent parsing is skipped; events at or above the severity threshold
+        get the full multi-agent analysis. ``pipeline_options`` are passed to
+        ``SecurityEventPipeline``.
+        """
+        async def full_analysis(event: Dict) -> Dict:
+            return await self._execute_full_analysis({"required_agents": ["all"], "structured_event": dict(event)})
+        
+        pipeline = SecurityEventPipeline(self.agents["threat"], full_analysis, **pipeline_options)
+        async for batch_result in pipeline.process_stream(events):
+            yield batch_result
+    
     async def _execute_full_analysis(self, intent_result: Dict) -> Dict:
         """Execute full multi-agent analysis without LangGraph"""
         structured_event = intent_result.get("structured_event", {})
@@ -59,35 +77,58 @@ class IntelligentOrchestrator:
             "recommendations": []
         }
         
-        try:
-            # Execute all agents sequentially
-            results["network_analysis"] = await self.agents["network"].assess_network_impact(structured_event)
-            results["threat_analysis"] = await self.agents["threat"].analyze_threat(structured_event)
-            results["compliance_impact"] = await self.agents["compliance"].check_compliance_impact(structured_event)
-            results["incident_details"] = await self.agents["incident"].create_incident(structured_event)
-            results["forensics_status"] = await self.agents["forensics"].collect_evidence(structured_event)
-            
-            # Calculate overall risk score
-            network_risk = results["network_analysis"].get("risk_score", 0)
-            threat_severity = results["threat_analysis"].get("severity_score", 0)
-            results["overall_risk_score"] = max(network_risk, threat_severity)
-            
-            # Generate recommendations
-            if results["overall_risk_score"] >= 8:
-                results["recommendations"] = ["Immediate isolation required", "Activate incident response team"]
-            elif results["overall_risk_score"] >= 6:
-                results["recommendations"] = ["Enhanced monitoring", "Prepare incident response"]
-            else:
-                results["recommendations"] = ["Continue monitoring", "Review security controls"]
-            
-            # Generate explainability report
-            results["explainability_report"] = await self.agents["explainability"].explain_decisions(results)
-            
-        except Exception as e:
-            results["error"] = str(e)
+        # Fan out the event-only agents, fan in for the risk assessment and explanation
+        nodes = [
+            DAGNode(name, self._event_agent_runner(name, structured_event))
+            for name in EVENT_AGENTS
+        ]
+        nodes.append(DAGNode("assessment", self._assess_risk, depends_on=["network", "threat"]))
+        nodes.append(DAGNode(
+            "explainability",
+            lambda upstream: self.agents["explainability"].explain_decisions(self._collect_full_results(results, upstream)),
+            depends_on=list(EVENT_AGENTS) + ["assessment"]
+        ))
+        
+        executor = DAGExecutor(nodes, max_concurrency=self.max_concurrency, default_timeout=self.agent_timeout)
+        upstream = await executor.run()
+        
+        self._collect_full_results(results, upstream)
+        results["explainability_report"] = upstream["explainability"]
+        results["agent_timings"] = executor.timings
+        if executor.errors:
+            results["error"] = "; ".join(f"{name}: {error}" for name, error in executor.errors.items())
         
         return results
     
+    def _event_agent_runner(self, name: str, event: Dict):
+        _, call = EVENT_AGENTS[name]
+        return lambda upstream: call(self.agents[name], event)
+    
+    async def _assess_risk(self, upstream: Dict) -> Dict:
+        """Overall risk score and recommendations from the network and threat results"""
+        network_risk = upstream["network"].get("risk_score", 0)
+        threat_severity = upstream["threat"].get("severity_score", 0)
+        overall_risk_score = max(network_risk, threat_severity)
+        
+        if overall_risk_score >= 8:
+            recommendations = ["Immediate isolation required", "Activate incident response team"]
+        elif overall_risk_score >= 6:
+            recommendations = ["Enhanced monitoring", "Prepare incident response"]
+        else:
+            recommendations = ["Continue monitoring", "Review security controls"]
+        
+        return {"overall_risk_score": overall_risk_score, "recommendations": recommendations}
+    
+    def _collect_full_results(self, results: Dict, upstream: Dict) -> Dict:
+        """Copy finished DAG node results into the full-analysis result layout"""
+        for name, (key, _) in EVENT_AGENTS.items():
+            if name in upstream:
+                results[key] = upstream[name]
+        assessment = upstream.get("assessment", {})
+        results["overall_risk_score"] = assessment.get("overall_risk_score", 0)
+        results["recommendations"] = assessment.get("recommendations", [])
+        return results
+    
     async def _execute_selective_agents(self, intent_result: Dict) -> Dict:
         """Execute only selected agents based on intent"""
         results = {
@@ -107,38 +148,36 @@ class IntelligentOrchestrator:
         if "protocol" not in structured_event or not structured_event["protocol"]:
             structured_event["protocol"] = "unknown"
         
-        # Execute selected agents
+        # Run the selected agents concurrently; explainability waits for the others
+        nodes = []
         for agent_name in required_agents:
-            if agent_name in self.agents:
-                try:
-                    agent = self.agents[agent_name]
-                    
-                    if agent_name == "network":
-                        result = await agent.assess_network_impact(structured_event)
-                    elif agent_name == "threat":
-                        result = await agent.analyze_threat(structured_event)
-                    elif agent_name == "compliance":
-                        result = await agent.check_compliance_impact(structured_event)
-                    elif agent_name == "incident":
-                        result = await agent.create_incident(structured_event)
-                    elif agent_name == "forensics":
-                        result = await agent.collect_evidence(structured_event)
-                    elif agent_name == "explainability":
-                        # For explainability, use the full results
-                        result = await agent.explain_decisions(results)
-                    else:
-                        result = {"error": f"Unknown agent: {agent_name}"}
-                    
-                    results["agent_results"][agent_name] = result
-                    
-                except Exception as e:
-                    results["agent_results"][agent_name] = {"error": str(e)}
+            if agent_name in EVENT_AGENTS:
+                nodes.append(DAGNode(agent_name, self._event_agent_runner(agent_name, structured_event)))
+        if "explainability" in required_agents:
+            nodes.append(DAGNode(
+                "explainability",
+                lambda upstream: self.agents["explainability"].explain_decisions(
+                    self._collect_selective_results(results, upstream)
+                ),
+                depends_on=[node.name for node in nodes]
+            ))
+        
+        executor = DAGExecutor(nodes, max_concurrency=self.max_concurrency, default_timeout=self.agent_timeout)
+        upstream = await executor.run()
+        self._collect_selective_results(results, upstream)
         
         # Generate overall assessment
         results["overall_assessment"] = self._generate_assessment(results)
         
         return results
     
+    def _collect_selective_results(self, results: Dict, upstream: Dict) -> Dict:
+        """Copy finished DAG node results into agent_results, in the requested order"""
+        for agent_name in results["intent_analysis"]["required_agents"]:
+            if agent_name in upstream:
+                results["agent_results"][agent_name] = upstream[agent_name]
+        return results
+    
     def _generate_assessment(self, results: Dict) -> Dict:
         """Generate overall assessment from selective agent results"""
         assessment = {
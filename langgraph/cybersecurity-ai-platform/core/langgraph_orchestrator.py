@@ -1,11 +1,8 @@
-from typing import Dict, List, TypedDict
-from langgraph.graph import StateGraph, END
-from agents.network_agent import NetworkSecurityAgent
-from agents.threat_agent import ThreatDetectionAgent
-from agents.compliance_agent import ComplianceAgent
-from agents.incident_agent import IncidentResponseAgent
-from agents.forensics_agent import ForensicsAgent
-from agents.explainability_agent import ExplainabilityAgent
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, TypedDict
+from langgraph.graph import StateGraph, START, END
+from core.agent_registry import get_agent
+from core.event_pipeline import SecurityEventPipeline
 
 class SecurityState(TypedDict):
     event: Dict
@@ -19,51 +16,84 @@ class SecurityState(TypedDict):
     next_action: str
 
 class LangGraphOrchestrator:
-    def __init__(self):
-        self.network_agent = NetworkSecurityAgent()
-        self.threat_agent = ThreatDetectionAgent()
-        self.compliance_agent = ComplianceAgent()
-        self.incident_agent = IncidentResponseAgent()
-        self.forensics_agent = ForensicsAgent()
-        self.explainability_agent = ExplainabilityAgent()
+    def __init__(self, max_concurrency: int = 4, node_timeout: float = 120):
+        self.max_concurrency = max_concurrency
+        self.node_timeout = node_timeout
         self.workflow = self._create_workflow()
     
+    # Agents are shared process-wide and constructed on first use
+    @property
+    def network_agent(self):
+        return get_agent("network")
+    
+    @property
+    def threat_agent(self):
+        return get_agent("threat")
+    
+    @property
+    def compliance_agent(self):
+        return get_agent("compliance")
+    
+    @property
+    def incident_agent(self):
+        return get_agent("incident")
+    
+    @property
+    def forensics_agent(self):
+        return get_agent("forensics")
+    
+    @property
+    def explainability_agent(self):
+        return get_agent("explainability")
+    
     def _create_workflow(self) -> StateGraph:
-        """Create LangGraph workflow for multi-agent coordination"""
+        """
+        Create LangGraph workflow for multi-agent coordination.
+        
+        Network, threat and compliance analysis only read the event, so they
+        fan out from START and fan in at triage. Incident response and
+        forensics are likewise independent of each other and run side by side
+        when triage decides an incident is needed.
+        """
         workflow = StateGraph(SecurityState)
         
         # Add nodes for each agent
-        workflow.add_node("network_analysis", self._network_analysis_node)
-        workflow.add_node("threat_analysis", self._threat_analysis_node)
-        workflow.add_node("compliance_check", self._compliance_check_node)
-        workflow.add_node("incident_response", self._incident_response_node)
-        workflow.add_node("forensics_collection", self._forensics_collection_node)
-        workflow.add_node("explainability_analysis", self._explainability_analysis_node)
+        workflow.add_node("network_analysis", self._bounded("network_analysis", self._network_analysis_node))
+        workflow.add_node("threat_analysis", self._bounded("threat_analysis", self._threat_analysis_node))
+        workflow.add_node("compliance_check", self._bounded("compliance_analysis", self._compliance_check_node))
+        workflow.add_node("triage", self._triage_node)
+        workflow.add_node("incident_response", self._bounded("incident_created", self._incident_response_node))
+        workflow.add_node("forensics_collection", self._bounded("forensics_evidence", self._forensics_collection_node))
+        workflow.add_node("explainability_analysis", self._bounded("explainability_report", self._explainability_analysis_node))
         workflow.add_node("final_synthesis", self._final_synthesis_node)
         
-        # Define workflow edges
-        workflow.set_entry_point("network_analysis")
-        workflow.add_edge("network_analysis", "threat_analysis")
-        workflow.add_edge("threat_analysis", "compliance_check")
-        workflow.add_conditional_edges(
-            "compliance_check",
-            self._should_create_incident,
-            {
-                "create_incident": "incident_response",
-                "skip_incident": "final_synthesis"
-            }
-        )
-        workflow.add_edge("incident_response", "forensics_collection")
-        workflow.add_edge("forensics_collection", "explainability_analysis")
+        # Fan out the event-only analyses, fan in at triage
+        for node in ("network_analysis", "threat_analysis", "compliance_check"):
+            workflow.add_edge(START, node)
+        workflow.add_edge(["network_analysis", "threat_analysis", "compliance_check"], "triage")
+        
         workflow.add_conditional_edges(
-            "compliance_check",
-            lambda state: "explainability_analysis" if not self._should_create_incident(state) == "create_incident" else "incident_response"
+            "triage",
+            self._route_after_triage,
+            ["incident_response", "forensics_collection", "explainability_analysis"]
         )
+        workflow.add_edge(["incident_response", "forensics_collection"], "explainability_analysis")
         workflow.add_edge("explainability_analysis", "final_synthesis")
         workflow.add_edge("final_synthesis", END)
         
         return workflow.compile()
     
+    def _bounded(self, key: str, node: Callable[[SecurityState], Awaitable[Dict]]):
+        """Wrap a node with the per-node timeout; failures are recorded under ``key`` instead of aborting the run"""
+        async def run(state: SecurityState) -> Dict:
+            try:
+                return await asyncio.wait_for(node(state), timeout=self.node_timeout)
+            except asyncio.TimeoutError:
+                return {key: {"error": f"{key} timed out after {self.node_timeout}s", "timed_out": True}}
+            except Exception as e:
+                return {key: {"error": str(e)}}
+        return run
+    
     async def process_security_event(self, event: Dict) -> Dict:
         """Process security event through LangGraph workflow"""
         initial_state = SecurityState(
@@ -78,40 +108,56 @@ class LangGraphOrchestrator:
             next_action=""
         )
         
-        result = await self.workflow.ainvoke(initial_state)
+        result = await self.workflow.ainvoke(initial_state, config={"max_concurrency": self.max_concurrency})
         return result["final_response"]
     
-    async def _network_analysis_node(self, state: SecurityState) -> SecurityState:
+    async def process_event_stream(self, events: AsyncIterator[Dict], **pipeline_options) -> AsyncIterator[Dict]:
+        """
+        Process a stream of security events in micro-batches.
+        
+        Every event is scored and correlated with the rule-based checks; only
+        events at or above the severity threshold run through the full
+        workflow. ``pipeline_options`` are passed to ``SecurityEventPipeline``.
+        """
+        pipeline = SecurityEventPipeline(self.threat_agent, self.process_security_event, **pipeline_options)
+        async for batch_result in pipeline.process_stream(events):
+            yield batch_result
+    
+    async def _network_analysis_node(self, state: SecurityState) -> Dict:
         """Network analysis node"""
         analysis = await self.network_agent.assess_network_impact(state["event"])
-        state["network_analysis"] = analysis
-        return state
+        return {"network_analysis": analysis}
     
-    async def _threat_analysis_node(self, state: SecurityState) -> SecurityState:
+    async def _threat_analysis_node(self, state: SecurityState) -> Dict:
         """Threat analysis node"""
         analysis = await self.threat_agent.analyze_threat(state["event"])
-        state["threat_analysis"] = analysis
-        return state
+        return {"threat_analysis": analysis}
     
-    async def _compliance_check_node(self, state: SecurityState) -> SecurityState:
+    async def _compliance_check_node(self, state: SecurityState) -> Dict:
         """Compliance check node"""
         analysis = await self.compliance_agent.check_compliance_impact(state["event"])
-        state["compliance_analysis"] = analysis
-        return state
+        return {"compliance_analysis": analysis}
+    
+    async def _triage_node(self, state: SecurityState) -> Dict:
+        """Join point after the parallel analyses; decides whether to open an incident"""
+        return {"next_action": self._should_create_incident(state)}
+    
+    def _route_after_triage(self, state: SecurityState):
+        if state["next_action"] == "create_incident":
+            return ["incident_response", "forensics_collection"]
+        return "explainability_analysis"
     
-    async def _incident_response_node(self, state: SecurityState) -> SecurityState:
+    async def _incident_response_node(self, state: SecurityState) -> Dict:
         """Incident response node"""
         incident = await self.incident_agent.create_incident(state["event"])
-        state["incident_created"] = incident
-        return state
+        return {"incident_created": incident}
     
-    async def _forensics_collection_node(self, state: SecurityState) -> SecurityState:
+    async def _forensics_collection_node(self, state: SecurityState) -> Dict:
         """Forensics collection node"""
         evidence = await self.forensics_agent.collect_evidence(state["event"])
-        state["forensics_evidence"] = evidence
-        return state
+        return {"forensics_evidence": evidence}
     
-    async def _explainability_analysis_node(self, state: SecurityState) -> SecurityState:
+    async def _explainability_analysis_node(self, state: SecurityState) -> Dict:
         """Explainability analysis node"""
         # Create workflow result for explanation
         workflow_result = {
@@ -129,10 +175,9 @@ class LangGraphOrchestrator:
         }
         
         explanation = await self.explainability_agent.explain_decisions(workflow_result)
-        state["explainability_report"] = explanation
-        return state
+        return {"explainability_report": explanation}
     
-    async def _final_synthesis_node(self, state: SecurityState) -> SecurityState:
+    async def _final_synthesis_node(self, state: SecurityState) -> Dict:
         """Final synthesis node"""
         # Calculate overall risk score
         network_risk = state["network_analysis"].get("risk_score", 0)
@@ -154,7 +199,7 @@ class LangGraphOrchestrator:
                 "Document all actions"
             ])
         
-        state["final_response"] = {
+        final_response = {
             "overall_risk_score": overall_risk,
             "network_analysis": state["network_analysis"],
             "threat_analysis": state["threat_analysis"],
@@ -166,7 +211,7 @@ class LangGraphOrchestrator:
             "workflow_complete": True
         }
         
-        return state
+        return {"final_response": final_response}
     
     def _should_create_incident(self, state: SecurityState) -> str:
         """Conditional logic to determine if incident should be created"""
@@ -1,16 +1,24 @@
 import asyncio
 from typing import Dict, List
-from agents.network_agent import NetworkSecurityAgent
-from agents.threat_agent import ThreatDetectionAgent
-from agents.compliance_agent import ComplianceAgent
+from core.agent_registry import get_agent
 
 class AgentOrchestrator:
     def __init__(self):
-        self.network_agent = NetworkSecurityAgent()
-        self.threat_agent = ThreatDetectionAgent()
-        self.compliance_agent = ComplianceAgent()
         self.active_threats = []
 
+    # Agents are shared process-wide and constructed on first use
+    @property
+    def network_agent(self):
+        return get_agent("network")
+
+    @property
+    def threat_agent(self):
+        return get_agent("threat")
+
+    @property
+    def compliance_agent(self):
+        return get_agent("compliance")
+
     async def process_security_event(self, event: Dict) -> Dict:
         """Orchestrate multiple agents to analyze security event"""
         tasks = [
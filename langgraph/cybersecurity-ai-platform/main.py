@@ -22,6 +22,7 @@ class SecurityEvent(BaseModel):
     destination_ip: str
     protocol: str
     description: str
+    timestamp: Optional[str] = None
 
 class NetworkConfig(BaseModel):
     device_type: str
@@ -36,6 +37,21 @@ async def analyze_security_event(event: SecurityEvent):
     result = await orchestrator.process_security_event(event.dict())
     return {"analysis": result, "recommendations": result.get("actions", [])}
 
+@app.post("/security/analyze/batch")
+async def analyze_security_events(events: List[SecurityEvent], severity_threshold: int = 8):
+    """Score and correlate a batch of events; only high-severity events get the full AI analysis"""
+    async def event_stream():
+        for event in events:
+            yield event.dict()
+    
+    batches = [batch async for batch in orchestrator.process_event_stream(event_stream(), severity_threshold=severity_threshold)]
+    return {
+        "events": sum(batch["batch_size"] for batch in batches),
+        "scored_events": [item for batch in batches for item in batch["scored_events"]],
+        "correlations": [item for batch in batches for item in batch["correlations"]],
+        "escalations": [item for batch in batches for item in batch["escalations"]]
+    }
+
 @app.post("/network/configure")
 async def configure_network_device(config: NetworkConfig, background_tasks: BackgroundTasks):
     """Configure network device through AI agent"""
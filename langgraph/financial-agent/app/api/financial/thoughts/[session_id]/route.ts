@@ -2,12 +2,17 @@ import { NextRequest } from "next/server";
 export const dynamic = 'force-dynamic'; 
 export const fetchCache = 'force-no-store';
 
-async function connectWithRetry(backendUrl: string, maxAttempts = 5) {
+async function connectWithRetry(backendUrl: string, lastEventId: string | null, maxAttempts = 5) {
+  const headers: Record<string, string> = { "Accept": "text/event-stream" };
+  if (lastEventId) {
+    headers["Last-Event-ID"] = lastEventId;
+  }
+
   for (let attempt = 0; attempt < maxAttempts; attempt++) {
     try {
       const response = await fetch(backendUrl, {
         cache: "no-store",
-        headers: { "Accept": "text/event-stream" }
+        headers
       });
       
       if (response.ok) return response;
@@ -22,6 +27,7 @@ async function connectWithRetry(backendUrl: string, maxAttempts = 5) {
 
 export async function GET(req: NextRequest, { params }: { params: { session_id: string } }) {
   const { session_id } = params;
+  const lastEventId = req.headers.get("last-event-id");
 
   if (!session_id) {
     return new Response(JSON.stringify({ error: "Session ID is required" }), { 
@@ -63,7 +69,7 @@ export async function GET(req: NextRequest, { params }: { params: { session_id:
           const backendUrl = `http://localhost:8000/api/financial/thoughts/${session_id}`;
           console.log(`Attempting backend connection: ${backendUrl}`);
           
-          const response = await connectWithRetry(backendUrl);
+          const response = await connectWithRetry(backendUrl, lastEventId);
           const reader = response.body?.getReader();
           
           if (!reader) {
@@ -3,7 +3,7 @@ import { apiRequest } from '@/utils/api';
 import { toast } from "@/hooks/use-toast";
 import { readFileAsText, readFileAsBase64, readFileAsPDFText } from "@/utils/fileHandling";
 import type { Message, FileUpload, AnalyzeAPIResponse, APIResponse } from '@/types/chat';
-import { subscribeToEvent } from '@/services/eventService';
+import { dispatchEvent, subscribeToEvent } from '@/services/eventService';
 import {
   prepareApiMessages,
   createUserMessage,
@@ -257,6 +257,10 @@ export const useChat = (selectedModel: string, selectedRegion: string): UseChatR
     thinkingStartTime.current = Date.now(); // Start timing
     setInput("");
     setIsLoading(true);
+    if (sessionId) {
+      // The thought stream closes after each turn; reopen it for this one
+      dispatchEvent.thoughtStreamRequest({ sessionId });
+    }
   
     try {
       const apiMessages = prepareApiMessages(messages, userMessage);
@@ -192,6 +192,12 @@ export function useThoughtProcess(sessionId?: string) {
         try {
           const data = JSON.parse(event.data);
           handleEventData(data);
+          if (data.type === 'complete') {
+            // The server drops the session's channel after 'complete'; closing here stops the
+            // browser from reconnecting to a fresh channel with the old Last-Event-ID
+            eventSource.close();
+            setConnected(false);
+          }
         } catch (err) {
           console.error(`Error processing SSE message:`, err);
         }
@@ -232,6 +238,17 @@ export function useThoughtProcess(sessionId?: string) {
     };
   }, [sessionId, setupEventSource]);
 
+  useEffect(() => {
+    // Reopen the stream closed on 'complete' when the next turn of the same session starts
+    return subscribeToEvent.thoughtStreamRequest(({ sessionId: requestSessionId }) => {
+      if (requestSessionId !== sessionId) return;
+      if (eventSourceRef.current && eventSourceRef.current.readyState !== EventSource.CLOSED) return;
+
+      setIsComplete(false);
+      eventSourceRef.current = setupEventSource(requestSessionId);
+    });
+  }, [sessionId, setupEventSource]);
+
   useEffect(() => {
     if (thoughts.length > 0) {
       const lastThought = thoughts[thoughts.length - 1];
@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException, Body
 from typing import List, Dict, Optional, Any
 import json
 import os
+import asyncio
 import logging
 from pydantic import BaseModel
+from app.libs.mcp_session_pool import mcp_session_pool
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -11,6 +13,17 @@ router = APIRouter()
 # Path to store server configuration
 MCP_SERVER_CONFIG_PATH = "mcp_server_config.json"
 
+# Used by the Strands document node regardless of the configured servers
+WORD_GENERATOR_URL = "http://localhost:8089/mcp"
+
+# Used for analysis when no server is configured as active
+DEFAULT_MCP_SERVER_URLS = [
+    "http://localhost:8083/mcp",  # stock_market_server
+    "http://localhost:8084/mcp",  # financial_analysis_server
+    "http://localhost:8085/mcp",  # web_news_server
+    WORD_GENERATOR_URL            # word_generator_server
+]
+
 # Model for server information
 class MCPServer(BaseModel):
     id: str
@@ -77,6 +90,12 @@ async def update_mcp_servers(servers: List[MCPServer] = Body(...)):
     """Updates the MCP server list."""
     server_data = [server.dict() for server in servers]
     save_server_config(server_data)
+
+    # Drop pooled sessions for removed/deactivated servers and re-list tools for the rest.
+    # Keep what the nodes still use: the defaults when nothing is active, and the Word Generator.
+    active_urls = [s["hostname"] for s in server_data if s["isActive"]] or DEFAULT_MCP_SERVER_URLS
+    await asyncio.to_thread(mcp_session_pool.retain_only, active_urls + [WORD_GENERATOR_URL])
+    mcp_session_pool.invalidate()
     return server_data
 
 @router.post("/test", response_model=Dict[str, Any])
@@ -45,12 +45,12 @@ async def route_request(request: Request, background_tasks: BackgroundTasks):
         bedrock_agent_client = clients["bedrock_agent_client"]
         
         if client_session_id:
-            if client_session_id in conversation_memory.conversations:
+            if conversation_memory.has_session(client_session_id):
                 session_id = client_session_id
                 logger.info(f"Reusing session: {session_id}")
                 
                 # Ensure thought handler also has this session registered
-                if client_session_id not in thought_handler.thought_store.queues:
+                if not thought_handler.thought_store.has_session(client_session_id):
                     thought_handler.register_session(session_id)
             else:
                 logger.warning(f"Session {client_session_id} not found, creating new session")
@@ -135,7 +135,7 @@ async def route_request(request: Request, background_tasks: BackgroundTasks):
 async def validate_session(session_id: str, request: Request):
     """Validate if a session exists and is still active"""
     try:
-        if session_id in thought_handler.thought_store.queues:
+        if thought_handler.thought_store.has_session(session_id):
             logger.info(f"Session validation: {session_id} is valid in thought store")
             return {"valid": True}
             
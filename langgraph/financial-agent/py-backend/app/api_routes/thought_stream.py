@@ -9,20 +9,25 @@ logger = logging.getLogger("thought_stream_api")
 router = APIRouter()
 
 @router.get("/thoughts/{session_id}")
-async def stream_thoughts(session_id: str):
+async def stream_thoughts(session_id: str, request: Request):
     """Stream thought processes for a specific session"""
     try:
         logger.info(f"SSE connection request for session: {session_id}")
-        if session_id not in thought_handler.thought_store.queues:
+        last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+        if not thought_handler.thought_store.has_session(session_id):
             logger.warning(f"SSE connection attempt for unknown session: {session_id}")
             logger.info(f"Auto-registering session: {session_id}")
             thought_handler.register_session(session_id)
             logger.info(f"Session {session_id} registered successfully")
         else:
-            logger.info(f"Valid session found with {thought_handler.thought_store.queues[session_id].qsize()} thoughts queued")
+            channel = thought_handler.thought_store.channels[session_id]
+            logger.info(f"Valid session found with {channel.pending_count(channel.delivered)} thoughts queued")
+        
+        if last_event_id:
+            logger.info(f"Resuming session {session_id} after event {last_event_id}")
         
         return StreamingResponse(
-            thought_handler.stream_generator(session_id),
+            thought_handler.stream_generator(session_id, last_event_id),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
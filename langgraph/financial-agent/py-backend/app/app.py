@@ -2,6 +2,7 @@ from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from app.api_routes import thought_stream, mcp_servers, router, file_download
 import os
+import asyncio
 import logging
 import subprocess
 import sys
@@ -34,6 +35,7 @@ class HealthCheckFilter(logging.Filter):
 logger.addFilter(HealthCheckFilter())
 
 mcp_processes = {}
+mcp_warm_up_task = None
 workflow_graph = None
 
 app = FastAPI(title="Financial Agent API")
@@ -103,11 +105,35 @@ async def startup_event():
         except Exception as e:
             logger.error(f"Error starting {server_name} MCP server: {e}")
 
+    # Event-driven thought streaming needs the loop for cross-thread publishing
+    from app.libs.thought_stream import thought_handler
+    thought_handler.start_janitor()
+
+    # Open pooled MCP sessions in the background once the servers are listening
+    from app.libs.mcp_session_pool import mcp_session_pool
+    from app.libs.nodes.prepare_analysis import get_mcp_servers
+    # Keep a reference: the loop only holds tasks weakly, so an unreferenced one can be collected mid-run
+    global mcp_warm_up_task
+    mcp_warm_up_task = asyncio.create_task(mcp_session_pool.warm_up(get_mcp_servers()))
+
     logger.info("Application startup complete")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     global mcp_processes
+    global mcp_warm_up_task
+    if mcp_warm_up_task is not None and not mcp_warm_up_task.done():
+        mcp_warm_up_task.cancel()
+        try:
+            await mcp_warm_up_task
+        except asyncio.CancelledError:
+            pass
+    mcp_warm_up_task = None
+
+    logger.info("Closing pooled MCP sessions")
+    from app.libs.mcp_session_pool import mcp_session_pool
+    mcp_session_pool.close_all()
+
     logger.info("Shutting down MCP servers")
 
     for server_name, process in mcp_processes.items():
@@ -1,177 +1,404 @@
 import logging
 import json
+import os
+import threading
+import time
 import uuid
 import base64
+from collections import OrderedDict, deque
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
+from app.libs.memory_backends import (
+    ConversationBackend,
+    InMemoryConversationBackend,
+    SQLiteConversationBackend,
+    blob_digest
+)
+from app.libs.utils import (
+    convert_message_for_converse,
+    convert_message_for_strands,
+    finalize_converse_messages
+)
 
 logger = logging.getLogger(__name__)
 
+# Rough per-message bookkeeping overhead used for the byte budget
+MESSAGE_OVERHEAD_BYTES = 256
+
+
+# Converters for the model-ready views kept alongside each session
+VIEW_CONVERTERS = {
+    "converse": convert_message_for_converse,
+    "strands": convert_message_for_strands
+}
+
+
+class SessionState:
+    """In-process view of one conversation: system messages plus an O(1) sliding window."""
+
+    def __init__(self, metadata: Dict[str, Any], version: int, window_size: int):
+        self.system: List[Dict[str, Any]] = []
+        self.window: deque = deque(maxlen=window_size)
+        self.metadata = metadata
+        self.version = version
+        self.nbytes = 0
+        # Per-message converted blocks keyed by view name then seq; each message is converted once
+        self.converted: Dict[str, Dict[int, Optional[Dict[str, Any]]]] = {name: {} for name in VIEW_CONVERTERS}
+        # Image bytes held by converted blocks, per seq; included in ``nbytes``
+        self.converted_nbytes: Dict[int, int] = {}
+        # Assembled view lists tagged with the session version they were built for
+        self.views: Dict[str, Any] = {}
+
+    def forget_converted(self, seqs) -> int:
+        """Drop the converted blocks of ``seqs``; returns the bytes released from ``nbytes``."""
+        for cache in self.converted.values():
+            for seq in seqs:
+                cache.pop(seq, None)
+        released = sum(self.converted_nbytes.pop(seq, 0) for seq in seqs)
+        self.nbytes -= released
+        return released
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        return self.system + list(self.window)
+
+    @property
+    def updated_at(self) -> float:
+        try:
+            return datetime.fromisoformat(self.metadata["last_updated"]).timestamp()
+        except (KeyError, ValueError):
+            return time.time()
+
+
 class ConversationMemoryManager:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ConversationMemoryManager, cls).__new__(cls)
             cls._instance._initialize()
         return cls._instance
-    
+
     def _initialize(self):
         """Initialize the conversation memory manager."""
-        self.conversations = {} 
-        self.files = {} 
-        self.active_sessions = set()  
+        self.backend = self._default_backend()
+        self.sessions: "OrderedDict[str, SessionState]" = OrderedDict()  # LRU order, most recent last
+        self.active_sessions = set()
         self.session_expiry_seconds = 3600
         self.max_messages_per_conversation = 50
         self.sliding_window_size = 30  # Keep only the most recent 30 messages
-        logger.info("ConversationMemoryManager initialized")
-    
-    def _apply_sliding_window(self, session_id: str) -> None:
-        """Apply sliding window to keep only the most recent messages."""
-        if session_id not in self.conversations:
-            return
-            
-        messages = self.conversations[session_id]["messages"]
-        if len(messages) <= self.sliding_window_size:
-            return
-            
-        # Separate system messages from other messages
-        system_messages = []
-        other_messages = []
-        
+        self.max_total_bytes = 256 * 1024 * 1024
+        self.total_bytes = 0
+        self.sweep_interval_seconds = 60
+        self._last_sweep = time.monotonic()
+        self.lock = threading.RLock()
+        logger.info(f"ConversationMemoryManager initialized with {type(self.backend).__name__}")
+
+    @staticmethod
+    def _default_backend() -> ConversationBackend:
+        backend = os.environ.get("CONVERSATION_MEMORY_BACKEND", "memory").lower()
+        if backend == "sqlite":
+            return SQLiteConversationBackend(os.environ.get("CONVERSATION_MEMORY_DB", "conversation_memory.db"))
+        return InMemoryConversationBackend()
+
+    def configure_backend(self, backend: ConversationBackend) -> None:
+        """Swap the storage backend, dropping any cached sessions."""
+        with self.lock:
+            self.backend = backend
+            self.sessions.clear()
+            self.total_bytes = 0
+            logger.info(f"Conversation memory backend set to {type(backend).__name__}")
+
+    # ------------------------------------------------------------------
+    # Cache, TTL and byte budget
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _blob_refs(message: Dict[str, Any]) -> List[str]:
+        refs = []
+        for block in message.get("content", []):
+            if isinstance(block, dict) and "image" in block:
+                digest = block["image"].get("source", {}).get("blob")
+                if digest:
+                    refs.append(digest)
+        return refs
+
+    @staticmethod
+    def _message_bytes(message: Dict[str, Any]) -> int:
+        size = MESSAGE_OVERHEAD_BYTES
+        for block in message.get("content", []):
+            if isinstance(block, dict):
+                if "text" in block:
+                    size += len(block["text"])
+                elif "image" in block:
+                    size += block["image"].get("size", 0)
+        return size
+
+    @staticmethod
+    def _image_bytes(message: Optional[Dict[str, Any]]) -> int:
+        """Size of the image bytes carried inline by a converted message."""
+        size = 0
+        for block in (message or {}).get("content", []):
+            if isinstance(block, dict) and "image" in block:
+                data = block["image"].get("source", {}).get("bytes")
+                if isinstance(data, (bytes, bytearray)):
+                    size += len(data)
+        return size
+
+    def _is_expired(self, state: SessionState) -> bool:
+        return time.time() - state.updated_at > self.session_expiry_seconds
+
+    def _cache(self, session_id: str, state: SessionState) -> None:
+        previous = self.sessions.pop(session_id, None)
+        if previous is not None:
+            self.total_bytes -= previous.nbytes
+        self.sessions[session_id] = state
+        self.total_bytes += state.nbytes
+
+    def _uncache(self, session_id: str) -> Optional[SessionState]:
+        state = self.sessions.pop(session_id, None)
+        if state is not None:
+            self.total_bytes -= state.nbytes
+        return state
+
+    def _load(self, session_id: str) -> Optional[SessionState]:
+        loaded = self.backend.load(session_id)
+        if loaded is None:
+            self._uncache(session_id)
+            return None
+
+        messages, metadata, version = loaded
+        state = SessionState(metadata, version, self.sliding_window_size)
         for msg in messages:
-            if msg.get('role') == 'system':
-                system_messages.append(msg)
+            if msg.get("role") == "system":
+                state.system.append(msg)
             else:
-                other_messages.append(msg)
-        
-        # Keep all system messages + most recent user/assistant messages
-        if len(other_messages) > self.sliding_window_size:
-            # Keep the most recent messages within the window
-            recent_messages = other_messages[-self.sliding_window_size:]
-            self.conversations[session_id]["messages"] = system_messages + recent_messages
-            
-            removed_count = len(other_messages) - self.sliding_window_size
-            logger.info(f"Applied sliding window to session {session_id}: removed {removed_count} old messages, kept {len(recent_messages)} recent + {len(system_messages)} system messages")
-    
-    def ensure_session_exists(self, session_id: str) -> bool:
-        if session_id in self.conversations:
+                state.window.append(msg)
+            state.nbytes += self._message_bytes(msg)
+
+        self._cache(session_id, state)
+        return state
+
+    def _get_state(self, session_id: str) -> Optional[SessionState]:
+        """Return the cached session, reloading it if another worker changed it."""
+        state = self.sessions.get(session_id)
+
+        if self.backend.persistent:
+            version = self.backend.version(session_id)
+            if version is None:
+                self._uncache(session_id)
+                return None
+            if state is None or state.version != version:
+                state = self._load(session_id)
+
+        if state is None:
+            return None
+
+        if self._is_expired(state):
+            logger.info(f"Session {session_id} expired after {self.session_expiry_seconds}s of inactivity")
+            self.delete_session(session_id)
+            return None
+
+        self.sessions.move_to_end(session_id)
+        return state
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently used sessions until the cache fits ``max_total_bytes``."""
+        while self.total_bytes > self.max_total_bytes and len(self.sessions) > 1:
+            session_id, state = next(iter(self.sessions.items()))
+            self._uncache(session_id)
+
+            if self.backend.persistent:
+                # Still on disk; it'll be reloaded on next access
+                logger.info(f"Evicted session {session_id} from memory cache ({state.nbytes} bytes)")
+            else:
+                self._drop_from_backend(session_id, state.messages)
+                logger.info(f"Evicted session {session_id} to stay within memory budget ({state.nbytes} bytes)")
+
+    def _maybe_sweep(self) -> None:
+        if time.monotonic() - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = time.monotonic()
+        self.cleanup_expired_sessions()
+
+    def _drop_from_backend(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        refs = [ref for msg in messages for ref in self._blob_refs(msg)]
+        self.backend.delete(session_id)
+        self.backend.release_blobs(refs)
+
+    def _append_message(self, session_id: str, message: Dict[str, Any], increment_turn: bool = False) -> bool:
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                logger.warning(f"Session {session_id} not found")
+                return False
+
+            evicted = []
+            if message.get("role") == "system":
+                state.system.append(message)
+            else:
+                if len(state.window) == state.window.maxlen:
+                    evicted.append(state.window.popleft())
+                state.window.append(message)
+
+            self._update_session_metadata(state, increment_turn=increment_turn)
+            expected_version = state.version + 1
+            state.version = self.backend.append(
+                session_id, message, state.metadata, [m["seq"] for m in evicted if "seq" in m]
+            )
+
+            added = self._message_bytes(message)
+            removed = sum(self._message_bytes(m) for m in evicted)
+            state.nbytes += added - removed
+            self.total_bytes += added - removed
+
+            if evicted:
+                self.total_bytes -= state.forget_converted([m.get("seq") for m in evicted])
+                self.backend.release_blobs([ref for m in evicted for ref in self._blob_refs(m)])
+                logger.info(f"Applied sliding window to session {session_id}: removed {len(evicted)} old messages, kept {len(state.window)} recent + {len(state.system)} system messages")
+
+            if self.backend.persistent and state.version != expected_version:
+                # Another worker wrote concurrently; resync from the shared store
+                self._load(session_id)
+
+            self._enforce_budget()
+            self._maybe_sweep()
             return True
-            
-        self.conversations[session_id] = {
-            "messages": [],
-            "metadata": {
+
+    def _hydrate(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a ``{role, content}`` copy with blob references resolved to image bytes."""
+        content = message.get("content", [])
+        if not self._blob_refs(message):
+            return {"role": message["role"], "content": content}
+
+        hydrated = []
+        for block in content:
+            if isinstance(block, dict) and "image" in block and "blob" in block["image"].get("source", {}):
+                image = block["image"]
+                data = self.backend.get_blob(image["source"]["blob"]) or b""
+                hydrated.append({
+                    "image": {
+                        "format": image.get("format", "png"),
+                        "source": {"bytes": data},
+                        "id": image.get("id")
+                    }
+                })
+            else:
+                hydrated.append(block)
+        return {"role": message["role"], "content": hydrated}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def has_session(self, session_id: str) -> bool:
+        with self.lock:
+            return self._get_state(session_id) is not None
+
+    def ensure_session_exists(self, session_id: str) -> bool:
+        with self.lock:
+            if self._get_state(session_id) is not None:
+                return True
+
+            metadata = {
                 "created_at": datetime.now().isoformat(),
                 "last_updated": datetime.now().isoformat(),
                 "message_count": 0,
                 "turn_count": 0
             }
-        }
-        
-        logger.info(f"Initialized conversation memory for session: {session_id}")
-        return True
-    
+            version = self.backend.create(session_id, metadata)
+            self._cache(session_id, SessionState(metadata, version, self.sliding_window_size))
+            if self.backend.persistent:
+                # Pick up the stored row in case another worker created it first
+                self._load(session_id)
+
+            logger.info(f"Initialized conversation memory for session: {session_id}")
+            self._maybe_sweep()
+            return True
+
     def add_user_message(self, session_id: str, content: str, file_data: Optional[Dict[str, Any]] = None) -> bool:
         if not self._validate_session(session_id):
             return False
-                
+
         message_content = []
         if content:
             message_content.append({"text": content})
-        
+
         if file_data and isinstance(file_data, dict) and "image" in file_data:
-            image_id = f"image_{str(uuid.uuid4())}.png"  
-            
+            image_id = f"image_{str(uuid.uuid4())}.png"
+
             image_bytes = file_data["image"]
             if isinstance(image_bytes, str):
                 try:
                     image_bytes = base64.b64decode(image_bytes)
                 except:
-                    pass
-            
+                    image_bytes = image_bytes.encode()
+
+            # Image bytes live in the content-addressed blob store, not in the message
+            digest = blob_digest(image_bytes)
+            self.backend.put_blob(digest, image_bytes)
+
             message_content.append({
                 "image": {
                     "format": "png",
                     "source": {
-                        "bytes": image_bytes
+                        "blob": digest
                     },
-                    "id": image_id 
+                    "id": image_id,
+                    "size": len(image_bytes)
                 }
             })
-            
-            if session_id not in self.files:
-                self.files[session_id] = []
-            
-            self.files[session_id].append({
-                "name": image_id,
-                "source": {
-                    "byteContent": {
-                        "data": image_bytes,
-                        "mediaType": "image/png"
-                    },
-                    "sourceType": "BYTE_CONTENT"
-                },
-                "useCase": "CHAT"
-            })
-        
+
         message = {
             "role": "user",
             "content": message_content,
             "timestamp": datetime.now().isoformat()
         }
-        
-        self.conversations[session_id]["messages"].append(message)
-        self._update_session_metadata(session_id, increment_turn=True)
-        
-        # Apply sliding window after adding message
-        self._apply_sliding_window(session_id)
-        
-        return True
 
-    
+        return self._append_message(session_id, message, increment_turn=True)
+
+
     def add_assistant_message(self, session_id: str, content: str, source: str = "direct_response") -> bool:
         if not self._validate_session(session_id):
             return False
-            
+
         message = {
             "role": "assistant",
             "content": [{"text": content}],
             "timestamp": datetime.now().isoformat(),
             "metadata": {"source": source}
         }
-        
-        self.conversations[session_id]["messages"].append(message)
-        self._update_session_metadata(session_id, increment_turn=True)
-        
-        # Apply sliding window after adding message
-        self._apply_sliding_window(session_id)
-        
+
+        if not self._append_message(session_id, message, increment_turn=True):
+            return False
+
         logger.debug(f"Added assistant message from {source} to session {session_id}: {content[:50]}...")
         return True
-    
+
 
     def get_bedrock_inline_session_state(self, session_id: str) -> Dict[str, Any]:
         """Get session state formatted for Amazon Bedrock InlineAgent"""
-        if not self._validate_session(session_id):
-            return {"conversationHistory": {"messages": []}}
-        
-        all_messages = self.conversations[session_id]["messages"]
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                return {"conversationHistory": {"messages": []}}
+            all_messages = state.messages
 
         processed_messages = []
         current_role = None
-        
+
         for i, message in enumerate(all_messages):
             if i == len(all_messages) - 1 and message.get("role") == "user":
                 break
-                
+
             if "content" in message and isinstance(message["content"], list):
                 combined_text = ""
                 for content_block in message["content"]:
                     if isinstance(content_block, dict) and "text" in content_block:
                         combined_text += (content_block["text"] + " ")
-                
+
                 role = message.get("role", "user")
-                
+
                 if role == current_role:
                     if processed_messages:
                         last_text = processed_messages[-1]["content"][0]["text"]
@@ -182,10 +409,10 @@ class ConversationMemoryManager:
                         "content": [{"text": combined_text.strip()}]
                     })
                     current_role = role
-        
+
         if processed_messages and processed_messages[-1]["role"] == "user":
             processed_messages = processed_messages[:-1]
-        
+
         return {
             "conversationHistory": {
                 "messages": processed_messages
@@ -196,184 +423,270 @@ class ConversationMemoryManager:
     def add_tool_usage_message(self, session_id: str, tool_name: str, parameters: Dict[str, Any]) -> bool:
         if not self._validate_session(session_id):
             return False
-            
+
         # Format parameters for readability
         params_str = ", ".join([f"{k}={json.dumps(v)}" for k, v in parameters.items()])
         tool_message = f"Using tool: {tool_name}({params_str})"
-        
+
         message = {
             "role": "assistant",
             "content": [{"text": tool_message}],
             "timestamp": datetime.now().isoformat(),
             "metadata": {"type": "tool_usage", "tool": tool_name}
         }
-        
-        self.conversations[session_id]["messages"].append(message)
-        self._update_session_metadata(session_id)
+
+        if not self._append_message(session_id, message):
+            return False
         logger.debug(f"Added tool usage message to session {session_id}: {tool_name}")
         return True
-    
+
     def add_tool_result_message(self, session_id: str, tool_name: str, result: Union[str, Dict, List]) -> bool:
         if not self._validate_session(session_id):
             return False
-            
+
         # Format the result as a string
         if not isinstance(result, str):
             result_str = json.dumps(result, ensure_ascii=False)
         else:
             result_str = result
-            
+
         tool_result_message = f"[{tool_name} result: {result_str}]"
-        
+
         message = {
             "role": "user",
             "content": [{"text": tool_result_message}],
             "timestamp": datetime.now().isoformat(),
             "metadata": {"type": "tool_result", "tool": tool_name}
         }
-        
-        self.conversations[session_id]["messages"].append(message)
-        self._update_session_metadata(session_id)
+
+        if not self._append_message(session_id, message):
+            return False
         logger.debug(f"Added tool result message to session {session_id} from {tool_name}")
         return True
-    
+
     def get_conversation_history(self, session_id: str, max_messages: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
-        if not self._validate_session(session_id):
-            return {"messages": []}
-        
-        messages = self.conversations[session_id]["messages"]
-        
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                logger.warning(f"Session {session_id} not found")
+                return {"messages": []}
+            messages = state.messages
+
         # Apply message limit if specified
         if max_messages and len(messages) > max_messages:
             messages = messages[-max_messages:]
-            
-        # Return in the format expected by Bedrock
-        history = {"messages": []}
-        
-        for msg in messages:
-            # Strip internal metadata before sending to Bedrock
-            cleaned_msg = {
-                "role": msg["role"],
-                "content": msg["content"]
-            }
-            history["messages"].append(cleaned_msg)
-            
-        return history
+
+        # Return in the format expected by Bedrock, stripping internal metadata
+        return {"messages": [self._hydrate(msg) for msg in messages]}
+
+    def _view(self, state: SessionState, name: str) -> List[Dict[str, Any]]:
+        """
+        Return the assembled ``name`` view for the current session version.
+
+        Messages are converted on first use and the result is kept per seq,
+        so images are decoded once per message for the life of the window.
+        The assembled list is rebuilt only after the session version moves.
+        """
+        cached = state.views.get(name)
+        if cached is not None and cached[0] == state.version:
+            return cached[1]
+
+        converter = VIEW_CONVERTERS[name]
+        converted = state.converted[name]
+        view = []
+        for msg in state.messages:
+            seq = msg.get("seq")
+            if seq not in converted:
+                converted[seq] = converter(self._hydrate(msg) if name == "converse" else msg)
+                # Hydrated images are held for as long as the view is; count them against the budget
+                image_bytes = self._image_bytes(converted[seq])
+                if image_bytes:
+                    state.converted_nbytes[seq] = state.converted_nbytes.get(seq, 0) + image_bytes
+                    state.nbytes += image_bytes
+                    self.total_bytes += image_bytes
+            if converted[seq] is not None:
+                view.append(converted[seq])
+
+        if name == "converse":
+            view = finalize_converse_messages(view)
+
+        state.views[name] = (state.version, view)
+        return view
+
+    def get_converse_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Conversation history ready for the Bedrock Converse API.
+
+        Equivalent to ``prepare_messages_with_binary_data(get_conversation_history(...))``
+        but served from the incrementally maintained view. Treat the messages as read-only.
+        """
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                return finalize_converse_messages([])
+            view = list(self._view(state, "converse"))
+            self._enforce_budget()
+            return view
+
+    def get_strands_messages(self, session_id: str, max_messages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Text-only user/assistant history for Strands agents. Treat the messages as read-only."""
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                return []
+            view = self._view(state, "strands")
+
+        if max_messages:
+            return view[-max_messages:]
+        return list(view)
 
     def get_raw_conversation(self, session_id: str) -> Dict[str, Any]:
-        if not self._validate_session(session_id):
-            return {"messages": [], "metadata": {}}
-            
-        return self.conversations[session_id]
-    
+        """Stored messages (images as blob references) and session metadata."""
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                logger.warning(f"Session {session_id} not found")
+                return {"messages": [], "metadata": {}}
+            return {"messages": state.messages, "metadata": state.metadata}
+
+    def get_session_files(self, session_id: str) -> List[Dict[str, Any]]:
+        """Images uploaded in this session, in the Bedrock inline agent file format."""
+        files = []
+        for msg in self.get_conversation_history(session_id)["messages"]:
+            for block in msg.get("content", []):
+                if isinstance(block, dict) and "image" in block:
+                    files.append({
+                        "name": block["image"].get("id"),
+                        "source": {
+                            "byteContent": {
+                                "data": block["image"]["source"]["bytes"],
+                                "mediaType": "image/png"
+                            },
+                            "sourceType": "BYTE_CONTENT"
+                        },
+                        "useCase": "CHAT"
+                    })
+        return files
+
+    def _rewrite(self, session_id: str, state: SessionState, keep: List[Dict[str, Any]]) -> None:
+        kept_seqs = {m.get("seq") for m in keep}
+        dropped = [m for m in state.messages if m.get("seq") not in kept_seqs]
+
+        self.total_bytes -= state.forget_converted([m.get("seq") for m in dropped])
+        state.system = [m for m in keep if m.get("role") == "system"]
+        state.window = deque((m for m in keep if m.get("role") != "system"), maxlen=self.sliding_window_size)
+        self._update_session_metadata(state)
+
+        state.version = self.backend.rewrite(session_id, state.messages, state.metadata)
+        self.backend.release_blobs([ref for m in dropped for ref in self._blob_refs(m)])
+
+        self.total_bytes -= state.nbytes
+        state.nbytes = sum(self._message_bytes(m) for m in state.messages) + sum(state.converted_nbytes.values())
+        self.total_bytes += state.nbytes
+
     def clear_conversation(self, session_id: str) -> bool:
-        if not self._validate_session(session_id):
-            return False
-            
-        metadata = self.conversations[session_id]["metadata"].copy()
-        metadata["last_updated"] = datetime.now().isoformat()
-        metadata["message_count"] = 0
-        metadata["turn_count"] = 0
-        
-        self.conversations[session_id] = {
-            "messages": [],
-            "metadata": metadata
-        }
-        
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                logger.warning(f"Session {session_id} not found")
+                return False
+
+            state.metadata["turn_count"] = 0
+            self._rewrite(session_id, state, [])
+
         logger.info(f"Cleared conversation for session {session_id}")
         return True
-    
+
     def delete_session(self, session_id: str) -> bool:
-        if session_id not in self.conversations:
-            logger.warning(f"Session {session_id} not found for deletion")
-            return False
-            
-        del self.conversations[session_id]
-        
-        if session_id in self.active_sessions:
-            self.active_sessions.remove(session_id)
-            
+        with self.lock:
+            state = self._uncache(session_id)
+            if state is None and self.backend.persistent:
+                loaded = self.backend.load(session_id)
+                messages = loaded[0] if loaded else None
+            else:
+                messages = state.messages if state else None
+
+            if messages is None:
+                logger.warning(f"Session {session_id} not found for deletion")
+                return False
+
+            self._drop_from_backend(session_id, messages)
+            self.active_sessions.discard(session_id)
+
         logger.info(f"Deleted session {session_id}")
         return True
-    
+
     def trim_conversation(self, session_id: str, max_messages: Optional[int] = None) -> bool:
-        if not self._validate_session(session_id):
-            return False
-            
         if max_messages is None:
             max_messages = self.max_messages_per_conversation
-            
-        messages = self.conversations[session_id]["messages"]
-        
-        if len(messages) > max_messages:
-            # Keep only the most recent messages
-            self.conversations[session_id]["messages"] = messages[-max_messages:]
-            self._update_session_metadata(session_id)
-            logger.info(f"Trimmed session {session_id} to {max_messages} messages")
-            
+
+        with self.lock:
+            state = self._get_state(session_id)
+            if state is None:
+                logger.warning(f"Session {session_id} not found")
+                return False
+
+            messages = state.messages
+            if len(messages) > max_messages:
+                # Keep only the most recent messages
+                self._rewrite(session_id, state, messages[-max_messages:])
+                logger.info(f"Trimmed session {session_id} to {max_messages} messages")
+
         return True
-    
+
     def set_max_messages(self, max_messages: int) -> None:
         self.max_messages_per_conversation = max_messages
         logger.info(f"Set default max messages per conversation to {max_messages}")
-    
+
     def cleanup_expired_sessions(self, max_age_seconds: Optional[int] = None) -> int:
         if max_age_seconds is None:
             max_age_seconds = self.session_expiry_seconds
-            
-        now = datetime.now()
-        sessions_to_delete = []
-        
-        for session_id, conversation in self.conversations.items():
-            last_updated_str = conversation["metadata"].get("last_updated")
-            if not last_updated_str:
-                continue
-                
-            try:
-                last_updated = datetime.fromisoformat(last_updated_str)
-                age_seconds = (now - last_updated).total_seconds()
-                
-                if age_seconds > max_age_seconds:
-                    sessions_to_delete.append(session_id)
-            except ValueError:
-                logger.error(f"Invalid timestamp format in session {session_id}: {last_updated_str}")
-                
-        for session_id in sessions_to_delete:
-            self.delete_session(session_id)
-            
+
+        with self.lock:
+            cutoff = time.time() - max_age_seconds
+            sessions_to_delete = set(self.backend.expired(cutoff))
+            sessions_to_delete.update(
+                session_id for session_id, state in self.sessions.items() if state.updated_at < cutoff
+            )
+
+            for session_id in sessions_to_delete:
+                self.delete_session(session_id)
+
         if sessions_to_delete:
             logger.info(f"Cleaned up {len(sessions_to_delete)} expired sessions")
-            
+
         return len(sessions_to_delete)
 
     def get_session_stats(self) -> Dict[str, Any]:
-        stats = {
-            "total_sessions": len(self.conversations),
-            "active_sessions": len(self.active_sessions),
-            "total_messages": sum(conv["metadata"].get("message_count", 0) for conv in self.conversations.values()),
-            "average_messages_per_session": 0
-        }
-        
+        with self.lock:
+            stats = {
+                "backend": type(self.backend).__name__,
+                "total_sessions": len(self.sessions),
+                "active_sessions": len(self.active_sessions),
+                "total_messages": sum(state.metadata.get("message_count", 0) for state in self.sessions.values()),
+                "cached_bytes": self.total_bytes,
+                "max_total_bytes": self.max_total_bytes,
+                "average_messages_per_session": 0
+            }
+
         if stats["total_sessions"] > 0:
             stats["average_messages_per_session"] = stats["total_messages"] / stats["total_sessions"]
-            
+
         return stats
-    
+
     def _validate_session(self, session_id: str) -> bool:
-        if session_id not in self.conversations:
+        if not self.has_session(session_id):
             logger.warning(f"Session {session_id} not found")
             return False
-            
+
         return True
-    
-    def _update_session_metadata(self, session_id: str, increment_turn: bool = False) -> None:
-        if session_id in self.conversations:
-            metadata = self.conversations[session_id]["metadata"]
-            metadata["last_updated"] = datetime.now().isoformat()
-            metadata["message_count"] = len(self.conversations[session_id]["messages"])
-            
-            if increment_turn:
-                metadata["turn_count"] = metadata.get("turn_count", 0) + 1
+
+    def _update_session_metadata(self, state: SessionState, increment_turn: bool = False) -> None:
+        state.metadata["last_updated"] = datetime.now().isoformat()
+        state.metadata["message_count"] = len(state.system) + len(state.window)
+
+        if increment_turn:
+            state.metadata["turn_count"] = state.metadata.get("turn_count", 0) + 1
 
 # Create singleton instance
 conversation_memory = ConversationMemoryManager()
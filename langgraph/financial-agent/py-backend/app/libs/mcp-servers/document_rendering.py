@@ -0,0 +1,541 @@
+"""
+Rendering functions for the Word generator MCP server.
+
+Everything here is a plain module-level function so it can run inside the
+``RenderJobQueue`` worker processes. Chart PNGs are cached on disk by a hash
+of their ``chart_data`` so identical charts are rendered once; the cache is
+swept by age and total size whenever a new chart is written.
+"""
+from typing import List, Dict, Any, Optional
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from docx import Document
+from docx.shared import Pt, Inches
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+import io
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt
+import json as json_lib
+
+logger = logging.getLogger("document-rendering")
+
+# Go up 4 levels to reach py-backend
+CHART_CACHE_DIR = os.environ.get(
+    "CHART_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), ".chart_cache")
+)
+CHART_CACHE_MAX_BYTES = int(os.environ.get("CHART_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+CHART_CACHE_MAX_AGE_SECONDS = int(os.environ.get("CHART_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600))
+# Files used this recently are never swept: their paths may be in a document being built
+CHART_CACHE_GRACE_SECONDS = 300
+
+def generate_chart_image(chart_data: Dict[str, Any]) -> io.BytesIO:
+    """
+    Generate a chart image from chart data and return as BytesIO stream.
+    
+    Args:
+        chart_data: Chart configuration and data
+        
+    Returns:
+        BytesIO stream containing the chart image
+    """
+    try:
+        chart_type = chart_data.get('chartType', 'line')
+        data = chart_data.get('data', [])
+        config = chart_data.get('config', {})
+        
+        if not data:
+            return None
+        
+        # Create figure and axis
+        plt.figure(figsize=(10, 6))
+        plt.style.use('default')
+        
+        if chart_type == 'line':
+            # Extract data for line chart
+            x_key = config.get('xAxisKey', 'x')
+            y_keys = [key for key in chart_data.get('chartConfig', {}).keys()]
+            
+            for y_key in y_keys:
+                x_vals = [item.get(x_key, '') for item in data]
+                y_vals = [item.get(y_key, 0) for item in data]
+                plt.plot(x_vals, y_vals, marker='o', label=y_key)
+            
+            plt.legend()
+            
+        elif chart_type == 'bar':
+            # Extract data for bar chart
+            x_key = config.get('xAxisKey', 'x')
+            y_keys = [key for key in chart_data.get('chartConfig', {}).keys()]
+            
+            x_vals = [item.get(x_key, '') for item in data]
+            
+            if len(y_keys) == 1:
+                # Single series bar chart
+                y_vals = [item.get(y_keys[0], 0) for item in data]
+                plt.bar(x_vals, y_vals)
+            else:
+                # Multiple series bar chart
+                import numpy as np
+                x_pos = np.arange(len(x_vals))
+                width = 0.8 / len(y_keys)
+                
+                for i, y_key in enumerate(y_keys):
+                    y_vals = [item.get(y_key, 0) for item in data]
+                    plt.bar(x_pos + i * width, y_vals, width, label=y_key)
+                
+                plt.xticks(x_pos + width * (len(y_keys) - 1) / 2, x_vals)
+                plt.legend()
+                
+        elif chart_type == 'pie':
+            # Extract data for pie chart
+            labels = [item.get('segment', item.get('name', '')) for item in data]
+            values = [item.get('value', 0) for item in data]
+            
+            plt.pie(values, labels=labels, autopct='%1.1f%%')
+            
+        elif chart_type == 'area':
+            # Extract data for area chart
+            x_key = config.get('xAxisKey', 'x')
+            y_keys = [key for key in chart_data.get('chartConfig', {}).keys()]
+            
+            x_vals = [item.get(x_key, '') for item in data]
+            
+            for y_key in y_keys:
+                y_vals = [item.get(y_key, 0) for item in data]
+                plt.fill_between(x_vals, y_vals, alpha=0.7, label=y_key)
+            
+            plt.legend()
+        
+        # Set title and labels
+        title = config.get('title', 'Chart')
+        plt.title(title, fontsize=16, fontweight='bold')
+        
+        x_label = config.get('xAxisLabel', '')
+        y_label = config.get('yAxisLabel', '')
+        if x_label:
+            plt.xlabel(x_label)
+        if y_label:
+            plt.ylabel(y_label)
+        
+        # Improve layout and styling
+        plt.tight_layout()
+        plt.grid(True, alpha=0.3)
+        
+        # Save to BytesIO
+        img_stream = io.BytesIO()
+        plt.savefig(img_stream, format='png', dpi=300, bbox_inches='tight')
+        img_stream.seek(0)
+        
+        # Close the plot to free memory
+        plt.close()
+        
+        return img_stream
+        
+    except Exception as e:
+        logger.error(f"Error generating chart image: {str(e)}")
+        plt.close()  # Ensure plot is closed even on error
+        return None
+
+def chart_digest(chart_data: Dict[str, Any]) -> str:
+    """Stable content hash of a chart definition."""
+    canonical = json_lib.dumps(chart_data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def render_chart(chart_data: Dict[str, Any], cache_dir: str = CHART_CACHE_DIR) -> Optional[str]:
+    """
+    Render a chart to PNG, reusing the cached image for identical chart data.
+    
+    Args:
+        chart_data: Chart configuration and data
+        cache_dir: Directory holding cached chart images
+        
+    Returns:
+        Path to the PNG file, or None if the chart could not be rendered
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{chart_digest(chart_data)}.png")
+    try:
+        os.utime(path)  # mtime tracks last use, so the sweep drops least recently used charts first
+        return path
+    except FileNotFoundError:
+        pass
+    
+    img_stream = generate_chart_image(chart_data)
+    if img_stream is None:
+        return None
+    
+    # Write then rename so parallel workers never see a partial image
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(img_stream.getbuffer())
+    os.replace(tmp_path, path)
+    sweep_chart_cache(cache_dir)
+    return path
+
+def sweep_chart_cache(cache_dir: str = CHART_CACHE_DIR,
+                      max_bytes: int = CHART_CACHE_MAX_BYTES,
+                      max_age_seconds: int = CHART_CACHE_MAX_AGE_SECONDS) -> int:
+    """
+    Remove cached charts unused for ``max_age_seconds``, then the least recently
+    used ones until the cache fits in ``max_bytes``.
+    
+    Args:
+        cache_dir: Directory holding cached chart images
+        max_bytes: Total size the cache is trimmed to
+        max_age_seconds: Age, since last use, after which a chart is removed
+        
+    Returns:
+        Number of files removed
+    """
+    now = time.time()
+    entries = []
+    for entry in os.scandir(cache_dir):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue  # removed by another worker
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in entries:
+        age = now - mtime
+        if age < CHART_CACHE_GRACE_SECONDS or (age < max_age_seconds and total <= max_bytes):
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+    if removed:
+        logger.info(f"Swept {removed} charts from {cache_dir} ({total} bytes left)")
+    return removed
+
+def parse_text_content(content: str) -> List[Dict[str, Any]]:
+    """
+    Parse plain text into structured elements for a Word document.
+    
+    Args:
+        content: Text content to parse
+        
+    Returns:
+        List of element dictionaries representing document structure
+    """
+    elements = []
+    lines = content.split('\n')
+    current_table = None
+    
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        
+        # Skip empty lines
+        if not line:
+            i += 1
+            continue
+        
+        # Check for headings (lines starting with # characters)
+        heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+        if heading_match:
+            level = len(heading_match.group(1))
+            text = heading_match.group(2)
+            elements.append({
+                'type': 'heading',
+                'text': text,
+                'level': level
+            })
+            i += 1
+            continue
+        
+        # Check for JSON chart data (```json ... ```)
+        if line.startswith('```json'):
+            # Start collecting JSON content
+            json_content = []
+            i += 1
+            while i < len(lines) and not lines[i].strip() == '```':
+                json_content.append(lines[i])
+                i += 1
+            
+            if i < len(lines):  # Found closing ```
+                try:
+                    json_str = '\n'.join(json_content)
+                    chart_data = json_lib.loads(json_str)
+                    elements.append({
+                        'type': 'chart',
+                        'data': chart_data
+                    })
+                except json_lib.JSONDecodeError:
+                    # If JSON is invalid, treat as code block
+                    elements.append({
+                        'type': 'code',
+                        'text': '\n'.join(['```json'] + json_content + ['```'])
+                    })
+            i += 1
+            continue
+        
+        # Check for table markers (| column | column |)
+        if line.startswith('|') and line.endswith('|'):
+            # Start of a new table or continuation of an existing one
+            if current_table is None:
+                current_table = {
+                    'type': 'table',
+                    'rows': []
+                }
+                elements.append(current_table)
+            
+            # Extract cells from the row
+            cells = [cell.strip() for cell in line.strip('|').split('|')]
+            current_table['rows'].append(cells)
+            
+            # Check if next line is a separator line (|---|---|)
+            if i+1 < len(lines) and re.match(r'^\|[\s\-:]+\|$', lines[i+1].strip()):
+                # Skip the separator row
+                i += 2
+            else:
+                i += 1
+            continue
+        
+        # If we reach here and were processing a table, end the table
+        if current_table is not None:
+            current_table = None
+        
+        # Check for bullets (lines starting with * or -)
+        if line.startswith('* ') or line.startswith('- '):
+            bullet_text = line[2:]
+            elements.append({
+                'type': 'bullet',
+                'text': bullet_text
+            })
+            i += 1
+            continue
+        
+        # Default: treat as regular paragraph
+        elements.append({
+            'type': 'paragraph',
+            'text': line
+        })
+        i += 1
+    
+    return elements
+
+def add_element_to_document(doc: Document, element: Dict[str, Any]):
+    """
+    Add an element to the document based on its type.
+    
+    Args:
+        doc: The document object
+        element: Element dictionary from parse_text_content
+    """
+    element_type = element.get('type', 'paragraph')
+    
+    if element_type == 'heading':
+        doc.add_heading(element['text'], level=element['level'])
+    
+    elif element_type == 'paragraph':
+        doc.add_paragraph(element['text'])
+    
+    elif element_type == 'bullet':
+        paragraph = doc.add_paragraph()
+        paragraph.style = 'List Bullet'
+        paragraph.add_run(element['text'])
+    
+    elif element_type == 'chart':
+        # Use the pre-rendered chart if the caller provided one, otherwise render (or reuse) it now
+        chart_data = element.get('data', {})
+        chart_image_stream = element.get('image_path') or render_chart(chart_data)
+        if chart_image_stream:
+            # Add chart title if available
+            chart_title = chart_data.get('config', {}).get('title', 'Chart')
+            if chart_title:
+                title_para = doc.add_paragraph()
+                title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                title_run = title_para.add_run(chart_title)
+                title_run.bold = True
+                title_run.font.size = Pt(14)
+            
+            # Insert the chart image
+            doc.add_picture(chart_image_stream, width=Inches(6))
+            
+            # Add some spacing after the chart
+            doc.add_paragraph()
+    
+    elif element_type == 'code':
+        # Handle code blocks
+        paragraph = doc.add_paragraph()
+        paragraph.style = 'Normal'
+        run = paragraph.add_run(element['text'])
+        run.font.name = 'Courier New'
+        run.font.size = Pt(9)
+    
+    elif element_type == 'table':
+        rows = element.get('rows', [])
+        if rows:
+            # Create table with appropriate dimensions
+            table = doc.add_table(rows=len(rows), cols=len(rows[0]))
+            table.style = 'Table Grid'
+            
+            # Fill the table with data
+            for i, row_data in enumerate(rows):
+                for j, cell_text in enumerate(row_data):
+                    if j < len(table.rows[i].cells):  # Ensure we don't go out of bounds
+                        table.rows[i].cells[j].text = cell_text
+            
+            # Format first row as header if it has content
+            if len(rows) > 1:
+                for cell in table.rows[0].cells:
+                    for paragraph in cell.paragraphs:
+                        for run in paragraph.runs:
+                            run.bold = True
+
+def build_word_document(full_path: str, elements: List[Dict[str, Any]], title: Optional[str] = None, author: Optional[str] = None):
+    """
+    Build and save a Word document from parsed content elements.
+    
+    Args:
+        full_path: Path to save the Word document
+        elements: Elements from parse_text_content, charts optionally carrying an image_path
+        title: Optional document title metadata
+        author: Optional document author metadata
+    """
+    doc = Document()
+    
+    # Set properties if provided
+    if title:
+        doc.core_properties.title = title
+    if author:
+        doc.core_properties.author = author
+    
+    for element in elements:
+        add_element_to_document(doc, element)
+    
+    doc.save(full_path)
+
+def build_table_document(filename: str, table_data: List[List[str]], title: Optional[str] = None):
+    """
+    Build and save a Word document containing a single table.
+    
+    Args:
+        filename: Path to save the Word document
+        table_data: 2D list of rows and columns
+        title: Optional title to add above the table
+    """
+    doc = Document()
+    
+    if title:
+        doc.add_heading(title, level=1)
+    
+    # Add table to document
+    rows = len(table_data)
+    cols = len(table_data[0]) if rows > 0 else 0
+    
+    if rows > 0 and cols > 0:
+        table = doc.add_table(rows=rows, cols=cols)
+        table.style = 'Table Grid'
+        
+        # Fill table with data
+        for i, row_data in enumerate(table_data):
+            for j, cell_text in enumerate(row_data):
+                if j < cols:  # Ensure within bounds
+                    table.cell(i, j).text = cell_text
+        
+        # Format first row as header if table has multiple rows
+        if rows > 1:
+            for cell in table.rows[0].cells:
+                for paragraph in cell.paragraphs:
+                    for run in paragraph.runs:
+                        run.bold = True
+    
+    doc.save(filename)
+
+def build_financial_report(filename: str, data: Dict[str, Any], title: str = "Financial Report"):
+    """
+    Build and save a formatted financial report Word document.
+    
+    Args:
+        filename: Path to save the Word document
+        data: Dictionary containing financial data sections
+        title: Report title
+    """
+    doc = Document()
+    
+    # Add title
+    doc.add_heading(title, level=0)
+    
+    # Add summary section
+    if "summary" in data:
+        doc.add_heading("Executive Summary", level=1)
+        doc.add_paragraph(data["summary"])
+    
+    # Add highlights section
+    if "highlights" in data and isinstance(data["highlights"], list):
+        doc.add_heading("Key Highlights", level=1)
+        for item in data["highlights"]:
+            p = doc.add_paragraph(style="List Bullet")
+            p.add_run(item)
+    
+    # Add metrics section
+    if "metrics" in data and isinstance(data["metrics"], dict):
+        doc.add_heading("Financial Metrics", level=1)
+        metrics = data["metrics"]
+        table = doc.add_table(rows=len(metrics)+1, cols=2)
+        table.style = 'Table Grid'
+        
+        # Add header row
+        header_cells = table.rows[0].cells
+        header_cells[0].text = "Metric"
+        header_cells[1].text = "Value"
+        
+        # Style header row
+        for cell in table.rows[0].cells:
+            for paragraph in cell.paragraphs:
+                for run in paragraph.runs:
+                    run.bold = True
+        
+        # Add metric rows
+        i = 1
+        for metric_name, metric_value in metrics.items():
+            if i < len(table.rows):
+                row = table.rows[i]
+                row.cells[0].text = str(metric_name)
+                row.cells[1].text = str(metric_value)
+                i += 1
+    
+    # Add quarterly data section
+    if "quarterly_data" in data and isinstance(data["quarterly_data"], list):
+        quarterly_data = data["quarterly_data"]
+        if quarterly_data:
+            doc.add_heading("Quarterly Performance", level=1)
+            
+            # Add header row if not already included
+            header_row = ["Quarter", "Revenue", "Expenses", "Net Income"]
+            if len(quarterly_data) > 0 and "Q" not in str(quarterly_data[0][0]):
+                quarterly_data.insert(0, header_row)
+            
+            # Create table
+            rows = len(quarterly_data)
+            cols = len(quarterly_data[0]) if rows > 0 else 0
+            
+            if rows > 0 and cols > 0:
+                table = doc.add_table(rows=rows, cols=cols)
+                table.style = 'Table Grid'
+                
+                # Fill table with data
+                for i, row_data in enumerate(quarterly_data):
+                    for j, cell_text in enumerate(row_data):
+                        if j < cols:  # Ensure within bounds
+                            table.cell(i, j).text = str(cell_text)
+                
+                # Format header row
+                for cell in table.rows[0].cells:
+                    for paragraph in cell.paragraphs:
+                        for run in paragraph.runs:
+                            run.bold = True
+    
+    doc.save(filename)
@@ -2,11 +2,11 @@ from typing import List, Dict, Any, Optional
 from mcp.server.fastmcp import FastMCP
 import logging
 import asyncio
-import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import time
 import argparse
+from market_data import MarketDataCache
+from technical_indicators import IndicatorPanel, compute_technical_indicators
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -49,6 +49,9 @@ def check_rate_limit():
 class APIError(Exception):
     pass
 
+# Shared cache in front of yfinance; only upstream fetches count against the rate limit
+market_data = MarketDataCache(rate_limiter=check_rate_limit)
+
 # Helper functions for analysis interpretation
 def interpret_rsi(rsi: float) -> str:
     if rsi >= 70: return "Overbought"
@@ -71,11 +74,8 @@ def interpret_relative_strength(stock_change: float, sp500_change: float) -> str
     else: return "Market performer"
 
 async def fetch_fundamental_analysis(equity):
-    check_rate_limit()
-    
     try:
-        ticker = yf.Ticker(equity)
-        info = ticker.info
+        info = await market_data.get_info(equity)
         if not info:
             raise ValueError(f"No fundamental data available for {equity}")
         
@@ -157,83 +157,35 @@ async def fetch_fundamental_analysis(equity):
         raise APIError(f"Fundamental analysis failed: {str(e)}")
 
 async def fetch_technical_analysis(equity):
-    check_rate_limit()
-    
     try:
-        ticker = yf.Ticker(equity)
-        hist = ticker.history(period="1y")
+        hist = await market_data.get_history(equity, period="1y", interval="1d")
         if hist.empty:
             raise ValueError(f"No historical data available for {equity}")
 
-        current_price = hist["Close"].iloc[-1]
-        avg_volume = hist["Volume"].mean()
-
-        sma_20 = hist["Close"].rolling(window=20).mean().iloc[-1]
-        sma_50 = hist["Close"].rolling(window=50).mean().iloc[-1]
-        sma_200 = hist["Close"].rolling(window=200).mean().iloc[-1]
-
-        delta = hist["Close"].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs)).iloc[-1]
-
-        high_low = hist["High"] - hist["Low"]
-        high_close = (hist["High"] - hist["Close"].shift()).abs()
-        low_close = (hist["Low"] - hist["Close"].shift()).abs()
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        atr = true_range.rolling(window=14).mean().iloc[-1]
-
-        ema12 = hist["Close"].ewm(span=12, adjust=False).mean()
-        ema26 = hist["Close"].ewm(span=26, adjust=False).mean()
-        macd = ema12 - ema26
-        signal_line = macd.ewm(span=9, adjust=False).mean()
-        macd_histogram = macd - signal_line
-
-        price_changes = {
-            "1d": hist["Close"].pct_change(periods=1).iloc[-1] * 100,
-            "5d": hist["Close"].pct_change(periods=5).iloc[-1] * 100,
-            "20d": hist["Close"].pct_change(periods=20).iloc[-1] * 100
-        }
-
-        ma_distances = {
-            "from_20sma": ((current_price / sma_20) - 1) * 100,
-            "from_50sma": ((current_price / sma_50) - 1) * 100,
-            "from_200sma": ((current_price / sma_200) - 1) * 100
-        }
-
-        return {
-            "price": current_price,
-            "avg_volume": avg_volume,
-            "moving_averages": {
-                "sma_20": sma_20,
-                "sma_50": sma_50,
-                "sma_200": sma_200
-            },
-            "indicators": {
-                "rsi": rsi,
-                "atr": atr,
-                "atr_percent": (atr / current_price) * 100,
-                "macd": macd.iloc[-1],
-                "macd_signal": signal_line.iloc[-1],
-                "macd_histogram": macd_histogram.iloc[-1]
-            },
-            "trend_analysis": price_changes,
-            "ma_distances": ma_distances
-        }
+        return compute_technical_indicators(hist)
     except Exception as e:
         logger.error(f"Error in technical analysis for {equity}: {str(e)}")
         raise APIError(f"Technical analysis failed: {str(e)}")
 
+async def fetch_technical_batch(equities):
+    try:
+        histories = await market_data.get_histories(equities, period="1y", interval="1d")
+        panel = IndicatorPanel.from_histories(histories)
+        results = panel.compute() if panel.symbols else {}
+        for equity in histories:
+            if equity not in results:
+                results[equity] = {"error": f"No historical data available for {equity}"}
+        return results
+    except Exception as e:
+        logger.error(f"Error in batch technical analysis for {len(equities)} equities: {str(e)}")
+        raise APIError(f"Batch technical analysis failed: {str(e)}")
+
 async def fetch_comprehensive_analysis(equity):
-    check_rate_limit()
-    
     try:
-        fundamental_data = await fetch_fundamental_analysis(equity)
-        technical_data = await fetch_technical_analysis(equity)
+        fundamental_data, technical_data = await asyncio.gather(
+            fetch_fundamental_analysis(equity),
+            fetch_technical_analysis(equity)
+        )
         
         current_price = technical_data["price"]
         target_price = fundamental_data["analyst_opinions"]["targetMeanPrice"]
@@ -311,8 +263,6 @@ async def fetch_comprehensive_analysis(equity):
         raise APIError(f"Comprehensive analysis failed: {str(e)}")
 
 async def fetch_fundamental_by_groups(equity, groups):
-    check_rate_limit()
-    
     try:
         full_data = await fetch_fundamental_analysis(equity)
         result = {}
@@ -325,8 +275,6 @@ async def fetch_fundamental_by_groups(equity, groups):
         raise APIError(f"Fundamental groups analysis failed: {str(e)}")
 
 async def fetch_technical_by_groups(equity, groups):
-    check_rate_limit()
-    
     try:
         full_data = await fetch_technical_analysis(equity)
         result = {}
@@ -440,6 +388,24 @@ async def technical_data_by_category(equity: str, categories: str) -> str:
     except Exception as e:
         return f"Error retrieving technical data: {str(e)}"
 
+@mcp.tool()
+async def technical_data_batch(equities: List[str]) -> str:
+    """
+    Get technical indicators for several stocks in one call.
+    Use this instead of calling technical_data_by_category once per ticker when a question
+    covers a portfolio, watchlist or comparison of multiple stocks.
+    
+    Args:
+        equities: List of stock ticker symbols (e.g., ["AAPL", "MSFT", "TSLA"])
+    """
+    try:
+        if not equities:
+            return "No equities provided"
+        data = await fetch_technical_batch(equities)
+        return format_analysis_results(data)
+    except Exception as e:
+        return f"Error retrieving batch technical data: {str(e)}"
+
 @mcp.tool()
 async def comprehensive_analysis(equity: str) -> str:
     """
@@ -0,0 +1,341 @@
+"""
+Shared async market-data layer for the Yahoo Finance backed MCP servers.
+
+Wraps the blocking yfinance calls with:
+- an in-memory TTL cache per (symbol, period, interval) and per symbol info, bounded by an LRU,
+- single-flight coalescing so concurrent tool calls for the same key share one fetch,
+- a bounded thread pool so yfinance never blocks the event loop,
+- a disk cache (parquet for price history, JSON for ticker info) that survives restarts
+  and is shared by every server process pointing at the same directory.
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger("market-data")
+
+INTRADAY_INTERVALS = {'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'}
+
+DEFAULT_CACHE_DIR = os.environ.get("MARKET_DATA_CACHE_DIR", ".market_data_cache")
+
+_MISSING = object()
+# Key kinds holding DataFrames: "history" from Ticker.history, "download" from yf.download
+HISTORY_KINDS = ("history", "download")
+
+
+class MarketDataCache:
+    def __init__(self,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 rate_limiter: Optional[Callable[[], None]] = None,
+                 info_ttl: int = 300,
+                 daily_history_ttl: int = 900,
+                 intraday_history_ttl: int = 60,
+                 max_workers: int = 8,
+                 max_memory_entries: int = 1024):
+        """
+        Args:
+            cache_dir: Directory for the on-disk cache, or None to keep everything in memory
+            rate_limiter: Called before every upstream fetch (cache hits are free); may raise
+            info_ttl: Seconds to keep ticker info
+            daily_history_ttl: Seconds to keep daily-or-coarser price history
+            intraday_history_ttl: Seconds to keep intraday price history
+            max_workers: Size of the thread pool running yfinance calls
+            max_memory_entries: In-memory entries kept; expired entries go first, then the least recently used
+        """
+        self.cache_dir = cache_dir
+        self.rate_limiter = rate_limiter
+        self.info_ttl = info_ttl
+        self.daily_history_ttl = daily_history_ttl
+        self.intraday_history_ttl = intraday_history_ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yfinance")
+
+        self.max_memory_entries = max_memory_entries
+        self.memory: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()  # LRU order, most recent last
+        self.inflight: Dict[Tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self.parquet_enabled = cache_dir is not None
+        if cache_dir:
+            os.makedirs(os.path.join(cache_dir, "history"), exist_ok=True)
+            os.makedirs(os.path.join(cache_dir, "info"), exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Disk cache
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, key: Tuple) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        kind = key[0]
+        name = "_".join(str(part) for part in key[1:]).replace("^", "IDX-").replace("/", "-")
+        if kind == "history":
+            return os.path.join(self.cache_dir, "history", f"{name}.parquet")
+        if kind == "download":
+            return os.path.join(self.cache_dir, "history", f"download_{name}.parquet")
+        return os.path.join(self.cache_dir, "info", f"{name}.json")
+
+    def _read_disk(self, key: Tuple, ttl: int) -> Optional[Any]:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        try:
+            if key[0] in HISTORY_KINDS:
+                if not self.parquet_enabled:
+                    return None
+                return pd.read_parquet(path)
+            with open(path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable market data cache file {path}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: Tuple, value: Any) -> None:
+        path = self._disk_path(key)
+        if not path:
+            return
+        try:
+            # Write then rename so concurrent server processes never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            if key[0] in HISTORY_KINDS:
+                if not self.parquet_enabled:
+                    os.remove(tmp_path)
+                    return
+                try:
+                    value.to_parquet(tmp_path)
+                except ImportError:
+                    logger.warning("pyarrow/fastparquet not installed; disabling on-disk history cache")
+                    self.parquet_enabled = False
+                    os.remove(tmp_path)
+                    return
+            else:
+                with open(tmp_path, "w") as f:
+                    json.dump(value, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write market data cache file {path}: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Memory cache
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: Tuple, now: float) -> Any:
+        """Fresh in-memory value for ``key``, or ``_MISSING``; an expired entry is dropped."""
+        cached = self.memory.get(key)
+        if cached is None:
+            return _MISSING
+        if cached[0] <= now:
+            del self.memory[key]
+            return _MISSING
+        self.memory.move_to_end(key)
+        return cached[1]
+
+    def _memory_put(self, key: Tuple, ttl: int, value: Any) -> None:
+        self.memory[key] = (time.monotonic() + ttl, value)
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_memory_entries:
+            now = time.monotonic()
+            for expired in [k for k, (expires, _) in self.memory.items() if expires <= now]:
+                del self.memory[expired]
+            while len(self.memory) > self.max_memory_entries:
+                self.memory.popitem(last=False)
+                self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    def _history_ttl(self, interval: str) -> int:
+        return self.intraday_history_ttl if interval in INTRADAY_INTERVALS else self.daily_history_ttl
+
+    async def _get(self, key: Tuple, ttl: int, fetch: Callable[[], Any]) -> Any:
+        cached = self._memory_get(key, time.monotonic())
+        if cached is not _MISSING:
+            self.hits += 1
+            return cached
+
+        # Single-flight: join an in-progress fetch for the same key
+        inflight = self.inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader was cancelled, not this caller: fetch again
+                return await self._get(key, ttl, fetch)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.inflight[key] = future
+        try:
+            value = await loop.run_in_executor(self.executor, self._read_disk, key, ttl)
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if self.rate_limiter:
+                    self.rate_limiter()
+                value = await loop.run_in_executor(self.executor, fetch)
+                await loop.run_in_executor(self.executor, self._write_disk, key, value)
+
+            self._memory_put(key, ttl, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            # Cancellation is not an Exception; release the waiters instead of leaving them pending
+            if not future.done():
+                future.cancel()
+            self.inflight.pop(key, None)
+
+    async def get_info(self, symbol: str) -> Dict[str, Any]:
+        """Ticker ``info`` dict for ``symbol``."""
+        symbol = symbol.upper()
+        return await self._get(("info", symbol), self.info_ttl, lambda: yf.Ticker(symbol).info or {})
+
+    async def get_history(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """OHLCV history for ``symbol``. Treat the returned frame as read-only; it is shared."""
+        symbol = symbol.upper()
+        return await self._get(
+            ("history", symbol, period, interval),
+            self._history_ttl(interval),
+            lambda: yf.Ticker(symbol).history(period=period, interval=interval)
+        )
+
+    @staticmethod
+    def _download_histories(symbols: List[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+        frame = yf.download(symbols, period=period, interval=interval, group_by="ticker",
+                            auto_adjust=True, threads=True, progress=False)
+        histories = {}
+        for symbol in symbols:
+            if isinstance(frame.columns, pd.MultiIndex):
+                if symbol not in frame.columns.get_level_values(0):
+                    histories[symbol] = pd.DataFrame()
+                    continue
+                hist = frame[symbol]
+            else:
+                hist = frame
+            histories[symbol] = hist.dropna(how="all")
+        return histories
+
+    async def get_histories(self, symbols: List[str], period: str = "1y",
+                            interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        """
+        OHLCV history for many symbols.
+
+        Cached and in-flight keys are served as usual; everything else is
+        fetched with a single ``yf.download`` call, which counts once against
+        the rate limit regardless of how many symbols it covers. Frames from
+        ``yf.download`` have other columns than ``Ticker.history``, so they are
+        cached under their own ``download`` keys.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        ttl = self._history_ttl(interval)
+        now = time.monotonic()
+        loop = asyncio.get_running_loop()
+
+        results: Dict[str, pd.DataFrame] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        owned: Dict[str, asyncio.Future] = {}
+        for symbol in symbols:
+            key = ("download", symbol, period, interval)
+            cached = self._memory_get(key, now)
+            if cached is not _MISSING:
+                self.hits += 1
+                results[symbol] = cached
+            elif key in self.inflight:
+                self.coalesced += 1
+                waiting[symbol] = self.inflight[key]
+            else:
+                owned[symbol] = self.inflight[key] = loop.create_future()
+
+        try:
+            missing = []
+            for symbol in owned:
+                key = ("download", symbol, period, interval)
+                value = await loop.run_in_executor(self.executor, self._read_disk, key, ttl)
+                if value is None:
+                    missing.append(symbol)
+                else:
+                    self.hits += 1
+                    results[symbol] = value
+
+            if missing:
+                self.misses += len(missing)
+                if self.rate_limiter:
+                    self.rate_limiter()
+                downloaded = await loop.run_in_executor(
+                    self.executor, self._download_histories, missing, period, interval
+                )
+                for symbol, hist in downloaded.items():
+                    if not hist.empty:
+                        await loop.run_in_executor(
+                            self.executor, self._write_disk, ("download", symbol, period, interval), hist
+                        )
+                    results[symbol] = hist
+
+            for symbol, future in owned.items():
+                key = ("download", symbol, period, interval)
+                self._memory_put(key, ttl, results[symbol])
+                future.set_result(results[symbol])
+        except Exception as e:
+            for future in owned.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            raise
+        finally:
+            for symbol, future in owned.items():
+                if not future.done():
+                    future.cancel()
+                self.inflight.pop(("download", symbol, period, interval), None)
+
+        for symbol, future in waiting.items():
+            try:
+                results[symbol] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                results[symbol] = pd.DataFrame()
+            except Exception:
+                results[symbol] = pd.DataFrame()
+        return results
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop in-memory entries for ``symbol`` (or everything)."""
+        if symbol is None:
+            self.memory.clear()
+            return
+        symbol = symbol.upper()
+        for key in [k for k in self.memory if k[1] == symbol]:
+            del self.memory[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self.inflight)
+        }
@@ -9,6 +9,8 @@ import json
 import subprocess
 import platform
 import shutil
+import tempfile
+from render_jobs import RenderJobQueue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -51,6 +53,13 @@ def check_rate_limit():
 class APIError(Exception):
     pass
 
+# Conversions run in worker processes; tools wait this long before handing back a job ID to poll
+JOB_WAIT_SECONDS = float(os.environ.get("RENDER_JOB_WAIT_SECONDS", "60"))
+render_jobs = RenderJobQueue(
+    max_workers=int(os.environ.get("RENDER_WORKERS", "2")),
+    max_pending=int(os.environ.get("RENDER_MAX_PENDING", "16"))
+)
+
 # Utility functions
 def check_file_writeable(filepath: str):
     """
@@ -104,7 +113,7 @@ def ensure_docx_extension(filename: str) -> str:
 
 async def convert_docx_to_pdf(filename: str, output_filename: Optional[str] = None):
     """
-    Convert a Word document to PDF format.
+    Convert a Word document to PDF format in a worker process.
     
     Args:
         filename: Path to the Word document
@@ -114,7 +123,19 @@ async def convert_docx_to_pdf(filename: str, output_filename: Optional[str] = No
         Status message with result of conversion
     """
     check_rate_limit()
+    return await render_jobs.run(convert_docx_to_pdf_sync, filename, output_filename)
+
+def convert_docx_to_pdf_sync(filename: str, output_filename: Optional[str] = None):
+    """
+    Blocking conversion; runs inside a render worker process.
     
+    Args:
+        filename: Path to the Word document
+        output_filename: Optional path for the output PDF
+        
+    Returns:
+        Status message with result of conversion
+    """
     try:
         filename = ensure_docx_extension(filename)
         
@@ -180,8 +201,12 @@ async def convert_docx_to_pdf(filename: str, output_filename: Optional[str] = No
                         # Ensure the directory exists
                         os.makedirs(output_dir, exist_ok=True)
                         
+                        # A private profile per worker lets conversions run side by side;
+                        # LibreOffice refuses to start twice on the same profile
+                        profile_dir = os.path.join(tempfile.gettempdir(), f"lo-profile-{os.getpid()}")
                         cmd = [
                             cmd_name, 
+                            f'-env:UserInstallation=file://{profile_dir}',
                             '--headless', 
                             '--convert-to', 
                             'pdf', 
@@ -247,11 +272,24 @@ async def convert_to_pdf(filename: str, output_filename: Optional[str] = None) -
                          will use the same name with .pdf extension
     """
     try:
-        result = await convert_docx_to_pdf(filename, output_filename)
-        return result
+        job_id = render_jobs.submit("convert_to_pdf", convert_docx_to_pdf, filename, output_filename)
+        return render_jobs.describe(await render_jobs.wait(job_id, JOB_WAIT_SECONDS))
     except Exception as e:
         return f"Error converting document to PDF: {str(e)}"
 
+@mcp.tool()
+async def pdf_job_status(job_id: str) -> str:
+    """
+    Check the status of a PDF conversion job.
+    
+    Use this when convert_to_pdf replied that its job is still queued or running.
+    Returns the conversion result once the job has finished.
+    
+    Args:
+        job_id: Job ID returned by convert_to_pdf
+    """
+    return render_jobs.describe(render_jobs.status(job_id))
+
 def main():
     parser = argparse.ArgumentParser(description='Run PDF Generator MCP server')
     parser.add_argument('--port', type=int, default=8089, help='Port to run the server on')
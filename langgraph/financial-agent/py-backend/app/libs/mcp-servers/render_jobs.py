@@ -0,0 +1,141 @@
+"""
+Bounded process pool and job registry for the document MCP servers.
+
+CPU-heavy rendering (matplotlib charts, python-docx, LibreOffice conversion)
+runs in worker processes so one large report can't stall the FastMCP event
+loop. Each tool call becomes a job with a status that clients can poll when
+it outlives the tool's wait window.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("render-jobs")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class RenderJobQueue:
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, job_ttl: int = 3600):
+        """
+        Args:
+            max_workers: Number of rendering worker processes
+            max_pending: Jobs allowed to be queued or running before new ones are rejected
+            job_ttl: Seconds a finished job's status is kept for polling
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # spawn: the servers run threads (uvicorn/anyio), which fork doesn't play well with
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run a picklable module-level function in the worker pool."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge chart); start a fresh pool for the next job
+            logger.error("Render worker pool is broken; recreating it")
+            if self.executor is executor:
+                self.executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job["finished_at"] and job["finished_at"] < cutoff]:
+            del self.jobs[job_id]
+
+    async def _execute(self, job_id: str, coro_fn: Callable[..., Awaitable[Any]], args: tuple) -> None:
+        job = self.jobs[job_id]
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        try:
+            job["result"] = await coro_fn(*args)
+            job["status"] = "done"
+        except Exception as e:
+            logger.error(f"Render job {job_id} ({job['kind']}) failed: {str(e)}")
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+            self.tasks.pop(job_id, None)
+
+    def submit(self, kind: str, coro_fn: Callable[..., Awaitable[Any]], *args) -> str:
+        """
+        Queue ``coro_fn(*args)`` as a job and return its id.
+
+        ``coro_fn`` runs on the event loop and is expected to push its heavy
+        parts through ``run``. Raises ``QueueFullError`` when ``max_pending``
+        jobs are already in flight.
+        """
+        self._prune()
+        if self.pending_count() >= self.max_pending:
+            raise QueueFullError(f"Renderer is busy ({self.max_pending} jobs in progress). Please try again shortly.")
+
+        job_id = uuid.uuid4().hex[:12]
+        self.jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None
+        }
+        self.tasks[job_id] = asyncio.get_running_loop().create_task(self._execute(job_id, coro_fn, args))
+        logger.info(f"Queued render job {job_id} ({kind}); {self.pending_count()} pending")
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait up to ``timeout`` seconds for the job to finish, then return its status."""
+        task = self.tasks.get(job_id)
+        if task is not None:
+            # asyncio.wait leaves the task running on timeout
+            await asyncio.wait([task], timeout=timeout)
+        return self.status(job_id)
+
+    def describe(self, job: Optional[Dict[str, Any]]) -> str:
+        """Tool-facing message for a job status."""
+        if job is None:
+            return "Unknown job ID. Finished jobs are kept for a limited time."
+        if job["status"] == "done":
+            return job["result"]
+        if job["status"] == "failed":
+            return f"Job {job['id']} failed: {job['error']}"
+        elapsed = time.time() - job["created_at"]
+        return (f"Job {job['id']} is {job['status']} ({elapsed:.0f}s elapsed). "
+                f"Check again later with the job status tool using job_id={job['id']}.")
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -7,7 +7,7 @@ import asyncio
 import aiohttp
 from datetime import datetime, timedelta
 import argparse
-import yfinance as yf
+from market_data import MarketDataCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -48,6 +48,9 @@ def check_rate_limit():
     request_count["minute"] += 1
     request_count["day"] += 1
 
+# Shared cache in front of yfinance; quotes go stale quickly so keep info for a minute only
+market_data = MarketDataCache(rate_limiter=check_rate_limit, info_ttl=60)
+
 # Helper functions for formatting output
 def format_number(num):
     """Format a number with commas and 2 decimal places"""
@@ -119,10 +122,7 @@ async def yahoo_stock_quote(symbol: str) -> str:
         symbol: Stock ticker symbol (e.g., AAPL, MSFT, TSLA)
     """
     try:
-        # Use yfinance library
-        loop = asyncio.get_event_loop()
-        ticker = await loop.run_in_executor(None, yf.Ticker, symbol)
-        info = await loop.run_in_executor(None, lambda: ticker.info)
+        info = await market_data.get_info(symbol)
         
         if not info:
             return f"No data found for symbol: {symbol}"
@@ -167,8 +167,6 @@ async def yahoo_stock_history(symbol: str, period: str = "1mo", interval: str =
         interval: Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
     """
     try:
-        check_rate_limit()
-        
         # Validate period and interval
         valid_periods = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
         valid_intervals = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
@@ -179,17 +177,23 @@ async def yahoo_stock_history(symbol: str, period: str = "1mo", interval: str =
         if interval not in valid_intervals:
             raise ValueError(f"Invalid interval: {interval}. Valid intervals are: {', '.join(valid_intervals)}")
         
-        # Use yfinance library
-        loop = asyncio.get_event_loop()
-        ticker = await loop.run_in_executor(None, yf.Ticker, symbol)
-        history = await loop.run_in_executor(None, lambda: ticker.history(period=period, interval=interval))
+        history, info = await asyncio.gather(
+            market_data.get_history(symbol, period=period, interval=interval),
+            market_data.get_info(symbol),
+            return_exceptions=True
+        )
+        if isinstance(history, Exception):
+            raise history
+        if isinstance(info, Exception):
+            logger.warning(f"Could not fetch currency for {symbol}: {str(info)}")
+            info = {}
         
         if history.empty:
             return f"No historical data found for symbol: {symbol}"
         
         # Format the output
         result = f"Historical data for {symbol} ({period}, {interval} intervals)\n"
-        result += f"Currency: {ticker.info.get('currency', 'USD')}\n\n"
+        result += f"Currency: {info.get('currency', 'USD')}\n\n"
         
         # Table header
         result += "Date       | Open     | High     | Low      | Close    | Volume\n"
@@ -244,18 +248,19 @@ async def yahoo_market_data(indices: List[str] = None) -> str:
                 Default: ["^GSPC", "^DJI", "^IXIC"] (S&P 500, Dow Jones, NASDAQ)
     """
     try:
-        check_rate_limit()
-        
         if indices is None:
             indices = ["^GSPC", "^DJI", "^IXIC"]  # Default indices: S&P 500, Dow Jones, NASDAQ
         
-        loop = asyncio.get_event_loop()
         index_results = []
+        infos = await asyncio.gather(
+            *(market_data.get_info(index_symbol) for index_symbol in indices),
+            return_exceptions=True
+        )
         
-        for index_symbol in indices:
+        for index_symbol, info in zip(indices, infos):
             try:
-                ticker = await loop.run_in_executor(None, yf.Ticker, index_symbol)
-                info = await loop.run_in_executor(None, lambda: ticker.info)
+                if isinstance(info, Exception):
+                    raise info
                 
                 if info:
                     index_results.append({
@@ -0,0 +1,206 @@
+"""
+Technical indicator engine for the financial analysis MCP server.
+
+``compute_technical_indicators`` is the per-ticker pandas path used by
+``fetch_technical_analysis``. ``IndicatorPanel`` computes the same indicators
+for many tickers at once: OHLCV series are right-aligned into (bars, tickers)
+NumPy arrays so every indicator is a single vectorized operation across all
+tickers, and EMA state is kept so a new bar can be applied without replaying
+the history.
+"""
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SMA_WINDOWS = (20, 50, 200)
+RSI_WINDOW = 14
+ATR_WINDOW = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+CHANGE_PERIODS = {"1d": 1, "5d": 5, "20d": 20}
+
+FIELDS = ("High", "Low", "Close", "Volume")
+
+
+def _build_result(price, avg_volume, sma_20, sma_50, sma_200, rsi, atr, macd, macd_signal, price_changes) -> Dict[str, Any]:
+    return {
+        "price": price,
+        "avg_volume": avg_volume,
+        "moving_averages": {
+            "sma_20": sma_20,
+            "sma_50": sma_50,
+            "sma_200": sma_200
+        },
+        "indicators": {
+            "rsi": rsi,
+            "atr": atr,
+            "atr_percent": (atr / price) * 100,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_histogram": macd - macd_signal
+        },
+        "trend_analysis": price_changes,
+        "ma_distances": {
+            "from_20sma": ((price / sma_20) - 1) * 100,
+            "from_50sma": ((price / sma_50) - 1) * 100,
+            "from_200sma": ((price / sma_200) - 1) * 100
+        }
+    }
+
+
+def compute_technical_indicators(hist: pd.DataFrame) -> Dict[str, Any]:
+    """Indicators for a single ticker's OHLCV history."""
+    current_price = hist["Close"].iloc[-1]
+    avg_volume = hist["Volume"].mean()
+
+    sma_20 = hist["Close"].rolling(window=20).mean().iloc[-1]
+    sma_50 = hist["Close"].rolling(window=50).mean().iloc[-1]
+    sma_200 = hist["Close"].rolling(window=200).mean().iloc[-1]
+
+    delta = hist["Close"].diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.rolling(window=14).mean()
+    avg_loss = loss.rolling(window=14).mean()
+    rs = avg_gain / avg_loss
+    rsi = 100 - (100 / (1 + rs)).iloc[-1]
+
+    high_low = hist["High"] - hist["Low"]
+    high_close = (hist["High"] - hist["Close"].shift()).abs()
+    low_close = (hist["Low"] - hist["Close"].shift()).abs()
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    true_range = ranges.max(axis=1)
+    atr = true_range.rolling(window=14).mean().iloc[-1]
+
+    ema12 = hist["Close"].ewm(span=12, adjust=False).mean()
+    ema26 = hist["Close"].ewm(span=26, adjust=False).mean()
+    macd = ema12 - ema26
+    signal_line = macd.ewm(span=9, adjust=False).mean()
+
+    price_changes = {
+        "1d": hist["Close"].pct_change(periods=1).iloc[-1] * 100,
+        "5d": hist["Close"].pct_change(periods=5).iloc[-1] * 100,
+        "20d": hist["Close"].pct_change(periods=20).iloc[-1] * 100
+    }
+
+    return _build_result(current_price, avg_volume, sma_20, sma_50, sma_200, rsi, atr,
+                         macd.iloc[-1], signal_line.iloc[-1], price_changes)
+
+
+def _alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+
+def _ema_step(state: np.ndarray, values: np.ndarray, alpha: float) -> np.ndarray:
+    """One ``ewm(adjust=False)`` step; NaN state is seeded with the first real value."""
+    stepped = alpha * values + (1 - alpha) * state
+    stepped = np.where(np.isnan(state), values, stepped)
+    return np.where(np.isnan(values), state, stepped)
+
+
+class IndicatorPanel:
+    """
+    Vectorized indicators for a panel of tickers.
+
+    Each field is stored as a ``(capacity, n_tickers)`` array with the most
+    recent bar in the last row; tickers with shorter histories are padded
+    with NaN at the top, which yields NaN for windows they can't fill yet,
+    matching pandas ``rolling`` semantics.
+    """
+
+    def __init__(self, symbols: List[str], data: Dict[str, np.ndarray]):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.data = data
+        self.capacity = data["Close"].shape[0]
+
+        n = len(self.symbols)
+        self.ema_fast = np.full(n, np.nan)
+        self.ema_slow = np.full(n, np.nan)
+        self.macd_signal = np.full(n, np.nan)
+        for row in range(self.capacity):
+            self._advance_ema(np.arange(n), data["Close"][row])
+
+    @classmethod
+    def from_histories(cls, histories: Dict[str, pd.DataFrame], capacity: Optional[int] = None) -> "IndicatorPanel":
+        """Build a panel from per-ticker OHLCV frames, dropping tickers without data."""
+        histories = {symbol: hist for symbol, hist in histories.items() if hist is not None and not hist.empty}
+        symbols = list(histories)
+        if capacity is None:
+            capacity = max([len(hist) for hist in histories.values()] + [max(SMA_WINDOWS) + 1])
+
+        data = {field: np.full((capacity, len(symbols)), np.nan) for field in FIELDS}
+        for i, symbol in enumerate(symbols):
+            hist = histories[symbol].iloc[-capacity:]
+            for field in FIELDS:
+                data[field][capacity - len(hist):, i] = hist[field].to_numpy(dtype=float)
+        return cls(symbols, data)
+
+    def _advance_ema(self, cols: np.ndarray, close: np.ndarray) -> None:
+        self.ema_fast[cols] = _ema_step(self.ema_fast[cols], close, _alpha(MACD_FAST))
+        self.ema_slow[cols] = _ema_step(self.ema_slow[cols], close, _alpha(MACD_SLOW))
+        self.macd_signal[cols] = _ema_step(self.macd_signal[cols], self.ema_fast[cols] - self.ema_slow[cols],
+                                           _alpha(MACD_SIGNAL))
+
+    def append_bars(self, bars: Dict[str, Dict[str, float]]) -> None:
+        """
+        Apply one new bar per listed ticker, e.g. ``{"AAPL": {"High": .., "Low": .., "Close": .., "Volume": ..}}``.
+
+        Only the touched columns are shifted and their EMA state advanced one
+        step, so the cost is independent of history length for MACD and
+        proportional to the window for the rolling indicators.
+        """
+        symbols = [symbol for symbol in bars if symbol in self.index]
+        if not symbols:
+            return
+        cols = np.array([self.index[symbol] for symbol in symbols])
+        for field in FIELDS:
+            values = np.array([bars[symbol].get(field, np.nan) for symbol in symbols], dtype=float)
+            column = self.data[field]
+            column[:-1, cols] = column[1:, cols]
+            column[-1, cols] = values
+        self._advance_ema(cols, self.data["Close"][-1, cols])
+
+    def compute(self) -> Dict[str, Dict[str, Any]]:
+        """Latest indicator values for every ticker, keyed by symbol."""
+        high, low, close, volume = (self.data[field] for field in FIELDS)
+
+        price = close[-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_volume = np.nanmean(volume, axis=0)
+            smas = {window: close[-window:].mean(axis=0) for window in SMA_WINDOWS}
+
+            # RSI / ATR only need the last window + 1 bars
+            tail = max(RSI_WINDOW, ATR_WINDOW) + 1
+            close_tail = close[-tail:]
+            prev_close = close[-tail - 1:-1] if self.capacity > tail else np.vstack(
+                [np.full((1, close.shape[1]), np.nan), close_tail[:-1]])
+            delta = close_tail - prev_close
+            # A bar with no previous close counts as zero change, like pandas' where(delta > 0, 0)
+            gain = np.where(np.isnan(close_tail), np.nan, np.where(delta > 0, delta, 0.0))
+            loss = np.where(np.isnan(close_tail), np.nan, np.where(delta < 0, -delta, 0.0))
+            rs = gain[-RSI_WINDOW:].mean(axis=0) / loss[-RSI_WINDOW:].mean(axis=0)
+            rsi = 100 - (100 / (1 + rs))
+
+            high_tail, low_tail = high[-tail:], low[-tail:]
+            true_range = np.fmax(high_tail - low_tail,
+                                 np.fmax(np.abs(high_tail - prev_close), np.abs(low_tail - prev_close)))
+            atr = true_range[-ATR_WINDOW:].mean(axis=0)
+
+            changes = {}
+            for label, periods in CHANGE_PERIODS.items():
+                base = close[-1 - periods] if self.capacity > periods else np.full(close.shape[1], np.nan)
+                changes[label] = (price / base - 1) * 100
+
+        results = {}
+        for i, symbol in enumerate(self.symbols):
+            results[symbol] = _build_result(
+                float(price[i]), float(avg_volume[i]),
+                float(smas[20][i]), float(smas[50][i]), float(smas[200][i]),
+                float(rsi[i]), float(atr[i]),
+                float(self.ema_fast[i] - self.ema_slow[i]), float(self.macd_signal[i]),
+                {label: float(values[i]) for label, values in changes.items()}
+            )
+        return results
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional
+import anyio
+import httpx
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from strands.tools.mcp.mcp_client import MCPClient
+from strands.types.exceptions import MCPClientInitializationError
+
+logger = logging.getLogger(__name__)
+
+# Failures of the MCP transport or session itself, as opposed to model or agent errors
+SESSION_ERRORS = (
+    MCPClientInitializationError,
+    McpError,
+    httpx.TransportError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+)
+
+
+def is_session_error(error: BaseException) -> bool:
+    """Whether ``error``, or an exception it was raised from, means an MCP session is unusable."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, SESSION_ERRORS):
+            return True
+        # Raised by MCPClient when its background session died
+        if isinstance(error, RuntimeError) and "Connection to the MCP server was closed" in str(error):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class PooledSession:
+    """A started MCP client for one server URL plus its cached tool list."""
+
+    def __init__(self, url: str, client: MCPClient):
+        self.url = url
+        self.client = client
+        self.tools: List[Any] = []
+        self.tools_loaded_at = 0.0
+        self.leases = 0
+        self.closing = False
+
+
+class MCPLease:
+    """Clients and tools handed to a graph node for the duration of one turn."""
+
+    def __init__(self, sessions: List[PooledSession]):
+        self.sessions = sessions
+        self.broken = False
+
+    def mark_broken(self):
+        """Evict the leased sessions on release instead of returning them to the pool."""
+        self.broken = True
+
+    def mark_broken_if_session_error(self, error: BaseException):
+        """Evict the leased sessions only if ``error`` came from an MCP transport or session."""
+        if is_session_error(error):
+            self.mark_broken()
+
+    @property
+    def clients(self) -> List[MCPClient]:
+        return [session.client for session in self.sessions]
+
+    @property
+    def tools(self) -> List[Any]:
+        all_tools = []
+        for session in self.sessions:
+            all_tools.extend(session.tools)
+        return all_tools
+
+    @property
+    def is_empty(self):
+        """Check if there are any leased clients."""
+        return len(self.sessions) == 0
+
+
+class MCPSessionPool:
+    """
+    Process-wide pool of MCP client sessions keyed by server URL.
+
+    Sessions are opened once and kept warm, so a graph turn only pays for
+    tool calls instead of a transport handshake and tool listing per server.
+    Tool schemas are cached for ``tools_ttl_seconds`` and can be dropped
+    early with ``invalidate``.
+    """
+
+    def __init__(self, tools_ttl_seconds: int = 300):
+        self.tools_ttl_seconds = tools_ttl_seconds
+        self.sessions: Dict[str, PooledSession] = {}
+        self.lock = threading.Lock()
+        self.url_locks: Dict[str, threading.Lock] = {}
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self.lock:
+            if url not in self.url_locks:
+                self.url_locks[url] = threading.Lock()
+            return self.url_locks[url]
+
+    def _open_session(self, url: str) -> PooledSession:
+        def create_transport():
+            logger.info(f"Creating transport for MCP server: {url}")
+            return streamablehttp_client(url)
+
+        logger.info(f"Opening pooled MCP session for {url}")
+        client = MCPClient(create_transport)
+        client.__enter__()
+        return PooledSession(url, client)
+
+    def _close_session(self, session: PooledSession) -> None:
+        try:
+            logger.info(f"Closing pooled MCP session for {session.url}")
+            session.client.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error closing MCP session for {session.url}: {str(e)}")
+
+    def _refresh_tools(self, session: PooledSession) -> None:
+        tools = session.client.list_tools_sync()
+        session.tools = list(tools or [])
+        session.tools_loaded_at = time.monotonic()
+
+        tool_names = [getattr(tool, 'tool_name', str(tool)) for tool in session.tools]
+        logger.info(f"Cached {len(tool_names)} tools for {session.url}: {', '.join(tool_names[:5])}{'...' if len(tool_names) > 5 else ''}")
+
+    def _tools_expired(self, session: PooledSession) -> bool:
+        return time.monotonic() - session.tools_loaded_at > self.tools_ttl_seconds
+
+    def _acquire_sync(self, url: str) -> Optional[PooledSession]:
+        """Return a warm session for ``url``, connecting or re-listing tools if needed."""
+        with self._url_lock(url):
+            session = self.sessions.get(url)
+
+            if session is None:
+                try:
+                    session = self._open_session(url)
+                    self._refresh_tools(session)
+                except Exception as e:
+                    logger.error(f"Failed to open MCP session for {url}: {str(e)}")
+                    if session is not None:
+                        self._close_session(session)
+                    return None
+
+                if not session.tools:
+                    logger.warning(f"Connected to MCP server {url}, but no tools were found")
+                    self._close_session(session)
+                    return None
+
+                with self.lock:
+                    self.sessions[url] = session
+
+            elif self._tools_expired(session):
+                try:
+                    self._refresh_tools(session)
+                except Exception as e:
+                    # The session itself is likely dead; drop it and reconnect once
+                    logger.warning(f"Tool refresh failed for {url}, reconnecting: {str(e)}")
+                    self._discard(url)
+                    return self._reconnect(url)
+
+            session.leases += 1
+            return session
+
+    def _reconnect(self, url: str) -> Optional[PooledSession]:
+        # Caller holds the per-URL lock
+        try:
+            session = self._open_session(url)
+            self._refresh_tools(session)
+        except Exception as e:
+            logger.error(f"Failed to reconnect MCP session for {url}: {str(e)}")
+            return None
+
+        with self.lock:
+            self.sessions[url] = session
+        session.leases += 1
+        return session
+
+    def _discard(self, url: str) -> None:
+        with self.lock:
+            session = self.sessions.pop(url, None)
+        if session is None:
+            return
+        if session.leases > 0:
+            # Close once the last lease is returned
+            session.closing = True
+        else:
+            self._close_session(session)
+
+    def _release_sync(self, session: PooledSession, broken: bool) -> None:
+        with self._url_lock(session.url):
+            session.leases -= 1
+            if broken and self.sessions.get(session.url) is session:
+                logger.warning(f"Evicting MCP session for {session.url} after a failed turn")
+                self._discard(session.url)
+            if session.closing and session.leases == 0:
+                self._close_session(session)
+
+    async def acquire(self, server_urls: List[str]) -> MCPLease:
+        """Lease warm sessions for all reachable ``server_urls``, connecting missing ones in parallel."""
+        unique_urls = list(dict.fromkeys(server_urls))
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._acquire_sync, url) for url in unique_urls),
+            return_exceptions=True
+        )
+
+        sessions = []
+        for url, result in zip(unique_urls, results):
+            if isinstance(result, PooledSession):
+                sessions.append(result)
+            elif isinstance(result, Exception):
+                logger.error(f"Failed to lease MCP session for {url}: {str(result)}")
+        return MCPLease(sessions)
+
+    async def release(self, lease: MCPLease) -> None:
+        for session in lease.sessions:
+            await asyncio.to_thread(self._release_sync, session, lease.broken)
+
+    @asynccontextmanager
+    async def lease(self, server_urls: List[str]):
+        """
+        Async context manager yielding an ``MCPLease``.
+
+        If the block raises an MCP transport or session error, the leased
+        sessions are evicted so the next turn reconnects instead of reusing a
+        broken transport. Other errors (model, agent) keep them pooled.
+        """
+        lease = await self.acquire(server_urls)
+        try:
+            yield lease
+        except Exception as e:
+            lease.mark_broken_if_session_error(e)
+            raise
+        finally:
+            await self.release(lease)
+
+    async def warm_up(self, server_urls: List[str], retries: int = 5, retry_delay: float = 2.0) -> int:
+        """
+        Connect to all ``server_urls`` in parallel ahead of the first request.
+
+        Servers that are still starting up are retried with a linear backoff.
+        Returns the number of servers with a warm session.
+        """
+        pending = list(dict.fromkeys(server_urls))
+        for attempt in range(retries):
+            lease = await self.acquire(pending)
+            await self.release(lease)
+            connected = {session.url for session in lease.sessions}
+            pending = [url for url in pending if url not in connected]
+            if not pending:
+                break
+            logger.info(f"MCP warm-up attempt {attempt + 1}/{retries}: waiting for {', '.join(pending)}")
+            await asyncio.sleep(retry_delay * (attempt + 1))
+
+        if pending:
+            logger.warning(f"MCP warm-up could not reach: {', '.join(pending)}")
+        return len(set(server_urls) - set(pending))
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Drop cached tool schemas for ``url`` (or every server) so the next lease re-lists them."""
+        with self.lock:
+            if url is None:
+                targets = list(self.sessions.values())
+            else:
+                targets = [self.sessions[url]] if url in self.sessions else []
+        for session in targets:
+            session.tools_loaded_at = 0.0
+
+    def close(self, url: str) -> None:
+        """Close and forget the session for ``url``."""
+        with self._url_lock(url):
+            self._discard(url)
+
+    def retain_only(self, server_urls: List[str]) -> None:
+        """Close sessions for servers no longer present in ``server_urls``."""
+        with self.lock:
+            stale = [url for url in self.sessions if url not in server_urls]
+        for url in stale:
+            self.close(url)
+
+    def close_all(self) -> None:
+        with self.lock:
+            urls = list(self.sessions)
+        for url in urls:
+            self.close(url)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self.lock:
+            return {
+                url: {
+                    "tools": len(session.tools),
+                    "leases": session.leases,
+                    "tools_age_seconds": round(now - session.tools_loaded_at, 1)
+                }
+                for url, session in self.sessions.items()
+            }
+
+
+mcp_session_pool = MCPSessionPool()
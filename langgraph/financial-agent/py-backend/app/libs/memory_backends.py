@@ -0,0 +1,308 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ConversationBackend:
+    """
+    Storage interface for conversation history.
+
+    Messages are plain dicts whose image blocks reference blobs by digest
+    (``{"image": {"source": {"blob": <sha256>}}}``), so message payloads stay
+    small and each distinct image is stored once. Every write bumps a
+    per-session version that callers use to detect changes made by other
+    processes sharing the same store.
+    """
+
+    # Whether data survives the process and is visible to other workers
+    persistent = False
+
+    def load(self, session_id: str) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any], int]]:
+        """Return ``(messages, metadata, version)`` or ``None`` if the session is unknown."""
+        raise NotImplementedError
+
+    def version(self, session_id: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def create(self, session_id: str, metadata: Dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    def append(self, session_id: str, message: Dict[str, Any], metadata: Dict[str, Any],
+               evicted_seqs: List[int]) -> int:
+        """
+        Append ``message`` and drop ``evicted_seqs`` that fell out of the window.
+
+        The backend assigns the message's ``seq`` (stored on the dict) so
+        concurrent writers never collide. Returns the new session version.
+        """
+        raise NotImplementedError
+
+    def rewrite(self, session_id: str, messages: List[Dict[str, Any]], metadata: Dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def expired(self, cutoff: float) -> List[str]:
+        """Session ids whose last update is older than the ``cutoff`` epoch timestamp."""
+        raise NotImplementedError
+
+    def put_blob(self, digest: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def get_blob(self, digest: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def release_blobs(self, digests: List[str]) -> None:
+        """Drop one reference to each digest and free blobs nobody references anymore."""
+        raise NotImplementedError
+
+
+class InMemoryConversationBackend(ConversationBackend):
+    """Process-local backend; history is lost on restart and not shared between workers."""
+
+    persistent = False
+
+    def __init__(self):
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.blobs: Dict[str, bytes] = {}
+        self.blob_refs: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def load(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            return list(session["messages"].values()), dict(session["metadata"]), session["version"]
+
+    def version(self, session_id):
+        session = self.sessions.get(session_id)
+        return session["version"] if session else None
+
+    def create(self, session_id, metadata):
+        with self.lock:
+            if session_id not in self.sessions:
+                self.sessions[session_id] = {"messages": OrderedDict(), "metadata": dict(metadata), "version": 1,
+                                             "next_seq": 1, "updated_at": time.time()}
+            return self.sessions[session_id]["version"]
+
+    def append(self, session_id, message, metadata, evicted_seqs):
+        with self.lock:
+            session = self.sessions[session_id]
+            for seq in evicted_seqs:
+                session["messages"].pop(seq, None)
+            message["seq"] = session["next_seq"]
+            session["next_seq"] += 1
+            session["messages"][message["seq"]] = message
+            session["metadata"] = dict(metadata)
+            session["version"] += 1
+            session["updated_at"] = time.time()
+            return session["version"]
+
+    def rewrite(self, session_id, messages, metadata):
+        with self.lock:
+            session = self.sessions[session_id]
+            session["messages"] = OrderedDict((m["seq"], m) for m in messages)
+            session["metadata"] = dict(metadata)
+            session["version"] += 1
+            session["updated_at"] = time.time()
+            return session["version"]
+
+    def delete(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def expired(self, cutoff):
+        with self.lock:
+            return [sid for sid, session in self.sessions.items() if session["updated_at"] < cutoff]
+
+    def put_blob(self, digest, data):
+        with self.lock:
+            if digest not in self.blobs:
+                self.blobs[digest] = data
+            self.blob_refs[digest] = self.blob_refs.get(digest, 0) + 1
+
+    def get_blob(self, digest):
+        return self.blobs.get(digest)
+
+    def release_blobs(self, digests):
+        with self.lock:
+            for digest in digests:
+                refs = self.blob_refs.get(digest, 0) - 1
+                if refs <= 0:
+                    self.blob_refs.pop(digest, None)
+                    self.blobs.pop(digest, None)
+                else:
+                    self.blob_refs[digest] = refs
+
+
+class SQLiteConversationBackend(ConversationBackend):
+    """
+    On-disk backend shared by every worker pointing at the same database file.
+
+    Uses WAL journaling so readers in other uvicorn workers don't block the
+    writer, and stores image blobs once per digest with a reference count.
+    """
+
+    persistent = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        metadata TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS messages (
+        session_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        PRIMARY KEY (session_id, seq)
+    );
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        refs INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        logger.info(f"SQLite conversation backend ready at {path}")
+
+    def _bump(self, session_id: str, metadata: Dict[str, Any]) -> int:
+        self.conn.execute(
+            "UPDATE sessions SET metadata = ?, version = version + 1, updated_at = ? WHERE session_id = ?",
+            (json.dumps(metadata), time.time(), session_id)
+        )
+        row = self.conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0]
+
+    def load(self, session_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT metadata, version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = [
+                json.loads(payload) for (payload,) in self.conn.execute(
+                    "SELECT payload FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+                )
+            ]
+            return messages, json.loads(row[0]), row[1]
+
+    def version(self, session_id):
+        with self.lock:
+            row = self.conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            return row[0] if row else None
+
+    def create(self, session_id, metadata):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, metadata, version, updated_at) VALUES (?, ?, 1, ?)",
+                (session_id, json.dumps(metadata), time.time())
+            )
+            row = self.conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            return row[0]
+
+    def append(self, session_id, message, metadata, evicted_seqs):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM messages WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                message["seq"] = row[0]
+                if evicted_seqs:
+                    self.conn.executemany(
+                        "DELETE FROM messages WHERE session_id = ? AND seq = ?",
+                        [(session_id, seq) for seq in evicted_seqs]
+                    )
+                self.conn.execute(
+                    "INSERT INTO messages (session_id, seq, payload) VALUES (?, ?, ?)",
+                    (session_id, message["seq"], json.dumps(message))
+                )
+                version = self._bump(session_id, metadata)
+                self.conn.execute("COMMIT")
+                return version
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def rewrite(self, session_id, messages, metadata):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self.conn.executemany(
+                    "INSERT INTO messages (session_id, seq, payload) VALUES (?, ?, ?)",
+                    [(session_id, m["seq"], json.dumps(m)) for m in messages]
+                )
+                version = self._bump(session_id, metadata)
+                self.conn.execute("COMMIT")
+                return version
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def expired(self, cutoff):
+        with self.lock:
+            return [sid for (sid,) in self.conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )]
+
+    def put_blob(self, digest, data):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO blobs (digest, data, refs) VALUES (?, ?, 1) "
+                "ON CONFLICT(digest) DO UPDATE SET refs = refs + 1",
+                (digest, sqlite3.Binary(data))
+            )
+
+    def get_blob(self, digest):
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            return bytes(row[0]) if row else None
+
+    def release_blobs(self, digests):
+        if not digests:
+            return
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", [(d,) for d in digests])
+                self.conn.execute("DELETE FROM blobs WHERE refs <= 0")
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
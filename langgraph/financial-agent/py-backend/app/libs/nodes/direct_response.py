@@ -1,5 +1,5 @@
 import logging
-from app.libs.utils import create_bedrock_client, prepare_messages_with_binary_data
+from app.libs.utils import create_bedrock_client
 from app.libs.types import GraphState  
 from app.libs.prompts import CHAT_SYSTEM_PROMPT
 from app.libs.conversation_memory import conversation_memory 
@@ -27,8 +27,7 @@ def handle_chat(state: GraphState) -> GraphState:
 
         api_messages = []
         if session_id:
-            conversation_history = conversation_memory.get_conversation_history(session_id)
-            api_messages = prepare_messages_with_binary_data(conversation_history["messages"])
+            api_messages = conversation_memory.get_converse_messages(session_id)
         else:
             api_messages = [{
                 "role": "user",
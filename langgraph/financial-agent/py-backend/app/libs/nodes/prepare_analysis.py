@@ -4,7 +4,7 @@ from typing import List
 from contextlib import AsyncExitStack
 from app.libs.types import GraphState
 from app.libs.decorators import with_thought_callback, log_thought
-from app.api_routes.mcp_servers import load_server_config
+from app.api_routes.mcp_servers import load_server_config, DEFAULT_MCP_SERVER_URLS
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +14,7 @@ def get_mcp_servers() -> List[str]:
     
     if not active_servers:
         logger.warning("No active MCP servers found, falling back to default values")
-        return [
-            "http://localhost:8083/mcp",  # stock_market_server
-            "http://localhost:8084/mcp",  # financial_analysis_server
-            "http://localhost:8085/mcp",  # web_news_server
-            "http://localhost:8089/mcp"   # word_generator_server
-        ]
+        return list(DEFAULT_MCP_SERVER_URLS)
     
     return active_servers
 
@@ -1,6 +1,6 @@
 import logging
 from typing import Dict, Any
-from app.libs.utils import extract_message_content, create_bedrock_client, prepare_messages_with_binary_data
+from app.libs.utils import extract_message_content, create_bedrock_client
 from app.libs.types import GraphState
 from app.libs.prompts import ROUTER_SYSTEM_PROMPT
 from app.libs.conversation_memory import conversation_memory
@@ -102,8 +102,7 @@ def classify_request(state: GraphState) -> GraphState:
         
         api_messages = []
         if session_id:
-            conversation_history = conversation_memory.get_conversation_history(session_id)
-            api_messages = prepare_messages_with_binary_data(conversation_history["messages"])
+            api_messages = conversation_memory.get_converse_messages(session_id)
             
             history_length = len(api_messages)
             log_thought(
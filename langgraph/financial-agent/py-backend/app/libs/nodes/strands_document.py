@@ -5,7 +5,8 @@ from app.libs.types import GraphState
 from app.libs.utils import create_bedrock_client, prepare_messages_with_binary_data
 from app.libs.decorators import with_thought_callback, log_thought
 from app.libs.conversation_memory import conversation_memory
-from app.libs.mcp_client_factory import create_mcp_clients, MCPClientContext
+from app.libs.mcp_session_pool import mcp_session_pool
+from app.api_routes.mcp_servers import WORD_GENERATOR_URL
 from strands import Agent
 from strands.models.bedrock import BedrockModel
 from langgraph.graph import END
@@ -36,13 +37,20 @@ async def execute_document_generation(state: GraphState) -> GraphState:
             content="Initializing Strands agent with Word Generator tools"
         )
         
-        # Initialize MCP clients for Word Generator
-        word_server_urls = ["http://localhost:8089/mcp"]
-        mcp_clients = []
-        all_tools = []
+        # Lease a warm Word Generator session from the process-wide pool
+        word_server_urls = [WORD_GENERATOR_URL]
         
         try:
-            mcp_clients, all_tools = await create_mcp_clients(word_server_urls)
+            lease = await mcp_session_pool.acquire(word_server_urls)
+        except Exception as e:
+            error_msg = f"Failed to connect to Word Generator server: {str(e)}"
+            logger.error(error_msg)
+            new_state["answer"] = error_msg
+            return new_state
+        
+        # Pooled sessions are already open; return them to the pool when done
+        try:
+            mcp_clients, all_tools = lease.clients, lease.tools
             
             if not mcp_clients or not all_tools:
                 error_msg = "Word Generator service is not available. Please ensure the Word Generator MCP server is running."
@@ -53,21 +61,12 @@ async def execute_document_generation(state: GraphState) -> GraphState:
             tool_names = [getattr(tool, 'tool_name', str(tool)) for tool in all_tools]
             logger.info(f"Connected to Word Generator with {len(all_tools)} tools: {', '.join(tool_names)}")
             
-        except Exception as e:
-            error_msg = f"Failed to connect to Word Generator server: {str(e)}"
-            logger.error(error_msg)
-            new_state["answer"] = error_msg
-            return new_state
-        
-        # Create the Strands agent
-        model = BedrockModel(
-            model_id="anthropic.claude-3-5-sonnet-20241022-v2:0",
-            region="us-west-2"
-        )
-        
-        # Use MCPClientContext for managing connections like in strands_reasoning
-        client_context = MCPClientContext(mcp_clients)
-        with client_context:
+            # Create the Strands agent
+            model = BedrockModel(
+                model_id="anthropic.claude-3-5-sonnet-20241022-v2:0",
+                region="us-west-2"
+            )
+            
             agent = Agent(
                 model=model,
                 tools=all_tools,
@@ -99,8 +98,8 @@ Always be helpful and provide detailed information about the documents you creat
             # Prepare conversation history for context
             conversation_context = ""
             if session_id:
-                history = conversation_memory.get_conversation_history(session_id)
-                recent_messages = history["messages"][-10:]  # Last 10 messages for context
+                # Stored messages, so system entries are kept and images are not loaded just to be skipped
+                recent_messages = conversation_memory.get_raw_conversation(session_id)["messages"][-10:]  # Last 10 messages for context
                 
                 for msg in recent_messages:
                     role = msg.get('role', 'unknown')
@@ -209,6 +208,12 @@ Consider the conversation context to make the document more relevant and compreh
                 node="Answer",
                 content=response_text
             )
+        except Exception as e:
+            # Only a broken MCP session is evicted; model or agent errors keep it pooled
+            lease.mark_broken_if_session_error(e)
+            raise
+        finally:
+            await mcp_session_pool.release(lease)
         
         return new_state
         
@@ -4,7 +4,7 @@ from app.libs.types import GraphState
 from app.libs.decorators import with_thought_callback, log_thought
 from app.libs.conversation_memory import conversation_memory
 from app.libs.prompts import FINANCIAL_SYSTEM_PROMPT
-from app.libs.mcp_client_factory import create_mcp_clients, MCPClientContext
+from app.libs.mcp_session_pool import mcp_session_pool
 from strands.agent import Agent
 
 logger = logging.getLogger("strands_reasoning")
@@ -28,26 +28,15 @@ async def execute_financial_analysis(state: GraphState) -> GraphState:
     
     if "thought_history" not in new_state:
         new_state["thought_history"] = []
+
+    lease = None
         
     try:
         # Get conversation history for context
         conversation_history = []
         if session_id:
-            conv_data = conversation_memory.get_conversation_history(session_id)
-            # Convert to simple string format for Strands Agent
-            for msg in conv_data.get("messages", []):
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-                if isinstance(content, list):
-                    # Extract text from content blocks
-                    text_content = ""
-                    for block in content:
-                        if isinstance(block, dict) and "text" in block:
-                            text_content += block["text"] + " "
-                    content = text_content.strip()
-                
-                if content and role in ["user", "assistant"]:
-                    conversation_history.append({"role": role, "content": [{"text": content}]})
+            # Text-only view maintained incrementally by the memory manager
+            conversation_history = conversation_memory.get_strands_messages(session_id)
 
         log_thought(
             session_id=session_id,
@@ -57,12 +46,13 @@ async def execute_financial_analysis(state: GraphState) -> GraphState:
             content=f"Loaded conversation history with {len(conversation_history)} messages"
         )
 
-        # Initialize MCP clients using our factory utility
+        # Lease warm MCP sessions from the process-wide pool
         mcp_clients = []
         all_tools = []
         
         try:
-            mcp_clients, all_tools = await create_mcp_clients(server_urls)
+            lease = await mcp_session_pool.acquire(server_urls)
+            mcp_clients, all_tools = lease.clients, lease.tools
             
             if mcp_clients:
                 log_thought(
@@ -99,46 +89,46 @@ async def execute_financial_analysis(state: GraphState) -> GraphState:
                 tool_names = [getattr(tool, 'tool_name', str(tool)) for tool in all_tools]
                 logger.info(f"Available tools: {', '.join(tool_names[:5])}{'...' if len(tool_names) > 5 else ''}")
                 
-                # Use our new MCPClientContext for managing connections
-                client_context = MCPClientContext(mcp_clients)
-                with client_context:
-                    # Create enhanced callback handler for streaming visibility
-                    callback = create_enhanced_callback_handler(session_id)
-                    tool_names = [getattr(tool, 'tool_name', str(tool)) for tool in all_tools]
-                    logger.info(f"Configuring Strands agent with tools: {', '.join(tool_names)}")
+                # Pooled sessions are already open, so the agent uses the leased tools directly
+                # Create enhanced callback handler for streaming visibility
+                callback = create_enhanced_callback_handler(session_id)
+                tool_names = [getattr(tool, 'tool_name', str(tool)) for tool in all_tools]
+                logger.info(f"Configuring Strands agent with tools: {', '.join(tool_names)}")
+                
+                # Configure the Strands agent with proper tools and callbacks
+                agent = Agent(
+                    model=model,
+                    system_prompt=FINANCIAL_SYSTEM_PROMPT,
+                    messages=conversation_history[-10:] if conversation_history else [],
+                    tools=all_tools,
+                    callback_handler=callback
+                )
+                
+                # Execute the agent with streaming support if enabled
+                if stream_enabled:
+                    final_answer = ""
+                    result = None
                     
-                    # Configure the Strands agent with proper tools and callbacks
-                    agent = Agent(
-                        model=model,
-                        system_prompt=FINANCIAL_SYSTEM_PROMPT,
-                        messages=conversation_history[-10:] if conversation_history else [],
-                        tools=all_tools,
-                        callback_handler=callback
-                    )
+                    # Process the agent execution as an async stream
+                    async for event in agent.stream_async(query):
+                        if "data" in event and isinstance(event["data"], str):
+                            final_answer += event["data"]
+                        if "message" in event:
+                            result = event
+                else:
+                    # Execute without streaming
+                    final_answer = ""
+                    result = None
                     
-                    # Execute the agent with streaming support if enabled
-                    if stream_enabled:
-                        final_answer = ""
-                        result = None
-                        
-                        # Process the agent execution as an async stream
-                        async for event in agent.stream_async(query):
-                            if "data" in event and isinstance(event["data"], str):
-                                final_answer += event["data"]
-                            if "message" in event:
-                                result = event
-                    else:
-                        # Execute without streaming
-                        final_answer = ""
-                        result = None
-                        
-                        async for event in agent.stream_async(query):
-                            if "data" in event and isinstance(event["data"], str):
-                                final_answer += event["data"]
-                            if "message" in event:
-                                result = event
+                    async for event in agent.stream_async(query):
+                        if "data" in event and isinstance(event["data"], str):
+                            final_answer += event["data"]
+                        if "message" in event:
+                            result = event
             except Exception as e:
                 logger.error(f"Error executing Strands Agent with tools: {str(e)}")
+                # Don't hand a broken session to the next turn
+                lease.mark_broken_if_session_error(e)
                 log_thought(
                     session_id=session_id,
                     type="thought",
@@ -271,6 +261,10 @@ async def execute_financial_analysis(state: GraphState) -> GraphState:
         
         new_state["answer"] = f"I encountered an error during analysis: {str(e)}"
         new_state["next"] = "format_response"
+
+    finally:
+        if lease is not None:
+            await mcp_session_pool.release(lease)
     
     return new_state
 
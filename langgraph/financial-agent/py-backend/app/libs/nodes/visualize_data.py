@@ -5,7 +5,7 @@ import asyncio
 from botocore.exceptions import ClientError
 from typing import Dict, Any, Optional
 from app.libs.types import GraphState
-from app.libs.utils import create_bedrock_client, prepare_messages_with_binary_data
+from app.libs.utils import create_bedrock_client
 from app.libs.decorators import with_thought_callback, log_thought
 from app.libs.conversation_memory import conversation_memory
 from app.libs.prompts import VISUALIZATION_SYSTEM_PROMPT
@@ -35,8 +35,7 @@ async def create_visualization(state: GraphState) -> GraphState:
     
     processed_messages = []
     if session_id:
-        messages_from_memory = conversation_memory.get_conversation_history(session_id)["messages"]
-        processed_messages = prepare_messages_with_binary_data(messages_from_memory)
+        processed_messages = conversation_memory.get_converse_messages(session_id)
     else:
         processed_messages = [{
             "role": "user",
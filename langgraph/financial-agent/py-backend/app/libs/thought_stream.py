@@ -1,67 +1,202 @@
 import asyncio
 import json
 import logging
+import threading
 import time
-from queue import Queue
-from threading import Event
-from typing import Dict, Any, Callable, AsyncIterator
+from collections import deque
+from typing import Dict, Any, Callable, AsyncIterator, Optional, List, Tuple
 
 logger = logging.getLogger("thought_stream")
 
+# Thoughts that must reach the client even when a slow consumer forces a drop
+PRIORITY_TYPES = {"complete", "error"}
+PRIORITY_CATEGORIES = {"result", "error", "visualization_data"}
+
+
+def _is_priority(thought: Dict[str, Any]) -> bool:
+    return thought.get("type") in PRIORITY_TYPES or thought.get("category") in PRIORITY_CATEGORIES
+
+
+class SessionChannel:
+    """
+    Per-session thought channel backed by a replay ring buffer.
+
+    Every published thought gets a monotonically increasing sequence number.
+    Consumers keep their own cursor, so a reconnecting client can resume from
+    ``Last-Event-ID`` as long as the events are still in the ring buffer.
+    A new connection without one starts after the last delivered thought.
+    """
+
+    def __init__(self, session_id: str, replay_size: int):
+        self.session_id = session_id
+        self.history: deque = deque(maxlen=replay_size)
+        self.seq = 0
+        self.delivered = 0
+        self.complete = False
+        self.last_activity = time.monotonic()
+        self.waiters = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self.waiters)
+
+    def publish(self, thought: Dict[str, Any]) -> None:
+        self.seq += 1
+        event = dict(thought)
+        event.setdefault("id", f"{self.session_id}-thought-{self.seq}")
+        self.history.append((self.seq, event))
+        self.last_activity = time.monotonic()
+        self._notify()
+
+    def close(self) -> None:
+        self.complete = True
+        self._notify()
+
+    def _notify(self) -> None:
+        for waiter in self.waiters:
+            waiter.set()
+
+    def pending_count(self, cursor: int) -> int:
+        return self.seq - cursor
+
+    def read_since(self, cursor: int, max_pending: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], int]:
+        """
+        Return ``(events, dropped)`` for everything after ``cursor``.
+
+        When more than ``max_pending`` events are waiting, the oldest
+        non-priority ones are coalesced into a single drop count so a slow
+        consumer catches up instead of replaying a stale backlog.
+        """
+        oldest = self.history[0][0] if self.history else self.seq + 1
+        dropped = max(0, oldest - cursor - 1)
+        events = [(seq, event) for seq, event in self.history if seq > cursor]
+
+        overflow = len(events) - max_pending
+        if overflow > 0:
+            kept = []
+            for seq, event in events:
+                if overflow > 0 and not _is_priority(event):
+                    overflow -= 1
+                    dropped += 1
+                    continue
+                kept.append((seq, event))
+            events = kept
+
+        return events, dropped
+
+
 class ThoughtStore:
-    def __init__(self):
-        self.queues = {}
-        self.events = {}
-        
-    def register_session(self, session_id: str) -> Queue:
-        if session_id in self.queues:
-            return self.queues[session_id]
-        
-        self.queues[session_id] = Queue()
-        self.events[session_id] = Event()
-        return self.queues[session_id]
+    """
+    Asyncio-native store of per-session thought channels.
+
+    Producers may call ``add_thought`` from any thread; publishing is handed
+    to the event loop with ``call_soon_threadsafe`` so consumers can await
+    new thoughts without polling.
+    """
+
+    def __init__(self, replay_size: int = 500, max_pending: int = 200, idle_timeout: int = 1800):
+        self.channels: Dict[str, SessionChannel] = {}
+        self.replay_size = replay_size
+        self.max_pending = max_pending
+        self.idle_timeout = idle_timeout
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.Lock()
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+    def _bind_running_loop(self) -> None:
+        if self.loop is None:
+            try:
+                self.loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _dispatch(self, fn: Callable, *args) -> None:
+        """Run ``fn`` on the bound event loop, directly if already on it."""
+        if self.loop is None or self._in_loop_thread() or self.loop.is_closed():
+            fn(*args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def has_session(self, session_id: str) -> bool:
+        return session_id in self.channels
+
+    def register_session(self, session_id: str) -> SessionChannel:
+        self._bind_running_loop()
+        with self.lock:
+            channel = self.channels.get(session_id)
+            if channel is None:
+                channel = SessionChannel(session_id, self.replay_size)
+                self.channels[session_id] = channel
+            channel.last_activity = time.monotonic()
+            return channel
 
     def unregister_session(self, session_id: str):
         logger.info(f"Unregistering session: {session_id}")
-        
-        if session_id in self.queues:
-            del self.queues[session_id]
-        if session_id in self.events:
-            del self.events[session_id]
-    
+
+        with self.lock:
+            channel = self.channels.pop(session_id, None)
+        if channel is not None:
+            self._dispatch(channel.close)
+
     def add_thought(self, session_id: str, thought: Dict[str, Any]):
-        if session_id in self.queues:
-            logger.debug(f"Adding thought to queue for session {session_id}")
-            self.queues[session_id].put(thought)
-            queue_size = self.queues[session_id].qsize()
+        channel = self.channels.get(session_id)
+        if channel is not None:
+            logger.debug(f"Publishing thought for session {session_id}")
+            self._dispatch(channel.publish, thought)
         else:
             logger.warning(f"Attempted to add thought to non-existent session: {session_id}")
-    
+
     def mark_complete(self, session_id: str):
-        if session_id in self.events:
+        channel = self.channels.get(session_id)
+        if channel is not None:
             logger.debug(f"Marking session complete: {session_id}")
-            self.events[session_id].set()
+            self._dispatch(channel.close)
         else:
             logger.warning(f"Attempted to mark non-existent session as complete: {session_id}")
-    
+
     def is_complete(self, session_id: str) -> bool:
-        result = session_id in self.events and self.events[session_id].is_set()
-        return result
+        channel = self.channels.get(session_id)
+        return channel is not None and channel.complete
+
+    def prune_idle(self) -> List[str]:
+        """Drop channels with no connected client and no activity for ``idle_timeout`` seconds."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.lock:
+            stale = [
+                session_id for session_id, channel in self.channels.items()
+                if channel.subscribers == 0 and channel.last_activity < cutoff
+            ]
+            for session_id in stale:
+                del self.channels[session_id]
+
+        if stale:
+            logger.info(f"Pruned {len(stale)} idle thought stream sessions")
+        return stale
 
 
 class ThoughtProcessHandler:
-    def __init__(self):
+    def __init__(self, ping_interval: float = 5.0):
         self.thought_store = ThoughtStore()
         self.callbacks = {}
-    
+        self.ping_interval = ping_interval
+        self._janitor: Optional[asyncio.Task] = None
+
     def thought_callback(self, session_id: str) -> Callable[[Dict[str, Any]], None]:
         """Creates a callback function that adds thoughts to the store for a specific session"""
         def _callback(thought: Dict[str, Any]) -> None:
             thought_type = thought.get('type', 'unknown')
-            
+
             content_summary = ""
             content = thought.get('content', {})
-            
+
             if isinstance(content, dict):
                 if 'query' in content:
                     content_summary += f"query: {content['query'][:50]}... "
@@ -74,107 +209,118 @@ class ThoughtProcessHandler:
                     content_summary += f"params: {params} "
             else:
                 content_summary = str(content)[:100] + "..." if len(str(content)) > 100 else str(content)
-                
+
             logger.info(f"Received thought for session {session_id}: Type={thought_type}, Content={content_summary}")
             self.thought_store.add_thought(session_id, thought)
-        
+
         logger.debug(f"Created thought callback for session {session_id}")
         self.callbacks[session_id] = _callback
         return _callback
-    
+
     def get_callback(self, session_id: str) -> Callable[[Dict[str, Any]], None]:
         if session_id in self.callbacks:
             return self.callbacks[session_id]
-        
+
         return self.thought_callback(session_id)
 
-    def register_session(self, session_id: str) -> Queue:
+    def register_session(self, session_id: str) -> SessionChannel:
         """Register a new session for thought streaming"""
         logger.info(f"Registering thought stream session: {session_id}")
         return self.thought_store.register_session(session_id)
-    
+
     def mark_session_complete(self, session_id: str) -> None:
         """Mark a session as completed"""
         logger.info(f"Marking session complete: {session_id}")
         self.thought_store.mark_complete(session_id)
-        
+
         if session_id in self.callbacks:
             del self.callbacks[session_id]
-    
-    async def stream_generator(self, session_id: str) -> AsyncIterator[str]:
-        logger.info(f"Setting up SSE stream generator for session: {session_id}")
-        
-        if session_id not in self.thought_store.queues:
-            logger.info(f"Creating pre-registered session for SSE: {session_id}")
-            self.thought_store.register_session(session_id)
-            self.thought_store.pending_sessions = getattr(self.thought_store, 'pending_sessions', set())
-            self.thought_store.pending_sessions.add(session_id)
-        
-        queue = self.thought_store.queues[session_id]
-        def format_sse(data: dict) -> str:
-            message = f"data: {json.dumps(data)}\n\n"
-            return message
-        
-        connection_msg = {"type": "connected", "message": "Thought process stream connected"}
-        yield format_sse(connection_msg)
-        await asyncio.sleep(0.1)
-        
-        cached_thoughts = []
-        while not queue.empty():
-            try:
-                cached_thoughts.append(queue.get_nowait())
-            except:
-                break
-        
-        for idx, thought in enumerate(cached_thoughts):
-            if "id" not in thought:
-                thought["id"] = f"{session_id}-cached-{idx}"
-            yield format_sse(thought)
-            
-            # Tool-related cached thoughts get immediate streaming
-            thought_category = thought.get('category', '')
-            if thought_category == 'tool' or 'tool' in thought.get('node', '').lower():
-                await asyncio.sleep(0.01)  # Immediate for tool events
-            else:
-                await asyncio.sleep(0.1)   # Delayed for other events
-        
-        thought_count = len(cached_thoughts)
-        ping_count = 0
-        
-        while not self.thought_store.is_complete(session_id) or not queue.empty():
+
+    def prune_idle_sessions(self) -> int:
+        """Drop channels and callbacks for sessions abandoned by disconnected clients."""
+        stale = self.thought_store.prune_idle()
+        for session_id in stale:
+            self.callbacks.pop(session_id, None)
+        return len(stale)
+
+    async def _run_janitor(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
             try:
-                if not queue.empty():
-                    thought = queue.get_nowait()
-                    thought_count += 1
-                    
-                    if "id" not in thought:
-                        thought["id"] = f"{session_id}-thought-{thought_count}"
-                        
-                    logger.info(f"Streaming thought #{thought_count} for session {session_id}: {thought.get('type', 'unknown')}")
-                    yield format_sse(thought)
-                    
-                    # Tool-related thoughts get immediate streaming, others get delay
-                    thought_category = thought.get('category', '')
-                    if thought_category == 'tool' or 'tool' in thought.get('node', '').lower():
-                        await asyncio.sleep(0.01)  # Immediate for tool events
-                    else:
-                        await asyncio.sleep(0.1)   # Delayed for other events
-                else:
-                    ping_count += 1
-                    if ping_count >= 10:  
-                        ping_count = 0
-                        yield format_sse({"type": "ping", "timestamp": f"{time.time()}"})
-                    
-                    await asyncio.sleep(0.5)
+                self.prune_idle_sessions()
             except Exception as e:
-                logger.error(f"Error in thought stream for session {session_id}: {e}")
-                yield format_sse({"type": "error", "message": str(e)})
-                await asyncio.sleep(0.5)
-        
-        complete_msg = {"type": "complete", "message": "Thought process complete"}
-        yield format_sse(complete_msg)
-        
-        self.thought_store.unregister_session(session_id)
+                logger.error(f"Error pruning thought stream sessions: {e}")
+
+    def start_janitor(self, interval: float = 60.0) -> None:
+        """Bind the store to the running loop and start periodic session cleanup."""
+        loop = asyncio.get_running_loop()
+        self.thought_store.bind_loop(loop)
+        if self._janitor is None or self._janitor.done():
+            self._janitor = loop.create_task(self._run_janitor(interval))
+
+    @staticmethod
+    def parse_last_event_id(last_event_id: Optional[str]) -> int:
+        """Accept either the bare sequence number or the ``<session>-thought-<seq>`` form."""
+        if not last_event_id:
+            return 0
+        try:
+            return int(last_event_id.rsplit("-", 1)[-1])
+        except ValueError:
+            return 0
+
+    async def stream_generator(self, session_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        logger.info(f"Setting up SSE stream generator for session: {session_id}")
+
+        channel = self.thought_store.register_session(session_id)
+        wakeup = asyncio.Event()
+
+        def format_sse(data: dict, event_id: Optional[int] = None) -> str:
+            prefix = f"id: {event_id}\n" if event_id is not None else ""
+            return f"{prefix}data: {json.dumps(data)}\n\n"
+
+        cursor = self.parse_last_event_id(last_event_id) if last_event_id else channel.delivered
+        # An id from an earlier, already unregistered channel can be ahead of this one's numbering
+        cursor = min(cursor, channel.seq)
+        channel.waiters.add(wakeup)
+
+        try:
+            yield format_sse({"type": "connected", "message": "Thought process stream connected"})
+
+            while True:
+                # Clear before reading so a publish between read and wait is not missed
+                wakeup.clear()
+                events, dropped = channel.read_since(cursor, self.thought_store.max_pending)
+
+                if dropped:
+                    logger.warning(f"Dropped {dropped} thoughts for slow consumer on session {session_id}")
+                    yield format_sse({"type": "dropped", "count": dropped})
+
+                if dropped and not events:
+                    cursor = channel.seq
+                    channel.delivered = max(channel.delivered, cursor)
+
+                for seq, thought in events:
+                    cursor = seq
+                    channel.delivered = max(channel.delivered, cursor)
+                    logger.info(f"Streaming thought #{seq} for session {session_id}: {thought.get('type', 'unknown')}")
+                    yield format_sse(thought, seq)
+
+                if channel.complete and channel.pending_count(cursor) <= 0:
+                    break
+                if channel.pending_count(cursor) > 0:
+                    continue
+
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.ping_interval)
+                except asyncio.TimeoutError:
+                    yield format_sse({"type": "ping", "timestamp": f"{time.time()}"})
+
+            yield format_sse({"type": "complete", "message": "Thought process complete"})
+            self.thought_store.unregister_session(session_id)
+        finally:
+            channel.waiters.discard(wakeup)
+            channel.last_activity = time.monotonic()
+            logger.info(f"SSE stream closed for session {session_id}")
 
 # Create a singleton instance
 thought_handler = ThoughtProcessHandler()
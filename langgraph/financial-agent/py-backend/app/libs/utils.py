@@ -62,77 +62,105 @@ def get_or_create_clients(region=None):
         "bedrock_agent_client": bedrock_agent_clients[region],
     }
 
-def prepare_messages_with_binary_data(messages):
-    processed_messages = []
+def convert_message_for_converse(msg):
+    """Convert one stored message into a Converse API message, or None if it has no usable content."""
+    if not msg.get('content'):
+        return None
+        
+    processed_content = []
     
-    for msg in messages:
-        if not msg.get('content'):
-            continue
+    for content_item in msg.get('content', []):
+        if isinstance(content_item, dict):
+            if 'text' in content_item:
+                processed_content.append({'text': content_item['text']})
             
-        processed_content = []
-        
-        for content_item in msg.get('content', []):
-            if isinstance(content_item, dict):
-                if 'text' in content_item:
-                    processed_content.append({'text': content_item['text']})
+            elif 'image' in content_item:
+                image_item = {'image': {}}
+                image_item['image']['format'] = content_item['image'].get('format', 'png')
                 
-                elif 'image' in content_item:
-                    image_item = {'image': {}}
-                    image_item['image']['format'] = content_item['image'].get('format', 'png')
+                if 'source' in content_item['image']:
+                    source = content_item['image']['source']
+                    image_item['image']['source'] = {}
                     
-                    if 'source' in content_item['image']:
-                        source = content_item['image']['source']
-                        image_item['image']['source'] = {}
+                    if 'bytes' in source:
+                        bytes_data = source['bytes']
                         
-                        if 'bytes' in source:
-                            bytes_data = source['bytes']
-                            
-                            if isinstance(bytes_data, dict):
-                                if 'source' in bytes_data and 'bytes' in bytes_data['source']:
-                                    inner_bytes = bytes_data['source']['bytes']
-                                    if isinstance(inner_bytes, str):
-                                        try:
-                                            image_item['image']['source']['bytes'] = base64.b64decode(inner_bytes)
-                                        except:
-                                            image_item['image']['source']['bytes'] = b'dummy_data'
-                                    else:
-                                        image_item['image']['source']['bytes'] = inner_bytes or b'dummy_data'
+                        if isinstance(bytes_data, dict):
+                            if 'source' in bytes_data and 'bytes' in bytes_data['source']:
+                                inner_bytes = bytes_data['source']['bytes']
+                                if isinstance(inner_bytes, str):
+                                    try:
+                                        image_item['image']['source']['bytes'] = base64.b64decode(inner_bytes)
+                                    except:
+                                        image_item['image']['source']['bytes'] = b'dummy_data'
                                 else:
-                                    image_item['image']['source']['bytes'] = b'dummy_data'
-                            
-                            elif isinstance(bytes_data, str):
-                                try:
-                                    image_item['image']['source']['bytes'] = base64.b64decode(bytes_data)
-                                except:
-                                    image_item['image']['source']['bytes'] = bytes_data.encode() if bytes_data else b'dummy_data'
-                            
-                            elif isinstance(bytes_data, bytes):
-                                image_item['image']['source']['bytes'] = bytes_data
-                            
+                                    image_item['image']['source']['bytes'] = inner_bytes or b'dummy_data'
                             else:
                                 image_item['image']['source']['bytes'] = b'dummy_data'
-                    
-                    if 'source' in image_item['image'] and 'bytes' in image_item['image']['source']:
-                        processed_content.append(image_item)
-            
-            elif isinstance(content_item, str):
-                processed_content.append({'text': content_item})
+                        
+                        elif isinstance(bytes_data, str):
+                            try:
+                                image_item['image']['source']['bytes'] = base64.b64decode(bytes_data)
+                            except:
+                                image_item['image']['source']['bytes'] = bytes_data.encode() if bytes_data else b'dummy_data'
+                        
+                        elif isinstance(bytes_data, bytes):
+                            image_item['image']['source']['bytes'] = bytes_data
+                        
+                        else:
+                            image_item['image']['source']['bytes'] = b'dummy_data'
+                
+                if 'source' in image_item['image'] and 'bytes' in image_item['image']['source']:
+                    processed_content.append(image_item)
         
-        if processed_content:
-            processed_messages.append({
-                'role': msg['role'],
-                'content': processed_content
-            })
+        elif isinstance(content_item, str):
+            processed_content.append({'text': content_item})
     
+    if not processed_content:
+        return None
+        
+    return {
+        'role': msg['role'],
+        'content': processed_content
+    }
+
+def finalize_converse_messages(processed_messages):
+    """Ensure the Converse message list is non-empty and starts with a user turn."""
     if not processed_messages:
-        processed_messages.append({
+        return [{
             'role': 'user',
             'content': [{'text': 'Can you help me visualize this data?'}]
-        })
+        }]
     elif processed_messages[0]['role'] != 'user':
-        processed_messages.insert(0, {
+        return [{
             'role': 'user',
             'content': [{'text': 'Can you help me visualize this data?'}]
-        })
+        }] + processed_messages
+    
+    return processed_messages
+
+def convert_message_for_strands(msg):
+    """Flatten one stored message into a text-only Strands message, or None if it isn't a user/assistant turn."""
+    role = msg.get("role", "user")
+    content = msg.get("content", "")
+    if isinstance(content, list):
+        # Extract text from content blocks
+        text_content = ""
+        for block in content:
+            if isinstance(block, dict) and "text" in block:
+                text_content += block["text"] + " "
+        content = text_content.strip()
+    
+    if content and role in ["user", "assistant"]:
+        return {"role": role, "content": [{"text": content}]}
+    return None
+
+def prepare_messages_with_binary_data(messages):
+    processed_messages = []
+    
+    for msg in messages:
+        converted = convert_message_for_converse(msg)
+        if converted:
+            processed_messages.append(converted)
     
-    return processed_messages
\ No newline at end of file
+    return finalize_converse_messages(processed_messages)
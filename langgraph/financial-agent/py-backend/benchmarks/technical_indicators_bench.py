@@ -0,0 +1,88 @@
+"""
+Benchmark the per-ticker pandas indicator path against the vectorized IndicatorPanel.
+
+Uses synthetic random-walk OHLCV data so it runs offline:
+
+    python py-backend/benchmarks/technical_indicators_bench.py --sizes 1 50 500
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app", "libs", "mcp-servers"))
+
+from technical_indicators import IndicatorPanel, compute_technical_indicators  # noqa: E402
+
+
+def synthetic_histories(count: int, bars: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars)
+    histories = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        spread = np.abs(rng.normal(0, 0.01, bars)) * close
+        histories[f"T{i:04d}"] = pd.DataFrame({
+            "Open": close,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 10_000_000, bars).astype(float)
+        }, index=index)
+    return histories
+
+
+def timed(fn, repeat: int):
+    best = math.inf
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def max_abs_diff(a, b):
+    worst = 0.0
+    for key, value in a.items():
+        if isinstance(value, dict):
+            worst = max(worst, max_abs_diff(value, b[key]))
+        elif not (np.isnan(value) and np.isnan(b[key])):
+            worst = max(worst, abs(float(value) - float(b[key])) / max(1.0, abs(float(value))))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Technical indicator engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8} | {'per-ticker':>11} | {'panel build':>11} | {'panel compute':>13} | "
+          f"{'new bar':>9} | {'speedup':>7} | {'max rel diff':>12}")
+    for size in args.sizes:
+        histories = synthetic_histories(size, args.bars)
+
+        baseline_time, baseline = timed(
+            lambda: {symbol: compute_technical_indicators(hist) for symbol, hist in histories.items()}, args.repeat
+        )
+        build_time, panel = timed(lambda: IndicatorPanel.from_histories(histories), args.repeat)
+        compute_time, batch = timed(panel.compute, args.repeat)
+
+        diff = max(max_abs_diff(baseline[symbol], batch[symbol]) for symbol in histories)
+
+        new_bar = {symbol: {"High": 101.0, "Low": 99.0, "Close": 100.0, "Volume": 2_000_000.0} for symbol in histories}
+        update_time, _ = timed(lambda: (panel.append_bars(new_bar), panel.compute()), args.repeat)
+
+        speedup = baseline_time / (build_time + compute_time)
+        print(f"{size:>8} | {baseline_time * 1000:>9.2f}ms | {build_time * 1000:>9.2f}ms | "
+              f"{compute_time * 1000:>11.2f}ms | {update_time * 1000:>7.2f}ms | {speedup:>6.1f}x | {diff:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@
 export type EventType = 
   | 'visualization-ready' 
   | 'thought-completion' 
-  | 'thought-stream-complete';
+  | 'thought-stream-complete'
+  | 'thought-stream-request';
 
 // Define event detail types
 export interface VisualizationEventDetail {
@@ -23,6 +24,10 @@ export interface ThoughtStreamCompleteDetail {
   finalAnswer?: string;
 }
 
+export interface ThoughtStreamRequestDetail {
+  sessionId: string;
+}
+
 // Type-safe event dispatch
 export const dispatchEvent = {
   visualizationReady: (detail: VisualizationEventDetail) => {
@@ -41,6 +46,12 @@ export const dispatchEvent = {
     const event = new CustomEvent('thought-stream-complete', { detail });
     window.dispatchEvent(event);
     return event;
+  },
+
+  thoughtStreamRequest: (detail: ThoughtStreamRequestDetail) => {
+    const event = new CustomEvent('thought-stream-request', { detail });
+    window.dispatchEvent(event);
+    return event;
   }
 };
 
@@ -62,5 +73,11 @@ export const subscribeToEvent = {
     const eventHandler = ((e: CustomEvent) => handler(e.detail)) as EventListener;
     window.addEventListener('thought-stream-complete', eventHandler);
     return () => window.removeEventListener('thought-stream-complete', eventHandler);
+  },
+
+  thoughtStreamRequest: (handler: (detail: ThoughtStreamRequestDetail) => void) => {
+    const eventHandler = ((e: CustomEvent) => handler(e.detail)) as EventListener;
+    window.addEventListener('thought-stream-request', eventHandler);
+    return () => window.removeEventListener('thought-stream-request', eventHandler);
   }
 };
\ No newline at end of file
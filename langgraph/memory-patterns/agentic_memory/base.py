@@ -3,7 +3,7 @@ from collections import defaultdict
 from datetime import datetime, timezone
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 class BaseCheckPointer(ABC):
@@ -49,6 +49,11 @@ class BaseLongTermStore(ABC):
     def search(self, query: str) -> List[Any]:
         pass
 
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over all (key, value) pairs, used by the retrievers to build their indexes"""
+        pass
+
 class BaseRetriever(ABC):
     @abstractmethod
     def build(self):
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from agentic_memory.sqlite_store import SQLiteStore
+
+EMBEDDING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+"""
+
+# Hashes per SELECT, below SQLite's limit on bound parameters
+LOOKUP_CHUNK_SIZE = 500
+
+
+class EmbeddingStore(SQLiteStore):
+    """float32 embeddings keyed by (model name, SHA-256 of the text)"""
+    def __init__(self, db_path: str):
+        super().__init__(db_path, EMBEDDING_SCHEMA)
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for i in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            chunk = hashes[i:i + LOOKUP_CHUNK_SIZE]
+            rows = self._query(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                (model, *chunk))
+            found.update((text_hash, np.frombuffer(vector, dtype=np.float32)) for text_hash, vector in rows)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, text_hash, np.asarray(vector, dtype=np.float32).tobytes())
+                 for text_hash, vector in vectors.items()])
+
+    def count(self, model: Optional[str] = None) -> int:
+        if model is None:
+            return self._query("SELECT COUNT(*) FROM embeddings")[0][0]
+        return self._query("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,))[0][0]
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Content-addressed cache in front of an embedding function.
+
+    Texts are looked up by (model name, text hash) in an EmbeddingStore, so
+    identical texts are encoded once per model, across builds and processes.
+    Only the misses reach the wrapped function, de-duplicated and in batches
+    of ``batch_size``. Query embeddings are also kept in an in-memory LRU of
+    ``query_cache_size`` entries. ``stats`` counts texts served from the cache
+    (``hits``), encoded (``misses``), served from the query LRU
+    (``query_hits``) and calls to the wrapped function (``batches``).
+    """
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction,
+        model_name: str,
+        cache_path: str = ":memory:",
+        batch_size: int = 64,
+        query_cache_size: int = 1024
+    ):
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.store = EmbeddingStore(cache_path)
+        self.batch_size = batch_size
+        self.query_cache_size = query_cache_size
+        self.query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "query_hits": 0, "batches": 0}
+        self.lock = threading.Lock()
+
+    def _count(self, **counts: int):
+        with self.lock:
+            for name, count in counts.items():
+                self.stats[name] += count
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        hashes = [EmbeddingStore.text_hash(text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        vectors = self.store.get_many(self.model_name, list(unique))
+        missing = [text_hash for text_hash in unique if text_hash not in vectors]
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            encoded = np.asarray(self.embedding_function([unique[text_hash] for text_hash in batch]), dtype=np.float32)
+            # Stored per batch, so an interrupted build keeps what it already encoded
+            self.store.put_many(self.model_name, dict(zip(batch, encoded)))
+            vectors.update(zip(batch, encoded))
+            self._count(batches=1)
+        self._count(hits=len(texts) - len(missing), misses=len(missing))
+        return [vectors[text_hash] for text_hash in hashes]
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self.embed(list(input))
+
+    def embed_query(self, input: Documents) -> Embeddings:
+        with self.lock:
+            cached = {text: self.query_cache[text] for text in input if text in self.query_cache}
+            for text in cached:
+                self.query_cache.move_to_end(text)
+            self.stats["query_hits"] += sum(1 for text in input if text in cached)
+        missing = list(dict.fromkeys(text for text in input if text not in cached))
+        if missing:
+            cached.update(zip(missing, self.embed(missing)))
+            with self.lock:
+                for text in missing:
+                    self.query_cache[text] = cached[text]
+                while len(self.query_cache) > self.query_cache_size:
+                    self.query_cache.popitem(last=False)
+        return [cached[text] for text in input]
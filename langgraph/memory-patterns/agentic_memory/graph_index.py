@@ -0,0 +1,270 @@
+import json
+import os
+import re
+import shutil
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+
+# Free-text attributes go into the token index; every other scalar attribute gets a typed "field=value" key
+TEXT_FIELDS = ("summary", "resolution")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# OBD-II diagnostic trouble codes, e.g. P0420, C140F
+DTC_PATTERN = re.compile(r"\b[PCBU][0-9][0-9A-F]{3}\b", re.IGNORECASE)
+
+ARRAYS = ("node_ids_data", "node_ids_offsets", "attrs_data", "attrs_offsets",
+          "out_offsets", "out_targets", "out_relations", "in_offsets", "in_sources", "in_relations",
+          "keys_data", "keys_offsets", "postings_offsets", "postings")
+
+
+class StringTable(Sequence):
+    """Strings stored as one UTF-8 blob plus offsets; decodes entries on access"""
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @staticmethod
+    def encode(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def index_keys(attrs: Dict[str, Any]) -> List[str]:
+    """Index keys of one node: typed attribute values, DTC codes and text tokens"""
+    keys = set()
+    for field, value in attrs.items():
+        if value is None or isinstance(value, (dict, list)):
+            continue
+        if field in TEXT_FIELDS:
+            keys.update(f"text={token}" for token in tokenize(str(value)))
+            keys.update(f"dtc={code.upper()}" for code in DTC_PATTERN.findall(str(value)))
+        else:
+            keys.add(f"{field}={value}")
+    return sorted(keys)
+
+
+class GraphIndex:
+    """
+    Read-only index over a node/edge graph, persisted as numpy arrays that are
+    memory-mapped on load, so opening it costs the same for any graph size.
+
+    - adjacency in both directions as CSR arrays, in edge insertion order
+    - node attributes as one JSON document per node
+    - postings (sorted node ids) per key: ``field=value`` for typed attributes
+      (type, vin, make, model, name, ...), ``dtc=CODE`` for trouble codes found in
+      text, and ``text=token`` for the tokens of free-text attributes
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.arrays = arrays
+        self.meta = meta
+        self.relations: List[str] = meta["relations"]
+        self.node_ids = StringTable(arrays["node_ids_data"], arrays["node_ids_offsets"])
+        self.attrs_table = StringTable(arrays["attrs_data"], arrays["attrs_offsets"])
+        self.keys = StringTable(arrays["keys_data"], arrays["keys_offsets"])
+        self._text_vocabulary: Optional[List[str]] = None
+
+    @classmethod
+    def build(cls, nodes: List[Tuple[str, Dict[str, Any]]], edges: Iterable[Tuple[int, int, str]],
+              meta: Optional[Dict[str, Any]] = None) -> "GraphIndex":
+        """
+        Args:
+            nodes: (node id, attributes) in node order; node numbers are positions in this list
+            edges: (source number, target number, relation) in insertion order
+        """
+        arrays = {}
+        arrays["node_ids_data"], arrays["node_ids_offsets"] = StringTable.encode([node for node, _ in nodes])
+        arrays["attrs_data"], arrays["attrs_offsets"] = StringTable.encode(
+            [json.dumps(attrs, default=str) for _, attrs in nodes])
+
+        relations, sources, targets, codes = {}, [], [], []
+        for source, target, relation in edges:
+            sources.append(source)
+            targets.append(target)
+            codes.append(relations.setdefault(relation, len(relations)))
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        codes = np.asarray(codes, dtype=np.uint8)
+        for direction, key, other in (("out", sources, targets), ("in", targets, sources)):
+            order = np.argsort(key, kind='stable')
+            offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(key, minlength=len(nodes)), out=offsets[1:])
+            arrays[f"{direction}_offsets"] = offsets
+            arrays[f"{direction}_{'targets' if direction == 'out' else 'sources'}"] = other[order]
+            arrays[f"{direction}_relations"] = codes[order]
+
+        postings = defaultdict(list)
+        for number, (_, attrs) in enumerate(nodes):
+            for key in index_keys(attrs):
+                postings[key].append(number)
+        keys = sorted(postings)
+        arrays["keys_data"], arrays["keys_offsets"] = StringTable.encode(keys)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(postings[key]) for key in keys], out=offsets[1:])
+        arrays["postings_offsets"] = offsets
+        arrays["postings"] = np.fromiter((n for key in keys for n in postings[key]), dtype=np.int32,
+                                         count=int(offsets[-1]))
+
+        meta = dict(meta or {}, version=INDEX_VERSION, nodes=len(nodes), relations=list(relations))
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_graph(cls, G, meta: Optional[Dict[str, Any]] = None) -> "GraphIndex":
+        """Index a networkx graph; node numbers follow G.nodes order"""
+        nodes = list(G.nodes(data=True))
+        number = {node: i for i, (node, _) in enumerate(nodes)}
+        edges = ((number[u], number[v], data.get("relation", "")) for u, v, data in G.edges(data=True))
+        return cls.build(nodes, edges, meta)
+
+    def save(self, path: str):
+        # Written next to the target and swapped in, so readers never open a partial index
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(self.arrays[name]))
+        with open(os.path.join(tmp_path, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "GraphIndex":
+        with open(os.path.join(path, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # Plain ndarray views of the mappings: np.memmap slices go through Python-level hooks
+        arrays = {name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')) for name in ARRAYS}
+        return cls(arrays, meta)
+
+    @staticmethod
+    def read_meta(path: str) -> Optional[Dict[str, Any]]:
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == INDEX_VERSION else None
+
+    # Nodes and edges
+
+    def __len__(self) -> int:
+        return self.meta["nodes"]
+
+    def node_id(self, number: int) -> str:
+        return self.node_ids[number]
+
+    def attrs(self, number: int) -> Dict[str, Any]:
+        return json.loads(self.attrs_table[number])
+
+    def out_edges(self, number: int) -> List[Tuple[int, str]]:
+        start, end = self.arrays["out_offsets"][number:number + 2].tolist()
+        return [(target, self.relations[code]) for target, code in
+                zip(self.arrays["out_targets"][start:end].tolist(), self.arrays["out_relations"][start:end].tolist())]
+
+    def in_edges(self, number: int) -> List[Tuple[int, str]]:
+        start, end = self.arrays["in_offsets"][number:number + 2].tolist()
+        return [(source, self.relations[code]) for source, code in
+                zip(self.arrays["in_sources"][start:end].tolist(), self.arrays["in_relations"][start:end].tolist())]
+
+    # Postings
+
+    def _postings(self, position: int) -> np.ndarray:
+        offsets = self.arrays["postings_offsets"]
+        return self.arrays["postings"][offsets[position]:offsets[position + 1]]
+
+    def lookup(self, field: str, value: Any) -> np.ndarray:
+        """Sorted node numbers whose ``field`` equals ``value`` (``dtc`` and ``text`` look up codes and tokens)"""
+        key = f"{field}={value}"
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return np.asarray(self._postings(position))
+        return np.empty(0, dtype=np.int32)
+
+    def _text_range(self) -> Tuple[int, int]:
+        # "text=" keys are contiguous in the sorted key table; ">" sorts right after "="
+        return bisect_left(self.keys, "text="), bisect_left(self.keys, "text>")
+
+    def text_vocabulary(self) -> List[str]:
+        if self._text_vocabulary is None:
+            start, end = self._text_range()
+            self._text_vocabulary = [self.keys[i][5:] for i in range(start, end)]
+        return self._text_vocabulary
+
+    def _union(self, tokens: List[str]) -> np.ndarray:
+        postings = [self.lookup("text", token) for token in tokens]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(postings))
+
+    def match_text(self, query: str, field: str, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Sorted node numbers whose ``field`` contains ``query``, case-insensitively.
+
+        Tokens of the query narrow the candidates: the first must end a token of
+        the text, the middle ones must be tokens of it and the last must start
+        one (a single token may sit anywhere inside one). Candidates are then
+        checked against the actual text, so the result is an exact substring match.
+        """
+        query = query.lower()
+        tokens = tokenize(query)
+        if tokens:
+            vocabulary = self.text_vocabulary()
+            if len(tokens) == 1:
+                matched = self._union([t for t in vocabulary if tokens[0] in t])
+            else:
+                matched = self._union([t for t in vocabulary if t.endswith(tokens[0])])
+                for token in tokens[1:-1]:
+                    matched = np.intersect1d(matched, self.lookup("text", token), assume_unique=True)
+                start = bisect_left(vocabulary, tokens[-1])
+                end = bisect_left(vocabulary, tokens[-1] + "\uffff", lo=start)
+                matched = np.intersect1d(matched, self._union(vocabulary[start:end]), assume_unique=True)
+            if candidates is not None:
+                matched = np.intersect1d(matched, candidates, assume_unique=True)
+        else:
+            matched = candidates if candidates is not None else np.arange(len(self), dtype=np.int32)
+        return np.asarray([n for n in matched if query in (self.attrs(int(n)).get(field) or "").lower()],
+                          dtype=np.int32)
+
+    # Traversal
+
+    def neighbourhood(self, seeds: Iterable[int], hops: int = 2, max_nodes: int = 1000,
+                      relations: Optional[Sequence[str]] = None) -> Dict[int, int]:
+        """
+        Nodes within ``hops`` edges of the seeds in either direction, mapped to
+        their distance, stopping once ``max_nodes`` nodes were reached.
+        """
+        distance = {}
+        queue = deque()
+        for seed in seeds:
+            if len(distance) >= max_nodes:
+                return distance
+            if int(seed) not in distance:
+                distance[int(seed)] = 0
+                queue.append(int(seed))
+        while queue:
+            number = queue.popleft()
+            if distance[number] >= hops:
+                continue
+            for neighbour, relation in self.out_edges(number) + self.in_edges(number):
+                if neighbour in distance or (relations and relation not in relations):
+                    continue
+                distance[neighbour] = distance[number] + 1
+                if len(distance) >= max_nodes:
+                    return distance
+                queue.append(neighbour)
+        return distance
@@ -3,7 +3,7 @@ from collections import defaultdict
 from datetime import datetime, timezone
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from agentic_memory.base import BaseCheckPointer,BaseEpisodicStore, BaseLongTermStore
 
@@ -72,6 +72,39 @@ class EpisodicStoreFile(BaseEpisodicStore):
                     keys.append((customer_id, vin))
         return keys
 
+SERVICE_RECORD_FIELDS = ["issue_summary", "resolution", "service_engineer", "service_date"]
+
+
+def service_record(value: dict) -> dict:
+    """Service history item with the standard fields first, followed by any extra fields"""
+    return {
+        "issue_summary": value.get("issue_summary", ""),
+        "resolution": value.get("resolution", ""),
+        "service_engineer": value.get("service_engineer", ""),
+        "service_date": value.get("service_date", ""),
+        **{k: v for k, v in value.items() if k not in SERVICE_RECORD_FIELDS}
+    }
+
+
+def merge_service_history(existing: Optional[dict], value: Any) -> Optional[dict]:
+    """
+    Apply a long-term put to the current entry of a VIN.
+    Returns the updated entry, or None when the put stores nothing.
+    """
+    # If VIN exists, append new detailed issue summary to service_history list
+    if existing is not None:
+        if "service_history" not in existing:
+            existing["service_history"] = []
+        existing["service_history"].append(service_record(value))
+        return existing
+    entry = None
+    if type(value) == list: #To avoid er due to response formatted as list
+        for i in value:
+            # New VIN entry with vehicle metadata and service_history list
+            entry = {"service_history": [service_record(i)]}
+    return entry
+
+
 class LongTermStoreFile(BaseLongTermStore):
     """File-based implementation storing all VINs in a single JSON file with multiple issues per VIN"""
     def __init__(self, storage_file: str = "long_term_store/all_vins.json"):
@@ -88,33 +121,9 @@ class LongTermStoreFile(BaseLongTermStore):
         if os.path.exists(self.storage_file):
             with open(self.storage_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-        # If VIN exists, append to service_history list
-        if key in data:
-            existing = data[key]
-            if "service_history" not in existing:
-                existing["service_history"] = []
-            # Append new detailed issue summary to service_history
-            existing["service_history"].append({
-                "issue_summary": value.get("issue_summary", ""),
-                "resolution": value.get("resolution", ""),
-                "service_engineer": value.get("service_engineer", ""),
-                "service_date": value.get("service_date", ""),
-                **{k: v for k, v in value.items() if k not in ["issue_summary", "resolution", "service_engineer", "service_date"]}
-            })
-            data[key] = existing
-        else:
-            if type(value) == list: #To avoid er due to response formatted as list
-                for i in value:
-                    # New VIN entry with vehicle metadata and service_history list
-                    data[key] = {
-                        "service_history": [{
-                            "issue_summary": i.get("issue_summary", ""),
-                            "resolution": i.get("resolution", ""),
-                            "service_engineer": i.get("service_engineer", ""),
-                            "service_date": i.get("service_date", ""),
-                            **{k: v for k, v in i.items() if k not in ["issue_summary", "resolution", "service_engineer", "service_date"]}
-                        }]
-                    }
+        entry = merge_service_history(data.get(key), value)
+        if entry is not None:
+            data[key] = entry
         with open(self.storage_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2)
 
@@ -134,4 +143,11 @@ class LongTermStoreFile(BaseLongTermStore):
         for vin, entry in data.items():
             if query.lower() in json.dumps(entry).lower():
                 results.append(entry)
-        return results
\ No newline at end of file
+        return results
+
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        if not os.path.exists(self.storage_file):
+            return iter(())
+        with open(self.storage_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return iter(data.items())
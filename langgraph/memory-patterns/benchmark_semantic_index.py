@@ -0,0 +1,170 @@
+'''
+Benchmark a full SemanticStoreRetrieval build against an incremental update.
+
+For each size, a long-term store with that many VINs is generated and
+indexed from scratch (build(full=True)). Then --new-vins VINs are added and
+--changed-vins existing VINs get a new service record, and build() updates
+the index incrementally. Cluster summaries are produced by a stand-in for the
+Bedrock call that waits --llm-latency seconds, so the report shows both the
+local work and the number of LLM calls each path makes. With --bedrock the
+real client is used instead, for example against fake_bedrock.py. A full
+rebuild and --queries searches then show the embedding cache at work: the
+texts column counts texts embedded, and how many of them the model encoded.
+
+    python benchmark_semantic_index.py --sizes 10000 100000
+    python benchmark_semantic_index.py --hash-embeddings      # no model download
+'''
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from sklearn.feature_extraction.text import HashingVectorizer
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+from agentic_memory.automotive import AutomotiveKnowledgeToolkit
+from agentic_memory.implementation import LongTermStoreFile
+from agentic_memory.retrievers import LocalHuggingFaceEmbeddingFunction, SemanticStoreRetrieval
+
+ISSUES = [
+    "Intermittent stalling during acceleration in stop-and-go traffic",
+    "Persistent check engine light with error code P0420",
+    "Oil leak under the engine bay with burning oil smell",
+    "Grinding noise from front brakes when stopping",
+    "Touchscreen display randomly reboots while driving",
+    "A/C blows warm air at idle",
+    "Transmission slips between second and third gear",
+    "Battery drains overnight when the car is parked",
+]
+CATALOG = AutomotiveKnowledgeToolkit().fallback_vehicle_catalog
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Offline stand-in for the sentence-transformers model"""
+    def __init__(self, n_features: int = 384):
+        self.vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1, 2))
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self.vectorizer.transform(input).toarray().astype(np.float32).tolist()
+
+
+class BenchmarkRetrieval(SemanticStoreRetrieval):
+    def __init__(self, *args, llm_latency: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.llm_latency = llm_latency
+
+    def invoke_bedrock_nova(self, prompt: str) -> str:
+        time.sleep(self.llm_latency)
+        return f"Summary of {prompt.count('VIN:')} vehicles"
+
+
+def make_vin(i: int) -> str:
+    return f"1HGCM8AB{i:09d}"
+
+
+def make_record(rng: random.Random) -> dict:
+    return {
+        "issue_summary": rng.choice(ISSUES),
+        "resolution": "Repaired and verified on test drive",
+        "service_engineer": "Alice Johnson",
+        "service_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+    }
+
+
+def make_vehicle(i: int) -> dict:
+    makes = sorted(CATALOG)
+    make = makes[i % len(makes)]
+    return {"make": make, "model": CATALOG[make][i // len(makes) % len(CATALOG[make])], "year": 2020}
+
+
+def write_store(path: str, data: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def run(size: int, args, embeddings, directory: str):
+    rng = random.Random(size)
+    store_file = os.path.join(directory, f"all_vins_{size}.json")
+    data = {make_vin(i): {"service_history": [make_record(rng) for _ in range(rng.randint(1, 3))]}
+            for i in range(size)}
+    write_store(store_file, data)
+    catalog_file = os.path.join(directory, f"vechicle_model_{size}.json")
+    write_store(catalog_file, {make_vin(i): make_vehicle(i) for i in range(size + args.new_vins)})
+    options = dict(
+        vector_store_path=os.path.join(directory, f"vector_store_{size}"),
+        drift_threshold=args.drift_threshold,
+        embedding_function=embeddings,
+        vehicle_toolkit=AutomotiveKnowledgeToolkit(catalog_file),
+        summary_workers=args.summary_workers,
+        # The stand-in has no quotas to respect
+        requests_per_minute=args.requests_per_minute if args.bedrock else 1e9,
+        tokens_per_minute=args.tokens_per_minute if args.bedrock else 1e12,
+    )
+    if args.bedrock:
+        retriever = SemanticStoreRetrieval(LongTermStoreFile(store_file), **options)
+    else:
+        retriever = BenchmarkRetrieval(LongTermStoreFile(store_file), llm_latency=args.llm_latency, **options)
+
+    def timed(phase: str, fn):
+        calls = retriever.summarizer.stats["calls"]
+        embedded = dict(retriever.embeddings.stats)
+        started = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - started
+        stats = {name: count - embedded[name] for name, count in retriever.embeddings.stats.items()}
+        texts = stats["hits"] + stats["misses"] + stats["query_hits"]
+        print(f"{size:>8,} {phase:<14} {seconds:>9.2f} {texts:>8,} {stats['misses']:>8,} "
+              f"{retriever.summarizer.stats['calls'] - calls:>10}")
+
+    timed("full build", lambda: retriever.build(full=True))
+
+    for i in range(size, size + args.new_vins):
+        data[make_vin(i)] = {"service_history": [make_record(rng)]}
+    for vin in rng.sample(sorted(data)[:size], args.changed_vins):
+        data[vin]["service_history"].append(make_record(rng))
+    write_store(store_file, data)
+    timed("incremental", lambda: retriever.build(full=False))
+    timed("no-op", lambda: retriever.build(full=False))
+    timed("full rebuild", lambda: retriever.build(full=True))
+    vehicles = [make_vehicle(i) for i in range(args.queries)]
+    timed(f"{args.queries} queries", lambda: [
+        retriever.search(make=vehicle["make"], model=vehicle["model"], issue=ISSUES[i % len(ISSUES)])
+        for i, vehicle in enumerate(vehicles)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs incremental semantic index build")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="VINs in the long-term store")
+    parser.add_argument("--new-vins", type=int, default=100, help="VINs added before the incremental build")
+    parser.add_argument("--changed-vins", type=int, default=100, help="VINs changed before the incremental build")
+    parser.add_argument("--drift-threshold", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per simulated summary call")
+    parser.add_argument("--bedrock", action="store_true", help="Call Bedrock (or AWS_ENDPOINT_URL_BEDROCK_RUNTIME)")
+    parser.add_argument("--summary-workers", type=int, default=8)
+    parser.add_argument("--requests-per-minute", type=float, default=60, help="Bedrock quota, used with --bedrock")
+    parser.add_argument("--tokens-per-minute", type=float, default=200_000, help="Bedrock quota, used with --bedrock")
+    parser.add_argument("--queries", type=int, default=200, help="Searches run after the builds")
+    parser.add_argument("--embedding-model", default="sentence-transformers/all-mpnet-base-v2")
+    parser.add_argument("--hash-embeddings", action="store_true", help="Use a hashing vectorizer instead of the model")
+    args = parser.parse_args()
+
+    embeddings = HashingEmbeddingFunction() if args.hash_embeddings \
+        else LocalHuggingFaceEmbeddingFunction(args.embedding_model)
+    directory = tempfile.mkdtemp(prefix="semantic_bench_")
+    try:
+        print(f"{'VINs':>8} {'phase':<14} {'seconds':>9} {'texts':>8} {'encoded':>8} {'LLM calls':>10}")
+        for size in args.sizes:
+            run(size, args, embeddings, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+Microbenchmark for AutomotiveKnowledgeToolkit.get_vehicle_info.
+
+Writes a vechicle_model.json with --vins VINs and compares the per-lookup
+cost of re-parsing the file on every call (the previous implementation) with
+the memoized VehicleCatalog, single and batched. It also times a reload after
+the file changes, and the catalog part of a semantic store build, which looks
+up every VIN once.
+
+    python benchmark_vehicle_catalog.py --vins 50000
+'''
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from agentic_memory.automotive import AutomotiveKnowledgeToolkit
+
+
+def legacy_get_vehicle_info(path: str, vin: str):
+    """Lookup as it was before the catalog: parse the whole file for every VIN"""
+    with open(path, "r") as f:
+        data = json.load(f)
+    record = data.get(vin)
+    if record and all(k in record for k in ("make", "model", "year")):
+        return record["make"], record["model"], record["year"]
+    return None
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vehicle catalog lookup microbenchmark")
+    parser.add_argument("--vins", type=int, default=50_000, help="VINs in vechicle_model.json")
+    parser.add_argument("--legacy-lookups", type=int, default=20, help="Lookups timed with the legacy path")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    toolkit_catalog = AutomotiveKnowledgeToolkit().fallback_vehicle_catalog
+    vins = [f"1HGCM8{i:011d}" for i in range(args.vins)]
+    data = {}
+    for vin in vins:
+        make = rng.choice(sorted(toolkit_catalog))
+        data[vin] = {"make": make, "model": rng.choice(toolkit_catalog[make]), "year": rng.randint(2015, 2022)}
+
+    directory = tempfile.mkdtemp(prefix="catalog_bench_")
+    try:
+        path = os.path.join(directory, "vechicle_model.json")
+        with open(path, "w") as f:
+            json.dump(data, f)
+        print(f"Catalog: {args.vins:,} VINs, {os.path.getsize(path) / 1e6:.1f} MB\n")
+
+        legacy = timed(lambda: legacy_get_vehicle_info(path, rng.choice(vins)), args.legacy_lookups)
+
+        started = time.perf_counter()
+        toolkit = AutomotiveKnowledgeToolkit(path)
+        toolkit.get_vehicle_info(vins[0])
+        first_load = time.perf_counter() - started
+
+        lookups = 100_000
+        sample = [rng.choice(vins) for _ in range(lookups)]
+        started = time.perf_counter()
+        for vin in sample:
+            toolkit.get_vehicle_info(vin)
+        single = (time.perf_counter() - started) / lookups
+        started = time.perf_counter()
+        toolkit.get_vehicle_info_many(sample)
+        batched = (time.perf_counter() - started) / lookups
+
+        print(f"{'lookup':<34} {'us/lookup':>12}")
+        print(f"{'re-parse file per call (before)':<34} {legacy * 1e6:>12,.1f}")
+        print(f"{'get_vehicle_info':<34} {single * 1e6:>12,.2f}")
+        print(f"{'get_vehicle_info_many':<34} {batched * 1e6:>12,.2f}")
+        print(f"\nFirst load and index: {first_load * 1000:.0f} ms")
+
+        data[vins[0]]["model"] = "Changed"
+        with open(path, "w") as f:
+            json.dump(data, f)
+        toolkit.catalog._checked_at = float("-inf")  # Skip the check interval for the measurement
+        started = time.perf_counter()
+        reloaded = toolkit.get_vehicle_info(vins[0])
+        print(f"Reload after the file changed: {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"(model now {reloaded[1]!r})")
+
+        build_before = legacy * args.vins
+        started = time.perf_counter()
+        toolkit.get_vehicle_info_many(vins)
+        build_after = time.perf_counter() - started + first_load
+        print(f"\nCatalog lookups for a {args.vins:,}-VIN semantic build: {build_before:,.0f} s before "
+              f"(estimated from the per-call cost), {build_after:.2f} s now including the first load")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
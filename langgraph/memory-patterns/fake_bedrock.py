@@ -0,0 +1,109 @@
+'''
+Local stand-in for the Bedrock runtime InvokeModel API, for testing the
+summarization pipeline without an AWS account. Answers Nova-style
+responses after --latency seconds and returns ThrottlingException when more
+than --rpm requests arrived in the last minute, or at random with
+probability --throttle-rate.
+
+    python fake_bedrock.py --port 8080 --rpm 120 --throttle-rate 0.1
+
+    AWS_ENDPOINT_URL_BEDROCK_RUNTIME=http://localhost:8080 \
+    AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test AWS_DEFAULT_REGION=us-east-1 \
+    python benchmark_semantic_index.py --sizes 10000 --hash-embeddings --bedrock
+'''
+
+import argparse
+import json
+import random
+import re
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INVOKE_PATH = re.compile(r"^/model/[^/]+/invoke$")
+
+
+class FakeBedrock:
+    def __init__(self, rpm: int, throttle_rate: float, latency: float):
+        self.rpm = rpm
+        self.throttle_rate = throttle_rate
+        self.latency = latency
+        self.recent = deque()
+        self.stats = {"requests": 0, "throttled": 0}
+        self.lock = threading.Lock()
+
+    def admit(self) -> bool:
+        """Whether a request arriving now is served or throttled"""
+        with self.lock:
+            now = time.monotonic()
+            self.stats["requests"] += 1
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if (self.rpm and len(self.recent) >= self.rpm) or random.random() < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return False
+            self.recent.append(now)
+            return True
+
+
+def make_handler(bedrock: FakeBedrock):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status: int, body: dict, error_type: str = None):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            if error_type:
+                self.send_header("x-amzn-ErrorType", error_type)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not INVOKE_PATH.match(self.path):
+                self.send_json(404, {"message": f"Unknown path {self.path}"}, "ResourceNotFoundException")
+                return
+            if not bedrock.admit():
+                self.send_json(429, {"message": "Too many requests, please wait before trying again."},
+                               "ThrottlingException")
+                return
+            time.sleep(bedrock.latency)
+            prompt = request.get("messages", [{}])[0].get("content", [{}])[0].get("text", "")
+            text = f"Summary of {prompt.count('VIN:')} vehicles with similar issues."
+            self.send_json(200, {
+                "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": len(prompt) // 4, "outputTokens": len(text) // 4}
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Bedrock runtime endpoint that injects throttling")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rpm", type=int, default=120, help="Requests per minute before throttling (0: no limit)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests throttled at random")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per successful response")
+    args = parser.parse_args()
+
+    bedrock = FakeBedrock(args.rpm, args.throttle_rate, args.latency)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(bedrock))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Fake Bedrock listening on http://127.0.0.1:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{bedrock.stats['requests']} requests, {bedrock.stats['throttled']} throttled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+'''
+Benchmark raw waf_logs vs. rollup latency on a synthetic dataset.
+
+Creates a separate table (waf_logs_bench by default) with the same schema,
+skip indexes and rollups as waf_logs, and fills it server-side from
+numbers(); the materialized views build the rollups during the load.
+Client IPs are log-uniform over 250k addresses, so a few IPs send most of
+the traffic, as in real WAF logs. Then it runs typical agent queries on the
+raw table and as rewritten by route_query, and reports median latency and
+rows read.
+
+    python benchmark_rollups.py --rows 100000000
+    python benchmark_rollups.py --skip-load          # rerun queries only
+    python benchmark_rollups.py --drop               # remove the benchmark tables
+'''
+
+import argparse
+import statistics
+import time
+
+from clickhouse_client import ClickHouseClient
+from rollups import ROLLUPS, create_rollups, drop_rollups, route_query
+from s3_to_clickhouse import WAF_LOGS_DDL
+
+BENCH_TABLE = 'waf_logs_bench'
+LOAD_CHUNK_ROWS = 10_000_000
+START = '2025-05-01 00:00:00'
+SPAN_MS = 30 * 86400 * 1000
+
+LOAD_SQL = '''
+INSERT INTO {table} (timestamp, format_version, webacl_id, terminating_rule_id, terminating_rule_type, action,
+                     http_source_name, http_client_ip, http_country, http_uri, http_http_method, http_request_id,
+                     http_scheme, http_host, header_host, header_user_agent)
+SELECT
+    addMilliseconds(toDateTime64('{start}', 3), intDiv(number * {span_ms}, {rows})),
+    1,
+    'arn:aws:wafv2:us-west-2:123456789012:regional/webacl/bench',
+    if(blocked, ['RateLimit', 'SQLi_BODY', 'XSS_QUERY', 'GeoBlock', 'BadBots'][1 + r1 % 5], 'Default_Action'),
+    if(blocked, 'RATE_BASED', 'REGULAR'),
+    if(blocked, 'BLOCK', 'ALLOW'),
+    'ALB',
+    IPv4NumToString(toUInt32(167772160 + exp(r2 / 4294967296 * log(250000)))),
+    ['IN', 'US', 'DE', 'BR', 'SG', 'GB', 'JP', 'FR', 'CN', 'RU'][1 + r3 % 10],
+    ['/', '/login', '/api/orders', '/search', '/static/app.js'][1 + r1 % 5],
+    ['GET', 'POST'][1 + r2 % 2],
+    toString(generateUUIDv4()),
+    'https',
+    concat('app', toString(r3 % 20), '.example.com'),
+    concat('app', toString(r3 % 20), '.example.com'),
+    'Mozilla/5.0'
+FROM (SELECT number, rand(1) AS r1, rand(2) AS r2, rand(3) AS r3, rand(4) % 10 = 0 AS blocked
+      FROM numbers({offset}, {count}))
+'''
+
+# Questions from sample_questions.txt, as the SQL generation prompt tends to write them
+QUERIES = [
+    ('blocked by country on a day',
+     "SELECT http_country, count() AS blocked FROM {table} WHERE LOWER(action) = LOWER('BLOCK') "
+     "AND timestamp >= '2025-05-10 00:00:00' AND timestamp <= '2025-05-10 23:59:59' "
+     "GROUP BY http_country ORDER BY blocked DESC"),
+    ('blocked per day, last week',
+     "SELECT toDate(timestamp) AS day, count() AS blocked FROM {table} WHERE LOWER(action) = LOWER('BLOCK') "
+     "AND timestamp >= '2025-05-03 00:00:00' AND timestamp < '2025-05-10 00:00:00' GROUP BY day ORDER BY day"),
+    ('top blocked IPs with rule ids',
+     "SELECT http_client_ip, terminating_rule_id, count() AS blocked FROM {table} "
+     "WHERE LOWER(action) = LOWER('BLOCK') GROUP BY http_client_ip, terminating_rule_id "
+     "ORDER BY blocked DESC LIMIT 20"),
+    ('blocked per minute before 4pm',
+     "SELECT toStartOfMinute(timestamp) AS minute, count() AS blocked FROM {table} "
+     "WHERE LOWER(action) = LOWER('BLOCK') AND timestamp >= '2025-05-10 15:00:00' "
+     "AND timestamp < '2025-05-10 16:00:00' GROUP BY minute ORDER BY minute"),
+    ('times one IP was blocked on a day',
+     "SELECT count() FROM {table} WHERE LOWER(http_client_ip) = LOWER('10.0.1.44') "
+     "AND LOWER(action) = LOWER('BLOCK') AND timestamp >= '2025-05-10 00:00:00' "
+     "AND timestamp <= '2025-05-10 23:59:59'"),
+    ('blocking rules per host',
+     "SELECT http_host, terminating_rule_id, count() AS blocked FROM {table} "
+     "WHERE LOWER(action) = LOWER('BLOCK') GROUP BY http_host, terminating_rule_id ORDER BY blocked DESC"),
+]
+
+# Row-level lookup that stays on the raw table; compared with and without skip indexes
+LOOKUP_SQL = ("SELECT toString(timestamp), http_uri, terminating_rule_id FROM {table} "
+              "WHERE LOWER(http_client_ip) = LOWER('10.0.1.44') AND LOWER(action) = LOWER('BLOCK')")
+
+
+def load(clickhouse, table, rows):
+    drop_rollups(clickhouse, table)
+    clickhouse.command(f'DROP TABLE IF EXISTS {table}')
+    clickhouse.command(WAF_LOGS_DDL.format(table=table))
+    create_rollups(clickhouse, table)
+
+    started = time.time()
+    for offset in range(0, rows, LOAD_CHUNK_ROWS):
+        count = min(LOAD_CHUNK_ROWS, rows - offset)
+        clickhouse.command(LOAD_SQL.format(table=table, start=START, span_ms=SPAN_MS, rows=rows,
+                                           offset=offset, count=count))
+        elapsed = time.time() - started
+        print(f"Loaded {offset + count:,} rows in {elapsed:.0f}s ({(offset + count) / elapsed:,.0f} rows/s)")
+
+
+def time_query(client, sql, repeat, settings=None):
+    latencies, read_rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = client.query(sql, settings=settings)
+        latencies.append(time.perf_counter() - started)
+        read_rows = int(result.summary.get('read_rows', 0))
+    return statistics.median(latencies), read_rows
+
+
+def table_sizes(client, table):
+    tables = [table] + [rollup.table(table) for rollup in ROLLUPS]
+    names = ', '.join(f"'{name}'" for name in tables)
+    result = client.query(f"SELECT table, sum(rows), formatReadableSize(sum(bytes_on_disk)) FROM system.parts "
+                          f"WHERE active AND database = currentDatabase() AND table IN ({names}) GROUP BY table")
+    for name, rows, size in sorted(result.result_rows, key=lambda row: tables.index(row[0])):
+        print(f"{name:<28} {rows:>14,} rows {size:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw vs rollup query latency on synthetic WAF logs")
+    parser.add_argument("--rows", type=int, default=100_000_000, help="Synthetic rows to load")
+    parser.add_argument("--table", default=BENCH_TABLE, help="Benchmark table (dropped and recreated)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is reported")
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the previously loaded table")
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark tables and exit")
+    args = parser.parse_args()
+
+    clickhouse = ClickHouseClient()
+    if args.drop:
+        drop_rollups(clickhouse, args.table)
+        clickhouse.command(f'DROP TABLE IF EXISTS {args.table}')
+        return
+    if not args.skip_load:
+        load(clickhouse, args.table, args.rows)
+
+    with clickhouse.pool.client() as client:
+        table_sizes(client, args.table)
+        print(f"\n{'query':<36} {'raw ms':>9} {'rollup ms':>10} {'speedup':>8} {'raw rows read':>15} "
+              f"{'rollup rows read':>17}  rollup")
+        for name, template in QUERIES:
+            sql = template.format(table=args.table)
+            routed, rollup_table = route_query(sql, raw_table=args.table)
+            raw_latency, raw_read = time_query(client, sql, args.repeat)
+            if rollup_table is None:
+                print(f"{name:<36} {raw_latency * 1000:>9.1f} {'-':>10} {'-':>8} {raw_read:>15,} {'-':>17}  (not routed)")
+                continue
+            rollup_latency, rollup_read = time_query(client, routed, args.repeat)
+            print(f"{name:<36} {raw_latency * 1000:>9.1f} {rollup_latency * 1000:>10.1f} "
+                  f"{raw_latency / rollup_latency:>7.1f}x {raw_read:>15,} {rollup_read:>17,}  {rollup_table}")
+
+        sql = LOOKUP_SQL.format(table=args.table)
+        without_index, rows_without = time_query(client, sql, args.repeat, settings={'use_skip_indexes': 0})
+        with_index, rows_with = time_query(client, sql, args.repeat)
+        print(f"\nIP lookup on raw rows: {without_index * 1000:.1f} ms / {rows_without:,} rows read without skip "
+              f"indexes, {with_index * 1000:.1f} ms / {rows_with:,} rows read with them")
+
+
+if __name__ == "__main__":
+    main()
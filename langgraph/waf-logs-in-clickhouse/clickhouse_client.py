@@ -1,10 +1,15 @@
 from pathlib import Path
 import os
+import uuid
+import queue
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field, asdict, is_dataclass
 import clickhouse_connect
 import concurrent.futures
 from clickhouse_connect.driver.binding import format_query_value
+from clickhouse_connect.driver.exceptions import OperationalError
 from clickhouse_env import get_config
 import atexit
 import json
@@ -37,13 +42,109 @@ class Table:
     columns: List[Column] = field(default_factory=list)
 
 
+@dataclass
+class QueryResult:
+    query_id: str
+    columns: List[str]
+    column_types: List[str]
+    data: List[list]  # one list of values per column
+    row_count: int
+    truncated: bool  # the row or byte cap was reached
+
+
 QUERY_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=10)
 atexit.register(lambda: QUERY_EXECUTOR.shutdown(wait=True))
 SELECT_QUERY_TIMEOUT_SECS = 30
 
+# Clients kept open and shared by all threads; one per concurrent query
+CLICKHOUSE_POOL_SIZE = int(os.getenv("CLICKHOUSE_POOL_SIZE", "10"))
+# Result caps for SELECT queries; larger results are cut off and marked truncated
+QUERY_MAX_ROWS = int(os.getenv("CLICKHOUSE_QUERY_MAX_ROWS", "10000"))
+QUERY_MAX_BYTES = int(os.getenv("CLICKHOUSE_QUERY_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class ClickHouseClientPool:
+    """Thread-safe pool of clickhouse_connect clients.
+
+    A client runs one query at a time (its HTTP session rejects concurrent
+    queries), so each caller leases a client exclusively. Clients are created
+    on demand up to ``max_size`` and reused; a client whose connection failed
+    is discarded instead of returned. A separate control client is kept for
+    KILL QUERY so cancellation works even when every pooled client is busy.
+    """
+
+    def __init__(self, factory, max_size: int = CLICKHOUSE_POOL_SIZE):
+        self.factory = factory
+        self.max_size = max_size
+        self.readonly: Optional[str] = None
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._control_client = None
+        self._control_lock = threading.Lock()
+
+    @contextmanager
+    def client(self):
+        """Lease a client for the duration of the block"""
+        self._slots.acquire()
+        try:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                client = self.factory()
+            broken = False
+            try:
+                yield client
+            except OperationalError:
+                broken = True
+                raise
+            finally:
+                # Query errors leave the connection usable; connection errors don't
+                if broken:
+                    client.close()
+                else:
+                    self._idle.put(client)
+        finally:
+            self._slots.release()
+
+    def kill_query(self, query_id: str):
+        """Cancel a running query on the server"""
+        with self._control_lock:
+            if self._control_client is None:
+                self._control_client = self.factory()
+            self._control_client.command(f"KILL QUERY WHERE query_id = {format_query_value(query_id)} ASYNC")
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if self._control_client is not None:
+            self._control_client.close()
+
+
+# Global instance placeholder for the singleton pattern
+_POOL_INSTANCE = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_client_pool(factory) -> ClickHouseClientPool:
+    """
+    Gets the singleton ClickHouseClientPool, creating clients with ``factory``.
+    Instantiates it on the first call.
+    """
+    global _POOL_INSTANCE
+    with _POOL_LOCK:
+        if _POOL_INSTANCE is None:
+            _POOL_INSTANCE = ClickHouseClientPool(factory)
+            atexit.register(_POOL_INSTANCE.close)
+    return _POOL_INSTANCE
+
+
 class ClickHouseClient:
     def __init__(self):
         self.util = Utility()
+        self.pool = get_client_pool(self.create_clickhouse_client)
 
     
     def result_to_table(self, query_columns, result) -> List[Table]:
@@ -66,8 +167,8 @@ class ClickHouseClient:
     def list_databases(self):
         """List available ClickHouse databases"""
         self.util.log_data("Listing all databases")
-        client = self.create_clickhouse_client()
-        result = client.command("SHOW DATABASES")
+        with self.pool.client() as client:
+            result = client.command("SHOW DATABASES")
         self.util.log_data(f"Found {len(result) if isinstance(result, list) else 1} databases")
         return result
 
@@ -79,7 +180,6 @@ class ClickHouseClient:
         row count, and column count."""
 
         self.util.log_data(f"Listing tables in database '{database}'")
-        client = self.create_clickhouse_client()
         query = f"SELECT database, name, engine, create_table_query, dependencies_database, dependencies_table, engine_full, sorting_key, primary_key FROM system.tables WHERE database = {format_query_value(database)}"
         if like:
             query += f" AND name LIKE {format_query_value(like)}"
@@ -88,43 +188,101 @@ class ClickHouseClient:
             query += f" AND name NOT LIKE {format_query_value(not_like)}"
  
         
-        result = client.query(query)
-        
+        with self.pool.client() as client:
+            result = client.query(query)
+            column_data_query_result = client.query(self.columns_query(database, like, not_like))
 
         # Deserialize result as Table dataclass instances
         tables = self.result_to_table(result.column_names, result.result_rows)
 
+        columns_by_table = {}
+        for column in self.result_to_column(
+            column_data_query_result.column_names,
+            column_data_query_result.result_rows,
+        ):
+            columns_by_table.setdefault(column.table, []).append(column)
+
         for table in tables:
-            column_data_query = f"SELECT database, table, name, type AS column_type, default_kind, default_expression, comment FROM system.columns WHERE database = {format_query_value(database)} AND table = {format_query_value(table.name)}"
-            column_data_query_result = client.query(column_data_query)
-            table.columns = [
-                c
-                for c in self.result_to_column(
-                    column_data_query_result.column_names,
-                    column_data_query_result.result_rows,
-                )
-            ]
+            table.columns = columns_by_table.get(table.name, [])
 
         self.util.log_data(f"Found {len(tables)} tables")
         return [asdict(table) for table in tables]
 
 
-    def execute_query(self, query: str):
-        client = self.create_clickhouse_client()
+    def columns_query(self, database: str, like: Optional[str] = None, not_like: Optional[str] = None) -> str:
+        """Columns of all matching tables in one query instead of one per table"""
+        query = f"SELECT database, table, name, type AS column_type, default_kind, default_expression, comment FROM system.columns WHERE database = {format_query_value(database)}"
+        if like:
+            query += f" AND table LIKE {format_query_value(like)}"
+
+        if not_like:
+            query += f" AND table NOT LIKE {format_query_value(not_like)}"
+
+        return query + " ORDER BY table, position"
+
+
+    def get_schema_version(self, database: str) -> str:
+        """Cheap fingerprint of the tables in a database: changes when a table is
+        created, dropped, renamed or altered (metadata_modification_time)."""
+
+        query = f"SELECT count(), toString(max(metadata_modification_time)), groupBitXor(cityHash64(name, metadata_modification_time)) FROM system.tables WHERE database = {format_query_value(database)}"
+        with self.pool.client() as client:
+            table_count, modified, names_hash = client.query(query).result_rows[0]
+        return f"{table_count}:{modified}:{names_hash}"
+
+
+    def execute_query(self, query: str, query_id: Optional[str] = None,
+                      max_rows: int = QUERY_MAX_ROWS, max_bytes: int = QUERY_MAX_BYTES):
+        """Run a read-only query and return the result as columns.
+
+        Blocks are streamed from the server and appended column by column, so
+        rows are never materialized as tuples or dicts. Reading stops at
+        ``max_rows``; closing the stream early cancels the query on the server.
+
+        Args:
+            query: SQL statement
+            query_id: Server query id, used to cancel the query (generated if not given)
+            max_rows: Row cap
+            max_bytes: Result size cap, enforced by the server
+
+        Returns:
+            QueryResult as a dictionary, or {"error": ...}
+        """
+        query_id = query_id or str(uuid.uuid4())
         try:
-            read_only = self.get_readonly_setting(client)
-            res = client.query(query, settings={"readonly": read_only})
-            column_names = res.column_names
-            rows = []
-            for row in res.result_rows:
-                row_dict = {}
-                for i, col_name in enumerate(column_names):
-                    row_dict[col_name] = row[i]
-                rows.append(row_dict)
-            
-            # self.util.log_data(f"Result:\n\n {rows}\n\n")
-            self.util.log_data(f"Query returned {len(rows)} rows")
-            return rows
+            with self.pool.client() as client:
+                settings = self.get_query_settings(client, max_rows, max_bytes)
+                settings["query_id"] = query_id
+
+                with client.query_column_block_stream(query, settings=settings) as stream:
+                    column_names = list(stream.source.column_names)
+                    column_types = [column_type.name for column_type in stream.source.column_types]
+                    data = [[] for _ in column_names]
+                    row_count = 0
+                    truncated = False
+
+                    for block in stream:
+                        block_rows = len(block[0]) if block else 0
+                        if row_count + block_rows > max_rows:
+                            take = max_rows - row_count
+                            for values, column in zip(data, block):
+                                values.extend(column[:take])
+                            row_count += take
+                            truncated = True
+                            break
+                        for values, column in zip(data, block):
+                            values.extend(column)
+                        row_count += block_rows
+
+            self.util.log_data(f"Query returned {row_count} rows{' (truncated)' if truncated else ''}")
+            return asdict(QueryResult(
+                query_id=query_id,
+                columns=column_names,
+                column_types=column_types,
+                data=data,
+                row_count=row_count,
+                truncated=truncated
+            ))
         except Exception as err:
             self.util.log_error(f"Error executing query: {err}")
             # Return a structured dictionary rather than a string to ensure proper serialization
@@ -136,7 +294,8 @@ class ClickHouseClient:
         """Run a SELECT query in a ClickHouse database"""
         self.util.log_data(f"Executing SELECT query: {query}")
         try:
-            future = QUERY_EXECUTOR.submit(self.execute_query, query)
+            query_id = str(uuid.uuid4())
+            future = QUERY_EXECUTOR.submit(self.execute_query, query, query_id)
             try:
                 result = future.result(timeout=SELECT_QUERY_TIMEOUT_SECS)
                 # Check if we received an error structure from execute_query
@@ -153,6 +312,9 @@ class ClickHouseClient:
                 self.util.log_data(
                     f"Query timed out after {SELECT_QUERY_TIMEOUT_SECS} seconds: {query}"
                 )
+                # A running future can't be cancelled; stop the query on the server so the
+                # worker thread and its pooled client are released
+                self.cancel_query(query_id)
                 future.cancel()
                 # Return a properly structured response for timeout errors
                 return {
@@ -166,6 +328,29 @@ class ClickHouseClient:
             return {"status": "error", "message": f"Unexpected error: {str(e)}"}
 
 
+    def command(self, sql: str):
+        """Run a DDL or other statement that returns no rows"""
+        with self.pool.client() as client:
+            return client.command(sql)
+
+
+    def insert(self, table: str, data: List[list], column_names: List[str], column_oriented: bool = True,
+               settings: Optional[Dict[str, Any]] = None):
+        """Insert one block; ``data`` is one list per column unless ``column_oriented`` is False"""
+        with self.pool.client() as client:
+            return client.insert(table, data, column_names=column_names, column_oriented=column_oriented,
+                                 settings=settings)
+
+
+    def cancel_query(self, query_id: str):
+        """Cancel a running query with KILL QUERY"""
+        try:
+            self.pool.kill_query(query_id)
+            self.util.log_data(f"Cancelled query {query_id}")
+        except Exception as e:
+            self.util.log_error(f"Failed to cancel query {query_id}: {str(e)}")
+
+
     def create_clickhouse_client(self):
         client_config = get_config().get_client_config()
         self.util.log_data(
@@ -199,7 +384,7 @@ class ClickHouseClient:
         "Setting readonly is unknown or readonly" error
 
         This function preserves the server's readonly setting unless it's 0, in which case
-        we enforce readonly=1 to ensure queries are read-only.
+        we enforce readonly=2 to ensure queries are read-only.
 
         Args:
             client: ClickHouse client connection
@@ -207,11 +392,34 @@ class ClickHouseClient:
         Returns:
             String value of readonly setting to use
         """
+        # The server's setting doesn't change between queries; probe it once per pool
+        if self.pool.readonly is not None:
+            return self.pool.readonly
+
         read_only = client.server_settings.get("readonly")
-        if read_only:
-            if read_only == "0":
-                return "1"  # Force read-only mode if server has it disabled
-            else:
-                return read_only.value  # Respect server's readonly setting (likely 2)
+        if read_only and read_only.value != "0":
+            self.pool.readonly = read_only.value  # Respect server's readonly setting
         else:
-            return "1"  # Default to basic read-only mode if setting isn't present
+            # Read-only mode if the server has it disabled or the setting isn't present; level 2
+            # so the result caps and timeout below can still be set per query
+            self.pool.readonly = "2"
+        return self.pool.readonly
+
+
+    def get_query_settings(self, client, max_rows: int, max_bytes: int) -> Dict[str, Any]:
+        """Settings for a capped, read-only query.
+
+        With readonly=1 the server rejects any other setting, so the caps are
+        then only applied while reading the stream.
+        """
+        read_only = self.get_readonly_setting(client)
+        settings = {"readonly": read_only}
+        if read_only != "1":
+            settings.update({
+                "max_result_rows": max_rows,
+                "max_result_bytes": max_bytes,
+                "result_overflow_mode": "break",
+                "max_execution_time": SELECT_QUERY_TIMEOUT_SECS,
+                "cancel_http_readonly_queries_on_client_close": 1,
+            })
+        return settings
@@ -16,6 +16,9 @@ from langchain_core.tools import tool
 from langchain_aws import ChatBedrockConverse
 from utility import Utility
 from clickhouse_client import ClickHouseClient
+from rollups import route_query, is_rollup_table
+from query_cache import (SchemaCatalog, TTLCache, question_key, normalize_sql,
+                         SQL_CACHE_TTL_SECS, SQL_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SECS, RESULT_CACHE_MAX_ENTRIES)
 
 MODEL_ID1   = "us.amazon.nova-pro-v1:0"
 MODEL_ID2   = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
@@ -49,11 +52,18 @@ llm2 = ChatBedrockConverse(
 
 util = Utility()
 
+# Shared across questions: table schemas, question -> validated SQL, and SQL -> results
+schema_catalog = SchemaCatalog()
+sql_cache = TTLCache(ttl=SQL_CACHE_TTL_SECS, max_entries=SQL_CACHE_MAX_ENTRIES)
+result_cache = TTLCache(ttl=RESULT_CACHE_TTL_SECS, max_entries=RESULT_CACHE_MAX_ENTRIES)
+
 class AppState(MessagesState):
     user_input: str
     conn: ClickHouseClient
     schema: str
+    schema_version: str
     sql_query: str
+    sql_from_cache: bool
     query_results: str
     usage: list
     response: str
@@ -65,12 +75,36 @@ def find_table_schema(state: AppState):
     '''
     
     util.log_header(function_name=sys._getframe().f_code.co_name)
-    table_schema = state['conn'].list_tables(database=DATABASE_NAME)
-    state['schema'] = table_schema
+    table_schema, schema_version = schema_catalog.get(state['conn'], DATABASE_NAME)
+    # Rollups are used by rewriting the generated SQL, not by the LLM
+    state['schema'] = [table for table in table_schema if not is_rollup_table(table['name'])]
+    state['schema_version'] = schema_version
     
     return state                
 
 
+def lookup_cached_sql(state: AppState):
+    '''
+    This function looks up SQL that already answered the same question against the current schema
+    '''
+
+    util.log_header(function_name=sys._getframe().f_code.co_name)
+    sql = sql_cache.get(question_key(state['user_input'], state['schema_version']))
+    if sql:
+        state['sql_query'] = sql
+        state['sql_from_cache'] = True
+        util.log_data(data=f"\n-------------------\nSQL Query (cached): {sql}\n-------------------")
+
+    return state
+
+
+def route_sql(state: AppState) -> Literal["Generate SQL Statement", "Execute SQL Statement"]:
+    '''
+    Skip SQL generation when a cached statement was found
+    '''
+    return "Execute SQL Statement" if state['sql_from_cache'] else "Generate SQL Statement"
+
+
 
 def generate_sql_statement(state: AppState):
     '''
@@ -130,9 +164,31 @@ def execute_sql_statement(state: AppState):
     
     util.log_header(function_name=sys._getframe().f_code.co_name)
 
+    cache_key = question_key(state['user_input'], state['schema_version'])
+    result_key = normalize_sql(state['sql_query'])
+    query_results = result_cache.get(result_key)
+    if query_results is not None:
+        # Only results of successful queries are cached, so the SQL is valid
+        util.log_data(data="Query results served from cache")
+        state['query_results'] = query_results
+        sql_cache.put(cache_key, state['sql_query'])
+        return state
+
+    sql, rollup_table = route_query(state['sql_query'])
+    if rollup_table:
+        util.log_data(data=f"Query routed to {rollup_table}: {sql}")
+
     conn = state['conn']
-    results = conn.execute_query(state['sql_query'])
-    state['query_results'] = json.dumps(results)
+    results = conn.run_select_query(sql)
+    state['query_results'] = json.dumps(results, default=str)
+
+    if results.get("status") == "error":
+        # Never reuse SQL that no longer runs
+        if state['sql_from_cache']:
+            sql_cache.invalidate(cache_key)
+    else:
+        sql_cache.put(cache_key, state['sql_query'])
+        result_cache.put(result_key, state['query_results'])
 
     # util.log_data(data=f"Query Results: {state['query_results']}")
 
@@ -184,13 +240,15 @@ def build_graph():
     # add nodes to the graph
     
     graph_builder.add_node("Retrieve Table Schema", find_table_schema)
+    graph_builder.add_node("Lookup Cached SQL", lookup_cached_sql)
     graph_builder.add_node("Generate SQL Statement", generate_sql_statement)
     graph_builder.add_node("Execute SQL Statement", execute_sql_statement)
     graph_builder.add_node("Generate Response", generate_response)
     
     # add edges to connect nodes
     graph_builder.add_edge(START, "Retrieve Table Schema")
-    graph_builder.add_edge("Retrieve Table Schema", "Generate SQL Statement")
+    graph_builder.add_edge("Retrieve Table Schema", "Lookup Cached SQL")
+    graph_builder.add_conditional_edges("Lookup Cached SQL", route_sql)
     graph_builder.add_edge("Generate SQL Statement", "Execute SQL Statement")
     graph_builder.add_edge("Execute SQL Statement", "Generate Response")
     
@@ -242,6 +300,8 @@ def invoke_for_input(input: str, langgraph_app):
     state['usage'] = []
     state['messages'] = []
     state['schema'] = ''
+    state['schema_version'] = ''
+    state['sql_from_cache'] = False
     state['response'] = ''
 
     conn = ClickHouseClient()
@@ -262,6 +322,7 @@ def invoke_for_input(input: str, langgraph_app):
     state = langgraph_app.invoke(state)
     # util.log_execution_flow(state['messages'])
     util.log_usage(state['usage'])
+    util.log_data(data=f"SQL cache: {sql_cache.stats()}, result cache: {result_cache.stats()}")
 
     return state['response']
 
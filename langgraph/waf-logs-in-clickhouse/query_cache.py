@@ -0,0 +1,150 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from utility import Utility
+
+# Schema catalog: full reload after SCHEMA_CACHE_TTL_SECS, cheap version probe at most every SCHEMA_CHECK_SECS
+SCHEMA_CACHE_TTL_SECS = int(os.getenv("SCHEMA_CACHE_TTL_SECS", "3600"))
+SCHEMA_CHECK_SECS = int(os.getenv("SCHEMA_CHECK_SECS", "30"))
+
+# Question -> SQL that executed successfully
+SQL_CACHE_TTL_SECS = int(os.getenv("SQL_CACHE_TTL_SECS", "86400"))
+SQL_CACHE_MAX_ENTRIES = int(os.getenv("SQL_CACHE_MAX_ENTRIES", "1000"))
+
+# SQL -> query results; short-lived because new logs keep arriving
+RESULT_CACHE_TTL_SECS = int(os.getenv("RESULT_CACHE_TTL_SECS", "60"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "100"))
+
+# Questions whose SQL depends on the current date ("last 8 hours", "today")
+RELATIVE_TIME_PATTERN = re.compile(r"\b(now|today|yesterday|last|past|recent|recently|ago|this (hour|week|month|year))\b")
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after they are stored"""
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SchemaCatalog:
+    """
+    Cache of table schemas per database.
+
+    Within ``check_interval`` of the last check the cached schema is returned
+    without touching the server. After that a single query against
+    system.tables compares the schema version (table count, names and latest
+    metadata_modification_time); the tables and columns are only reloaded when
+    it changed or after ``ttl``.
+    """
+
+    def __init__(self, ttl: int = SCHEMA_CACHE_TTL_SECS, check_interval: int = SCHEMA_CHECK_SECS):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.util = Utility()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, conn, database: str) -> Tuple[List[dict], str]:
+        """
+        Tables of ``database`` with their columns, and the schema version they were read at.
+
+        Args:
+            conn: ClickHouseClient used when the catalog has to be checked or reloaded
+            database: Database name
+        """
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(database)
+            if entry and now - entry['loaded_at'] < self.ttl:
+                if now - entry['checked_at'] < self.check_interval:
+                    return entry['tables'], entry['version']
+
+                version = conn.get_schema_version(database)
+                entry['checked_at'] = now
+                if version == entry['version']:
+                    return entry['tables'], entry['version']
+                self.util.log_data(f"Schema of '{database}' changed, reloading")
+
+            # Read the version first: a change during the reload is caught by the next check
+            version = conn.get_schema_version(database)
+            tables = conn.list_tables(database=database)
+            self._entries[database] = {
+                'tables': tables,
+                'version': version,
+                'loaded_at': now,
+                'checked_at': now
+            }
+            return tables, version
+
+    def invalidate(self, database: Optional[str] = None):
+        with self._lock:
+            if database is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(database, None)
+
+
+def normalize_question(question: str) -> str:
+    '''
+    Normalize a question for the SQL cache: case, whitespace, quotes and
+    trailing punctuation don't change the SQL it needs.
+    '''
+    question = question.lower().replace('"', "'")
+    question = re.sub(r"\s+", " ", question).strip()
+    return question.rstrip(" ?.!")
+
+
+def question_key(question: str, schema_version: str) -> Tuple[str, ...]:
+    '''
+    SQL cache key for a question. SQL generated for an older schema is never
+    reused, and questions relative to the current time only match on the same day.
+    '''
+    normalized = normalize_question(question)
+    if RELATIVE_TIME_PATTERN.search(normalized):
+        return (schema_version, normalized, date.today().isoformat())
+    return (schema_version, normalized)
+
+
+def normalize_sql(sql: str) -> str:
+    '''
+    Normalize SQL for the result cache: whitespace and a trailing semicolon
+    don't change the result.
+    '''
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
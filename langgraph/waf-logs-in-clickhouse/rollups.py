@@ -0,0 +1,275 @@
+'''
+Pre-aggregated rollups of waf_logs and a router that runs eligible SQL on them.
+
+Materialized views keep per-minute and per-hour request counts in
+AggregatingMergeTree tables keyed by (bucket, action, http_country,
+terminating_rule_id, http_host, http_client_ip). Most questions the agent gets
+("blocked requests by country last week") are counts over those dimensions,
+so the generated SQL can be answered from a rollup that is orders of
+magnitude smaller than the raw table. route_query rewrites such SQL and
+leaves everything else (row-level lookups, other columns, relative time
+windows that don't line up with a bucket) on the raw table.
+
+The raw table also gets bloom filter skip indexes on lower(...) of the
+high-cardinality filter columns, matching the LOWER() comparisons the SQL
+generation prompt asks for.
+'''
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+RAW_TABLE = 'waf_logs'
+
+# Rollup dimensions, named as in the raw table so filters and GROUP BY carry over unchanged
+DIMENSIONS = ['action', 'http_country', 'terminating_rule_id', 'http_host', 'http_client_ip']
+
+# name, expression, type, granularity
+SKIP_INDEXES = [
+    ('idx_client_ip', 'lower(http_client_ip)', 'bloom_filter(0.01)', 4),
+    ('idx_host', 'lower(http_host)', 'bloom_filter(0.01)', 4),
+    ('idx_header_host', 'lower(header_host)', 'bloom_filter(0.01)', 4),
+    ('idx_request_id', 'http_request_id', 'bloom_filter(0.01)', 4),
+    ('idx_rule_id', 'lower(terminating_rule_id)', 'set(256)', 4),
+]
+
+
+@dataclass
+class Rollup:
+    suffix: str
+    bucket_function: str
+    grain_seconds: int
+
+    def table(self, raw_table: str = RAW_TABLE) -> str:
+        return f'{raw_table}_{self.suffix}'
+
+
+# Coarsest first: the router uses the first rollup a query fits
+ROLLUPS = [
+    Rollup('by_hour', 'toStartOfHour', 3600),
+    Rollup('by_minute', 'toStartOfMinute', 60),
+]
+
+# Time bucketing functions that can be applied to a rollup's bucket, with their grain
+BUCKET_FUNCTIONS = {
+    'tostartofminute': 60,
+    'tostartoffiveminutes': 300,
+    'tostartoffiveminute': 300,
+    'tostartoftenminutes': 600,
+    'tostartoffifteenminutes': 900,
+    'tostartofhour': 3600,
+    'tostartofday': 86400,
+    'todate': 86400,
+    'tostartofweek': 7 * 86400,
+    'tostartofmonth': 28 * 86400,
+    'tostartofyear': 365 * 86400,
+    'tohour': 3600,
+    'todayofweek': 86400,
+    'todayofmonth': 86400,
+}
+
+# Functions that mean the same on rollup rows as on raw rows (aggregates are rewritten or checked separately)
+ALLOWED_FUNCTIONS = set(BUCKET_FUNCTIONS) | {
+    'count', 'uniq', 'uniqexact', 'min', 'max', 'lower', 'upper', 'tostring', 'todatetime', 'todatetime64',
+    'in', 'if', 'round', 'like', 'ilike', 'concat',
+}
+
+KEYWORDS = {
+    'select', 'distinct', 'from', 'where', 'and', 'or', 'not', 'group', 'by', 'order', 'having', 'limit', 'offset',
+    'as', 'asc', 'desc', 'in', 'between', 'like', 'ilike', 'is', 'null', 'nulls', 'first', 'last', 'case', 'when',
+    'then', 'else', 'end', 'true', 'false', 'default',
+}
+
+# Anything that changes what a row means, or that the router can't see through
+UNSUPPORTED = re.compile(r'\b(join|union|with|final|sample|prewhere|array|settings|format|into|window|over)\b|--|/\*|;.')
+
+LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+PLACEHOLDER = '__lit{}__'
+
+
+def rollup_ddl(rollup: Rollup, raw_table: str = RAW_TABLE) -> List[str]:
+    '''Statements creating a rollup table and the materialized view that feeds it'''
+    table = rollup.table(raw_table)
+    dimensions = ', '.join(DIMENSIONS)
+    return [
+        f'''
+        CREATE TABLE IF NOT EXISTS {table}
+            (
+                bucket DateTime,
+                action LowCardinality(String),
+                http_country LowCardinality(String),
+                terminating_rule_id LowCardinality(String),
+                http_host LowCardinality(String),
+                http_client_ip String,
+                requests SimpleAggregateFunction(sum, UInt64),
+                first_seen SimpleAggregateFunction(min, DateTime64(3)),
+                last_seen SimpleAggregateFunction(max, DateTime64(3))
+            )
+            ENGINE = AggregatingMergeTree()
+            PARTITION BY toYYYYMM(bucket)
+            ORDER BY (bucket, {dimensions})
+        ''',
+        f'''
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {table}_mv TO {table} AS
+            {rollup_select(rollup, raw_table)}
+        ''',
+    ]
+
+
+def rollup_select(rollup: Rollup, raw_table: str = RAW_TABLE) -> str:
+    dimensions = ', '.join(DIMENSIONS)
+    return (f'SELECT {rollup.bucket_function}(timestamp) AS bucket, {dimensions}, '
+            f'count() AS requests, min(timestamp) AS first_seen, max(timestamp) AS last_seen '
+            f'FROM {raw_table} GROUP BY bucket, {dimensions}')
+
+
+def create_rollups(clickhouse, raw_table: str = RAW_TABLE):
+    '''
+    Create the skip indexes on the raw table and the rollup tables with their
+    materialized views. Idempotent. Views only see new inserts; call
+    rebuild_rollups to load rows that were already in the raw table.
+    '''
+    for name, expression, index_type, granularity in SKIP_INDEXES:
+        clickhouse.command(f'ALTER TABLE {raw_table} ADD INDEX IF NOT EXISTS {name} {expression} '
+                           f'TYPE {index_type} GRANULARITY {granularity}')
+    for rollup in ROLLUPS:
+        for statement in rollup_ddl(rollup, raw_table):
+            clickhouse.command(statement)
+
+
+def rebuild_rollups(clickhouse, raw_table: str = RAW_TABLE):
+    '''
+    Reload the rollups from the raw table and build the skip indexes for
+    existing parts. Run it while nothing is being ingested, or rows inserted
+    meanwhile are counted twice.
+    '''
+    for name, _, _, _ in SKIP_INDEXES:
+        clickhouse.command(f'ALTER TABLE {raw_table} MATERIALIZE INDEX {name}')
+    for rollup in ROLLUPS:
+        table = rollup.table(raw_table)
+        clickhouse.command(f'TRUNCATE TABLE IF EXISTS {table}')
+        clickhouse.command(f'INSERT INTO {table} {rollup_select(rollup, raw_table)}')
+
+
+def drop_rollups(clickhouse, raw_table: str = RAW_TABLE):
+    for rollup in ROLLUPS:
+        table = rollup.table(raw_table)
+        clickhouse.command(f'DROP VIEW IF EXISTS {table}_mv')
+        clickhouse.command(f'DROP TABLE IF EXISTS {table}')
+
+
+def is_rollup_table(name: str, raw_table: str = RAW_TABLE) -> bool:
+    return any(name in (rollup.table(raw_table), f'{rollup.table(raw_table)}_mv') for rollup in ROLLUPS)
+
+
+def _parse_literal(literal: str) -> Optional[datetime]:
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(literal.strip("'"), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _bound_fits(operator: str, value: Optional[datetime], grain_seconds: int) -> bool:
+    '''
+    Whether ``timestamp <operator> value`` selects whole buckets. Lower bounds
+    and exclusive upper bounds must be at a bucket start; inclusive upper
+    bounds at the bucket's last second (e.g. 23:59:59).
+    '''
+    if value is None:
+        return False
+    seconds = value.hour * 3600 + value.minute * 60 + value.second
+    if operator in ('>=', '<'):
+        return value.microsecond == 0 and seconds % grain_seconds == 0
+    if operator == '<=':
+        return (seconds + 1) % grain_seconds == 0
+    return False
+
+
+def _rewrite(masked: str, literals: List[str], rollup: Rollup, raw_table: str) -> Optional[str]:
+    grain = rollup.grain_seconds
+
+    # Time buckets at least as coarse as the rollup's
+    def bucket(match):
+        return f'{match.group(1)}(bucket)' if BUCKET_FUNCTIONS[match.group(1).lower()] >= grain else match.group(0)
+    sql = re.sub(r'\b(\w+)\s*\(\s*timestamp\s*\)', lambda m: bucket(m) if m.group(1).lower() in BUCKET_FUNCTIONS
+                 else m.group(0), masked)
+
+    # First and last event time
+    sql = re.sub(r'\bmin\s*\(\s*timestamp\s*\)', 'min(first_seen)', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bmax\s*\(\s*timestamp\s*\)', 'max(last_seen)', sql, flags=re.IGNORECASE)
+
+    # Time range filters on bucket boundaries
+    literal_value = lambda index: _parse_literal(literals[int(index)])
+    cast = r'(?:todatetime(?:64)?\s*\(\s*)?'
+
+    def between(match):
+        low, high = literal_value(match.group(1)), literal_value(match.group(2))
+        if _bound_fits('>=', low, grain) and _bound_fits('<=', high, grain):
+            return match.group(0).replace('timestamp', 'bucket', 1)
+        return match.group(0)
+    sql = re.sub(rf'\btimestamp\s+between\s+{cast}__lit(\d+)__.*?\band\s+{cast}__lit(\d+)__', between, sql,
+                 flags=re.IGNORECASE)
+
+    def compare(match):
+        if _bound_fits(match.group(1), literal_value(match.group(2)), grain):
+            return f'bucket {match.group(1)} ' + match.group(0)[match.end(1) - match.start(0):].lstrip()
+        return match.group(0)
+    sql = re.sub(rf'\btimestamp\s*(>=|<=|<|>|=)\s*{cast}__lit(\d+)__', compare, sql, flags=re.IGNORECASE)
+
+    # Any other use of the event time needs raw rows
+    if re.search(r'\btimestamp\b', sql, flags=re.IGNORECASE):
+        return None
+
+    # A request count is the sum of the bucket counts
+    dimension_pattern = '|'.join(DIMENSIONS)
+    sql = re.sub(rf'\bcount\s*\(\s*(\*|1|{dimension_pattern}|bucket)?\s*\)', 'sum(requests)', sql, flags=re.IGNORECASE)
+
+    sql = re.sub(rf'\bfrom\s+(?:default\.)?`?{raw_table}`?(?!\w)', f'FROM {rollup.table(raw_table)}', sql,
+                 flags=re.IGNORECASE)
+    return sql
+
+
+def route_query(sql: str, raw_table: str = RAW_TABLE) -> Tuple[str, Optional[str]]:
+    '''
+    Rewrite ``sql`` onto the coarsest rollup that returns the same result.
+
+    Eligible queries read only waf_logs, aggregate or group (or use DISTINCT),
+    use only rollup dimensions, count requests with count()/uniq() or take
+    min/max(timestamp), and filter or group time on bucket boundaries.
+
+    Returns:
+        (SQL to run, rollup table used or None if the query stays on the raw table)
+    '''
+    statement = sql.strip().rstrip(';').strip()
+    literals = LITERAL.findall(statement)
+    masked = statement
+    for index, literal in enumerate(literals):
+        masked = masked.replace(literal, PLACEHOLDER.format(index), 1)
+    lowered = masked.lower()
+
+    if UNSUPPORTED.search(lowered) or lowered.count('select') != 1:
+        return sql, None
+    if len(re.findall(rf'\bfrom\s+(?:default\.)?`?{raw_table}`?(?!\w|\s*,)', lowered)) != 1:
+        return sql, None
+    if not re.search(r'\b(count|uniq|uniqexact|min|max)\s*\(|\bgroup\s+by\b|\bselect\s+distinct\b', lowered):
+        return sql, None  # row-level queries need raw rows
+
+    # Only functions that mean the same on rollup rows, and only rollup columns
+    if any(name not in ALLOWED_FUNCTIONS | KEYWORDS for name in re.findall(r'\b(\w+)\s*\(', lowered)):
+        return sql, None
+    aliases = set(re.findall(r'\bas\s+`?(\w+)', lowered))
+    allowed_names = KEYWORDS | aliases | set(DIMENSIONS) | {'timestamp', raw_table}
+    for name in re.findall(r'\b([a-z_]\w*)\b(?!\s*\()', lowered):
+        if name not in allowed_names and not re.fullmatch(r'__lit\d+__', name):
+            return sql, None
+
+    for rollup in ROLLUPS:
+        rewritten = _rewrite(masked, literals, rollup, raw_table)
+        if rewritten is not None:
+            for index, literal in enumerate(literals):
+                rewritten = rewritten.replace(PLACEHOLDER.format(index), literal, 1)
+            return rewritten, rollup.table(raw_table)
+    return sql, None
@@ -1,29 +1,67 @@
 import boto3
 #from clickhouse_driver import Client
 from datetime import datetime, timezone
-import json
+import argparse
 import gzip
-import io
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from clickhouse_client import ClickHouseClient
+from rollups import create_rollups, drop_rollups, rebuild_rollups
 
+try:
+    # orjson parses log lines several times faster than the standard library
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 
-WAF_LOGS_BUCKET = 'xxxx'
-WAF_LOGS_BUCKET_PREFIX = 'xxxx'
+WAF_LOGS_BUCKET = os.getenv('WAF_LOGS_BUCKET', 'xxxx')
+WAF_LOGS_BUCKET_PREFIX = os.getenv('WAF_LOGS_BUCKET_PREFIX', 'xxxx')
+# Set to a MinIO or moto server URL to ingest from a local S3 stand-in
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL')
 
-class WAFLogProcessor:
-    def __init__(self):
-        self.s3 = boto3.client('s3')
+TABLE_NAME = 'waf_logs'
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '8'))
+INSERT_BATCH_ROWS = int(os.getenv('INSERT_BATCH_ROWS', '100000'))
+CHECKPOINT_FILE = os.getenv('INGEST_CHECKPOINT_FILE', './waf_ingest_checkpoint.txt')
+PROGRESS_INTERVAL_SECS = 10
+# ClickHouse's default max_insert_block_size; larger blocks are sent as one block too
+MIN_INSERT_BLOCK_SIZE = 1_048_449
 
-        self.clickhouse = ClickHouseClient()
-        self.bucket = WAF_LOGS_BUCKET
-        self.prefix = WAF_LOGS_BUCKET_PREFIX
+# waf_logs columns, in insert order
+COLUMNS = [
+    'timestamp', 'format_version', 'webacl_id', 'terminating_rule_id', 'terminating_rule_type', 'action',
+    'http_source_name', 'http_source_id', 'response_code_sent',
+    # httpRequest fields
+    'http_client_ip', 'http_country', 'http_uri', 'http_args', 'http_http_version', 'http_http_method',
+    'http_request_id', 'http_fragment', 'http_scheme', 'http_host',
+    # httpRequest.headers fields
+    'header_host', 'header_connection', 'header_cache_control', 'header_upgrade_insecure_requests',
+    'header_user_agent', 'header_accept', 'header_accept_encoding', 'header_accept_language',
+    'header_if_none_match', 'header_if_modified_since',
+]
+
+# httpRequest.headers name (lowercase) -> column
+HEADER_COLUMNS = [
+    ('host', 'header_host'),
+    ('connection', 'header_connection'),
+    ('cache-control', 'header_cache_control'),
+    ('upgrade-insecure-requests', 'header_upgrade_insecure_requests'),
+    ('user-agent', 'header_user_agent'),
+    ('accept', 'header_accept'),
+    ('accept-encoding', 'header_accept_encoding'),
+    ('accept-language', 'header_accept_language'),
+    ('if-none-match', 'header_if_none_match'),
+    ('if-modified-since', 'header_if_modified_since'),
+]
 
-    def create_table(self):
 
-        self.clickhouse.execute('DROP TABLE IF EXISTS waf_logs')
-        self.clickhouse.execute('''
-            CREATE TABLE waf_logs
+WAF_LOGS_DDL = '''
+            CREATE TABLE IF NOT EXISTS {table}
                 (
                     timestamp DateTime64,  -- UTC-compatible
                     format_version UInt32,
@@ -62,101 +100,269 @@ class WAFLogProcessor:
                 ENGINE = MergeTree()
                 ORDER BY (timestamp);
 
-        ''')
+'''
 
-    def process_log(self, content):
-        log = json.loads(content)
-        http_req = log.get('httpRequest', {})
-        headers = {h['name']: h['value'] for h in http_req.get('headers', [])}
 
-        def get_header(name):
-            return headers.get(name, '')
-            #return headers.get(name, None)
+class IngestCheckpoint:
+    """Append-only file of S3 keys whose rows are all in ClickHouse, so a restart resumes"""
 
-        try:
-            row_data = {
-                'timestamp': datetime.fromtimestamp(log['timestamp'] / 1000, timezone.utc), #datetime.utcfromtimestamp(log['timestamp'] / 1000),
-                'format_version': log.get('formatVersion'),
-                'webacl_id': log.get('webaclId'),
-                'terminating_rule_id': log.get('terminatingRuleId'),
-                'terminating_rule_type': log.get('terminatingRuleType'),
-                'action': log.get('action'),
-                'http_source_name': log.get('httpSourceName'),
-                'http_source_id': log.get('httpSourceId'),
-                'response_code_sent': log.get('responseCodeSent'),
-
-                # httpRequest fields
-                'http_client_ip': http_req.get('clientIp'),
-                'http_country': http_req.get('country'),
-                'http_uri': http_req.get('uri'),
-                'http_args': http_req.get('args'),
-                'http_http_version': http_req.get('httpVersion'),
-                'http_http_method': http_req.get('httpMethod'),
-                'http_request_id': http_req.get('requestId'),
-                'http_fragment': http_req.get('fragment'),
-                'http_scheme': http_req.get('scheme'),
-                'http_host': http_req.get('host'),
-
-                # httpRequest.headers fields
-                'header_host': get_header('Host'),
-                'header_connection': get_header('Connection'),
-                'header_cache_control': get_header('Cache-Control'),
-                'header_upgrade_insecure_requests': get_header('Upgrade-Insecure-Requests'),
-                'header_user_agent': get_header('User-Agent'),
-                'header_accept': get_header('Accept'),
-                'header_accept_encoding': get_header('Accept-Encoding'),
-                'header_accept_language': get_header('Accept-Language'),
-                'header_if_none_match': get_header('If-None-Match'),
-                'header_if_modified_since': get_header('If-Modified-Since')
-            }
-        except Exception as e:
-            print(f'Exception extracting data. Details: {e}')
-            print(f'{content}')
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.strip() for line in f if line.strip()}
+
+    def mark(self, keys):
+        if not keys:
+            return
+        with open(self.path, 'a') as f:
+            f.write(''.join(f'{key}\n' for key in keys))
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(keys)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
+
+
+class ColumnBatch:
+    """Parsed log rows held as one list per column"""
+
+    def __init__(self):
+        self.columns = [[] for _ in COLUMNS]
+        self.rows = 0
+
+    def extend(self, other: 'ColumnBatch'):
+        for values, more in zip(self.columns, other.columns):
+            values.extend(more)
+        self.rows += other.rows
+
+
+class WAFLogProcessor:
+    def __init__(self, bucket: str = WAF_LOGS_BUCKET, prefix: str = WAF_LOGS_BUCKET_PREFIX,
+                 workers: int = INGEST_WORKERS, batch_rows: int = INSERT_BATCH_ROWS,
+                 checkpoint_file: str = CHECKPOINT_FILE, endpoint_url: str = S3_ENDPOINT_URL):
+        self.s3 = boto3.client('s3', endpoint_url=endpoint_url)
+
+        self.clickhouse = ClickHouseClient()
+        self.bucket = bucket
+        self.prefix = prefix
+        self.workers = workers
+        self.batch_rows = batch_rows
+        self.checkpoint = IngestCheckpoint(checkpoint_file)
+
+        self._stats_lock = threading.Lock()
+        self._abort = threading.Event()
+        self.files_done = 0
+        self.files_failed = 0
+        self.bytes_read = 0
+        self.rows_parsed = 0
+        self.rows_inserted = 0
+        self.started_at = None
 
-        return row_data
+    def create_table(self, recreate: bool = False):
 
-    def process_s3_file(self, key):
+        if recreate:
+            drop_rollups(self.clickhouse, TABLE_NAME)
+            self.clickhouse.command(f'DROP TABLE IF EXISTS {TABLE_NAME}')
+            self.checkpoint.clear()
+        self.clickhouse.command(WAF_LOGS_DDL.format(table=TABLE_NAME))
+        # Skip indexes, and minute/hour rollups kept up to date by materialized views
+        create_rollups(self.clickhouse, TABLE_NAME)
+
+    def process_log(self, content, batch: ColumnBatch):
+        '''
+        Parse one JSON log line and append its fields to ``batch``.
+        String columns get '' for missing fields, as the table's String columns aren't Nullable.
+        '''
+        log = json_loads(content)
+        http_req = log.get('httpRequest') or {}
+        # Header names are case-insensitive (and lowercase over HTTP/2)
+        headers = {h['name'].lower(): h['value'] for h in http_req.get('headers') or ()}
+
+        values = (
+            datetime.fromtimestamp(log['timestamp'] / 1000, timezone.utc),
+            log.get('formatVersion') or 0,
+            log.get('webaclId') or '',
+            log.get('terminatingRuleId') or '',
+            log.get('terminatingRuleType') or '',
+            log.get('action') or '',
+            log.get('httpSourceName') or '',
+            log.get('httpSourceId') or '',
+            log.get('responseCodeSent'),
+
+            # httpRequest fields
+            http_req.get('clientIp') or '',
+            http_req.get('country') or '',
+            http_req.get('uri') or '',
+            http_req.get('args') or '',
+            http_req.get('httpVersion') or '',
+            http_req.get('httpMethod') or '',
+            http_req.get('requestId') or '',
+            http_req.get('fragment') or '',
+            http_req.get('scheme') or '',
+            http_req.get('host') or '',
+        ) + tuple(headers.get(name, '') for name, _ in HEADER_COLUMNS)
+
+        for column, value in zip(batch.columns, values):
+            column.append(value)
+        batch.rows += 1
+
+    def process_s3_file(self, key, chunks: queue.Queue):
+        '''
+        Stream one gzip object: decompress while downloading and parse its lines
+        into one column batch. The batch is handed to the inserter only once the
+        whole file was read, so a file that fails midway inserts nothing and is
+        retried in full on the next run.
+        '''
+        if self._abort.is_set():
+            return
         try:
-            print(f"Processing file '{key}'...")
             response = self.s3.get_object(Bucket=self.bucket, Key=key)
-            gzipped_content = response['Body'].read()
-            
-            # Decompress gzip content
-            with gzip.GzipFile(fileobj=io.BytesIO(gzipped_content)) as gz:
-                content = gz.read().decode('utf-8')
-            
-            logs = []
-            for line in content.splitlines():
-                if line.strip():  # Skip empty lines
-                    logs.append(self.process_log(line))
-            
-            print('Inserting in waf_logs table...')
-            if logs:
-                try:
-                    self.clickhouse.execute('INSERT INTO waf_logs VALUES', logs)
-                except Exception as e1:
-                    print(f'Exception inserting data. Details: {e1}')
-                    print(logs)
-            print(f"Processed {len(logs)} logs from {key}")
+            body = response['Body']
+            batch = ColumnBatch()
+            with gzip.GzipFile(fileobj=body) as gz:
+                for line_number, line in enumerate(gz, 1):
+                    if not line.strip():  # Skip empty lines
+                        continue
+                    try:
+                        self.process_log(line, batch)
+                    except Exception as e:
+                        print(f'Exception extracting data from {key}:{line_number}. Details: {e}')
+                    if line_number % 10_000 == 0 and self._abort.is_set():
+                        return
+            chunks.put((key, batch))
+
+            with self._stats_lock:
+                self.bytes_read += response.get('ContentLength') or 0
         except Exception as e:
+            with self._stats_lock:
+                self.files_failed += 1
             print(f"Error processing {key}: {e}")
 
-    def process_all_logs(self):
+    def list_keys(self):
+        '''
+        List gzip objects under the prefix. The first level of sub-prefixes
+        (e.g. the hourly folders of WAF logs) is listed concurrently.
+        '''
         paginator = self.s3.get_paginator('list_objects_v2')
-        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
-            for obj in page.get('Contents', []):
-                if obj['Key'].endswith('.gz'):  # Process only gzip files
-                    self.process_s3_file(obj['Key'])
 
-    def run(self):
+        def list_prefix(prefix, delimiter=None):
+            keys, prefixes = [], []
+            params = {'Bucket': self.bucket, 'Prefix': prefix}
+            if delimiter:
+                params['Delimiter'] = delimiter
+            for page in paginator.paginate(**params):
+                keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.gz'))
+                prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+            return keys, prefixes
+
+        keys, prefixes = list_prefix(self.prefix, delimiter='/')
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for sub_keys, _ in executor.map(list_prefix, prefixes):
+                keys.extend(sub_keys)
+        return sorted(keys)
+
+    def insert_batch(self, batch: ColumnBatch):
+        # One block, so the insert writes a single part: all of its rows land or none do
+        self.clickhouse.insert(TABLE_NAME, batch.columns, column_names=COLUMNS, column_oriented=True,
+                               settings={'max_insert_block_size': max(batch.rows, MIN_INSERT_BLOCK_SIZE)})
+        self.rows_inserted += batch.rows
+
+    def insert_chunks(self, chunks: queue.Queue):
+        '''
+        Merge parsed files from all workers into blocks of at least
+        ``batch_rows`` rows and insert them. A block only holds whole files,
+        and exactly those are checkpointed after it is inserted, so no file is
+        ever partly in ClickHouse and a restart never inserts a row twice.
+        '''
+        pending = ColumnBatch()
+        completed_keys = []
+        last_report = time.time()
+
+        def flush():
+            nonlocal pending, completed_keys
+            if pending.rows:
+                self.insert_batch(pending)
+            self.checkpoint.mark(completed_keys)
+            self.files_done += len(completed_keys)
+            pending, completed_keys = ColumnBatch(), []
+
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            key, batch = chunk
+            pending.extend(batch)
+            self.rows_parsed += batch.rows
+            completed_keys.append(key)
+            if pending.rows >= self.batch_rows:
+                flush()
+            if time.time() - last_report >= PROGRESS_INTERVAL_SECS:
+                self.report_progress()
+                last_report = time.time()
+        flush()
+
+    def process_all_logs(self):
+        keys = [key for key in self.list_keys() if key not in self.checkpoint.done]
+        print(f"{len(keys)} files to ingest ({len(self.checkpoint.done)} already done)")
+
+        # Bounded so parsing can't run far ahead of inserts
+        chunks = queue.Queue(maxsize=self.workers * 2)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.process_s3_file, key, chunks) for key in keys]
+
+            def close_queue():
+                wait(futures)
+                chunks.put(None)
+
+            threading.Thread(target=close_queue, daemon=True).start()
+            try:
+                self.insert_chunks(chunks)
+            except Exception:
+                # Skip the remaining files and drain the queue so running workers can finish
+                self._abort.set()
+                while chunks.get() is not None:
+                    pass
+                raise
+
+    def report_progress(self):
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        print(f"{self.files_done} files, {self.rows_inserted} rows inserted in {elapsed:.1f}s: "
+              f"{self.rows_inserted / elapsed:,.0f} rows/s, {self.bytes_read / elapsed / 1e6:.2f} MB/s compressed"
+              f"{f', {self.files_failed} files failed' if self.files_failed else ''}")
+
+    def run(self, recreate: bool = False, rebuild: bool = False):
         print("Creating table...")
-        self.create_table()
-        print("Table Created! Table name: waf_logs")
+        self.create_table(recreate=recreate)
+        print(f"Table ready! Table name: {TABLE_NAME}")
+        if rebuild:
+            print("Rebuilding rollups from existing rows...")
+            rebuild_rollups(self.clickhouse, TABLE_NAME)
         print("Processing logs...")
+        self.started_at = time.time()
         self.process_all_logs()
+        self.report_progress()
         print("Done!")
 
+
 if __name__ == "__main__":
-    processor = WAFLogProcessor()
-    processor.run()
+    parser = argparse.ArgumentParser(description="Ingest WAF logs from S3 into ClickHouse")
+    parser.add_argument("--bucket", default=WAF_LOGS_BUCKET, help="S3 bucket with WAF logs")
+    parser.add_argument("--prefix", default=WAF_LOGS_BUCKET_PREFIX, help="Key prefix of the WAF logs")
+    parser.add_argument("--endpoint-url", default=S3_ENDPOINT_URL, help="S3 endpoint, e.g. a local MinIO")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Concurrent downloads")
+    parser.add_argument("--batch-rows", type=int, default=INSERT_BATCH_ROWS, help="Rows per insert")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="File of already ingested keys")
+    parser.add_argument("--recreate", action="store_true", help="Drop the table and the checkpoint first")
+    parser.add_argument("--rebuild-rollups", action="store_true",
+                        help="Reload the rollups from rows ingested before they existed")
+    args = parser.parse_args()
 
+    processor = WAFLogProcessor(bucket=args.bucket, prefix=args.prefix, workers=args.workers,
+                                batch_rows=args.batch_rows, checkpoint_file=args.checkpoint,
+                                endpoint_url=args.endpoint_url)
+    processor.run(recreate=args.recreate, rebuild=args.rebuild_rollups)
@@ -0,0 +1,74 @@
+"""
+Tests for the ingest path into ClickHouseClient.insert.
+
+No server is needed: the real ClickHouseClient and ClickHouseClientPool are
+used with a recording stand-in for the clickhouse_connect client, so the
+calls made by WAFLogProcessor.insert_batch go through the actual method
+signatures.
+
+    python -m unittest test_clickhouse_client
+"""
+import unittest
+
+from clickhouse_client import ClickHouseClient, ClickHouseClientPool
+from s3_to_clickhouse import COLUMNS, MIN_INSERT_BLOCK_SIZE, TABLE_NAME, ColumnBatch, WAFLogProcessor
+
+
+class RecordingClient:
+    """Accepts the keyword arguments of clickhouse_connect's Client.insert and records each call"""
+
+    def __init__(self):
+        self.inserts = []
+
+    def insert(self, table, data, column_names='*', database='', column_types=None, column_type_names=None,
+               column_oriented=False, settings=None, context=None):
+        self.inserts.append({'table': table, 'data': data, 'column_names': column_names,
+                             'column_oriented': column_oriented, 'settings': settings})
+
+    def close(self):
+        pass
+
+
+def make_clickhouse_client(recording: RecordingClient) -> ClickHouseClient:
+    clickhouse = ClickHouseClient.__new__(ClickHouseClient)
+    clickhouse.pool = ClickHouseClientPool(lambda: recording, max_size=1)
+    return clickhouse
+
+
+class InsertTest(unittest.TestCase):
+    def test_insert_passes_settings_to_client(self):
+        recording = RecordingClient()
+        clickhouse = make_clickhouse_client(recording)
+
+        clickhouse.insert('t', [[1], [2]], column_names=['a', 'b'], settings={'max_insert_block_size': 10})
+
+        self.assertEqual(recording.inserts[0]['settings'], {'max_insert_block_size': 10})
+        self.assertTrue(recording.inserts[0]['column_oriented'])
+
+    def test_insert_without_settings(self):
+        recording = RecordingClient()
+        make_clickhouse_client(recording).insert('t', [[1]], column_names=['a'])
+
+        self.assertIsNone(recording.inserts[0]['settings'])
+
+    def test_insert_batch_sends_one_block(self):
+        recording = RecordingClient()
+        processor = WAFLogProcessor.__new__(WAFLogProcessor)
+        processor.clickhouse = make_clickhouse_client(recording)
+        processor.rows_inserted = 0
+        batch = ColumnBatch()
+        for values in batch.columns:
+            values.extend([None, None])
+        batch.rows = 2
+
+        processor.insert_batch(batch)
+
+        insert = recording.inserts[0]
+        self.assertEqual(insert['table'], TABLE_NAME)
+        self.assertEqual(insert['column_names'], COLUMNS)
+        self.assertEqual(insert['settings'], {'max_insert_block_size': MIN_INSERT_BLOCK_SIZE})
+        self.assertEqual(processor.rows_inserted, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,15 @@
 import json
+from contextlib import contextmanager
+from contextvars import ContextVar
 from utils.utility import Utility
 
+# Thought queue of the request being processed. Pooled agents are shared across
+# requests, so their callbacks look the queue up here instead of binding one;
+# Strands copies the context into the threads it runs agents and tools on.
+current_thought_queue = ContextVar('current_thought_queue', default=None)
 
-def common_agent_callback_handler(thought_queue, **kwargs):    
+
+def common_agent_callback_handler(thought_queue, **kwargs):
     if "data" in kwargs:
         # Stream the model's thinking process
         thought_data = {
@@ -11,7 +18,7 @@ def common_agent_callback_handler(thought_queue, **kwargs):
         }
         thought_queue.put(json.dumps(thought_data))
 
-        
+
     elif "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name"):
         # Stream tool usage information
         tool_data = {
@@ -19,5 +26,23 @@ def common_agent_callback_handler(thought_queue, **kwargs):
             "tool": kwargs['current_tool_use']['name']
         }
         thought_queue.put(json.dumps(tool_data))
-        
+
+    return None
+
+
+def thought_stream_callback_handler(**kwargs):
+    """Forward agent events to the current request's thought queue, if any"""
+    thought_queue = current_thought_queue.get()
+    if thought_queue is not None:
+        common_agent_callback_handler(thought_queue=thought_queue, **kwargs)
     return None
+
+
+@contextmanager
+def thought_stream(thought_queue):
+    """Route pooled agents' events to ``thought_queue`` for the duration of the block"""
+    token = current_thought_queue.set(thought_queue)
+    try:
+        yield thought_queue
+    finally:
+        current_thought_queue.reset(token)
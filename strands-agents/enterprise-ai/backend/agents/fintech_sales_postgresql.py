@@ -1,20 +1,22 @@
-import ast
+import os
 import json
-import re
 from datetime import date
 from utils.utility import Utility
 from utils.utility import Utility, GREEN_COLOR, RESET_COLOR, WHITE_COLOR, BLUE_COLOR
 from providers.mcp_provider import MCPProvider
-from agents.agent_callback_handler import common_agent_callback_handler
-from strands import Agent, tool
-from strands.models import BedrockModel
+from providers.agent_pool import AgentPool, tool_name
+from providers.sql_provider import SQLProvider
+from strands import tool
 from utils.tool_message_schema import MessageSchema
-from decimal import Decimal
+from utils.query_results import page
 
 task_manager_model_id = 'apac.anthropic.claude-3-haiku-20240307-v1:0' #'apac.anthropic.claude-3-7-sonnet-20250219-v1:0'
 sql_generator_model_id  = 'apac.anthropic.claude-3-5-sonnet-20241022-v2:0'
 #response_generator_model_id = 'apac.amazon.nova-lite-v1:0'
 
+# Rows of a result shown to the model; the full result stays in the query result cache
+QUERY_PREVIEW_ROWS = int(os.environ.get('QUERY_PREVIEW_ROWS', 50))
+
 
 # Define the system prompt as a global variable
 # SYSTEM_PROMPT = f"""
@@ -80,15 +82,19 @@ SYSTEM_PROMPT = f"""
 
 class FintechSalesAgent():
 
-    def __init__(self, thought_queue):
+    def __init__(self):
         self.util = Utility()
-        self.thought_queue = thought_queue
-
-    def agent_callback_handler(self, **kwargs):
-        common_agent_callback_handler(thought_queue=self.thought_queue, **kwargs)
-    
+        self.agent_pool = AgentPool()
+        self.sql_provider = SQLProvider()
+        self._sales_analytics_assistant = None
 
     def sales_analytics_assistant_tool(self):
+        # One tool object per process, so orchestrators using it pool under the same key
+        if self._sales_analytics_assistant is None:
+            self._sales_analytics_assistant = self._build_sales_analytics_assistant_tool()
+        return self._sales_analytics_assistant
+
+    def _build_sales_analytics_assistant_tool(self):
         @tool 
         def sales_analytics_assistant(user_input: str) -> dict:
             """
@@ -102,33 +108,73 @@ class FintechSalesAgent():
             """
             
 
-            mcp_tools = MCPProvider().get_tools_for_mcp_server('postgres-mcp-server')
+            mcp_tools = MCPProvider().get_tools_for_mcp_server('postgres-mcp-server') or []
             
-            # Get the tools from the MCP server
-            tools = mcp_tools
+            # Get the tools from the MCP server; queries run through our execute_sql,
+            # which returns typed columns instead of the MCP server's text rows
+            tools = [t for t in mcp_tools if tool_name(t) != 'execute_sql']
+            tools.append(self.execute_sql)
 
             # self.util.log_data(f'tools ==> {tools}')
 
-            model = BedrockModel(model_id=task_manager_model_id, verbose=True, temperature=0.3)
-            agent = Agent(
-                system_prompt=SYSTEM_PROMPT,
-                model=model,
-                tools=tools,
-                callback_handler=self.agent_callback_handler,
-            )
-            response = agent(user_input)
-
-            query_results = agent.messages[-2]
-            print(f'\nagent.messages -->{agent.messages}\n')
-            query_results = query_results['content'][-1]['toolResult']['content'][0]['text']
-            print(f'\nquery_results -->{query_results}\n')
-
-            query_results = re.sub(r"Decimal\('([0-9.]+)'\)", r"\1", query_results)
-            query_results = ast.literal_eval(query_results)
-            query_results = json.dumps(query_results)
-            
-            show_graph = len(query_results)>1
-            
-            return json.dumps(MessageSchema.create(response=str(response), query_results=query_results, show_graph=show_graph))
+            with self.agent_pool.lease('sales_analytics', task_manager_model_id, SYSTEM_PROMPT, tools,
+                                       verbose=True, temperature=0.3) as agent:
+                response = agent(user_input)
+                query_id = self.last_query_id(agent.messages)
+
+            result = self.sql_provider.cache.get(query_id) if query_id else None
+            if result is None:
+                return json.dumps(MessageSchema.create(response=str(response)))
+
+            # Rows are not passed back through the orchestrator's context; the UI reads them by query_id
+            return json.dumps(MessageSchema.create(response=str(response),
+                                                   show_graph=result['row_count'] > 1,
+                                                   query_id=query_id,
+                                                   row_count=result['row_count']))
         return sales_analytics_assistant
 
+    @staticmethod
+    def last_query_id(messages: list):
+        """query_id of the last execute_sql result in the conversation, if any"""
+        for message in reversed(messages):
+            for block in reversed(message.get('content', [])):
+                tool_result = block.get('toolResult') if isinstance(block, dict) else None
+                if not tool_result or tool_result.get('status') != 'success':
+                    continue
+                for item in tool_result.get('content', []):
+                    text = item.get('text', '')
+                    if text.startswith('{') and '"query_id"' in text:
+                        try:
+                            return json.loads(text).get('query_id')
+                        except ValueError:
+                            continue
+        return None
+
+    @tool
+    def execute_sql(self, sql: str) -> str:
+        """
+        Execute a read-only PostgreSQL query against the payments database.
+
+        Args:
+            sql (str): PostgreSQL SELECT statement to execute
+
+        Returns:
+            str: JSON with the query_id, column names and types, total row_count and a
+                 preview of the first rows as column arrays
+        """
+        try:
+            result = self.sql_provider.run_query(sql)
+        except Exception as e:
+            self.util.log_error(f"SQL execution failed: {e}")
+            return json.dumps({"error": str(e)})
+
+        preview = page(result, 0, QUERY_PREVIEW_ROWS)
+        return json.dumps({
+            "query_id": result['query_id'],
+            "columns": preview['columns'],
+            "row_count": result['row_count'],
+            "truncated": result['truncated'],
+            "preview_rows": min(result['row_count'], QUERY_PREVIEW_ROWS),
+            "data": preview['data']
+        }, default=str)
+
@@ -3,24 +3,26 @@ import sys
 from utils.utility import Utility
 from utils.utility import Utility
 from providers.mcp_provider import MCPProvider
-from strands import Agent, tool
-from strands.models import BedrockModel
-from agents.agent_callback_handler import common_agent_callback_handler
+from providers.agent_pool import AgentPool
+from strands import tool
 
 model_id = 'apac.anthropic.claude-3-haiku-20240307-v1:0' #'apac.anthropic.claude-3-7-sonnet-20250219-v1:0'
 
 
 class MCPServersAgent():
 
-    def __init__(self, thought_queue):
+    def __init__(self):
         self.util = Utility()
-        self.thought_queue = thought_queue
-
-    def agent_callback_handler(self, **kwargs):
-        common_agent_callback_handler(thought_queue=self.thought_queue, **kwargs)
-
+        self.agent_pool = AgentPool()
+        self._mcp_servers_assistant = None
 
     def mcp_servers_tool(self):
+        # One tool object per process, so orchestrators using it pool under the same key
+        if self._mcp_servers_assistant is None:
+            self._mcp_servers_assistant = self._build_mcp_servers_tool()
+        return self._mcp_servers_assistant
+
+    def _build_mcp_servers_tool(self):
 
         @tool 
         def mcp_servers_assistant(user_input: str):
@@ -45,15 +47,8 @@ class MCPServersAgent():
 
             print(f'\nmcp_servers_assistant - mcp_tools--> {mcp_tools}')
 
-            model = BedrockModel(model_id=model_id, verbose=True)
-            agent = Agent(
-                system_prompt=SYSTEM_PROMPT,
-                model=model,
-                tools=mcp_tools,
-                callback_handler=self.agent_callback_handler
-            )
-
-            response = agent(user_input)
+            with self.agent_pool.lease('mcp_servers', model_id, SYSTEM_PROMPT, mcp_tools, verbose=True) as agent:
+                response = agent(user_input)
             content = str(response)
 
             return content
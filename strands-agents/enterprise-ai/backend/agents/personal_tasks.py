@@ -3,24 +3,26 @@ import sys
 from utils.utility import Utility
 from utils.utility import Utility
 from providers.mcp_provider import MCPProvider
-from strands import Agent, tool
-from strands.models import BedrockModel
-from agents.agent_callback_handler import common_agent_callback_handler
+from providers.agent_pool import AgentPool
+from strands import tool
 
 model_id = 'apac.amazon.nova-lite-v1:0'
 
 
 class PersonalTasksAgent():
 
-    def __init__(self, thought_queue):
+    def __init__(self):
         self.util = Utility()
-        self.thought_queue = thought_queue
-
-    def agent_callback_handler(self, **kwargs):
-        common_agent_callback_handler(thought_queue=self.thought_queue, **kwargs)
-
+        self.agent_pool = AgentPool()
+        self._quip_tasks_assistant = None
 
     def personal_task_manager_tool(self):
+        # One tool object per process, so orchestrators using it pool under the same key
+        if self._quip_tasks_assistant is None:
+            self._quip_tasks_assistant = self._build_personal_task_manager_tool()
+        return self._quip_tasks_assistant
+
+    def _build_personal_task_manager_tool(self):
 
         @tool 
         def quip_tasks_assistant(user_input: str):
@@ -40,16 +42,9 @@ class PersonalTasksAgent():
             
             mcp_tools = MCPProvider().get_tools_for_mcp_server('d2-quip-mcp-server')
 
-            model = BedrockModel(model_id=model_id, verbose=True)
-            agent = Agent(
-                system_prompt=SYSTEM_PROMPT,
-                model=model,
-                tools=mcp_tools,
-                callback_handler=self.agent_callback_handler
-            )
-
             #self.util.log_data('calling quip task agent')
-            response = agent(user_input)
+            with self.agent_pool.lease('quip_tasks', model_id, SYSTEM_PROMPT, mcp_tools, verbose=True) as agent:
+                response = agent(user_input)
             content = str(response)
             #self.util.log_data(f'\n\nquip task response  ==> {content}\n\n')
             return content
@@ -5,10 +5,9 @@ from utils.utility import Utility
 from utils.utility import Utility
 from providers.mcp_provider import MCPProvider
 
-from strands import Agent, tool
-from strands.models import BedrockModel
+from strands import tool
 from utils.tool_message_schema import MessageSchema
-from agents.agent_callback_handler import common_agent_callback_handler
+from providers.agent_pool import AgentPool
 
 
 task_manager_model_id = 'apac.anthropic.claude-3-7-sonnet-20250219-v1:0'
@@ -18,14 +17,18 @@ response_generator_model_id = 'apac.amazon.nova-lite-v1:0'
 
 
 class WAFLogsAgent():
-    def __init__(self, thought_queue):
+    def __init__(self):
         self.util = Utility()
-        self.thought_queue = thought_queue
-
-    def agent_callback_handler(self, **kwargs):
-        common_agent_callback_handler(thought_queue=self.thought_queue, **kwargs)
+        self.agent_pool = AgentPool()
+        self._waf_logs_assistant = None
 
     def was_tool(self):
+        # One tool object per process, so orchestrators using it pool under the same key
+        if self._waf_logs_assistant is None:
+            self._waf_logs_assistant = self._build_waf_logs_tool()
+        return self._waf_logs_assistant
+
+    def _build_waf_logs_tool(self):
         @tool 
         def waf_logs_assistant(user_input: str) -> dict:
             """
@@ -100,17 +103,11 @@ class WAFLogsAgent():
             tools = [self.generate_sql_statement]
             tools += mcp_tools
 
-            model = BedrockModel(model_id=task_manager_model_id, verbose=True, temperature=0.3)
-            agent = Agent(
-                system_prompt=SYSTEM_PROMPT,
-                model=model,
-                tools=tools,
-                callback_handler=self.agent_callback_handler
-                
-            )
-            response = agent(user_input)
+            with self.agent_pool.lease('waf_logs', task_manager_model_id, SYSTEM_PROMPT, tools,
+                                       verbose=True, temperature=0.3) as agent:
+                response = agent(user_input)
 
-            query_results = agent.messages[-2]
+                query_results = agent.messages[-2]
             query_results = query_results['content'][-1]['toolResult']['content']
             rows = []
             for row in query_results:
@@ -172,10 +169,10 @@ class WAFLogsAgent():
 
         """
         self.util.log_data(f"Formatted query: {formatted_query}")
-        sql_gen_model = BedrockModel(model_id=sql_generator_model_id, verbose=True)
-        
-        sql_agent = Agent(system_prompt=SYSTEM_PROMPT,model=sql_gen_model, tools=[], callback_handler=None) # no extra tools required
-        agent_response = sql_agent(formatted_query)
+        # no extra tools required
+        with self.agent_pool.lease('waf_sql_generator', sql_generator_model_id, SYSTEM_PROMPT,
+                                   callback_handler=None, verbose=True) as sql_agent:
+            agent_response = sql_agent(formatted_query)
 
         sql = str(agent_response)
         sql = self.util.clean_sql_string(sql)
@@ -214,9 +211,9 @@ class WAFLogsAgent():
                         context: {sql_query_results}
                         """
             
-            response_gen_model = BedrockModel(model_id=response_generator_model_id, verbose=True)
-            user_query_agent = Agent(system_prompt=system_message, model=response_gen_model, tools=[], callback_handler=None)
-            agent_response = user_query_agent(prompt)
+            with self.agent_pool.lease('waf_response_generator', response_generator_model_id, system_message,
+                                       callback_handler=None, verbose=True) as user_query_agent:
+                agent_response = user_query_agent(prompt)
             response = str(agent_response)
             
 
@@ -11,8 +11,10 @@ from resources.wizard_api import ApiInsightsResource
 from resources.chart_api import ChartResource
 from resources.streaming_api import StreamAnswerResource
 from resources.chat_thread_api import ChatThreadListResource, ChatThreadResource
+from resources.query_results_api import QueryResultsResource
 
 from providers.mcp_provider import MCPProvider
+from providers.agent_pool import AgentPool, AgentWorkerPool
 from utils.db_init import init_database
 from utils.database import DatabaseManager
 from config import get_config
@@ -46,6 +48,7 @@ def create_app(config_object=None):
     api.add_resource(ApiInsightsResource, '/api/insights')
     api.add_resource(ChartResource, '/api/chart')
     api.add_resource(StreamAnswerResource, '/api/answer')
+    api.add_resource(QueryResultsResource, '/api/results/<string:query_id>')
     
     # Register thread management APIs
     api.add_resource(ChatThreadListResource, '/api/threads')
@@ -63,6 +66,14 @@ def create_app(config_object=None):
         db = DatabaseManager()
         return jsonify(db.test_connection())
     
+    # Agent pool and worker queue status endpoint
+    @app.route('/agents/status', methods=['GET'])
+    def agents_status():
+        return jsonify({
+            "agents": AgentPool().get_pool_status(),
+            "workers": AgentWorkerPool().get_pool_status()
+        })
+    
     # Initialize database
     try:
         logger.info("Initializing database connection...")
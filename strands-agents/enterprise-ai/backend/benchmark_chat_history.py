@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-turn cost of saving a chat thread as it grows.
+
+Appends synthetic turns (one UI item with query results plus a user,
+tool-use, tool-result and assistant agent message) to a scratch thread and,
+at each checkpoint, times one save with the append-only chat_messages
+storage and one with the legacy whole-thread JSON rewrite of chat_history.
+WAL bytes written per save are reported alongside.
+
+Run it against a scratch database:
+
+    python benchmark_chat_history.py --turns 25 100 400 1600
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from utils.database import DatabaseManager
+from utils.db_init import init_database
+from utils.chat_thread import ChatThread, ChatThreadHelper
+from repositories.chat_history_repository import ChatHistoryRepository
+
+LEGACY_UPDATE = """
+UPDATE chat_history
+SET ui_msgs = :ui_msgs, agent_msgs = :agent_msgs, date = CURRENT_TIMESTAMP
+WHERE thread_id = :thread_id AND user_id = :user_id
+"""
+
+
+def make_turn(index):
+    """One UI item and the agent messages the orchestrator appends for it"""
+    query_results = [{"merchant": f"Merchant {i}", "state": "Karnataka", "total_sales": 1000.5 + i} for i in range(20)]
+    question = f"What were the top merchants in week {index}?"
+    answer = f"Here are the top merchants for week {index}. " * 5
+    agent_msgs = [
+        {"role": "user", "content": [{"text": question}]},
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": f"tool-{index}", "name": "sales_analytics_assistant",
+                                                        "input": {"query": question}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": f"tool-{index}", "status": "success",
+                                                      "content": [{"text": json.dumps({"response": answer,
+                                                                                       "query_results": query_results})}]}}]},
+        {"role": "assistant", "content": [{"text": answer}]}
+    ]
+    return question, answer, query_results, agent_msgs
+
+
+def wal_lsn(db):
+    return db.execute_query("SELECT pg_current_wal_lsn()::text AS lsn")[0]["lsn"]
+
+
+def wal_bytes(db, since):
+    return db.execute_query("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:since AS pg_lsn)) AS bytes",
+                            {"since": since})[0]["bytes"]
+
+
+def timed(db, action):
+    lsn = wal_lsn(db)
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start, int(wal_bytes(db, lsn))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history per-turn save benchmark")
+    parser.add_argument("--turns", type=int, nargs="+", default=[25, 100, 400, 1600],
+                        help="Thread lengths (in turns) to measure at")
+    parser.add_argument("--repeat", type=int, default=5, help="Saves timed per checkpoint")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    init_database()
+    repo = ChatHistoryRepository()
+    user_id = "benchmark"
+    thread = ChatThread.create_new("Benchmark thread", user_id=user_id)
+    repo.save_thread(thread, is_new=True)
+    legacy_ui, legacy_agent = [], []
+
+    print(f"{'turns':>6} | {'append-only':>11} | {'WAL/turn':>9} | {'JSON rewrite':>12} | {'WAL/turn':>9}")
+    turns = 0
+    try:
+        for checkpoint in sorted(args.turns):
+            append_times, append_wal, legacy_times, legacy_wal = [], [], [], []
+            while turns < checkpoint:
+                turns += 1
+                question, answer, query_results, agent_msgs = make_turn(turns)
+                legacy_ui.append({"human": question, "ai": answer, "query_results": query_results,
+                                  "show_graph": False, "graph_code": "", "usage": {}})
+                legacy_agent.extend(agent_msgs)
+                measure = turns > checkpoint - args.repeat
+
+                # What a request does: load the context tail, run the agent, append the turn
+                thread = repo.get_thread_by_id(thread["thread_id"], user_id, ui_limit=0)
+                helper = ChatThreadHelper(thread)
+                helper.update_agent_messages(thread["agent_msgs"] + agent_msgs)
+                helper.update_ui_messages(response=answer, query_results=query_results,
+                                          user_input=question, show_graph=False)
+                elapsed, written = timed(db, lambda: repo.save_thread(thread, is_new=False))
+                if measure:
+                    append_times.append(elapsed)
+                    append_wal.append(written)
+                    legacy = lambda: db.execute_write(LEGACY_UPDATE, {
+                        "thread_id": thread["thread_id"], "user_id": user_id,
+                        "ui_msgs": json.dumps(legacy_ui), "agent_msgs": json.dumps(legacy_agent)
+                    })
+                    elapsed, written = timed(db, legacy)
+                    legacy_times.append(elapsed)
+                    legacy_wal.append(written)
+
+            print(f"{checkpoint:>6} | {sorted(append_times)[len(append_times) // 2] * 1000:>9.1f}ms | "
+                  f"{sum(append_wal) // len(append_wal):>8}B | "
+                  f"{sorted(legacy_times)[len(legacy_times) // 2] * 1000:>10.1f}ms | "
+                  f"{sum(legacy_wal) // len(legacy_wal):>8}B")
+    finally:
+        db.execute_write("DELETE FROM chat_messages WHERE thread_id = :thread_id", {"thread_id": thread["thread_id"]})
+        db.execute_write("DELETE FROM chat_history WHERE thread_id = :thread_id", {"thread_id": thread["thread_id"]})
+
+
+if __name__ == "__main__":
+    main()
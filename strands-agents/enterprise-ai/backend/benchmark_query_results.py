@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQL result handling: text round-trip vs typed columnar results.
+
+The legacy path is what sales_analytics_assistant did with the postgres MCP
+server's output: a Python repr of row dicts, with Decimal('...') stripped by
+a regex, parsed with ast.literal_eval, then JSON-encoded twice on its way to
+the UI (and through the orchestrator's context). The columnar path builds
+typed column arrays from fetched rows, caches them, gives the model a
+preview and the UI a first page.
+
+Rows are synthetic transactions-like tuples, so no database is needed:
+
+    python benchmark_query_results.py --rows 10000 100000
+
+With --database, the columnar path also runs end to end through SQLProvider
+against SALES_DATABASE_URI (or the postgres MCP server's DATABASE_URI).
+"""
+
+import argparse
+import ast
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.query_results import QUERY_RESULT_PAGE_ROWS, QueryResultCache, ColumnarBuilder, page
+from utils.tool_message_schema import MessageSchema
+
+COLUMNS = ['transaction_id', 'merchant_name', 'state', 'amount', 'transaction_status', 'transaction_date']
+PREVIEW_ROWS = 50
+
+SERIES_SQL = """
+SELECT i AS transaction_id, 'Merchant ' || (i % 500) AS merchant_name, 'Karnataka' AS state,
+       round((random() * 10000)::numeric, 2) AS amount, 'COMPLETED' AS transaction_status,
+       TIMESTAMP '2025-01-01' + i * INTERVAL '1 minute' AS transaction_date
+FROM generate_series(1, {rows}) AS i
+"""
+
+
+def make_rows(count):
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    return [
+        (i, f"Merchant {i % 500}", rng.choice(['Karnataka', 'Delhi', 'Assam']),
+         Decimal(f"{rng.uniform(10, 10000):.2f}"), rng.choice(['COMPLETED', 'PENDING', 'FAILED']),
+         start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+def mcp_text(rows):
+    # The MCP server returned str() of the row dicts; dates were already strings in its output
+    return str([dict(zip(COLUMNS, row[:-1] + (row[-1].isoformat(),))) for row in rows])
+
+
+def legacy_path(text):
+    start = time.perf_counter()
+    cleaned = re.sub(r"Decimal\('([0-9.]+)'\)", r"\1", text)
+    parsed = ast.literal_eval(cleaned)
+    query_results = json.dumps(parsed)
+    tool_output = json.dumps(MessageSchema.create(response="answer", query_results=query_results, show_graph=True))
+    return time.perf_counter() - start, len(tool_output), len(tool_output)
+
+
+def columnar_path(rows):
+    start = time.perf_counter()
+    builder = ColumnarBuilder(COLUMNS)
+    for offset in range(0, len(rows), 5000):  # fetchmany batches
+        builder.add_rows(rows[offset:offset + 5000])
+    result = builder.build("SELECT ...")
+    QueryResultCache().put(result)
+    preview = page(result, 0, PREVIEW_ROWS)
+    model_payload = json.dumps({"query_id": result['query_id'], "columns": preview['columns'],
+                                "row_count": result['row_count'], "data": preview['data']})
+    tool_output = json.dumps(MessageSchema.create(response="answer", show_graph=True,
+                                                  query_id=result['query_id'], row_count=result['row_count']))
+    ui_page = json.dumps(page(result, 0, QUERY_RESULT_PAGE_ROWS, as_rows=True)['rows'])
+    return time.perf_counter() - start, len(model_payload) + len(tool_output), len(ui_page)
+
+
+def measure(path, data):
+    tracemalloc.start()
+    elapsed, llm_bytes, ui_bytes = path(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, llm_bytes, ui_bytes
+
+
+def database_path(count):
+    from providers.sql_provider import SQLProvider
+    start = time.perf_counter()
+    result = SQLProvider().run_query(SERIES_SQL.format(rows=count))
+    return time.perf_counter() - start, result['row_count']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL result handling benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="Result sizes to measure")
+    parser.add_argument("--database", action="store_true", help="Also time the columnar path against the database")
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} | {'path':>8} | {'time':>8} | {'peak mem':>9} | {'via LLM ctx':>11} | {'to UI':>9}")
+    for count in args.rows:
+        rows = make_rows(count)
+        for name, path, data in (("legacy", legacy_path, mcp_text(rows)), ("columnar", columnar_path, rows)):
+            elapsed, peak, llm_bytes, ui_bytes = measure(path, data)
+            print(f"{count:>7} | {name:>8} | {elapsed * 1000:>6.0f}ms | {peak / 1e6:>7.1f}MB | "
+                  f"{llm_bytes / 1e3:>9.1f}KB | {ui_bytes / 1e3:>7.1f}KB")
+        if args.database:
+            elapsed, fetched = database_path(count)
+            print(f"{count:>7} | {'database':>8} | {elapsed * 1000:>6.0f}ms | fetched {fetched} rows into the result cache")
+
+
+if __name__ == "__main__":
+    main()
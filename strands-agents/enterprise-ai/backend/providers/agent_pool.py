@@ -0,0 +1,249 @@
+"""
+Reusable Strands agents and a bounded worker pool for agent requests.
+
+Building a BedrockModel and an Agent (tool registry, model config, boto3
+session) on every request and every tool call is pure overhead: the
+configuration is the same each time, only the conversation differs. The
+AgentPool keeps idle agents keyed by (name, model_id, model settings, tool
+set) and leases them out with the caller's messages swapped in; the lease
+clears per-conversation state before the agent goes back to the pool.
+
+Agent requests run on the AgentWorkerPool, a fixed number of threads with a
+bounded queue, so a burst of requests queues (or is rejected) instead of
+spawning a thread each.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from strands import Agent
+from strands.agent.state import AgentState
+from strands.handlers.callback_handler import null_callback_handler
+from strands.models import BedrockModel
+from strands.telemetry.metrics import EventLoopMetrics
+
+from agents.agent_callback_handler import thought_stream_callback_handler
+
+logger = logging.getLogger(__name__)
+
+# Idle agents kept per (name, model, tool set)
+AGENT_POOL_MAX_IDLE = int(os.environ.get('AGENT_POOL_MAX_IDLE', 8))
+# Threads running agent requests, and requests allowed to wait for one
+AGENT_WORKERS = int(os.environ.get('AGENT_WORKERS', 8))
+AGENT_MAX_QUEUE = int(os.environ.get('AGENT_MAX_QUEUE', 32))
+
+
+def tool_name(agent_tool: Any) -> str:
+    """Name of a Strands tool (decorated function or MCP tool)"""
+    return getattr(agent_tool, 'tool_name', None) or getattr(agent_tool, '__name__', repr(agent_tool))
+
+
+class AgentPool:
+    """
+    Pool of reusable Strands agents.
+
+    Models are shared by all agents with the same model id and settings; agents
+    are leased exclusively, so one agent never runs two conversations at once.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """Singleton pattern so every resource and tool shares one pool."""
+        if cls._instance is None:
+            cls._instance = super(AgentPool, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, max_idle_per_key: int = None):
+        if self._initialized:
+            return
+        self.max_idle_per_key = max_idle_per_key or AGENT_POOL_MAX_IDLE
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple, BedrockModel] = {}
+        self._idle: Dict[Tuple, List[Agent]] = defaultdict(list)
+        self._stats = defaultdict(int)
+        self._initialized = True
+
+    def get_model(self, model_id: str, **model_kwargs) -> BedrockModel:
+        """Shared BedrockModel for ``model_id`` and settings"""
+        key = (model_id, tuple(sorted(model_kwargs.items())))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._models[key] = BedrockModel(model_id=model_id, **model_kwargs)
+        return model
+
+    @contextmanager
+    def lease(self, name: str, model_id: str, system_prompt: Optional[str] = None, tools: Optional[list] = None,
+              messages: Optional[list] = None, callback_handler: Optional[Callable] = thought_stream_callback_handler,
+              **model_kwargs) -> Iterator[Agent]:
+        """
+        Lease an agent configured with ``system_prompt`` and ``tools`` on ``model_id``.
+
+        Agents are pooled by ``name`` (which identifies the system prompt), model
+        and tool set. ``messages`` is the conversation to continue; the agent
+        appends to that list, so callers can read it after the lease ends.
+
+        Args:
+            name: Pool name for this kind of agent
+            model_id: Bedrock model id
+            system_prompt: System prompt for the agent
+            tools: Tools available to the agent
+            messages: Conversation history to continue (defaults to a new one)
+            callback_handler: Handler for streamed events (defaults to the request's thought stream; None for silent)
+            **model_kwargs: BedrockModel settings, e.g. temperature
+
+        Yields:
+            Agent instance, exclusively for the duration of the lease
+        """
+        tools = list(tools or [])
+        callback_handler = callback_handler or null_callback_handler
+        key = (name, model_id, tuple(sorted(model_kwargs.items())), tuple(tool_name(t) for t in tools))
+
+        with self._lock:
+            idle = self._idle[key]
+            agent = idle.pop() if idle else None
+            self._stats['leases'] += 1
+            self._stats['reused' if agent is not None else 'created'] += 1
+            self._stats['in_use'] += 1
+
+        if agent is None:
+            agent = Agent(
+                system_prompt=system_prompt,
+                model=self.get_model(model_id, **model_kwargs),
+                tools=tools,
+                callback_handler=callback_handler
+            )
+
+        agent.messages = messages if messages is not None else []
+        agent.callback_handler = callback_handler
+        try:
+            yield agent
+        finally:
+            self._release(key, agent)
+
+    def _release(self, key: Tuple, agent: Agent):
+        # Drop everything tied to the conversation that just ended
+        agent.messages = []
+        agent.state = AgentState()
+        agent.event_loop_metrics = EventLoopMetrics()
+
+        with self._lock:
+            self._stats['in_use'] -= 1
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_key:
+                idle.append(agent)
+            else:
+                self._stats['discarded'] += 1
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """
+        Get the current status of the agent pool.
+
+        Returns:
+            Dictionary with pool statistics
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "models": len(self._models),
+                "idle": {"/".join(str(part) for part in key[:2]): len(agents)
+                         for key, agents in self._idle.items() if agents}
+            }
+
+
+class AgentWorkerPool:
+    """
+    Fixed-size thread pool for agent requests with a bounded queue.
+
+    ``submit`` returns None instead of queueing once ``max_queue`` requests are
+    already waiting, so callers can answer "busy" rather than pile up work.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """Singleton pattern so all requests share one set of workers."""
+        if cls._instance is None:
+            cls._instance = super(AgentWorkerPool, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, workers: int = None, max_queue: int = None):
+        if self._initialized:
+            return
+        self.workers = workers or AGENT_WORKERS
+        self.max_queue = max_queue if max_queue is not None else AGENT_MAX_QUEUE
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='agent-worker')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = defaultdict(float)
+        self._initialized = True
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """
+        Run ``fn(*args, **kwargs)`` on a worker thread.
+
+        Returns:
+            Future for the call, or None if the queue is full
+        """
+        with self._lock:
+            if self._queued + self._running >= self.workers + self.max_queue:
+                self._stats['rejected'] += 1
+                return None
+            self._queued += 1
+            self._stats['submitted'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queued)
+
+        return self._executor.submit(self._run, time.time(), fn, args, kwargs)
+
+    def _run(self, submitted_at: float, fn: Callable, args: tuple, kwargs: dict):
+        started = time.time()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._stats['queue_wait_seconds'] += started - submitted_at
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.error(f"Agent request failed: {str(e)}", exc_info=True)
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._stats['completed'] += 1
+                self._stats['run_seconds'] += time.time() - started
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """
+        Get the current status of the worker pool.
+
+        Returns:
+            Dictionary with queue depth and throughput statistics
+        """
+        with self._lock:
+            started = self._stats['submitted'] - self._queued
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._queued,
+                "max_queue_depth": int(self._stats['max_queue_depth']),
+                "submitted": int(self._stats['submitted']),
+                "completed": int(self._stats['completed']),
+                "failed": int(self._stats['failed']),
+                "rejected": int(self._stats['rejected']),
+                "avg_queue_wait_seconds": round(self._stats['queue_wait_seconds'] / started, 3) if started else 0.0,
+                "avg_run_seconds": round(self._stats['run_seconds'] / self._stats['completed'], 3)
+                if self._stats['completed'] else 0.0
+            }
@@ -0,0 +1,128 @@
+"""
+Read-only SQL execution against the payments database for the sales agent.
+
+Rows are streamed from a server-side cursor in batches into a columnar
+result (utils/query_results.py) up to a row cap, and the result is cached
+by query id so the UI and the chart generator can page through it later.
+"""
+
+import os
+import logging
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from utils.utility import Utility
+from utils.query_results import ColumnarBuilder, ColumnarResult, QueryResultCache
+
+logger = logging.getLogger(__name__)
+
+MCP_JSON_FILE = 'mcp.json'
+POSTGRES_MCP_SERVER = 'postgres-mcp-server'
+
+# Rows kept per query, rows fetched per round trip, and the per-statement timeout
+QUERY_RESULT_MAX_ROWS = int(os.environ.get('QUERY_RESULT_MAX_ROWS', 100_000))
+QUERY_FETCH_BATCH_ROWS = int(os.environ.get('QUERY_FETCH_BATCH_ROWS', 5_000))
+QUERY_STATEMENT_TIMEOUT_MS = int(os.environ.get('QUERY_STATEMENT_TIMEOUT_MS', 60_000))
+
+
+def sales_database_uri() -> Optional[str]:
+    """
+    Connection URI of the payments database.
+
+    SALES_DATABASE_URI if set, otherwise the DATABASE_URI configured for the
+    postgres MCP server in mcp.json, so both point at the same database.
+    """
+    uri = os.environ.get('SALES_DATABASE_URI')
+    if uri:
+        return uri
+    try:
+        mcp_json = Utility().load_mcp_json(MCP_JSON_FILE)
+        return mcp_json.get('mcpServers', {}).get(POSTGRES_MCP_SERVER, {}).get('env', {}).get('DATABASE_URI')
+    except Exception as e:
+        logger.warning(f"Could not read {MCP_JSON_FILE}: {str(e)}")
+        return None
+
+
+class SQLProvider:
+    """Runs agent-generated SQL in read-only transactions and caches the results"""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """Singleton pattern so the connection pool is shared."""
+        if cls._instance is None:
+            cls._instance = super(SQLProvider, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, uri: str = None):
+        if self._initialized:
+            return
+        self.uri = uri or sales_database_uri()
+        self.cache = QueryResultCache()
+        self._engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    if not self.uri:
+                        raise RuntimeError("Payments database not configured: set SALES_DATABASE_URI")
+                    self._engine = create_engine(self.uri, pool_size=5, max_overflow=5, pool_pre_ping=True)
+                    parts = urlsplit(self.uri)
+                    logger.info(f"SQL provider connected to {parts.hostname}{parts.path}")
+        return self._engine
+
+    def run_query(self, sql: str, max_rows: int = None) -> ColumnarResult:
+        """
+        Execute ``sql`` read-only and cache its result.
+
+        At most ``max_rows`` rows are kept; ``truncated`` is set on the result
+        when the query returned more.
+
+        Args:
+            sql: SQL statement to execute
+            max_rows: Row cap (defaults to QUERY_RESULT_MAX_ROWS)
+
+        Returns:
+            ColumnarResult, also cached under its query_id
+        """
+        max_rows = max_rows or QUERY_RESULT_MAX_ROWS
+        with self.engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text("SET TRANSACTION READ ONLY"))
+                conn.execute(text(f"SET LOCAL statement_timeout = {QUERY_STATEMENT_TIMEOUT_MS}"))
+
+                # exec_driver_sql: agent SQL is passed through verbatim, ':name' is not a bind parameter
+                result = conn.execution_options(stream_results=True, max_row_buffer=QUERY_FETCH_BATCH_ROWS) \
+                    .exec_driver_sql(sql.replace('%', '%%'))
+                if not result.returns_rows:
+                    builder = ColumnarBuilder(['rows_affected'])
+                    builder.add_rows([(result.rowcount,)])
+                    return self._cache(builder.build(sql))
+
+                builder = ColumnarBuilder(list(result.keys()))
+                truncated = False
+                while builder.row_count < max_rows:
+                    rows = result.fetchmany(min(QUERY_FETCH_BATCH_ROWS, max_rows - builder.row_count))
+                    if not rows:
+                        break
+                    builder.add_rows(rows)
+                else:
+                    truncated = result.fetchone() is not None
+                result.close()
+
+        return self._cache(builder.build(sql, truncated))
+
+    def _cache(self, result: ColumnarResult) -> ColumnarResult:
+        self.cache.put(result)
+        logger.info(f"Query {result['query_id']} returned {result['row_count']} rows"
+                    f"{' (truncated)' if result['truncated'] else ''}")
+        return result
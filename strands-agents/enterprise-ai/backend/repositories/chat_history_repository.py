@@ -2,7 +2,7 @@
 Repository for chat history data.
 """
 
-import logging, json
+import logging, json, os
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from utils.utility import Utility
@@ -11,6 +11,10 @@ from utils.chat_thread import ChatThread
 
 logger = logging.getLogger(__name__)
 
+MESSAGES_TABLE = "chat_messages"
+# Agent messages loaded as model context; matches the agent's default sliding window
+AGENT_CONTEXT_MESSAGES = int(os.environ.get('CHAT_AGENT_CONTEXT_MESSAGES', 40))
+
 class ChatHistoryRepository(BaseRepository):
     """
     Repository for managing chat history data in the database.
@@ -21,19 +25,26 @@ class ChatHistoryRepository(BaseRepository):
         super().__init__("chat_history")
         self.utils = Utility()
     
-    def get_thread_by_id(self, thread_id: str, user_id: str) -> Optional[ChatThread]:
+    def get_thread_by_id(self, thread_id: str, user_id: str, ui_limit: Optional[int] = None,
+                         agent_limit: Optional[int] = AGENT_CONTEXT_MESSAGES) -> Optional[ChatThread]:
         """
         Get a chat thread by its ID and user ID.
         
+        Only the tail of each message list is loaded: the last ``ui_limit`` display
+        items and the last ``agent_limit`` agent messages (None loads everything).
+        
         Args:
             thread_id: ID of the thread
             user_id: ID of the user
+            ui_limit: Number of most recent UI messages to load
+            agent_limit: Number of most recent agent messages to load
             
         Returns:
             ChatThread instance or None if not found
         """
         query = f"""
-        SELECT * FROM {self.table_name}
+        SELECT thread_id, user_id, thread_title, date, ui_msg_count, agent_msg_count
+        FROM {self.table_name}
         WHERE thread_id = :thread_id
         AND user_id = :user_id
         AND deleted = FALSE
@@ -48,80 +59,232 @@ class ChatHistoryRepository(BaseRepository):
         
         if not results:
             return None
-            
+        
+        row = results[0]
+        ui_count = row.get('ui_msg_count') or 0
+        agent_count = row.get('agent_msg_count') or 0
+        ui_offset = self._tail_offset(ui_count, ui_limit)
+        agent_offset = self._tail_offset(agent_count, agent_limit)
+        
         try:
-            return ChatThread.create_from_string(results[0])
+            messages = self._load_messages(thread_id, user_id, ui_offset, agent_offset)
+            agent_msgs = messages['agent']
+            
+            # A cut-off context must not start with tool results whose tool use was dropped
+            while agent_offset and agent_msgs and not self._starts_turn(agent_msgs[0]):
+                agent_msgs.pop(0)
+                agent_offset += 1
+            
+            thread = ChatThread.create_from_string({
+                **row,
+                "ui_msgs": messages['ui'],
+                "agent_msgs": agent_msgs
+            })
+            thread['ui_msgs_offset'] = ui_offset
+            thread['agent_msgs_offset'] = agent_offset
+            thread['ui_msgs_count'] = ui_count
+            thread['agent_msgs_count'] = agent_count
+            return thread
         except Exception as e:
             logger.error(f"Error creating chat thread from database: {str(e)}")
             return None
     
+    def get_ui_messages(self, thread_id: str, user_id: str, before_seq: Optional[int] = None,
+                        limit: int = 50) -> Dict[str, Any]:
+        """
+        Get one page of a thread's UI messages, newest page first.
+        
+        Args:
+            thread_id: ID of the thread
+            user_id: ID of the user
+            before_seq: Only return messages older than this sequence number
+            limit: Maximum number of messages to return
+            
+        Returns:
+            Dictionary with the messages in chronological order and the seq of the first one
+        """
+        query = f"""
+        SELECT seq, content FROM (
+            SELECT seq, content FROM {MESSAGES_TABLE}
+            WHERE thread_id = :thread_id
+            AND user_id = :user_id
+            AND kind = 'ui'
+            AND (CAST(:before_seq AS INTEGER) IS NULL OR seq < :before_seq)
+            ORDER BY seq DESC
+            LIMIT :limit
+        ) page
+        ORDER BY seq
+        """
+        
+        params = {
+            "thread_id": thread_id,
+            "user_id": user_id,
+            "before_seq": before_seq,
+            "limit": limit
+        }
+        
+        rows = self.db.execute_query(query, params)
+        return {
+            "ui_msgs": [row['content'] for row in rows],
+            "first_seq": rows[0]['seq'] if rows else None
+        }
+    
+    def _load_messages(self, thread_id: str, user_id: str, ui_offset: int, agent_offset: int) -> Dict[str, list]:
+        """Load UI messages from seq ``ui_offset`` and agent messages from ``agent_offset`` in one query"""
+        query = f"""
+        SELECT kind, content FROM {MESSAGES_TABLE}
+        WHERE thread_id = :thread_id
+        AND user_id = :user_id
+        AND ((kind = 'ui' AND seq >= :ui_offset) OR (kind = 'agent' AND seq >= :agent_offset))
+        ORDER BY kind, seq
+        """
+        
+        params = {
+            "thread_id": thread_id,
+            "user_id": user_id,
+            "ui_offset": ui_offset,
+            "agent_offset": agent_offset
+        }
+        
+        messages = {"ui": [], "agent": []}
+        for row in self.db.execute_query(query, params):
+            messages[row['kind']].append(row['content'])
+        return messages
+    
+    @staticmethod
+    def _tail_offset(count: int, limit: Optional[int]) -> int:
+        """Seq of the first of the last ``limit`` messages (all of them when limit is None)"""
+        if limit is None:
+            return 0
+        return max(0, count - limit)
+    
+    @staticmethod
+    def _starts_turn(message: Dict[str, Any]) -> bool:
+        """True for a user message that is not a tool result"""
+        if message.get('role') != 'user':
+            return False
+        content = message.get('content')
+        if isinstance(content, list):
+            return not any(isinstance(block, dict) and 'toolResult' in block for block in content)
+        return True
+    
     def save_thread(self, thread: ChatThread, is_new: bool) -> bool:
         """
         Save a chat thread to the database.
         
+        Only messages appended since the thread was loaded are written, one row
+        each, together with the thread's title, date and message counts, so the
+        cost of a turn does not grow with the length of the thread.
+        
         Args:
             thread: ChatThread instance
             
         Returns:
             True if save was successful
         """
-
-        # Convert Python dictionaries to JSON strings
-        ui_msgs_json = json.dumps(thread["ui_msgs"])
-        agent_msgs_json = json.dumps(thread["agent_msgs"])
-
+        new_rows = []
+        counts = {}
+        for kind in ("ui", "agent"):
+            messages = thread[f"{kind}_msgs"]
+            offset = thread.get(f"{kind}_msgs_offset", 0)
+            saved = thread.get(f"{kind}_msgs_count", 0)
+            pending = messages[saved - offset:]
+            new_rows.extend(
+                {
+                    "thread_id": thread["thread_id"],
+                    "user_id": thread["user_id"],
+                    "kind": kind,
+                    "seq": saved + index,
+                    "content": json.dumps(message, default=str)
+                }
+                for index, message in enumerate(pending)
+            )
+            counts[kind] = saved + len(pending)
+        
+        params = {
+            "thread_id": thread["thread_id"],
+            "user_id": thread["user_id"],
+            "thread_title": thread["thread_title"],
+            "ui_msg_count": counts["ui"],
+            "agent_msg_count": counts["agent"]
+        }
         
         if is_new:
-            # Insert new thread using named parameters (without text() wrapper)
-            query = f"""
+            thread_query = f"""
             INSERT INTO {self.table_name} (
-                thread_id, user_id, thread_title, ui_msgs, agent_msgs, date, deleted
+                thread_id, user_id, thread_title, ui_msg_count, agent_msg_count, date, deleted
             ) VALUES (
-                :thread_id, :user_id, :thread_title, :ui_msgs, :agent_msgs, CURRENT_TIMESTAMP, FALSE
+                :thread_id, :user_id, :thread_title, :ui_msg_count, :agent_msg_count, CURRENT_TIMESTAMP, FALSE
             )
             """
-
-            params = {
-                "thread_id": thread["thread_id"],
-                "user_id": thread["user_id"],
-                "thread_title": thread["thread_title"],
-                "ui_msgs": ui_msgs_json,  # JSON string
-                "agent_msgs": agent_msgs_json  # JSON string
-            }
-            
-            try:
-                self.db.execute_write(query, params)
-                return True
-            except Exception as e:
-                logger.error(f"Error inserting chat thread: {str(e)}")
-                return False
-            
         else:
-            # Update existing thread using named parameters (without text() wrapper)
-            query = f"""
+            thread_query = f"""
             UPDATE {self.table_name}
-            SET ui_msgs = :ui_msgs,
-                agent_msgs = :agent_msgs,
+            SET ui_msg_count = :ui_msg_count,
+                agent_msg_count = :agent_msg_count,
                 date = CURRENT_TIMESTAMP,
                 thread_title = :thread_title
             WHERE thread_id = :thread_id
             AND user_id = :user_id
             """
+        
+        queries = [(thread_query, params)]
+        if new_rows:
+            insert_messages = f"""
+            INSERT INTO {MESSAGES_TABLE} (thread_id, user_id, kind, seq, content)
+            VALUES (:thread_id, :user_id, :kind, :seq, :content)
+            """
+            queries.append((insert_messages, new_rows))
+        
+        try:
+            self.db.execute_transaction(queries)
+        except Exception as e:
+            logger.error(f"Error {'inserting' if is_new else 'updating'} chat thread: {str(e)}")
+            return False
+        
+        thread["ui_msgs_count"] = counts["ui"]
+        thread["agent_msgs_count"] = counts["agent"]
+        return True
+    
+    def set_graph_code(self, thread_id: str, user_id: str, human: str, graph_code: str) -> bool:
+        """
+        Attach chart code to the latest UI message of a thread asking ``human``.
+        
+        Args:
+            thread_id: ID of the thread
+            user_id: ID of the user
+            human: Text of the user message the chart belongs to
+            graph_code: Chart configuration to store
             
-            params = {
-                "thread_id": thread["thread_id"],
-                "thread_title": thread["thread_title"],
-                "user_id": thread["user_id"],
-                "ui_msgs": ui_msgs_json,  # JSON string
-                "agent_msgs": agent_msgs_json  # JSON string
-            }
-            
-            try:
-                self.db.execute_write(query, params)
-                return True
-            except Exception as e:
-                logger.error(f"Error updating chat thread: {str(e)}")
-                return False
+        Returns:
+            True if a message was updated
+        """
+        query = f"""
+        UPDATE {MESSAGES_TABLE}
+        SET content = jsonb_set(content, '{{graph_code}}', to_jsonb(CAST(:graph_code AS TEXT)))
+        WHERE id = (
+            SELECT id FROM {MESSAGES_TABLE}
+            WHERE thread_id = :thread_id
+            AND user_id = :user_id
+            AND kind = 'ui'
+            AND content->>'human' = :human
+            ORDER BY seq DESC
+            LIMIT 1
+        )
+        """
+        
+        params = {
+            "thread_id": thread_id,
+            "user_id": user_id,
+            "human": human,
+            "graph_code": graph_code
+        }
+        
+        try:
+            return self.db.execute_write(query, params) > 0
+        except Exception as e:
+            logger.error(f"Error attaching chart to chat thread: {str(e)}")
+            return False
             
     
     def delete_thread(self, thread_id: str, user_id: str) -> bool:
@@ -169,7 +332,8 @@ class ChatHistoryRepository(BaseRepository):
         offset = (page - 1) * page_size
         
         query = f"""
-        SELECT thread_id, user_id, thread_title, date as created_at, date as updated_at
+        SELECT thread_id, user_id, thread_title, date as created_at, date as updated_at,
+               ui_msg_count as message_count
         FROM {self.table_name}
         WHERE user_id = :user_id
         AND deleted = FALSE
@@ -198,7 +362,8 @@ class ChatHistoryRepository(BaseRepository):
                     'user_id': row.get('user_id', ''),
                     'thread_title': row.get('thread_title', 'Untitled Chat'),
                     'created_at': self.utils.to_serializable_date(row.get('created_at', '')),
-                    'updated_at': self.utils.to_serializable_date(row.get('updated_at', ''))
+                    'updated_at': self.utils.to_serializable_date(row.get('updated_at', '')),
+                    'message_count': row.get('message_count') or 0
                 }
                 
                 threads.append(thread)
@@ -1,14 +1,18 @@
+import os
 import json
 from flask_restful import Resource, request
-from strands import Agent
 from utils.utility import Utility
-from strands.models import BedrockModel
+from utils.query_results import QueryResultCache, page
+from providers.agent_pool import AgentPool
 from repositories.chat_history_repository import ChatHistoryRepository
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Rows of a cached result given to the model when charting it
+CHART_MAX_ROWS = int(os.environ.get('CHART_MAX_ROWS', 1000))
+
 class ChartResource(Resource):
     """
     API resource for generating chart configurations based on query results
@@ -17,6 +21,8 @@ class ChartResource(Resource):
     def __init__(self):
         self.util = Utility()
         self.chat_history_repo = ChatHistoryRepository()
+        self.agent_pool = AgentPool()
+        self.result_cache = QueryResultCache()
         
 
     def post(self):
@@ -29,7 +35,17 @@ class ChartResource(Resource):
         query_results = data.get('queryResults')
         user_id = data.get('user_id', 'Deepesh')  # Default to 'Deepesh' if not provided
         thread_id = data.get('thread_id')
-        thread = self.chat_history_repo.get_thread_by_id(thread_id, user_id)
+        query_id = data.get('query_id')
+        
+        # Prefer the typed result cached server-side over the rows echoed back by the client
+        result = self.result_cache.get(query_id) if query_id else None
+        if result is not None:
+            columns = page(result, 0, CHART_MAX_ROWS)
+            query_results = json.dumps({
+                "columns": columns['columns'],
+                "row_count": result['row_count'],
+                "data": columns['data']
+            }, separators=(',', ':'))
         
         prompt = f"""
             You are a data visualization expert. Based on the following data and analysis, suggest the most appropriate chart type and configuration.
@@ -58,28 +74,16 @@ class ChartResource(Resource):
             do not generate formatter functions as these are not parsable by JavaScript
         """
 
-        model = BedrockModel(model_id=model_id, verbose=True, temperature=0.3)
-
         # Strands Agents SDK allows easy integration of agent tools
-        agent = Agent(model=model, tools=[])
-
-        response = agent(prompt)
+        with self.agent_pool.lease('chart', model_id, callback_handler=None, verbose=True, temperature=0.3) as agent:
+            response = agent(prompt)
         # print(f'Chart Code: {response}')
 
         response = str(response)
         json_response = self.util.clean_json_string(response)
 
-        try:
-            ui_msgs = thread['ui_msgs']
-            for msg in ui_msgs:
-                if msg['human'] == text:
-                    msg['graph_code'] = json_response
-                    break
-            
-            # print(f'updated thread: {thread}')
-            self.chat_history_repo.save_thread(thread, False)
-        except Exception as e:
-            logger.error(f"Error updating thread {thread_id} with chart data: {str(e)}")
+        if not self.chat_history_repo.set_graph_code(thread_id, user_id, text, json_response):
+            logger.error(f"Error updating thread {thread_id} with chart data")
 
         self.util.log_data(f'\nFinal Response: {json_response}')
         #chart_dict = json.loads(json_response)
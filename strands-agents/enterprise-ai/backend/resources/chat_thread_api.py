@@ -38,7 +38,7 @@ class ChatThreadListResource(Resource):
                     'user_id': thread.get('user_id', ''),
                     'created_at': thread.get('created_at', ''),
                     'updated_at': thread.get('updated_at', ''),
-                    'message_count': len(thread.get('ui_msgs', [])) if thread.get('ui_msgs') else 0
+                    'message_count': thread.get('message_count', 0)
                 })
             
             return {
@@ -68,18 +68,31 @@ class ChatThreadResource(Resource):
             # Get user from request parameters
             user = request.args.get('user', 'Deepesh')
             
+            # Optional pagination: the last `limit` messages, or the page before seq `before`
+            limit = request.args.get('limit', type=int)
+            before = request.args.get('before', type=int)
+            
             # Get thread from repository
-            thread = self.chat_history_repo.get_thread_by_id(thread_id, user)
+            ui_limit = 0 if before is not None else limit
+            thread = self.chat_history_repo.get_thread_by_id(thread_id, user, ui_limit=ui_limit, agent_limit=0)
             
             if not thread:
                 return {'status': 'error', 'message': 'Thread not found'}, 404
             
+            first_seq = thread['ui_msgs_offset']
+            ui_msgs = thread.get('ui_msgs', [])
+            if before is not None:
+                page = self.chat_history_repo.get_ui_messages(thread_id, user, before_seq=before, limit=limit or 50)
+                ui_msgs, first_seq = page['ui_msgs'], page['first_seq']
+            
             # Format the response to match the expected structure
             response = {
                 'thread_id': thread.get('thread_id', ''),
                 'thread_title': thread.get('thread_title', ''),
                 'type': 'final',
-                'ui_msgs': thread.get('ui_msgs', []),
+                'ui_msgs': ui_msgs,
+                'first_seq': first_seq,
+                'message_count': thread['ui_msgs_count'],
                 'status': 'success'
             }
             
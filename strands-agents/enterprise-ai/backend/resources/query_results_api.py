@@ -0,0 +1,33 @@
+from flask_restful import Resource, request
+import logging
+from utils.query_results import QUERY_RESULT_PAGE_ROWS, QueryResultCache, page
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class QueryResultsResource(Resource):
+    """Pages through a cached SQL result by query id"""
+
+    def __init__(self):
+        self.cache = QueryResultCache()
+
+    def get(self, query_id):
+        """
+        Get one page of a cached query result.
+
+        Query parameters:
+            offset: First row of the page (default 0)
+            limit: Rows per page (default QUERY_RESULT_PAGE_ROWS)
+            format: 'columns' (default) for column arrays or 'rows' for row objects
+        """
+        result = self.cache.get(query_id)
+        if result is None:
+            return {'status': 'error', 'message': 'Query result not found or expired'}, 404
+
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = max(1, request.args.get('limit', QUERY_RESULT_PAGE_ROWS, type=int))
+        as_rows = request.args.get('format', 'columns') == 'rows'
+
+        response = page(result, offset, limit, as_rows=as_rows)
+        response['status'] = 'success'
+        return response
@@ -5,10 +5,9 @@ from providers.bedrock_provider import get_bedrock_client
 from utils.utility import Utility
 from flask import Response, stream_with_context, request
 import queue
-import threading
 import json
-from strands.models import BedrockModel
-from strands import Agent, tool
+from strands import tool
+from agents.agent_callback_handler import thought_stream
 from agents.fintech_sales_postgresql import FintechSalesAgent
 from agents.personal_tasks import PersonalTasksAgent
 from agents.waf_logs import WAFLogsAgent
@@ -17,21 +16,32 @@ from flask import session
 import time
 from utils.chat_thread import ChatThread, ChatThreadHelper
 from repositories.chat_history_repository import ChatHistoryRepository
+from providers.agent_pool import AgentPool, AgentWorkerPool
+from utils.query_results import QUERY_RESULT_PAGE_ROWS, QueryResultCache, page
 import re
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Sub-agents hold no per-request state (events go to the request's thought
+# queue via thought_stream), so they and their tools are built once per process
+fintech_sales_agent = FintechSalesAgent()
+personal_tasks_manager = PersonalTasksAgent()
+mcp_servers_agent = MCPServersAgent()
+waf_logs_agent = WAFLogsAgent()
+
 class StreamAnswerResource(Resource):
 
     def __init__(self):
         self.thought_queue = queue.Queue()
         self.util = Utility()
         self.start_time = None
-        self.fintech_sales_agent = FintechSalesAgent(self.thought_queue)
-        self.personal_tasks_manager = PersonalTasksAgent(self.thought_queue)
-        self.mcp_servers_agent = MCPServersAgent(self.thought_queue)
-        self.waf_logs_agent = WAFLogsAgent(self.thought_queue)
+        self.fintech_sales_agent = fintech_sales_agent
+        self.personal_tasks_manager = personal_tasks_manager
+        self.mcp_servers_agent = mcp_servers_agent
+        self.waf_logs_agent = waf_logs_agent
+        self.agent_pool = AgentPool()
+        self.worker_pool = AgentWorkerPool()
         self.chat_history_repo = ChatHistoryRepository()
         
 
@@ -61,8 +71,11 @@ class StreamAnswerResource(Resource):
         # Log the received data
         logger.info(f"Received request: human={user_input}, thread_id={thread_id}, user={user}, model_id={model_id}")
         
-        # Start the processing thread
-        threading.Thread(target=self.process_agent_response, args=(user_input, model_id, thread_id, user)).start()
+        # Process the request on the shared worker pool; refuse rather than queue without bound
+        future = self.worker_pool.submit(self._process_agent_request, user_input, model_id, thread_id, user)
+        if future is None:
+            logger.warning(f"Agent worker queue is full, rejecting request for thread {thread_id}")
+            return {'status': 'error', 'message': 'Server is busy, please retry shortly'}, 503
         
         response = Response(stream_with_context(self.generate()), 
                       mimetype='text/event-stream',
@@ -114,28 +127,21 @@ class StreamAnswerResource(Resource):
         return self._answer_stream_response(**kwargs)
 
 
-    # Override the callback handler in sales_analytics_assistant to forward thoughts to our queue
-    def global_callback_handler(self, **kwargs):
+    def _process_agent_request(self, user_input, model_id, thread_id, user):
+        """Worker entry point: stream this request's agent events to its thought queue"""
+        with thought_stream(self.thought_queue):
+            try:
+                self.process_agent_response(user_input, model_id, thread_id, user)
+            except Exception as e:
+                error_data = {
+                    'type': 'error',
+                    'content': f"Error processing request: {str(e)}"
+                }
+                self.thought_queue.put(json.dumps(error_data))
+                self.thought_queue.put("DONE")
+                raise
 
-        if "data" in kwargs:
-            # Stream the model's thinking process
-            thought_data = {
-                "type": "thinking",
-                "content": kwargs['data']
-            }
-            self.thought_queue.put(json.dumps(thought_data))
-            
-        elif "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name"):
-            # Stream tool usage information
-            tool_data = {
-                "type": "tool_use",
-                "tool": kwargs['current_tool_use']['name']
-            }
-            self.thought_queue.put(json.dumps(tool_data))
-            
-        return None
-        
-    # Start a thread to process the agent's response
+    # Process the agent's response on a worker thread
     def process_agent_response(self, user_input, model_id, thread_id, user="Deepesh"):
         #try:
         # Handle thread management
@@ -156,40 +162,37 @@ class StreamAnswerResource(Resource):
 
             
         """
-        chat_thread = self.chat_history_repo.get_thread_by_id(thread_id, user)
+        # The UI already shows the history; only the agent context tail is needed
+        chat_thread = self.chat_history_repo.get_thread_by_id(thread_id, user, ui_limit=0)
         print(chat_thread)
-        if (len(chat_thread['ui_msgs']) < 1):
+        if (chat_thread['ui_msgs_count'] < 1):
             chat_thread['thread_title'] = user_input
         
         
         chat_thread_helper = ChatThreadHelper(chat_thread)
-        model = BedrockModel(model_id=model_id, 
-                                verbose=True, 
-                                temperature=0.3)
-        
-        # Set up the orchestrator with the enhanced callback
-        orchestrator = Agent(
-            system_prompt=MAIN_SYSTEM_PROMPT,
-            model=model,
-            
-            tools=[
-                self.fintech_sales_agent.sales_analytics_assistant_tool(),
-                    self.personal_tasks_manager.personal_task_manager_tool(),
-                    self.mcp_servers_agent.mcp_servers_tool(),
-                    self.waf_logs_agent.was_tool()],
-            callback_handler=self.global_callback_handler,
-            messages = chat_thread['agent_msgs']
-        )
         
-        # Process the user input
-        response = orchestrator(user_input)
+        # Lease a pooled orchestrator and swap in this thread's conversation
+        tools = [
+            self.fintech_sales_agent.sales_analytics_assistant_tool(),
+            self.personal_tasks_manager.personal_task_manager_tool(),
+            self.mcp_servers_agent.mcp_servers_tool(),
+            self.waf_logs_agent.was_tool()
+        ]
+        with self.agent_pool.lease('orchestrator', model_id, MAIN_SYSTEM_PROMPT, tools,
+                                   messages=chat_thread['agent_msgs'],
+                                   verbose=True, temperature=0.3) as orchestrator:
+            # Process the user input
+            response = orchestrator(user_input)
+            orchestrator_messages = orchestrator.messages
         
         # Get the final response and any query results
-        last_message = orchestrator.messages[-2]['content']
+        last_message = orchestrator_messages[-2]['content']
         # print(f'\n\nmessages -->{orchestrator.messages}')
         final_response = ""
         query_results = []
         show_graph = False
+        query_id = ''
+        row_count = 0
         
         # Check if the response is a JSON string that might contain query results
         try:
@@ -212,7 +215,7 @@ class StreamAnswerResource(Resource):
         if not final_response:
             for item in last_message:
                 if 'text' in item: # direct LLM call, no tools involved
-                    final_response = orchestrator.messages[-1]['content'][0]['text']
+                    final_response = orchestrator_messages[-1]['content'][0]['text']
                 elif 'toolResult' in item: # when results are coming from tools
                     final_response  = item['toolResult']['content'][0]['text']
                     try:
@@ -220,6 +223,7 @@ class StreamAnswerResource(Resource):
                         final_response  = response_json['response']
                         query_results   = response_json['query_results']
                         show_graph      = response_json['show_graph']
+                        query_id        = response_json.get('query_id', '')
                     except ValueError as ex:
                         response_json   = final_response
                         query_results   = []
@@ -228,15 +232,23 @@ class StreamAnswerResource(Resource):
 
                     
     
+        # SQL results come from the result cache, not through the agent's messages
+        result = QueryResultCache().get(query_id) if query_id else None
+        if result is not None:
+            query_results = page(result, 0, QUERY_RESULT_PAGE_ROWS, as_rows=True)['rows']
+            row_count = result['row_count']
+        
         # Save the updated thread to the database
         # try:
         # attach tool messages from the agent
-        chat_thread_helper.update_agent_messages(orchestrator.messages)
+        chat_thread_helper.update_agent_messages(orchestrator_messages)
         
         chat_thread_helper.update_ui_messages(response=final_response,
                                                 user_input=user_input,
                                                 query_results=query_results,
-                                                show_graph=show_graph)
+                                                show_graph=show_graph,
+                                                query_id=query_id,
+                                                row_count=row_count)
         
 
         self.chat_history_repo.save_thread(chat_thread_helper.get_chat_thread(), is_new=False)
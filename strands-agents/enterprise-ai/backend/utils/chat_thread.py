@@ -44,6 +44,8 @@ class ChatItem(TypedDict):
     show_graph: bool
     graph_code: str
     usage: Usage
+    query_id: NotRequired[str]
+    row_count: NotRequired[int]
 
 class ChatThread(TypedDict):
     """
@@ -56,6 +58,12 @@ class ChatThread(TypedDict):
     ui_msgs: List[ChatItem]
     agent_msgs: list
     date: datetime
+    # Message bookkeeping for append-only storage: ui_msgs/agent_msgs may hold only
+    # the tail of the thread, starting at seq *_offset; *_count messages are stored
+    ui_msgs_offset: NotRequired[int]
+    agent_msgs_offset: NotRequired[int]
+    ui_msgs_count: NotRequired[int]
+    agent_msgs_count: NotRequired[int]
     
     @staticmethod
     def create_new(human_msg: str, user_id: str = DEFAULT_USER) -> 'ChatThread':
@@ -144,13 +152,39 @@ class ChatThreadHelper:
         return self.chat_thread
 
     def update_agent_messages(self, messages: list):
+        """
+        Replace the agent context with ``messages``, the agent's message list after a turn.
+        
+        The agent appends to the list it was given but its conversation manager may
+        also trim old messages from the front, so the stored offset is re-based on
+        the last message that was already saved: only messages after it are new.
+        """
+        previous = self.chat_thread['agent_msgs']
+        saved = self.chat_thread.get('agent_msgs_count', 0)
+        offset = self.chat_thread.get('agent_msgs_offset', 0)
+        
+        last_saved_index = None
+        if previous and saved > offset:
+            last_saved = previous[saved - offset - 1]
+            for index in range(len(messages) - 1, -1, -1):
+                if messages[index] is last_saved or messages[index] == last_saved:
+                    last_saved_index = index
+                    break
+        
+        if last_saved_index is None:
+            # Nothing saved survived in the list: all of it is new
+            self.chat_thread['agent_msgs_offset'] = saved
+        else:
+            self.chat_thread['agent_msgs_offset'] = saved - (last_saved_index + 1)
         self.chat_thread['agent_msgs'] = messages
 
     def update_ui_messages(self, 
                            response: str, 
                            query_results: list, 
                            user_input: str, 
-                           show_graph: bool):
+                           show_graph: bool,
+                           query_id: str = '',
+                           row_count: int = 0):
         
         usage = Usage()
         usage['input'] = 0
@@ -166,6 +200,10 @@ class ChatThreadHelper:
         chat_item['show_graph'] = show_graph
         chat_item['graph_code'] = ''
         chat_item['usage'] = usage
+        if query_id:
+            # Full result is paged from /api/results/<query_id> while it is cached
+            chat_item['query_id'] = query_id
+            chat_item['row_count'] = row_count
 
         self.chat_thread['ui_msgs'].append(chat_item)
 
@@ -33,6 +33,26 @@ def init_database():
         );
         """
         
+        # Per-thread message counts, so appending a turn knows the next seq without scanning messages
+        add_message_counts = [
+            "ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS ui_msg_count INTEGER NOT NULL DEFAULT 0;",
+            "ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS agent_msg_count INTEGER NOT NULL DEFAULT 0;"
+        ]
+        
+        # One row per message; kind is 'ui' (display items) or 'agent' (model context)
+        create_chat_messages_table = """
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id BIGSERIAL PRIMARY KEY,
+            thread_id VARCHAR(255) NOT NULL,
+            user_id VARCHAR(255) NOT NULL,
+            kind VARCHAR(10) NOT NULL,
+            seq INTEGER NOT NULL,
+            content JSONB NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(thread_id, user_id, kind, seq)
+        );
+        """
+        
         # Create indexes for better performance
         create_indexes = [
             "CREATE INDEX IF NOT EXISTS idx_chat_history_thread_user ON chat_history(thread_id, user_id);",
@@ -42,19 +62,81 @@ def init_database():
         
         # Execute table creation
         db.execute_write(create_chat_history_table)
+        for alter_query in add_message_counts:
+            db.execute_write(alter_query)
         logger.info("chat_history table created/verified successfully")
         
+        db.execute_write(create_chat_messages_table)
+        logger.info("chat_messages table created/verified successfully")
+        
         # Execute index creation
         for index_query in create_indexes:
             db.execute_write(index_query)
         
         logger.info("Database indexes created/verified successfully")
+        
+        migrated = migrate_chat_messages(db)
+        if migrated:
+            logger.info(f"Migrated {migrated} chat threads to chat_messages")
         logger.info("Database initialization completed successfully")
         
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
         raise
 
+def migrate_chat_messages(db: DatabaseManager = None) -> int:
+    """
+    Move the ui_msgs/agent_msgs JSON arrays of existing threads into chat_messages.
+    
+    Each array element becomes one row with its position as seq, the thread's
+    message counts are set, and the JSON columns are cleared. Threads already
+    migrated have NULL arrays, so running this again is a no-op.
+    
+    Args:
+        db: DatabaseManager to use (defaults to the shared instance)
+        
+    Returns:
+        Number of threads migrated
+    """
+    db = db or DatabaseManager()
+    
+    legacy_threads = """
+    SELECT COUNT(*) AS count FROM chat_history
+    WHERE ui_msgs IS NOT NULL OR agent_msgs IS NOT NULL
+    """
+    count = db.execute_query(legacy_threads)[0]["count"]
+    if not count:
+        return 0
+    
+    copy_messages = """
+    INSERT INTO chat_messages (thread_id, user_id, kind, seq, content, created_at)
+    SELECT h.thread_id, h.user_id, m.kind, m.ordinality - 1, m.value, h.date
+    FROM chat_history h
+    CROSS JOIN LATERAL (
+        SELECT 'ui' AS kind, value, ordinality
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(h.ui_msgs) = 'array' THEN h.ui_msgs ELSE '[]'::jsonb END)
+            WITH ORDINALITY
+        UNION ALL
+        SELECT 'agent', value, ordinality
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(h.agent_msgs) = 'array' THEN h.agent_msgs ELSE '[]'::jsonb END)
+            WITH ORDINALITY
+    ) m
+    WHERE h.ui_msgs IS NOT NULL OR h.agent_msgs IS NOT NULL
+    ON CONFLICT (thread_id, user_id, kind, seq) DO NOTHING
+    """
+    
+    clear_blobs = """
+    UPDATE chat_history
+    SET ui_msg_count = CASE WHEN jsonb_typeof(ui_msgs) = 'array' THEN jsonb_array_length(ui_msgs) ELSE 0 END,
+        agent_msg_count = CASE WHEN jsonb_typeof(agent_msgs) = 'array' THEN jsonb_array_length(agent_msgs) ELSE 0 END,
+        ui_msgs = NULL,
+        agent_msgs = NULL
+    WHERE ui_msgs IS NOT NULL OR agent_msgs IS NOT NULL
+    """
+    
+    db.execute_transaction([(copy_messages, None), (clear_blobs, None)])
+    return count
+
 def create_sample_data():
     """Create sample data for testing (optional)."""
     db = DatabaseManager()
@@ -79,14 +161,12 @@ def create_sample_data():
             "thread_id": "sample_thread_001",
             "user_id": "sample_user",
             "thread_title": "Sample Chat Thread",
-            "ui_msgs": '[]',
-            "agent_msgs": '[]',
             "deleted": False
         }
         
         insert_query = """
-        INSERT INTO chat_history (thread_id, user_id, thread_title, ui_msgs, agent_msgs, deleted)
-        VALUES (:thread_id, :user_id, :thread_title, :ui_msgs, :agent_msgs, :deleted)
+        INSERT INTO chat_history (thread_id, user_id, thread_title, deleted)
+        VALUES (:thread_id, :user_id, :thread_title, :deleted)
         """
         
         db.execute_write(insert_query, sample_thread)
@@ -0,0 +1,234 @@
+"""
+Typed columnar SQL results and the server-side result cache.
+
+A query result is kept as column names, a type per column and one list of
+JSON-ready values per column. Values are converted once when rows are
+fetched (a converter is picked per column, not per value), so results can be
+cached, paged and serialized with plain json.dumps without being re-parsed.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypedDict
+
+logger = logging.getLogger(__name__)
+
+# Cached results are evicted after this many seconds, or when the cache holds more cells than this
+QUERY_RESULT_TTL = int(os.environ.get('QUERY_RESULT_TTL', 1800))
+QUERY_RESULT_CACHE_CELLS = int(os.environ.get('QUERY_RESULT_CACHE_CELLS', 5_000_000))
+# Rows sent to the UI with an answer; the rest is paged from /api/results/<query_id>
+QUERY_RESULT_PAGE_ROWS = int(os.environ.get('QUERY_RESULT_PAGE_ROWS', 500))
+
+
+class ResultColumn(TypedDict):
+    name: str
+    type: str  # integer | number | boolean | string | date | datetime | time | interval | json
+
+
+class ColumnarResult(TypedDict):
+    query_id: str
+    sql: str
+    columns: List[ResultColumn]
+    data: Dict[str, list]  # column name -> values
+    row_count: int
+    truncated: bool  # more rows than the row cap were available
+    created_at: float
+
+
+def _identity(value):
+    return value
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def _to_iso(value):
+    return None if value is None else value.isoformat()
+
+
+def _to_seconds(value):
+    return None if value is None else value.total_seconds()
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def _to_hex(value):
+    return None if value is None else bytes(value).hex()
+
+
+# Python type of the column's values -> (column type, converter to a JSON value)
+_CONVERTERS: List[Tuple[type, str, Callable[[Any], Any]]] = [
+    (bool, 'boolean', _identity),
+    (int, 'integer', _identity),
+    (float, 'number', _identity),
+    (Decimal, 'number', _to_float),
+    (datetime, 'datetime', _to_iso),
+    (date, 'date', _to_iso),
+    (dt_time, 'time', _to_iso),
+    (timedelta, 'interval', _to_seconds),
+    (str, 'string', _identity),
+    ((dict, list), 'json', _identity),
+    ((bytes, bytearray, memoryview), 'string', _to_hex),
+]
+
+
+def column_converter(values: Iterable[Any]) -> Tuple[str, Callable[[Any], Any]]:
+    """Pick the column type and converter from the first non-null value"""
+    for value in values:
+        if value is None:
+            continue
+        for python_type, column_type, converter in _CONVERTERS:
+            if isinstance(value, python_type):
+                return column_type, converter
+        return 'string', _to_str
+    return 'string', _identity
+
+
+class ColumnarBuilder:
+    """Accumulates fetched row batches into typed column arrays"""
+
+    def __init__(self, column_names: Sequence[str]):
+        # Duplicate names (e.g. two "count" columns) would collide as dict keys
+        seen = {}
+        self.names = []
+        for name in column_names:
+            seen[name] = seen.get(name, 0) + 1
+            self.names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+        self.raw: List[list] = [[] for _ in self.names]
+        self.row_count = 0
+
+    def add_rows(self, rows: Sequence[Sequence[Any]]):
+        if not rows:
+            return
+        for index, values in enumerate(zip(*rows)):
+            self.raw[index].extend(values)
+        self.row_count += len(rows)
+
+    def build(self, sql: str, truncated: bool = False, query_id: Optional[str] = None) -> ColumnarResult:
+        columns: List[ResultColumn] = []
+        data: Dict[str, list] = {}
+        for name, values in zip(self.names, self.raw):
+            column_type, converter = column_converter(values)
+            columns.append(ResultColumn(name=name, type=column_type))
+            data[name] = values if converter is _identity else [converter(value) for value in values]
+        return ColumnarResult(
+            query_id=query_id or str(uuid.uuid4()),
+            sql=sql,
+            columns=columns,
+            data=data,
+            row_count=self.row_count,
+            truncated=truncated,
+            created_at=time.time()
+        )
+
+
+def to_columnar(column_names: Sequence[str], rows: Sequence[Sequence[Any]], sql: str = '',
+                truncated: bool = False) -> ColumnarResult:
+    """Build a ColumnarResult from fetched rows"""
+    builder = ColumnarBuilder(column_names)
+    builder.add_rows(rows)
+    return builder.build(sql, truncated)
+
+
+def page(result: ColumnarResult, offset: int = 0, limit: Optional[int] = None, as_rows: bool = False) -> Dict[str, Any]:
+    """
+    One page of a result, as columns (default) or as a list of row dicts.
+
+    Args:
+        result: Cached result
+        offset: First row of the page
+        limit: Maximum rows in the page (None for all remaining rows)
+        as_rows: Return row dicts instead of column arrays
+
+    Returns:
+        Dictionary with the page and the paging metadata
+    """
+    end = result['row_count'] if limit is None else min(result['row_count'], offset + limit)
+    names = [column['name'] for column in result['columns']]
+    sliced = {name: result['data'][name][offset:end] for name in names}
+    payload = {
+        "query_id": result['query_id'],
+        "columns": result['columns'],
+        "row_count": result['row_count'],
+        "truncated": result['truncated'],
+        "offset": offset,
+        "next_offset": end if end < result['row_count'] else None
+    }
+    if as_rows:
+        payload["rows"] = [dict(zip(names, values)) for values in zip(*(sliced[name] for name in names))]
+    else:
+        payload["data"] = sliced
+    return payload
+
+
+class QueryResultCache:
+    """
+    Process-wide LRU cache of query results keyed by query id.
+
+    Bounded by age and by the total number of cells held, so a few very
+    large results can't exhaust memory.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """Singleton pattern so the agents and the API resources share one cache."""
+        if cls._instance is None:
+            cls._instance = super(QueryResultCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, ttl: int = None, max_cells: int = None):
+        if self._initialized:
+            return
+        self.ttl = ttl or QUERY_RESULT_TTL
+        self.max_cells = max_cells or QUERY_RESULT_CACHE_CELLS
+        self._results: "OrderedDict[str, ColumnarResult]" = OrderedDict()
+        self._cells = 0
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _size(result: ColumnarResult) -> int:
+        return result['row_count'] * max(1, len(result['columns']))
+
+    def put(self, result: ColumnarResult) -> str:
+        """Cache ``result``; returns its query id"""
+        with self._lock:
+            self._results[result['query_id']] = result
+            self._cells += self._size(result)
+            self._evict()
+        return result['query_id']
+
+    def get(self, query_id: str) -> Optional[ColumnarResult]:
+        """Cached result for ``query_id``, or None if unknown or expired"""
+        with self._lock:
+            result = self._results.get(query_id)
+            if result is None:
+                return None
+            if time.time() - result['created_at'] > self.ttl:
+                self._remove(query_id)
+                return None
+            self._results.move_to_end(query_id)
+            return result
+
+    def _remove(self, query_id: str):
+        result = self._results.pop(query_id)
+        self._cells -= self._size(result)
+
+    def _evict(self):
+        now = time.time()
+        for query_id in [key for key, result in self._results.items() if now - result['created_at'] > self.ttl]:
+            self._remove(query_id)
+        # Keep at least the newest result even if it alone exceeds the budget
+        while self._cells > self.max_cells and len(self._results) > 1:
+            self._remove(next(iter(self._results)))
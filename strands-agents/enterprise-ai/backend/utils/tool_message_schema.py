@@ -9,16 +9,20 @@ class MessageSchema(TypedDict):
     messages: list
     query_results: list
     status: NotRequired[str]  # Status field for API responses
+    query_id: NotRequired[str]  # Key of the full result in the query result cache
+    row_count: NotRequired[int]  # Rows in the full result (query_results may hold only the first page)
     
     @staticmethod
-    def create(response="", messages=[], query_results=[], show_graph=False, status="success"):
+    def create(response="", messages=[], query_results=[], show_graph=False, status="success", query_id="", row_count=0):
         """Factory method to create a MessageSchema with default values."""
         return MessageSchema(
             response=response,
             messages=messages,
             query_results=query_results,
             show_graph=show_graph,
-            status=status
+            status=status,
+            query_id=query_id,
+            row_count=row_count
         )
 
 
@@ -137,6 +137,7 @@ const Chat = ({
                     parsedResults.length > 0
                   ) {
                     aiResponse.queryResults = parsedResults;
+                    aiResponse.queryId = msg.query_id;
                     console.log("Parsed query results:", parsedResults);
 
                     // Handle chart data if available
@@ -359,6 +360,7 @@ const Chat = ({
             // Handle query results
             if (queryResults.length > 0) {
               json.queryResults = queryResults;
+              json.queryId = apiResponse.query_id;
 
               // Set chart to loading if show_graph is true
               if (showGraph) {
@@ -170,6 +170,7 @@ export const invokeStreamingApi = (
                         response: latestMessage.ai,
                         thread_id: data.thread_id || "",
                         query_results: queryResults,
+                        query_id: latestMessage.query_id,
                         show_graph: latestMessage.show_graph || false,
                         usage: latestMessage.usage || {
                           input: 0,
@@ -289,6 +290,7 @@ export const generateChartApi = async (answer) => {
       body: JSON.stringify({
         text: userQuery,
         queryResults: answer.queryResults,
+        query_id: answer.queryId,
         user_id: answer.user_id || "Deepesh",
         thread_id: window.threadId ,
       }),
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark full rebuild vs incremental refresh of daily_sales_report.
+
+Grows the transactions table in steps (backwards in time, at a fixed daily
+volume) and, at each size, times a full rebuild and an incremental refresh
+after a fixed batch of changes: new rows, a share of them back-dated, plus
+PENDING -> COMPLETED/REFUNDED updates. The incremental result is checked
+against a full rebuild.
+
+Run it against a scratch database: it inserts synthetic transactions
+(and minimal merchants/terminals if none exist).
+
+    python benchmark_sales_report_refresh.py --sizes 100000 400000 1600000 --delta 1000
+"""
+import argparse
+import time
+
+from db_connection import db
+from create_tables import create_tables
+from sales_report_table import create_sales_report_table, rebuild_sales_report, refresh_sales_report
+
+SEED_MERCHANTS = """
+INSERT INTO merchants (name, city, state)
+SELECT 'Bench Merchant ' || i, 'City', (ARRAY['Karnataka', 'Maharashtra', 'Delhi', 'West Bengal', 'Assam', 'Gujarat'])[1 + i % 6]
+FROM generate_series(1, 60) AS i
+"""
+
+SEED_TERMINALS = """
+INSERT INTO pos_terminals (merchant_id, terminal_name, serial_number, terminal_type)
+SELECT m.merchant_id, 'Bench Terminal', 'BENCH-' || m.merchant_id || '-' || i, 'ANDROID'
+FROM merchants m CROSS JOIN generate_series(1, 3) AS i
+"""
+
+# History grows backwards in time at a fixed daily volume, like a real ledger:
+# rows land between :from_days and :to_days days before the recent window
+INSERT_HISTORY = """
+INSERT INTO transactions (pos_terminal_id, amount, transaction_status, transaction_date)
+WITH terminals AS (SELECT array_agg(pos_terminal_id) AS ids FROM pos_terminals)
+SELECT
+    ids[1 + floor(random() * array_length(ids, 1))::int],
+    round((10 + random() * 9990)::numeric, 2),
+    (ARRAY['COMPLETED', 'COMPLETED', 'COMPLETED', 'PENDING', 'FAILED', 'REFUNDED', 'CANCELLED'])[1 + floor(random() * 7)],
+    NOW() - INTERVAL '2 days' - (:from_days + random() * (:to_days - :from_days)) * INTERVAL '1 day'
+FROM terminals, generate_series(1, :rows)
+"""
+
+# New rows since the last refresh; :backdated share arrives late, dated up to 90 days back
+INSERT_NEW = """
+INSERT INTO transactions (pos_terminal_id, amount, transaction_status, transaction_date)
+WITH terminals AS (SELECT array_agg(pos_terminal_id) AS ids FROM pos_terminals)
+SELECT
+    ids[1 + floor(random() * array_length(ids, 1))::int],
+    round((10 + random() * 9990)::numeric, 2),
+    (ARRAY['COMPLETED', 'PENDING', 'PENDING', 'FAILED'])[1 + floor(random() * 4)],
+    CASE WHEN random() < :backdated
+         THEN NOW() - INTERVAL '2 days' - random() * INTERVAL '90 days'
+         ELSE NOW() - random() * INTERVAL '1 day'
+    END
+FROM terminals, generate_series(1, :rows)
+"""
+
+# Settle the most recent pending payments
+SETTLE_PENDING = """
+UPDATE transactions
+SET transaction_status = CASE WHEN random() < 0.8 THEN 'COMPLETED' ELSE 'REFUNDED' END
+WHERE transaction_id IN (
+    SELECT transaction_id FROM transactions WHERE transaction_status = 'PENDING' ORDER BY transaction_id DESC LIMIT :rows
+)
+"""
+
+REPORT_CHECKSUM = """
+SELECT COUNT(*), COALESCE(SUM(total_transactions), 0), COALESCE(SUM(total_sales), 0),
+       COALESCE(SUM(completed_transactions), 0), COALESCE(SUM(pending_transactions), 0),
+       COALESCE(SUM(refunded_transactions), 0)
+FROM daily_sales_report
+"""
+
+
+def ensure_schema():
+    create_tables()
+    if db.fetch_one("SELECT COUNT(*) FROM merchants")[0] == 0:
+        db.execute_sql(SEED_MERCHANTS)
+    if db.fetch_one("SELECT COUNT(*) FROM pos_terminals")[0] == 0:
+        db.execute_sql(SEED_TERMINALS)
+    create_sales_report_table()
+
+
+def grow_history(current, size, rows_per_day):
+    db.execute_sql(INSERT_HISTORY, {
+        "rows": size - current, "from_days": current / rows_per_day, "to_days": size / rows_per_day
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="daily_sales_report refresh benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 400000, 1600000],
+                        help="Transaction table sizes to measure at")
+    parser.add_argument("--delta", type=int, default=1000, help="New rows per refresh")
+    parser.add_argument("--updates", type=int, default=200, help="PENDING rows settled per refresh")
+    parser.add_argument("--backdated", type=float, default=0.1, help="Share of new rows dated in the past")
+    parser.add_argument("--rows-per-day", type=int, default=2000, help="Daily volume of the synthetic history")
+    args = parser.parse_args()
+
+    ensure_schema()
+    db.execute_sql("ANALYZE transactions")
+
+    print(f"{'transactions':>12} | {'full rebuild':>12} | {'incremental':>11} | {'buckets':>7} | {'matches':>7}")
+    for size in sorted(args.sizes):
+        current = db.fetch_one("SELECT COUNT(*) FROM transactions")[0]
+        if size > current:
+            grow_history(current, size, args.rows_per_day)
+            db.execute_sql("ANALYZE transactions")
+        rebuild_sales_report()
+
+        db.execute_sql(INSERT_NEW, {"rows": args.delta, "backdated": args.backdated})
+        db.execute_sql(SETTLE_PENDING, {"rows": args.updates})
+
+        stats = refresh_sales_report()
+        incremental = tuple(db.fetch_one(REPORT_CHECKSUM))
+
+        start = time.perf_counter()
+        rebuild_sales_report()
+        full_time = time.perf_counter() - start
+        full = tuple(db.fetch_one(REPORT_CHECKSUM))
+
+        print(f"{size:>12} | {full_time * 1000:>10.0f}ms | {stats['seconds'] * 1000:>9.0f}ms | "
+              f"{stats['buckets_refreshed']:>7} | {'yes' if incremental == full else 'NO':>7}")
+
+
+if __name__ == "__main__":
+    main()
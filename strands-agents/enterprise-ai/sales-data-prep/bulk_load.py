@@ -0,0 +1,328 @@
+"""
+Bulk synthetic data loader using PostgreSQL COPY
+
+The per-table scripts (generate_merchants.py, transactions.py, ...) build one
+dict per row and insert them with executemany, which is fine for the default
+dataset but far too slow for load-test volumes. This loader generates each
+chunk of rows column-wise with NumPy, serializes it to an in-memory CSV
+buffer and streams it with COPY FROM STDIN. Chunks are generated and copied
+by parallel worker processes, each on its own connection.
+
+Foreign keys are drawn from id arrays preloaded from the parent tables and
+checked against them before a chunk is copied, so no per-row lookups are
+needed.
+
+Usage:
+    python bulk_load.py --transactions 5000000
+    python bulk_load.py --merchants 10000 --gateways 20 --payment-methods 10 --transactions 20000000 --workers 8
+"""
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from db_connection import db
+from generate_merchants import merchant_names, states_cities
+from payment_gateways import api_endpoint_patterns, gateway_names, gateway_types
+from payment_methods import payment_methods
+from pos_terminals import locations, terminal_prefixes, terminal_statuses, terminal_types
+from transactions import status_weights, transaction_statuses
+
+TRANSACTION_START = np.datetime64('2024-04-01T00:00:00')
+TRANSACTION_END = np.datetime64('2025-06-22T23:59:59')
+
+UPPERCASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+DIGITS = '0123456789'
+
+COMPANY_SUFFIXES = ['Pvt Ltd', 'Ltd', 'LLP', 'and Sons', 'Enterprises', 'Traders', 'Group', 'Co']
+STREET_NAMES = ['MG Road', 'Station Road', 'Park Street', 'Church Street', 'Gandhi Nagar', 'Nehru Marg',
+                'Residency Road', 'Market Road', 'Ring Road', 'Lake View Road']
+UPI_PREFIXES = ['UPI', 'BHIM', 'GPay', 'PhonePe', 'Paytm']
+
+
+# ---------------------------------------------------------------------------
+# Column helpers
+# ---------------------------------------------------------------------------
+
+def random_strings(rng, alphabet, size, length):
+    """``size`` random strings of ``length`` characters drawn from ``alphabet``"""
+    chars = np.array(list(alphabet))[rng.integers(0, len(alphabet), (size, length))]
+    return np.ascontiguousarray(chars).view(f'<U{length}').ravel()
+
+
+def random_digits(rng, size, length):
+    return random_strings(rng, DIGITS, size, length)
+
+
+def concat(*parts):
+    """Element-wise string concatenation of arrays and scalars"""
+    result = np.asarray(parts[0]).astype(str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part).astype(str))
+    return result
+
+
+def check_foreign_keys(column, valid_ids, name):
+    """Reject the chunk if any non-null value of ``column`` is not in ``valid_ids``"""
+    values = column[~pd.isna(column)]
+    missing = ~np.isin(values, valid_ids)
+    if missing.any():
+        raise ValueError(f"{int(missing.sum())} rows reference unknown {name} ids, e.g. {values[missing][:5].tolist()}")
+
+
+# ---------------------------------------------------------------------------
+# Chunk generators: (rng, rows, context) -> DataFrame in COPY column order
+# ---------------------------------------------------------------------------
+
+def generate_merchants_chunk(rng, rows, context):
+    state_idx = rng.integers(0, len(states_cities), rows)
+    states = np.array([state for state, _ in states_cities])[state_idx]
+    cities = np.array([city for _, city in states_cities])[state_idx]
+    return pd.DataFrame({
+        'name': concat(np.array(merchant_names)[rng.integers(0, len(merchant_names), rows)], ' ',
+                       np.array(COMPANY_SUFFIXES)[rng.integers(0, len(COMPANY_SUFFIXES), rows)]),
+        'address': concat(rng.integers(1, 999, rows), ', ',
+                          np.array(STREET_NAMES)[rng.integers(0, len(STREET_NAMES), rows)]),
+        'city': cities,
+        'state': states,
+        'pin_code': concat(rng.integers(110001, 855999, rows)),
+        'contact_number': concat('+91-', rng.integers(7000000000, 9999999999, rows, dtype=np.int64)),
+        'email': concat('merchant', context['offset'] + np.arange(rows), '@example.in'),
+        'gst_number': concat(np.char.zfill(rng.integers(1, 37, rows).astype(str), 2),
+                             random_strings(rng, UPPERCASE, rows, 5), rng.integers(1000, 10000, rows),
+                             random_strings(rng, UPPERCASE, rows, 1), '1Z', rng.integers(1, 10, rows))
+    })
+
+
+def generate_payment_gateways_chunk(rng, rows, context):
+    index = context['offset'] + np.arange(rows)
+    base_names = np.array(gateway_names)[index % len(gateway_names)]
+    # Past the built-in list, repeat names with a numeric suffix
+    names = np.where(index < len(gateway_names), base_names, concat(base_names, ' ', index // len(gateway_names) + 1))
+    endpoints = [api_endpoint_patterns.get(name, f"https://api.{name.lower().replace(' ', '')}.com/v1/")
+                 for name in base_names]
+    return pd.DataFrame({
+        'gateway_name': names,
+        'gateway_type': np.array(gateway_types)[rng.integers(0, len(gateway_types), rows)],
+        'api_endpoint': endpoints
+    })
+
+
+def generate_payment_methods_chunk(rng, rows, context):
+    index = context['offset'] + np.arange(rows)
+    methods = [payment_methods[i % len(payment_methods)] for i in index]
+    return pd.DataFrame({
+        'method_name': [method['method_name'] if i < len(payment_methods)
+                        else f"{method['method_name']} {i // len(payment_methods) + 1}"
+                        for i, method in zip(index, methods)],
+        'description': [method['description'] for method in methods]
+    })
+
+
+def generate_pos_terminals_chunk(rng, rows, context):
+    merchant_ids = context['merchant_ids']
+    check_foreign_keys(merchant_ids, context['valid_merchant_ids'], 'merchant')
+
+    # Serial numbers encode a run-unique sequence (2 letters + 6 digits) so they never collide within a load
+    sequence = context['serial_base'] + context['offset'] + np.arange(rows)
+    letters = np.array(list(UPPERCASE))
+    serials = concat(np.array(['PT', 'ST', 'MT', 'KT'])[rng.integers(0, 4, rows)], '-',
+                     letters[(sequence // 1_000_000 // 26) % 26], letters[(sequence // 1_000_000) % 26],
+                     np.char.zfill((sequence % 1_000_000).astype(str), 6))
+
+    # 70% of terminals have a maintenance date within the last year
+    now = np.datetime64(datetime.now().replace(microsecond=0))
+    maintenance = pd.Series(now - rng.integers(0, 366 * 86400, rows).astype('timedelta64[s]'))
+    maintenance[rng.random(rows) >= 0.7] = pd.NaT
+
+    frame = pd.DataFrame({
+        'merchant_id': merchant_ids,
+        'terminal_name': concat(np.array(terminal_prefixes)[rng.integers(0, len(terminal_prefixes), rows)], ' ',
+                                rng.integers(1, 100, rows)),
+        'serial_number': serials,
+        'terminal_type': np.array(terminal_types)[rng.integers(0, len(terminal_types), rows)],
+        'location': np.array(locations)[rng.integers(0, len(locations), rows)],
+        'status': np.array(terminal_statuses)[rng.integers(0, len(terminal_statuses), rows)],
+        'last_maintenance': maintenance
+    })
+    # The serial_number column is UNIQUE; drop the rare clash with rows generated elsewhere
+    return frame[~np.isin(serials, context['existing_serials'])]
+
+
+def generate_transactions_chunk(rng, rows, context):
+    terminal_ids = context['terminal_ids'][rng.integers(0, len(context['terminal_ids']), rows)]
+    method_ids = context['payment_method_ids'][rng.integers(0, len(context['payment_method_ids']), rows)]
+    gateway_ids = context['payment_gateway_ids'][rng.integers(0, len(context['payment_gateway_ids']), rows)]
+    check_foreign_keys(terminal_ids, context['terminal_ids'], 'pos_terminal')
+    check_foreign_keys(method_ids, context['payment_method_ids'], 'payment_method')
+    check_foreign_keys(gateway_ids, context['payment_gateway_ids'], 'payment_gateway')
+
+    span = int((TRANSACTION_END - TRANSACTION_START) / np.timedelta64(1, 's'))
+    dates = TRANSACTION_START + rng.integers(0, span + 1, rows).astype('timedelta64[s]')
+
+    # Same conventions as transactions.py: methods 1/2 are cards, 3 is UPI
+    is_card = np.isin(method_ids, [1, 2])
+    is_upi = method_ids == 3
+    card_last4 = np.where(is_card, random_digits(rng, rows, 4), None)
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    upi_ids = concat(np.array(UPI_PREFIXES)[rng.integers(0, len(UPI_PREFIXES), rows)], f'-{stamp}-',
+                     random_strings(rng, DIGITS + UPPERCASE, rows, 8))
+
+    weights = np.array(status_weights) / np.sum(status_weights)
+    return pd.DataFrame({
+        'pos_terminal_id': terminal_ids,
+        'payment_method_id': method_ids,
+        'amount': np.round(rng.uniform(10, 10000, rows), 2),
+        'transaction_status': np.array(transaction_statuses)[rng.choice(len(transaction_statuses), rows, p=weights)],
+        'transaction_date': dates,
+        'card_number_last4': card_last4,
+        'upi_transaction_id': np.where(is_upi, upi_ids, None),
+        'payment_gateway_id': gateway_ids
+    })
+
+
+GENERATORS = {
+    'merchants': generate_merchants_chunk,
+    'payment_gateways': generate_payment_gateways_chunk,
+    'payment_methods': generate_payment_methods_chunk,
+    'pos_terminals': generate_pos_terminals_chunk,
+    'transactions': generate_transactions_chunk,
+}
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    db.get_engine().dispose(close=False)
+
+
+def load_chunk(table, rows, seed, context):
+    """Generate one chunk and COPY it into ``table``; returns (rows loaded, generate s, copy s)"""
+    start = time.perf_counter()
+    frame = GENERATORS[table](np.random.default_rng(seed), rows, context)
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, float_format='%.2f', date_format='%Y-%m-%d %H:%M:%S')
+    buffer.seek(0)
+    generated = time.perf_counter()
+    db.copy_from(table, list(frame.columns), buffer)
+    return len(frame), generated - start, time.perf_counter() - generated
+
+
+def bulk_load(table, chunks, workers, seed):
+    """
+    Load ``chunks`` (a list of (rows, context) pairs) into ``table`` in parallel.
+
+    Each chunk commits on its own, so a failure leaves earlier chunks loaded.
+    """
+    total_rows = sum(rows for rows, _ in chunks)
+    print(f"Loading {total_rows:,} rows into {table} in {len(chunks)} chunks with {workers} workers...")
+    start = time.perf_counter()
+    loaded = generate_time = copy_time = 0.0
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(load_chunk, table, rows, chunk_seed, context)
+                   for (rows, context), chunk_seed in zip(chunks, seeds)]
+        for future in futures:
+            rows, generated, copied = future.result()
+            loaded += rows
+            generate_time += generated
+            copy_time += copied
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {table}: {int(loaded):,} rows in {elapsed:.2f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/sec; "
+          f"worker time {generate_time:.1f}s generating, {copy_time:.1f}s copying)")
+    return int(loaded)
+
+
+def split(total, chunk_size):
+    """Chunk sizes and offsets covering ``total`` rows"""
+    return [(min(chunk_size, total - offset), offset) for offset in range(0, total, chunk_size)]
+
+
+def fetch_ids(sql):
+    return np.array([row[0] for row in db.fetch_all(sql)], dtype=np.int64)
+
+
+def load_simple_table(table, count, chunk_size, workers, seed):
+    existing = db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0]
+    chunks = [(rows, {'offset': existing + offset}) for rows, offset in split(count, chunk_size)]
+    return bulk_load(table, chunks, workers, seed)
+
+
+def load_pos_terminals(min_per_merchant, max_per_merchant, chunk_size, workers, seed):
+    merchant_ids = fetch_ids("SELECT merchant_id FROM merchants ORDER BY merchant_id")
+    if not len(merchant_ids):
+        print("No merchants found in the database. Load merchants first.")
+        return 0
+    existing_serials = np.array([row[0] for row in db.fetch_all("SELECT serial_number FROM pos_terminals")], dtype=str)
+
+    rng = np.random.default_rng(seed)
+    per_merchant = rng.integers(min_per_merchant, max_per_merchant + 1, len(merchant_ids))
+    terminal_merchants = np.repeat(merchant_ids, per_merchant)
+    serial_base = int(rng.integers(0, 26 * 26 * 1_000_000 - len(terminal_merchants)))
+    chunks = [
+        (rows, {
+            'offset': offset,
+            'serial_base': serial_base,
+            'merchant_ids': terminal_merchants[offset:offset + rows],
+            'valid_merchant_ids': merchant_ids,
+            'existing_serials': existing_serials
+        })
+        for rows, offset in split(len(terminal_merchants), chunk_size)
+    ]
+    return bulk_load('pos_terminals', chunks, workers, seed)
+
+
+def load_transactions(count, chunk_size, workers, seed):
+    context = {
+        'terminal_ids': fetch_ids("SELECT pos_terminal_id FROM pos_terminals WHERE status = 'ACTIVE'"),
+        'payment_method_ids': fetch_ids("SELECT payment_method_id FROM payment_methods"),
+        'payment_gateway_ids': fetch_ids("SELECT payment_gateway_id FROM payment_gateways"),
+    }
+    if not all(len(ids) for ids in context.values()):
+        print("Missing required data in related tables. Load terminals, payment methods and gateways first.")
+        return 0
+    chunks = [(rows, context) for rows, _ in split(count, chunk_size)]
+    return bulk_load('transactions', chunks, workers, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic payments data with COPY")
+    parser.add_argument("--merchants", type=int, default=0, help="Merchants to generate")
+    parser.add_argument("--gateways", type=int, default=0, help="Payment gateways to generate")
+    parser.add_argument("--payment-methods", type=int, default=0, help="Payment methods to generate")
+    parser.add_argument("--terminals-per-merchant", type=int, nargs=2, metavar=("MIN", "MAX"),
+                        help="Generate MIN-MAX POS terminals for every merchant")
+    parser.add_argument("--transactions", type=int, default=0, help="Transactions to generate")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per generated/copied chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Parallel worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total = 0
+    if args.merchants:
+        total += load_simple_table('merchants', args.merchants, args.chunk_size, args.workers, args.seed)
+    if args.gateways:
+        total += load_simple_table('payment_gateways', args.gateways, args.chunk_size, args.workers, args.seed)
+    if args.payment_methods:
+        total += load_simple_table('payment_methods', args.payment_methods, args.chunk_size, args.workers, args.seed)
+    if args.terminals_per_merchant:
+        total += load_pos_terminals(*args.terminals_per_merchant, args.chunk_size, args.workers, args.seed)
+    if args.transactions:
+        total += load_transactions(args.transactions, args.chunk_size, args.workers, args.seed)
+
+    elapsed = time.perf_counter() - start
+    print(f"📊 Loaded {total:,} rows in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/sec overall)")
+
+
+if __name__ == "__main__":
+    main()
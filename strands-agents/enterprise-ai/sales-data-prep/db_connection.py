@@ -54,6 +54,18 @@ class DatabaseConnection:
             connection.commit()
             return result
     
+    def copy_from(self, table, columns, file_obj):
+        """Bulk load CSV rows from a file-like object with COPY FROM STDIN"""
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", file_obj
+                )
+            connection.commit()
+        finally:
+            connection.close()
+    
     def fetch_all(self, sql_statement, parameters=None):
         """Fetch all results from a SELECT query"""
         with self.engine.connect() as connection:
@@ -1,3 +1,8 @@
+import argparse
+import time
+
+from sqlalchemy import text
+
 from db_connection import db
 
 # Define SQL statements as separate statements (RDS Data API doesn't support multi-statements)
@@ -82,8 +87,9 @@ CREATE_INDEX_YEAR_QUARTER = """
 CREATE INDEX IF NOT EXISTS idx_daily_sales_year_quarter ON daily_sales_report(year, quarter);
 """
 
-# SQL to populate the daily sales report table
-POPULATE_SALES_REPORT = """
+# Aggregation shared by the full rebuild and the incremental refresh
+# (which aggregates only the (date, state) buckets being refreshed)
+SALES_REPORT_AGGREGATE = """
 INSERT INTO daily_sales_report (
     transaction_date,
     year,
@@ -120,14 +126,7 @@ SELECT
     COUNT(CASE WHEN t.transaction_status = 'PENDING' THEN 1 END) AS pending_transactions,
     COUNT(CASE WHEN t.transaction_status = 'REFUNDED' THEN 1 END) AS refunded_transactions,
     COUNT(CASE WHEN t.transaction_status = 'CANCELLED' THEN 1 END) AS cancelled_transactions
-FROM 
-    transactions t
-JOIN 
-    pos_terminals pt ON t.pos_terminal_id = pt.pos_terminal_id
-JOIN 
-    merchants m ON pt.merchant_id = m.merchant_id
-JOIN 
-    state_zones sz ON m.state = sz.state_name
+{from_clause}
 GROUP BY 
     DATE(t.transaction_date),
     EXTRACT(YEAR FROM t.transaction_date),
@@ -136,8 +135,179 @@ GROUP BY
     TO_CHAR(t.transaction_date, 'Month'),
     m.state,
     sz.zone
-ORDER BY 
-    transaction_date, state;
+{conflict_clause}
+"""
+
+# SQL to populate the daily sales report table
+POPULATE_SALES_REPORT = SALES_REPORT_AGGREGATE.format(
+    from_clause="""FROM 
+    transactions t
+JOIN 
+    pos_terminals pt ON t.pos_terminal_id = pt.pos_terminal_id
+JOIN 
+    merchants m ON pt.merchant_id = m.merchant_id
+JOIN 
+    state_zones sz ON m.state = sz.state_name""",
+    conflict_clause="""ORDER BY 
+    transaction_date, state;"""
+)
+
+# Recompute the buckets listed in the affected_buckets temp table, then drop
+# buckets that no longer have any transactions (deleted or moved rows).
+# The LATERAL join makes each bucket an index range scan per terminal on
+# idx_transactions_terminal_date, so cost tracks the changed buckets rather
+# than the size of transactions.
+REFRESH_AFFECTED_BUCKETS = """
+WITH refreshed AS (
+""" + SALES_REPORT_AGGREGATE.format(
+    from_clause="""FROM 
+    affected_buckets b
+JOIN 
+    merchants m ON m.state = b.state
+JOIN 
+    pos_terminals pt ON pt.merchant_id = m.merchant_id
+JOIN 
+    state_zones sz ON m.state = sz.state_name
+JOIN LATERAL (
+    SELECT *
+    FROM transactions
+    WHERE transactions.pos_terminal_id = pt.pos_terminal_id
+      AND transactions.transaction_date >= b.transaction_date
+      AND transactions.transaction_date < b.transaction_date + 1
+    OFFSET 0  -- keeps the planner from flattening this into a hash join over all transactions
+) t ON TRUE""",
+    conflict_clause="""ON CONFLICT (transaction_date, state) DO UPDATE SET
+    year = EXCLUDED.year,
+    quarter = EXCLUDED.quarter,
+    month = EXCLUDED.month,
+    month_name = EXCLUDED.month_name,
+    zone = EXCLUDED.zone,
+    total_transactions = EXCLUDED.total_transactions,
+    total_sales = EXCLUDED.total_sales,
+    avg_transaction_value = EXCLUDED.avg_transaction_value,
+    completed_transactions = EXCLUDED.completed_transactions,
+    failed_transactions = EXCLUDED.failed_transactions,
+    pending_transactions = EXCLUDED.pending_transactions,
+    refunded_transactions = EXCLUDED.refunded_transactions,
+    cancelled_transactions = EXCLUDED.cancelled_transactions
+RETURNING transaction_date, state"""
+) + """
+)
+DELETE FROM daily_sales_report r
+USING affected_buckets b
+WHERE r.transaction_date = b.transaction_date
+  AND r.state = b.state
+  AND NOT EXISTS (
+      SELECT 1 FROM refreshed
+      WHERE refreshed.transaction_date = r.transaction_date AND refreshed.state = r.state
+  );
+"""
+
+# --- Incremental refresh bookkeeping ---
+#
+# Statement-level triggers log the (date, terminal) buckets that inserts,
+# updates and deletes (e.g. PENDING -> COMPLETED/REFUNDED) touch, and a
+# refresh consumes the log. Inserts are logged too rather than found by a
+# transaction_id high-water mark: a transaction can commit after a refresh
+# with an id below that refresh's maximum, and a mark would skip it for good.
+# The mark is still kept for the new/late row counts a refresh reports.
+
+CREATE_REFRESH_STATE_TABLE = """
+CREATE TABLE IF NOT EXISTS sales_report_refresh_state (
+    report_name VARCHAR(50) PRIMARY KEY,
+    last_transaction_id INTEGER NOT NULL DEFAULT 0,
+    last_transaction_date TIMESTAMP WITH TIME ZONE,
+    last_refreshed_at TIMESTAMP WITH TIME ZONE
+);
+"""
+
+CREATE_CHANGES_TABLE = """
+CREATE TABLE IF NOT EXISTS daily_sales_report_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    transaction_date DATE NOT NULL,
+    pos_terminal_id INTEGER
+);
+"""
+
+CREATE_INDEX_TRANSACTIONS_TERMINAL_DATE = """
+CREATE INDEX IF NOT EXISTS idx_transactions_terminal_date ON transactions(pos_terminal_id, transaction_date);
+"""
+
+CREATE_CHANGE_LOG_FUNCTION = """
+CREATE OR REPLACE FUNCTION log_sales_report_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO daily_sales_report_changes (transaction_date, pos_terminal_id)
+        SELECT DISTINCT DATE(n.transaction_date), n.pos_terminal_id
+        FROM new_rows n;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO daily_sales_report_changes (transaction_date, pos_terminal_id)
+        SELECT DISTINCT DATE(o.transaction_date), o.pos_terminal_id
+        FROM old_rows o;
+    ELSE
+        -- Only rows whose reported columns changed; log both the old and the new bucket
+        INSERT INTO daily_sales_report_changes (transaction_date, pos_terminal_id)
+        SELECT DISTINCT bucket_date, bucket_terminal
+        FROM old_rows o
+        JOIN new_rows n ON n.transaction_id = o.transaction_id
+        CROSS JOIN LATERAL (VALUES
+            (DATE(o.transaction_date), o.pos_terminal_id),
+            (DATE(n.transaction_date), n.pos_terminal_id)
+        ) AS bucket(bucket_date, bucket_terminal)
+        WHERE (o.transaction_status, o.amount, o.transaction_date, o.pos_terminal_id)
+              IS DISTINCT FROM (n.transaction_status, n.amount, n.transaction_date, n.pos_terminal_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Transition tables only allow one event per trigger, hence one trigger per event
+CHANGE_LOG_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS trg_sales_report_inserts ON transactions;",
+    """
+    CREATE TRIGGER trg_sales_report_inserts
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_sales_report_changes();
+    """,
+    "DROP TRIGGER IF EXISTS trg_sales_report_updates ON transactions;",
+    """
+    CREATE TRIGGER trg_sales_report_updates
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_sales_report_changes();
+    """,
+    "DROP TRIGGER IF EXISTS trg_sales_report_deletes ON transactions;",
+    """
+    CREATE TRIGGER trg_sales_report_deletes
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_sales_report_changes();
+    """
+]
+
+# Takes the logged changes out of the log and keeps exactly those rows: deleting by
+# a change_id bound read earlier could drop entries that committed in between
+CONSUME_LOGGED_CHANGES = [
+    """
+    CREATE TEMP TABLE consumed_changes ON COMMIT DROP AS
+    SELECT transaction_date, pos_terminal_id FROM daily_sales_report_changes WITH NO DATA;
+    """,
+    """
+    WITH consumed AS (
+        DELETE FROM daily_sales_report_changes RETURNING transaction_date, pos_terminal_id
+    )
+    INSERT INTO consumed_changes SELECT transaction_date, pos_terminal_id FROM consumed;
+    """
+]
+
+COLLECT_AFFECTED_BUCKETS = """
+CREATE TEMP TABLE affected_buckets ON COMMIT DROP AS
+SELECT DISTINCT c.transaction_date, m.state
+FROM consumed_changes c
+JOIN pos_terminals pt ON c.pos_terminal_id = pt.pos_terminal_id
+JOIN merchants m ON pt.merchant_id = m.merchant_id;
 """
 
 def execute_sql(sql, description):
@@ -162,6 +332,104 @@ def insert_state_zone(state, zone):
         print(f"❌ Error inserting state zone mapping for {state}: {e}")
         return False
 
+def create_refresh_tracking():
+    """Create the high-water mark table and the change-log triggers used by incremental refresh"""
+    ok = execute_sql(CREATE_REFRESH_STATE_TABLE, "Creating refresh state table")
+    ok = execute_sql(CREATE_CHANGES_TABLE, "Creating report change log table") and ok
+    ok = execute_sql(CREATE_INDEX_TRANSACTIONS_TERMINAL_DATE, "Creating transactions terminal/date index") and ok
+    ok = execute_sql(CREATE_CHANGE_LOG_FUNCTION, "Creating change log function") and ok
+    for statement in CHANGE_LOG_TRIGGERS:
+        ok = execute_sql(statement, "Creating change log triggers") and ok
+    return ok
+
+def rebuild_sales_report():
+    """Rebuild daily_sales_report from scratch and reset the incremental high-water mark"""
+    start = time.perf_counter()
+    with db.get_engine().begin() as connection:
+        max_id, max_date = connection.execute(text(
+            "SELECT COALESCE(MAX(transaction_id), 0), MAX(transaction_date) FROM transactions"
+        )).fetchone()
+        connection.execute(text("TRUNCATE daily_sales_report"))
+        # Everything logged so far is covered by the rebuild
+        connection.execute(text("DELETE FROM daily_sales_report_changes"))
+        connection.execute(text(POPULATE_SALES_REPORT))
+        _save_high_water_mark(connection, max_id, max_date)
+    return time.perf_counter() - start
+
+def refresh_sales_report():
+    """
+    Incrementally refresh daily_sales_report.
+
+    Only (date, state) buckets touched since the last refresh are recomputed:
+    the buckets logged by the insert/update/delete triggers (new rows,
+    including late rows dated in the past, status changes, refunds,
+    corrections). Returns refresh stats.
+    """
+    start = time.perf_counter()
+    with db.get_engine().begin() as connection:
+        # Row lock so overlapping scheduled runs serialize instead of double-counting
+        connection.execute(text(
+            "INSERT INTO sales_report_refresh_state (report_name) VALUES ('daily_sales_report') "
+            "ON CONFLICT (report_name) DO NOTHING"
+        ))
+        last_id, last_date = connection.execute(text(
+            "SELECT last_transaction_id, last_transaction_date FROM sales_report_refresh_state "
+            "WHERE report_name = 'daily_sales_report' FOR UPDATE"
+        )).fetchone()
+
+        max_id = connection.execute(text(
+            "SELECT COALESCE(MAX(transaction_id), 0) FROM transactions"
+        )).scalar()
+        new_rows, late_rows, max_date = connection.execute(text(
+            "SELECT COUNT(*), COUNT(*) FILTER (WHERE transaction_date < :last_date), MAX(transaction_date) "
+            "FROM transactions WHERE transaction_id > :last_id AND transaction_id <= :max_id"
+        ), {"last_id": last_id, "max_id": max_id, "last_date": last_date}).fetchone()
+
+        for statement in CONSUME_LOGGED_CHANGES:
+            connection.execute(text(statement))
+        logged_changes = connection.execute(text("SELECT COUNT(*) FROM consumed_changes")).scalar()
+        connection.execute(text(COLLECT_AFFECTED_BUCKETS))
+        buckets = connection.execute(text("SELECT COUNT(*) FROM affected_buckets")).scalar()
+        if buckets:
+            connection.execute(text("ANALYZE affected_buckets"))
+            connection.execute(text(REFRESH_AFFECTED_BUCKETS))
+        _save_high_water_mark(connection, max_id, max(filter(None, [last_date, max_date]), default=None))
+
+    return {
+        "new_rows": new_rows,
+        "late_rows": late_rows,
+        "logged_changes": logged_changes,
+        "buckets_refreshed": buckets,
+        "high_water_mark": max_id,
+        "seconds": time.perf_counter() - start
+    }
+
+def _save_high_water_mark(connection, max_id, max_date):
+    connection.execute(text("""
+        INSERT INTO sales_report_refresh_state (report_name, last_transaction_id, last_transaction_date, last_refreshed_at)
+        VALUES ('daily_sales_report', :max_id, :max_date, NOW())
+        ON CONFLICT (report_name) DO UPDATE SET
+            last_transaction_id = EXCLUDED.last_transaction_id,
+            last_transaction_date = EXCLUDED.last_transaction_date,
+            last_refreshed_at = EXCLUDED.last_refreshed_at
+    """), {"max_id": max_id, "max_date": max_date})
+
+def run_refresh_schedule(interval_seconds, max_runs=None):
+    """Run refresh_sales_report every ``interval_seconds`` (forever, or ``max_runs`` times)"""
+    runs = 0
+    while max_runs is None or runs < max_runs:
+        started = time.monotonic()
+        try:
+            stats = refresh_sales_report()
+            print(f"🔄 Refreshed {stats['buckets_refreshed']} buckets "
+                  f"({stats['new_rows']} new rows, {stats['late_rows']} late, "
+                  f"{stats['logged_changes']} logged changes) in {stats['seconds']:.2f}s")
+        except Exception as e:
+            print(f"❌ Incremental refresh failed: {e}")
+        runs += 1
+        if max_runs is None or runs < max_runs:
+            time.sleep(max(0.0, interval_seconds - (time.monotonic() - started)))
+
 def create_sales_report_table():
     print("Creating sales report tables and data...")
     
@@ -184,8 +452,15 @@ def create_sales_report_table():
         execute_sql(CREATE_INDEX_ZONE, "Creating zone index")
         execute_sql(CREATE_INDEX_YEAR_QUARTER, "Creating year-quarter index")
         
+        # Change tracking for incremental refreshes
+        create_refresh_tracking()
+        
         # Populate daily sales report table
-        execute_sql(POPULATE_SALES_REPORT, "Populating daily sales report table")
+        try:
+            elapsed = rebuild_sales_report()
+            print(f"✅ Populating daily sales report table - Success ({elapsed:.2f}s)")
+        except Exception as e:
+            print(f"❌ Populating daily sales report table - Failed: {e}")
     
     # Get count of records in the report table
     try:
@@ -207,4 +482,20 @@ def create_sales_report_table():
         print(f"❌ Error counting report records: {e}")
 
 if __name__ == "__main__":
-    create_sales_report_table()
+    parser = argparse.ArgumentParser(description="Build or refresh the daily sales report table")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", action="store_true",
+                      help="Recompute only the buckets changed since the last refresh")
+    mode.add_argument("--schedule", type=int, metavar="SECONDS",
+                      help="Run the incremental refresh every SECONDS seconds")
+    args = parser.parse_args()
+    
+    if args.incremental:
+        stats = refresh_sales_report()
+        print(f"✅ Refreshed {stats['buckets_refreshed']} buckets "
+              f"({stats['new_rows']} new rows, {stats['late_rows']} late, "
+              f"{stats['logged_changes']} logged changes) in {stats['seconds']:.2f}s")
+    elif args.schedule:
+        run_refresh_schedule(args.schedule)
+    else:
+        create_sales_report_table()
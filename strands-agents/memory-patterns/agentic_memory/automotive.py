@@ -1,5 +1,9 @@
 import random
 import json
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
 from typing import List, Dict, Tuple, Optional
 from typing_extensions import TypedDict
 from datetime import datetime
@@ -13,9 +17,101 @@ class RepairCostEstimate(TypedDict):
     total_cost: float
 
 
+class VehicleCatalog:
+    """
+    Vehicle catalog (VIN -> make, model, year) loaded once from a JSON file and
+    indexed by VIN, VIN prefix, make and model. The file's mtime and size are
+    checked at most every ``check_interval`` seconds and the catalog is
+    reloaded when they change.
+    """
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.by_vin: Dict[str, Tuple[str, str, int]] = {}
+        self.sorted_vins: List[str] = []
+        self.by_make: Dict[str, List[str]] = {}
+        self.by_model: Dict[Tuple[str, str], List[str]] = {}
+        self._signature = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = None
+            if signature != self._signature:
+                self._load(signature)
+            self._checked_at = time.monotonic()
+
+    def _load(self, signature):
+        by_vin = {}
+        if signature is not None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return  # Keep the current catalog; a file caught mid-write is retried at the next check
+            for vin, record in data.items():
+                if isinstance(record, dict) and all(k in record for k in ("make", "model", "year")):
+                    by_vin[vin] = (record["make"], record["model"], record["year"])
+
+        by_make, by_model = defaultdict(list), defaultdict(list)
+        for vin, (make, model, _) in by_vin.items():
+            by_make[make].append(vin)
+            by_model[(make, model)].append(vin)
+        # Swapped in one assignment each, so readers never see a half-built index
+        self.by_vin, self.sorted_vins = by_vin, sorted(by_vin)
+        self.by_make, self.by_model = dict(by_make), dict(by_model)
+        self._signature = signature
+
+    def get(self, vin: str) -> Optional[Tuple[str, str, int]]:
+        self._refresh()
+        return self.by_vin.get(vin)
+
+    def get_many(self, vins: List[str]) -> List[Optional[Tuple[str, str, int]]]:
+        self._refresh()
+        by_vin = self.by_vin
+        return [by_vin.get(vin) for vin in vins]
+
+    def find_by_prefix(self, prefix: str) -> List[str]:
+        """VINs starting with ``prefix``, e.g. a manufacturer identifier (first 3 characters)"""
+        self._refresh()
+        sorted_vins = self.sorted_vins
+        start = bisect_left(sorted_vins, prefix)
+        end = bisect_left(sorted_vins, prefix + "\uffff", lo=start)
+        return sorted_vins[start:end]
+
+    def vins_for(self, make: str, model: Optional[str] = None) -> List[str]:
+        self._refresh()
+        if model is None:
+            return list(self.by_make.get(make, []))
+        return list(self.by_model.get((make, model), []))
+
+
+_vehicle_catalogs: Dict[str, VehicleCatalog] = {}
+_vehicle_catalogs_lock = threading.Lock()
+
+
+def get_vehicle_catalog(path: str = "vechicle_model.json") -> VehicleCatalog:
+    """Catalog shared by every toolkit reading the same file"""
+    key = os.path.abspath(path)
+    with _vehicle_catalogs_lock:
+        if key not in _vehicle_catalogs:
+            _vehicle_catalogs[key] = VehicleCatalog(path)
+        return _vehicle_catalogs[key]
+
+
 class AutomotiveKnowledgeToolkit:
     def __init__(self, vehicle_data_path: str = "vechicle_model.json"):
         self.vehicle_data_path = vehicle_data_path
+        self.catalog = get_vehicle_catalog(vehicle_data_path)
         self.fallback_vehicle_catalog = {
             "Toyota": ["Camry", "Corolla", "RAV4"],
             "Honda": ["Civic", "Accord", "CR-V"],
@@ -45,19 +141,21 @@ class AutomotiveKnowledgeToolkit:
 
         return estimates
 
-    def get_vehicle_info(self, vin: str) -> Tuple[str, str, int]:
-        try:
-            if os.path.exists(self.vehicle_data_path):
-                with open(self.vehicle_data_path, "r") as f:
-                    data = json.load(f)
-                record = data.get(vin)
-                if record and all(k in record for k in ("make", "model", "year")):
-                    return record["make"], record["model"], record["year"]
-        except Exception:
-            pass  # fallback if anything fails
+    def fallback_vehicle_info(self, vin: Optional[str] = None) -> Tuple[str, str, int]:
+        # Seeded with the VIN, so an unknown vehicle gets the same make, model and year on every lookup
+        rng = random.Random(vin) if vin is not None else random
+        fallback_make = rng.choice(list(self.fallback_vehicle_catalog.keys()))
+        fallback_model = rng.choice(self.fallback_vehicle_catalog[fallback_make])
+        fallback_year = rng.choice(self.fallback_years)
 
-        fallback_make = random.choice(list(self.fallback_vehicle_catalog.keys()))
-        fallback_model = random.choice(self.fallback_vehicle_catalog[fallback_make])
-        fallback_year = random.choice(self.fallback_years)
+        return fallback_make, fallback_model, fallback_year
+
+    def get_vehicle_info(self, vin: str) -> Tuple[str, str, int]:
+        record = self.catalog.get(vin)
+        if record:
+            return record
+        return self.fallback_vehicle_info(vin)  # fallback if the VIN is not in the catalog
 
-        return fallback_make, fallback_model, fallback_year 
+    def get_vehicle_info_many(self, vins: List[str]) -> List[Tuple[str, str, int]]:
+        """get_vehicle_info for a batch of VINs, checking the catalog file once"""
+        return [record or self.fallback_vehicle_info(vin) for vin, record in zip(vins, self.catalog.get_many(vins))]
@@ -1,9 +1,10 @@
 from sklearn.cluster import KMeans
 import numpy as np
 import boto3
+import hashlib
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import networkx as nx
 from sentence_transformers import SentenceTransformer
 import chromadb
@@ -13,17 +14,23 @@ from chromadb.utils import embedding_functions
 from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from agentic_memory.base import BaseRetriever, BaseLongTermStore
 from agentic_memory.automotive import AutomotiveKnowledgeToolkit
+from agentic_memory.embedding_cache import CachedEmbeddingFunction
+from agentic_memory.graph_index import GraphIndex
+from agentic_memory.summarization import SummaryExecutor
 from collections import defaultdict
 import botocore
+from botocore.config import Config
 import time
 
 
 
 class LocalHuggingFaceEmbeddingFunction(EmbeddingFunction[Documents]):
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, batch_size: int = 32):
+        self.model_name = model_name
+        self.batch_size = batch_size
         self.model = SentenceTransformer(model_name)
     def __call__(self, input: Documents) -> Embeddings:
-        return self.model.encode(input).tolist()
+        return self.model.encode(input, batch_size=self.batch_size).tolist()
 
 class SemanticStoreRetrieval(BaseRetriever):
     def __init__(
@@ -31,14 +38,48 @@ class SemanticStoreRetrieval(BaseRetriever):
         long_term_store: BaseLongTermStore,
         n_clusters: int = 5,
         vector_store_path: str = "semantic_vector_store",
-        embedding_model: str = "sentence-transformers/all-mpnet-base-v2"
+        embedding_model: str = "sentence-transformers/all-mpnet-base-v2",
+        drift_threshold: float = 0.2,
+        embedding_function: Optional[EmbeddingFunction] = None,
+        vehicle_toolkit: Optional[AutomotiveKnowledgeToolkit] = None,
+        summary_workers: int = 8,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 200_000,
+        embedding_batch_size: int = 64,
+        query_cache_size: int = 1024
     ):
         self.long_term_store = long_term_store
         self.vector_store_path = vector_store_path
         self.n_clusters = n_clusters
-        self.bedrock_client = boto3.client('bedrock-runtime')
-        self.embeddings = LocalHuggingFaceEmbeddingFunction(embedding_model)
+        # Fraction of a cluster's members added, changed or removed before its summary is regenerated
+        self.drift_threshold = drift_threshold
+        # Retries are left to the summary executor, which backs off with jitter
+        self.bedrock_client = boto3.client('bedrock-runtime', config=Config(
+            retries={"mode": "standard", "total_max_attempts": 1},
+            max_pool_connections=summary_workers
+        ))
+        # Set requests_per_minute / tokens_per_minute to the account's Bedrock quotas for the model
+        self.summarizer = SummaryExecutor(
+            self.invoke_bedrock_nova,
+            max_workers=summary_workers,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            cache_path=os.path.join(self.vector_store_path, "summary_cache.jsonl")
+        )
+        # Embeddings are cached by (model, text hash); custom functions are keyed by their model_name or class
+        embedding_function = embedding_function or LocalHuggingFaceEmbeddingFunction(embedding_model)
+        self.embeddings = CachedEmbeddingFunction(
+            embedding_function,
+            getattr(embedding_function, "model_name", type(embedding_function).__name__),
+            cache_path=os.path.join(self.vector_store_path, "embedding_cache.db"),
+            batch_size=embedding_batch_size,
+            query_cache_size=query_cache_size
+        )
+        self.vehicle_toolkit = vehicle_toolkit or AutomotiveKnowledgeToolkit()
         self.chroma_client = chromadb.PersistentClient(path=self.vector_store_path)
+        # Cluster centroids and VIN assignments of the documents in the collection
+        self.state_path = os.path.join(self.vector_store_path, "index_state.json")
+        self.state = self.load_state()
 
         try:
             self.collection = self.chroma_client.get_or_create_collection(
@@ -52,48 +93,61 @@ class SemanticStoreRetrieval(BaseRetriever):
 
     def load_all_entries(self) -> List[Dict[str, Any]]:
         entries = []
-        auto_tool_kit = AutomotiveKnowledgeToolkit()
-        if hasattr(self.long_term_store, 'storage_file') and os.path.exists(self.long_term_store.storage_file):
-            with open(self.long_term_store.storage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            for vin, record in data.items():
-                make, model, year = auto_tool_kit.get_vehicle_info(vin)
-                entry = record.copy()
-                entry['vin'] = vin
-                entry['make'] = make
-                entry['model'] = model
-                entries.append(entry)
+        records = list(self.long_term_store.items())
+        vehicles = self.vehicle_toolkit.get_vehicle_info_many([vin for vin, _ in records])
+        for (vin, record), (make, model, year) in zip(records, vehicles):
+            entry = record.copy()
+            entry['vin'] = vin
+            entry['make'] = make
+            entry['model'] = model
+            entries.append(entry)
         return entries
 
     def cluster_entries(self, entries: List[Dict[str, Any]], n_clusters: int = 5) -> List[List[Dict[str, Any]]]:
-         # Group entries by (make, model)
-        grouped = defaultdict(list)
-        for entry in entries:
-            make = entry.get("make", "")
-            model = entry.get("model", "")
-            grouped[(make, model)].append(entry)
-        
         all_clusters = []
-        for (make, model), group_entries in grouped.items():
-            if not group_entries:
-                continue
-            texts = [
-                " ".join([issue.get('issue_summary', '') for issue in entry.get('service_history', [])])
-                for entry in group_entries
-            ]
-            vectors = self.embeddings(texts)
-            n = min(n_clusters, len(group_entries))
-            if n < 1:
-                continue
-            kmeans = KMeans(n_clusters=n, random_state=42)
-            labels = kmeans.fit_predict(vectors)
+        for group_entries in self.group_entries(entries).values():
+            _, labels = self.cluster_group(group_entries, n_clusters)
             clusters = [[] for _ in range(max(labels) + 1)]
             for idx, label in enumerate(labels):
                 clusters[label].append(group_entries[idx])
             all_clusters.extend(clusters)
         return all_clusters
 
-    def call_bedrock_nova(self, prompt: str, max_retries: int = 3) -> str:
+    @staticmethod
+    def group_entries(entries: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        # Group entries by (make, model)
+        grouped = defaultdict(list)
+        for entry in entries:
+            grouped[(entry.get("make", ""), entry.get("model", ""))].append(entry)
+        return grouped
+
+    @staticmethod
+    def entry_text(entry: Dict[str, Any]) -> str:
+        return " ".join([issue.get('issue_summary', '') for issue in entry.get('service_history', [])])
+
+    @staticmethod
+    def entry_hash(entry: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(entry, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def group_key(make: str, model: str) -> str:
+        return f"{make}|{model}"
+
+    @staticmethod
+    def document_id(group_key: str, cluster: int) -> str:
+        """Stable Chroma id of a cluster summary, so updates can upsert and delete it"""
+        return f"summary|{group_key}|{cluster}"
+
+    def cluster_group(self, group_entries: List[Dict[str, Any]], n_clusters: int) -> Tuple[np.ndarray, np.ndarray]:
+        """KMeans over the issue texts of one (make, model) group; returns (centroids, labels)"""
+        vectors = np.asarray(self.embeddings([self.entry_text(entry) for entry in group_entries]), dtype=np.float64)
+        n = min(n_clusters, len(group_entries))
+        kmeans = KMeans(n_clusters=n, random_state=42)
+        labels = kmeans.fit_predict(vectors)
+        return kmeans.cluster_centers_, labels
+
+    def invoke_bedrock_nova(self, prompt: str) -> str:
+        """Single Nova request; throttling errors are raised to the caller"""
         request_body = {
             "messages": [
                 {
@@ -106,64 +160,96 @@ class SemanticStoreRetrieval(BaseRetriever):
                 }
             ]
         }
-        retries = 0
-        while retries < max_retries:
-            try:
-                response = self.bedrock_client.invoke_model(
-                    modelId="us.amazon.nova-pro-v1:0",
-                    contentType="application/json",
-                    accept="application/json",
-                    body=json.dumps(request_body)
-                )
-                result = json.loads(response['body'].read())
-                # Adjust this line if Nova's output format changes
-                return result.get('output', [{}]).get('message',{}).get('content',[])[0].get('text')
-            except botocore.exceptions.ClientError as e:
-                error_code = e.response['Error']['Code']
-                if error_code == "ThrottlingException":
-                    print(f"ThrottlingException encountered {retries}. Waiting 60 seconds before retrying...")
-                    time.sleep(60)
-                    retries += 1
-                else:
-                    raise
-            except Exception as e:
-                raise
-        raise RuntimeError("Max retries exceeded for Bedrock Nova call due to throttling.")
+        response = self.bedrock_client.invoke_model(
+            modelId="us.amazon.nova-pro-v1:0",
+            contentType="application/json",
+            accept="application/json",
+            body=json.dumps(request_body)
+        )
+        result = json.loads(response['body'].read())
+        # Adjust this line if Nova's output format changes
+        return result.get('output', [{}]).get('message',{}).get('content',[])[0].get('text')
 
-    def summarize_cluster(self, cluster: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def call_bedrock_nova(self, prompt: str) -> str:
+        """Rate-limited, cached Nova call, retried on throttling"""
+        return self.summarizer.summarize(prompt)
+
+    def cluster_prompt(self, cluster: List[Dict[str, Any]]) -> str:
         combined_text = ""
-        for entry in cluster:
+        # Sorted so an unchanged cluster always produces the same prompt and hits the summary cache
+        for entry in sorted(cluster, key=lambda entry: entry.get('vin', '')):
             vin = entry.get('vin', '')
             issues = [issue.get('issue_summary', '') for issue in entry.get('service_history', [])]
             issues_str = "; ".join(issues)
             combined_text += f"VIN: {vin} - Issues: {issues_str}\n"
-        prompt = (
+        return (
             "Summarize the following vehicle issues and resolutions into a consolidated summary, "
             "highlighting common patterns and resolutions:\n" +
             combined_text +
             "\nSummary:"
         )
-        summary = self.call_bedrock_nova(prompt)
+
+    @staticmethod
+    def cluster_metadata(cluster: List[Dict[str, Any]], summary: str) -> Dict[str, Any]:
         first = cluster[0]
-        meta = {
+        return {
             "make": first.get("make", ""),
             "model": first.get("model", ""),
             "year": first.get("year", ""),
             "summary": summary
         }
-        return meta
 
-    def build(self):
-        """Cluster, summarize, and store summaries in Chroma vector store."""
+    def summarize_cluster(self, cluster: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self.cluster_metadata(cluster, self.call_bedrock_nova(self.cluster_prompt(cluster)))
+
+    def summarize_clusters(self, clusters: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Summarize clusters concurrently within the Bedrock rate limits"""
+        summaries = self.summarizer.summarize_many([self.cluster_prompt(cluster) for cluster in clusters])
+        return [self.cluster_metadata(cluster, summary) for cluster, summary in zip(clusters, summaries)]
+
+    def load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {"vins": {}, "groups": {}}
+
+    def save_state(self):
+        # Written to a temporary file first so an interrupted save keeps the previous state
+        os.makedirs(self.vector_store_path, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def build(self, full: bool = False):
+        """
+        Cluster, summarize, and store summaries in Chroma vector store.
+
+        After the first build only VINs that are new, changed or removed since the
+        previous build are processed: each is assigned to the nearest centroid of
+        its (make, model) group, and a cluster is summarized again only once the
+        share of its members that changed reaches ``drift_threshold``.
+        Pass ``full=True`` to re-cluster and re-summarize everything.
+        """
         entries = self.load_all_entries()
         if not entries:
             print("No entries found in long term store.")
             return
-        clusters = self.cluster_entries(entries, self.n_clusters)
-        summaries = [self.summarize_cluster(cluster) for cluster in clusters]
-        documents = [summary["summary"] for summary in summaries]
-        metadatas = [{"make": s["make"], "model": s["model"], "year": s["year"]} for s in summaries]
-        ids = [f"summary_{i}" for i in range(len(documents))]
+        try:
+            if full or not self.state["groups"] or self.collection is None or self.collection.count() == 0:
+                self.build_full(entries)
+            else:
+                self.build_incremental(entries)
+        except Exception:
+            # Back to the last saved state; summaries finished before the failure are reused from the cache
+            self.state = self.load_state()
+            raise
+
+    def build_full(self, entries: List[Dict[str, Any]]):
+        self.state = {"vins": {}, "groups": {}}
+        for (make, model), group_entries in self.group_entries(entries).items():
+            self.recluster_group(make, model, group_entries)
+
         # Remove existing collection and recreate to avoid duplicates
         try:
             self.chroma_client.delete_collection("semantic_store")
@@ -173,12 +259,110 @@ class SemanticStoreRetrieval(BaseRetriever):
             "semantic_store",
             embedding_function=self.embeddings
         )
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
-        #self.chroma_client.persist()
+        summarized = self.summarize_drifted(entries)
+        self.save_state()
+        print(f"Built semantic store: {len(entries)} VINs, {summarized} cluster summaries")
+
+    def build_incremental(self, entries: List[Dict[str, Any]]):
+        vins = self.state["vins"]
+        groups = self.state["groups"]
+        current = {entry["vin"]: entry for entry in entries}
+        hashes = {vin: self.entry_hash(entry) for vin, entry in current.items()}
+        changed = [entry for vin, entry in current.items() if vins.get(vin, {}).get("hash") != hashes[vin]]
+        removed = [vin for vin in vins if vin not in current]
+        if not changed and not removed:
+            print("Semantic store is up to date")
+            return
+
+        # Take removed and changed VINs out of their clusters; changed ones are reassigned below
+        for vin in removed + [entry["vin"] for entry in changed if entry["vin"] in vins]:
+            old = vins.pop(vin)
+            group = groups[old["group"]]
+            group["counts"][old["cluster"]] -= 1
+            group["drift"][old["cluster"]] += 1
+
+        for (make, model), group_changed in self.group_entries(changed).items():
+            key = self.group_key(make, model)
+            group = groups.get(key)
+            size = len(group_changed) + (sum(group["counts"]) if group else 0)
+            # New groups, and groups that have grown into more clusters, are clustered from scratch
+            if group is None or len(group["centroids"]) < min(self.n_clusters, size):
+                members = [entry for entry in entries if entry["make"] == make and entry["model"] == model]
+                self.recluster_group(make, model, members)
+                continue
+
+            centroids = np.asarray(group["centroids"], dtype=np.float64)
+            vectors = np.asarray(self.embeddings([self.entry_text(entry) for entry in group_changed]), dtype=np.float64)
+            distances = ((vectors[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+            for entry, vector, label in zip(group_changed, vectors, distances.argmin(axis=1)):
+                label = int(label)
+                group["counts"][label] += 1
+                group["drift"][label] += 1
+                # Move the centroid towards the new member with a 1/count learning rate, as MiniBatchKMeans does
+                centroids[label] += (vector - centroids[label]) / max(group["counts"][label], 1)
+                vins[entry["vin"]] = {"hash": hashes[entry["vin"]], "group": key, "cluster": label}
+            group["centroids"] = centroids.tolist()
+
+        summarized = self.summarize_drifted(entries)
+        self.save_state()
+        print(f"Updated semantic store: {len(changed)} new or changed VINs, {len(removed)} removed, "
+              f"{summarized} cluster summaries regenerated")
+
+    def recluster_group(self, make: str, model: str, group_entries: List[Dict[str, Any]]):
+        """Re-cluster one (make, model) group; every cluster of the group is summarized again"""
+        key = self.group_key(make, model)
+        for vin in [vin for vin, info in self.state["vins"].items() if info["group"] == key]:
+            del self.state["vins"][vin]
+        previous = self.state["groups"].get(key)
+        centroids, labels = self.cluster_group(group_entries, self.n_clusters)
+        counts = np.bincount(labels, minlength=len(centroids)).tolist()
+        self.state["groups"][key] = {
+            "make": make,
+            "model": model,
+            "centroids": centroids.tolist(),
+            "counts": counts,
+            "drift": counts.copy(),
+            "summarized": [0] * len(counts),
+            # Summaries of clusters that no longer exist are deleted by summarize_drifted
+            "stale": list(range(len(counts), len(previous["counts"]))) if previous else []
+        }
+        for entry, label in zip(group_entries, labels):
+            self.state["vins"][entry["vin"]] = {"hash": self.entry_hash(entry), "group": key, "cluster": int(label)}
+
+    def summarize_drifted(self, entries: List[Dict[str, Any]]) -> int:
+        """Regenerate the summaries of clusters past the drift threshold; returns the number regenerated"""
+        current = {entry["vin"]: entry for entry in entries}
+        members = defaultdict(list)
+        for vin, info in self.state["vins"].items():
+            members[(info["group"], info["cluster"])].append(current[vin])
+
+        ids, clusters, deleted = [], [], []
+        for key, group in self.state["groups"].items():
+            deleted.extend(self.document_id(key, cluster) for cluster in group.pop("stale", []))
+            for cluster, count in enumerate(group["counts"]):
+                if group["drift"][cluster] == 0:
+                    continue
+                if count == 0:
+                    deleted.append(self.document_id(key, cluster))
+                elif group["drift"][cluster] < self.drift_threshold * max(group["summarized"][cluster], 1):
+                    continue
+                else:
+                    ids.append(self.document_id(key, cluster))
+                    clusters.append(members[(key, cluster)])
+                group["drift"][cluster] = 0
+                group["summarized"][cluster] = count
+            if not any(group["counts"]):
+                group["removed"] = True
+        self.state["groups"] = {key: group for key, group in self.state["groups"].items() if not group.get("removed")}
+
+        summaries = self.summarize_clusters(clusters)
+        documents = [summary["summary"] for summary in summaries]
+        metadatas = [{"make": s["make"], "model": s["model"], "year": s["year"]} for s in summaries]
+        if deleted:
+            self.collection.delete(ids=deleted)
+        if ids:
+            self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas)
+        return len(ids)
 
     def search(self, make: Optional[str], model: Optional[str], issue: Optional[str]) -> List[Dict[str, Any]]:
         """Search summaries filtered by metadata and issue similarity using Chroma native API."""
@@ -207,48 +391,80 @@ class SemanticStoreRetrieval(BaseRetriever):
 
 
 class GraphRetrieval(BaseRetriever):
-    def __init__(self, long_term_store, graph_json_path="semantic_graph_store/vehicle_graph.json"):
+    def __init__(self, long_term_store, graph_json_path="semantic_graph_store/vehicle_graph.json",
+                 index_path: Optional[str] = None):
         self.long_term_store = long_term_store
         self.graph_json_path = graph_json_path
-        self.G = nx.MultiDiGraph()
+        # Binary index saved next to the JSON graph; queries run against it
+        self.index_path = index_path or os.path.splitext(graph_json_path)[0] + ".index"
+        self._G = None
+        self.index = None
         if os.path.exists(self.graph_json_path):
-            self.load_graph()
+            meta = GraphIndex.read_meta(self.index_path)
+            if meta and meta.get("source") == self.graph_signature():
+                self.index = GraphIndex.load(self.index_path)
+            else:
+                # No index yet, or the JSON graph changed since it was written
+                self.load_graph()
+                self.save_index()
         else:
             self.build()
             self.save_graph()
 
+    @property
+    def G(self) -> nx.MultiDiGraph:
+        """The networkx graph; only parsed from the JSON file when something asks for it"""
+        if self._G is None:
+            self._G = nx.MultiDiGraph()
+            if os.path.exists(self.graph_json_path):
+                self.load_graph()
+        return self._G
+
+    @G.setter
+    def G(self, graph: nx.MultiDiGraph):
+        self._G = graph
+
     def build(self):
         """Extracts nodes and edges from long-term store and builds the graph."""
-        self.G.clear()
+        self.G = nx.MultiDiGraph()
+
+        for vin, record in self.long_term_store.items():
+            vehicle_node = f"VIN:{vin}"
+            self.G.add_node(vehicle_node, type="Vehicle", vin=vin, make=record.get("make"), model=record.get("model"), year=record.get("year"))
 
-        if hasattr(self.long_term_store, 'storage_file') and os.path.exists(self.long_term_store.storage_file):
-            with open(self.long_term_store.storage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            for vin, record in data.items():
+            for idx, service in enumerate(record.get("service_history", [])):
+                issue_node = f"Issue:{vin}:{idx}"
+                self.G.add_node(issue_node, type="Issue", summary=service.get("issue_summary"), date=service.get("service_date"))
+                self.G.add_edge(vehicle_node, issue_node, relation="has_issue")
 
-                vehicle_node = f"VIN:{vin}"
-                self.G.add_node(vehicle_node, type="Vehicle", vin=vin, make=record.get("make"), model=record.get("model"), year=record.get("year"))
+                resolution_node = f"Resolution:{vin}:{idx}"
+                self.G.add_node(resolution_node, type="Resolution", resolution=service.get("resolution"), engineer=service.get("service_engineer"))
+                self.G.add_edge(issue_node, resolution_node, relation="resolved_by")
 
-                for idx, service in enumerate(record.get("service_history", [])):
-                    issue_node = f"Issue:{vin}:{idx}"
-                    self.G.add_node(issue_node, type="Issue", summary=service.get("issue_summary"), date=service.get("service_date"))
-                    self.G.add_edge(vehicle_node, issue_node, relation="has_issue")
+                if service.get("service_engineer"):
+                    engineer_node = f"Engineer:{service.get('service_engineer')}"
+                    self.G.add_node(engineer_node, type="Engineer", name=service.get("service_engineer"))
+                    self.G.add_edge(resolution_node, engineer_node, relation="performed_by")
 
-                    resolution_node = f"Resolution:{vin}:{idx}"
-                    self.G.add_node(resolution_node, type="Resolution", resolution=service.get("resolution"), engineer=service.get("service_engineer"))
-                    self.G.add_edge(issue_node, resolution_node, relation="resolved_by")
+        self.index = GraphIndex.from_graph(self.G)
 
-                    if service.get("service_engineer"):
-                        engineer_node = f"Engineer:{service.get('service_engineer')}"
-                        self.G.add_node(engineer_node, type="Engineer", name=service.get("service_engineer"))
-                        self.G.add_edge(resolution_node, engineer_node, relation="performed_by")
+    def graph_signature(self) -> List[int]:
+        """mtime and size of the JSON graph, recorded in the index it was built from"""
+        stat = os.stat(self.graph_json_path)
+        return [stat.st_mtime_ns, stat.st_size]
 
     def save_graph(self):
-        """Persist the graph as a JSON file."""
+        """Persist the graph as a JSON file, and its index."""
         directory = os.path.dirname(self.graph_json_path)
         os.makedirs(directory, exist_ok=True)
         with open(self.graph_json_path, 'w', encoding='utf-8') as f:
             json.dump(nx.node_link_data(self.G), f, indent=2)
+        self.save_index()
+
+    def save_index(self):
+        self.index = GraphIndex.from_graph(self.G, meta={"source": self.graph_signature()})
+        self.index.save(self.index_path)
+        self.index = GraphIndex.load(self.index_path)
 
     def load_graph(self):
         """Load the graph from a JSON file."""
@@ -257,30 +473,79 @@ class GraphRetrieval(BaseRetriever):
 
     def search(self, make: Optional[str]=None, model: Optional[str]=None, issue: Optional[str]=None) -> List[Dict[str, Any]]:
         """Search for vehicles/issues/resolutions by metadata and keyword."""
+        index = self.index
+        vehicles = index.lookup("type", "Vehicle")
+        if make:
+            vehicles = np.intersect1d(vehicles, index.lookup("make", make), assume_unique=True)
+        if model:
+            vehicles = np.intersect1d(vehicles, index.lookup("model", model), assume_unique=True)
+        issues = None
+        if issue:
+            if make or model:
+                candidates = np.asarray(sorted(target for node in vehicles.tolist()
+                                               for target, relation in index.out_edges(node) if relation == "has_issue"),
+                                        dtype=np.int32)
+            else:
+                candidates = index.lookup("type", "Issue")
+            issues = set(index.match_text(issue, "summary", candidates=candidates).tolist())
+            # Vehicles that own a matching issue, in node order
+            vehicles = sorted({source for node in issues for source, relation in index.in_edges(node)
+                               if relation == "has_issue"})
+
         results = []
-        for node, data in self.G.nodes(data=True):
-            if data.get("type") == "Vehicle":
-                if (make and data.get("make") != make) or (model and data.get("model") != model):
+        for node in vehicles:
+            data = index.attrs(int(node))
+            for issue_node, relation in index.out_edges(int(node)):
+                if relation != "has_issue" or (issues is not None and issue_node not in issues):
                     continue
-
-                for _, issue_node, edge_data in self.G.out_edges(node, data=True):
-                    if edge_data.get("relation") == "has_issue":
-                        issue_data = self.G.nodes[issue_node]
-
-                        if issue and issue.lower() not in (issue_data.get("summary") or "").lower():
-                            continue
-
-                        for _, res_node, res_edge in self.G.out_edges(issue_node, data=True):
-                            if res_edge.get("relation") == "resolved_by":
-                                res_data = self.G.nodes[res_node]
-                                results.append({
-                                    "vin": data.get("vin"),
-                                    "make": data.get("make"),
-                                    "model": data.get("model"),
-                                    "year": data.get("year"),
-                                    "issue_summary": issue_data.get("summary"),
-                                    "issue_date": issue_data.get("date"),
-                                    "resolution": res_data.get("resolution"),
-                                    "engineer": res_data.get("engineer")
-                                })
+                issue_data = index.attrs(issue_node)
+                for res_node, res_relation in index.out_edges(issue_node):
+                    if res_relation == "resolved_by":
+                        res_data = index.attrs(res_node)
+                        results.append({
+                            "vin": data.get("vin"),
+                            "make": data.get("make"),
+                            "model": data.get("model"),
+                            "year": data.get("year"),
+                            "issue_summary": issue_data.get("summary"),
+                            "issue_date": issue_data.get("date"),
+                            "resolution": res_data.get("resolution"),
+                            "engineer": res_data.get("engineer")
+                        })
         return results
+
+    def related(self, vin: Optional[str] = None, make: Optional[str] = None, model: Optional[str] = None,
+                dtc: Optional[str] = None, issue: Optional[str] = None, hops: int = 2,
+                max_nodes: int = 200) -> List[Dict[str, Any]]:
+        """
+        Nodes within ``hops`` edges of the matched seeds, e.g. the resolutions and
+        engineers around the issues with a trouble code. ``vin``, ``make`` and
+        ``model`` select vehicles; ``dtc`` and ``issue`` select issues (of those
+        vehicles, if both are given). Each result is the node's attributes plus
+        its ``id`` and ``hops`` from the nearest seed, closest first, at most
+        ``max_nodes`` of them.
+        """
+        index = self.index
+        vehicles = None
+        for field, value in (("vin", vin), ("make", make), ("model", model)):
+            if value:
+                nodes = index.lookup(field, value)
+                vehicles = nodes if vehicles is None else np.intersect1d(vehicles, nodes, assume_unique=True)
+        issues = None
+        if dtc or issue:
+            issues = index.lookup("type", "Issue")
+            if dtc:
+                issues = np.intersect1d(issues, index.lookup("dtc", dtc.upper()), assume_unique=True)
+            if issue:
+                issues = index.match_text(issue, "summary", candidates=issues)
+            if vehicles is not None:
+                owners = set(vehicles.tolist())
+                issues = [node for node in issues
+                          if any(source in owners for source, _ in index.in_edges(int(node)))]
+        seeds = issues if issues is not None else vehicles
+        if seeds is None:
+            return []
+
+        neighbourhood = index.neighbourhood(seeds, hops=hops, max_nodes=max_nodes)
+        return [dict(index.attrs(node), id=index.node_id(node), hops=distance)
+                for node, distance in sorted(neighbourhood.items(), key=lambda item: (item[1], item[0]))]
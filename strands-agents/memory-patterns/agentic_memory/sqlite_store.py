@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agentic_memory.base import BaseEpisodicStore, BaseLongTermStore
+from agentic_memory.implementation import EpisodicStoreFile, merge_service_history
+
+DEFAULT_DB_PATH = "memory_store/agentic_memory.db"
+
+# Trigram FTS5 index matches substrings, so search() returns the same entries as LongTermStoreFile.search
+LONG_TERM_SCHEMA = """
+CREATE TABLE IF NOT EXISTS long_term (
+    vin TEXT PRIMARY KEY,
+    entry TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS long_term_fts USING fts5(
+    entry, content='long_term', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS long_term_ai AFTER INSERT ON long_term BEGIN
+    INSERT INTO long_term_fts(rowid, entry) VALUES (new.rowid, new.entry);
+END;
+CREATE TRIGGER IF NOT EXISTS long_term_ad AFTER DELETE ON long_term BEGIN
+    INSERT INTO long_term_fts(long_term_fts, rowid, entry) VALUES ('delete', old.rowid, old.entry);
+END;
+CREATE TRIGGER IF NOT EXISTS long_term_au AFTER UPDATE ON long_term BEGIN
+    INSERT INTO long_term_fts(long_term_fts, rowid, entry) VALUES ('delete', old.rowid, old.entry);
+    INSERT INTO long_term_fts(rowid, entry) VALUES (new.rowid, new.entry);
+END;
+"""
+
+EPISODIC_SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodic_events (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS episodic_events_key ON episodic_events (key, id);
+"""
+
+# Shortest query the trigram index can answer; shorter ones scan the table
+MIN_FTS_QUERY_LENGTH = 3
+
+
+class SQLiteStore:
+    """
+    SQLite database in WAL mode shared by the SQLite memory stores.
+    Readers don't block the writer, and each put is a single small transaction
+    instead of a rewrite of the whole file.
+    """
+    def __init__(self, db_path: str, schema: str):
+        self.db_path = db_path
+        dir_name = os.path.dirname(self.db_path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(schema)
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; BEGIN IMMEDIATE so read-modify-write is safe across processes"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EpisodicStoreSQLite(SQLiteStore, BaseEpisodicStore):
+    """SQLite implementation: one row per event, appended without rewriting the history"""
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        super().__init__(db_path, EPISODIC_SCHEMA)
+
+    @staticmethod
+    def _encode_key(key: Tuple) -> str:
+        return json.dumps([str(k) for k in key])
+
+    def put(self, key: Tuple, value: Any):
+        """Append value with original timestamp"""
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO episodic_events (key, event) VALUES (?, ?)",
+                         (self._encode_key(key), json.dumps({"v": 1, "value": value})))
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        rows = self._query("SELECT event FROM episodic_events WHERE key = ? ORDER BY id", (self._encode_key(key),))
+        if not rows:
+            return None
+        # One parse for the whole history instead of one per event
+        return json.loads("[" + ",".join(event for (event,) in rows) + "]")
+
+    def list_keys(self) -> list:
+        rows = self._query("SELECT key FROM episodic_events GROUP BY key ORDER BY MIN(id)")
+        return [tuple(json.loads(key)) for (key,) in rows]
+
+    def import_dir(self, storage_dir: str = "auto_service_records") -> int:
+        """
+        Copy the histories of an EpisodicStoreFile directory into this store.
+        Keys that were imported before are replaced, so the import can be rerun.
+        Returns the number of events imported.
+        """
+        source = EpisodicStoreFile(storage_dir)
+        imported = 0
+        with self._transaction() as conn:
+            for key in source.list_keys():
+                history = source.get(key) or []
+                encoded = self._encode_key(key)
+                conn.execute("DELETE FROM episodic_events WHERE key = ?", (encoded,))
+                conn.executemany("INSERT INTO episodic_events (key, event) VALUES (?, ?)",
+                                 [(encoded, json.dumps(event)) for event in history])
+                imported += len(history)
+        return imported
+
+
+class LongTermStoreSQLite(SQLiteStore, BaseLongTermStore):
+    """SQLite implementation: one row per VIN with a full-text index for search"""
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        super().__init__(db_path, LONG_TERM_SCHEMA)
+
+    # An upsert fires the update trigger; INSERT OR REPLACE would bypass the FTS delete trigger
+    UPSERT_SQL = ("INSERT INTO long_term (vin, entry) VALUES (?, ?) "
+                  "ON CONFLICT(vin) DO UPDATE SET entry = excluded.entry")
+
+    def put(self, key: str, value: dict):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT entry FROM long_term WHERE vin = ?", (key,)).fetchone()
+            entry = merge_service_history(json.loads(row[0]) if row else None, value)
+            if entry is not None:
+                conn.execute(self.UPSERT_SQL, (key, json.dumps(entry)))
+
+    def get(self, key: str) -> Optional[dict]:
+        rows = self._query("SELECT entry FROM long_term WHERE vin = ?", (key,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def search(self, query: str) -> List[dict]:
+        query = query.lower()
+        if len(query) >= MIN_FTS_QUERY_LENGTH:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = self._query("SELECT l.entry FROM long_term_fts f JOIN long_term l ON l.rowid = f.rowid "
+                               "WHERE long_term_fts MATCH ? ORDER BY l.rowid", (phrase,))
+        else:
+            rows = self._query("SELECT entry FROM long_term WHERE instr(lower(entry), ?) > 0 ORDER BY rowid", (query,))
+        # The index folds case slightly differently from str.lower(); confirm each candidate
+        return [json.loads(entry) for (entry,) in rows if query in entry.lower()]
+
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        for vin, entry in self._query("SELECT vin, entry FROM long_term ORDER BY rowid"):
+            yield vin, json.loads(entry)
+
+    def import_file(self, storage_file: str = "long_term_store/all_vins.json") -> int:
+        """
+        Copy the VINs of a LongTermStoreFile JSON file into this store, replacing
+        entries already present. Returns the number of VINs imported.
+        """
+        with open(storage_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self._transaction() as conn:
+            conn.executemany(self.UPSERT_SQL, ((vin, json.dumps(entry)) for vin, entry in data.items()))
+        return len(data)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import botocore
+
+# Bedrock error codes that mean "slow down and retry"
+RETRYABLE_ERRORS = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException",
+                    "ModelNotReadyException"}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``"""
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """Block until ``amount`` tokens are available and take them"""
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SummaryCache:
+    """
+    Summaries keyed by a hash of their prompt. Every summary is appended to a
+    JSON lines file as soon as it is produced, so the file doubles as the
+    checkpoint of an interrupted build: rerunning it only summarizes what is
+    missing.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Last line of a file cut off mid-write
+                    self.entries[record["key"]] = record["summary"]
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key: str, summary: str):
+        with self.lock:
+            self.entries[key] = summary
+            if self.path:
+                dir_name = os.path.dirname(self.path)
+                if dir_name:
+                    os.makedirs(dir_name, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "summary": summary}) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+
+class SummaryExecutor:
+    """
+    Runs LLM summarization calls concurrently within request and token per
+    minute quotas.
+
+    Each attempt first takes one request and the estimated tokens of the call
+    from the rate limiters. Throttling errors are retried with exponential
+    backoff and full jitter, so workers throttled together don't retry
+    together. Identical prompts are only summarized once.
+    """
+    def __init__(
+        self,
+        invoke: Callable[[str], str],
+        max_workers: int = 8,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 200_000,
+        max_output_tokens: int = 1000,
+        max_retries: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        cache_path: Optional[str] = None
+    ):
+        self.invoke = invoke
+        self.max_workers = max_workers
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_output_tokens = max_output_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = SummaryCache(cache_path)
+        self.stats = {"calls": 0, "throttled": 0, "cached": 0}
+        self.stats_lock = threading.Lock()
+
+    def estimate_tokens(self, prompt: str) -> int:
+        # About 4 characters per token, plus the longest answer the call can produce
+        return len(prompt) // 4 + self.max_output_tokens
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _count(self, name: str):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def summarize(self, prompt: str) -> str:
+        key = SummaryCache.key(prompt)
+        if (summary := self.cache.get(key)) is not None:
+            self._count("cached")
+            return summary
+
+        for attempt in range(self.max_retries + 1):
+            self.requests.acquire()
+            self.tokens.acquire(self.estimate_tokens(prompt))
+            try:
+                self._count("calls")
+                summary = self.invoke(prompt)
+                break
+            except botocore.exceptions.ClientError as e:
+                error_code = e.response['Error']['Code']
+                if error_code not in RETRYABLE_ERRORS or attempt == self.max_retries:
+                    raise
+                self._count("throttled")
+                delay = self.backoff_delay(attempt)
+                print(f"{error_code} encountered (attempt {attempt + 1}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        self.cache.put(key, summary)
+        return summary
+
+    def summarize_many(self, prompts: List[str]) -> List[str]:
+        """
+        Summarize prompts concurrently; results are in the order of ``prompts``.
+        Every summary that completes is cached even when another one fails.
+        """
+        unique = list(dict.fromkeys(prompts))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {prompt: executor.submit(self.summarize, prompt) for prompt in unique}
+        errors = [future.exception() for future in futures.values() if future.exception() is not None]
+        if errors:
+            raise errors[0]
+        return [futures[prompt].result() for prompt in prompts]
@@ -0,0 +1,199 @@
+'''
+Query latency of GraphRetrieval on synthetic service graphs.
+
+For each size, a graph with about that many nodes (vehicles, issues,
+resolutions and engineers, shaped like GraphRetrieval.build) is generated
+and indexed with GraphIndex. Every query is timed against the index, and for
+graphs up to --legacy-max-nodes also against the previous implementation,
+which scanned every node of the networkx graph. Cold start compares loading
+the node-link JSON with memory-mapping the saved index.
+
+    python benchmark_graph_index.py --sizes 10000 100000 1000000
+'''
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import networkx as nx
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+from agentic_memory.automotive import AutomotiveKnowledgeToolkit
+from agentic_memory.graph_index import GraphIndex
+from agentic_memory.retrievers import GraphRetrieval
+
+SYMPTOMS = [
+    "Intermittent stalling during acceleration in stop-and-go traffic",
+    "Check engine light with error code {dtc}",
+    "Oil leak under the engine bay with burning oil smell",
+    "Grinding noise from front brakes when stopping",
+    "Touchscreen display randomly reboots while driving",
+    "A/C blows warm air at idle",
+    "Transmission slips between second and third gear, stored code {dtc}",
+    "Battery drains overnight when the car is parked",
+]
+DTCS = [f"{system}{n:04d}" for system in "PCBU" for n in range(100, 150)]
+ENGINEERS = [f"Engineer {i}" for i in range(200)]
+CATALOG = AutomotiveKnowledgeToolkit().fallback_vehicle_catalog
+MAKES = sorted(CATALOG)
+
+
+class IndexedGraph(GraphRetrieval):
+    """GraphRetrieval queries over a saved index, without the JSON graph behind it"""
+    def __init__(self, index_path: str):
+        self.index = GraphIndex.load(index_path)
+
+
+def make_graph(size: int, rng: random.Random):
+    """(nodes, edges) in GraphRetrieval.build order, about ``size`` nodes"""
+    nodes, edges, numbers = [], [], {}
+
+    def add_node(node, **attrs):
+        if node not in numbers:
+            numbers[node] = len(nodes)
+            nodes.append((node, attrs))
+        return numbers[node]
+
+    i = 0
+    while len(nodes) < size:
+        vin = f"1HGCM8AB{i:09d}"
+        make = MAKES[i % len(MAKES)]
+        vehicle = add_node(f"VIN:{vin}", type="Vehicle", vin=vin, make=make,
+                           model=CATALOG[make][i // len(MAKES) % len(CATALOG[make])], year=2015 + i % 8)
+        for idx in range(rng.randint(1, 3)):
+            issue = add_node(f"Issue:{vin}:{idx}", type="Issue",
+                             summary=rng.choice(SYMPTOMS).format(dtc=rng.choice(DTCS)),
+                             date=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+            edges.append((vehicle, issue, "has_issue"))
+            engineer = rng.choice(ENGINEERS)
+            resolution = add_node(f"Resolution:{vin}:{idx}", type="Resolution",
+                                  resolution="Repaired and verified on test drive", engineer=engineer)
+            edges.append((issue, resolution, "resolved_by"))
+            edges.append((resolution, add_node(f"Engineer:{engineer}", type="Engineer", name=engineer),
+                          "performed_by"))
+        i += 1
+    return nodes, edges
+
+
+def to_networkx(nodes, edges) -> nx.MultiDiGraph:
+    G = nx.MultiDiGraph()
+    for node, attrs in nodes:
+        G.add_node(node, **attrs)
+    for source, target, relation in edges:
+        G.add_edge(nodes[source][0], nodes[target][0], relation=relation)
+    return G
+
+
+def legacy_search(G, make=None, model=None, issue=None):
+    """GraphRetrieval.search as it was before the index: scan every node"""
+    results = []
+    for node, data in G.nodes(data=True):
+        if data.get("type") == "Vehicle":
+            if (make and data.get("make") != make) or (model and data.get("model") != model):
+                continue
+            for _, issue_node, edge_data in G.out_edges(node, data=True):
+                if edge_data.get("relation") == "has_issue":
+                    issue_data = G.nodes[issue_node]
+                    if issue and issue.lower() not in (issue_data.get("summary") or "").lower():
+                        continue
+                    for _, res_node, res_edge in G.out_edges(issue_node, data=True):
+                        if res_edge.get("relation") == "resolved_by":
+                            res_data = G.nodes[res_node]
+                            results.append({
+                                "vin": data.get("vin"), "make": data.get("make"), "model": data.get("model"),
+                                "year": data.get("year"), "issue_summary": issue_data.get("summary"),
+                                "issue_date": issue_data.get("date"), "resolution": res_data.get("resolution"),
+                                "engineer": res_data.get("engineer")
+                            })
+    return results
+
+
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(size: int, args, directory: str):
+    rng = random.Random(size)
+    nodes, edges = make_graph(size, rng)
+    started = time.perf_counter()
+    index = GraphIndex.build(nodes, edges)
+    build_seconds = time.perf_counter() - started
+    index_path = os.path.join(directory, f"graph_{size}.index")
+    index.save(index_path)
+    index_mb = sum(os.path.getsize(os.path.join(index_path, f)) for f in os.listdir(index_path)) / 1e6
+
+    started = time.perf_counter()
+    retriever = IndexedGraph(index_path)
+    retriever.search(make="Toyota", model="Camry", issue="oil leak")
+    index_cold = time.perf_counter() - started
+
+    vin = nodes[len(nodes) // 2][1].get("vin") or nodes[0][1]["vin"]
+    queries = {
+        "make + model": dict(make="Toyota", model="Camry"),
+        "issue 'oil leak'": dict(issue="oil leak"),
+        "issue 'p0120'": dict(issue="p0120"),
+        "make + model + issue": dict(make="Honda", model="Civic", issue="brakes when"),
+    }
+    legacy = size <= args.legacy_max_nodes
+    if legacy:
+        G = to_networkx(nodes, edges)
+        json_path = os.path.join(directory, f"graph_{size}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(nx.node_link_data(G), f)
+        started = time.perf_counter()
+        with open(json_path, 'r', encoding='utf-8') as f:
+            loaded = nx.node_link_graph(json.load(f))
+        legacy_search(loaded, make="Toyota", model="Camry", issue="oil leak")
+        json_cold = time.perf_counter() - started
+        del loaded
+
+    print(f"\n{len(nodes):,} nodes, {len(edges):,} edges: index built in {build_seconds:.1f} s, "
+          f"{index_mb:.1f} MB on disk")
+    print(f"  {'query':<30} {'results':>8} {'scan ms':>10} {'index ms':>10}")
+    for name, query in queries.items():
+        results = retriever.search(**query)
+        indexed = median_ms(lambda: retriever.search(**query), args.repeat)
+        if legacy:
+            assert legacy_search(G, **query) == results, name
+            scanned = f"{median_ms(lambda: legacy_search(G, **query), max(1, args.repeat // 10)):>10.2f}"
+        else:
+            scanned = f"{'-':>10}"
+        print(f"  {name:<30} {len(results):>8,} {scanned} {indexed:>10.3f}")
+    for name, query in {"vin, 2 hops": dict(vin=vin, hops=2),
+                        "dtc P0120, 2 hops, 200 nodes": dict(dtc="P0120", hops=2, max_nodes=200)}.items():
+        results = retriever.related(**query)
+        print(f"  {name:<30} {len(results):>8,} {'-':>10} "
+              f"{median_ms(lambda: retriever.related(**query), args.repeat):>10.3f}")
+    cold = f"{json_cold * 1000:,.0f} ms JSON load + scan, " if legacy else ""
+    print(f"  cold start to first query: {cold}{index_cold * 1000:,.1f} ms mmap index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphRetrieval query latency, node scan vs index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Nodes per graph")
+    parser.add_argument("--legacy-max-nodes", type=int, default=100_000,
+                        help="Largest graph also queried with the networkx scan (it is held in memory)")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query; the median is reported")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="graph_bench_")
+    try:
+        for size in args.sizes:
+            run(size, args, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+'''
+Benchmark the JSON file memory stores against the SQLite stores.
+
+Generates a long-term store with --vins VINs (1-3 service records each) and
+an episodic history of --events events, migrates both to SQLite, then times
+get / put / search on each backend. File store operations read and rewrite
+the whole JSON file, so they are only repeated --file-ops times.
+
+    python benchmark_memory_store.py --vins 100000
+'''
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from agentic_memory.implementation import EpisodicStoreFile, LongTermStoreFile
+from agentic_memory.sqlite_store import EpisodicStoreSQLite, LongTermStoreSQLite
+
+ISSUES = [
+    "Intermittent stalling during acceleration in stop-and-go traffic",
+    "Persistent check engine light with error code P0420",
+    "Oil leak under the engine bay with burning oil smell",
+    "Grinding noise from front brakes when stopping",
+    "Touchscreen display randomly reboots while driving",
+    "A/C blows warm air at idle",
+    "Transmission slips between second and third gear",
+    "Battery drains overnight when the car is parked",
+]
+RESOLUTIONS = [
+    "Replaced throttle body and recalibrated the ECU",
+    "Replaced catalytic converter and upstream oxygen sensor",
+    "Replaced valve cover gasket and cleaned engine bay",
+    "Replaced brake pads and resurfaced rotors",
+    "Installed firmware update and replaced touchscreen controller",
+    "Recharged refrigerant and replaced condenser fan relay",
+    "Flushed transmission fluid and replaced shift solenoid",
+    "Replaced battery and repaired parasitic draw in body control module",
+]
+ENGINEERS = ["Alice Johnson", "Brian Lee", "Carla Schmidt", "Derek Lin", "Elena Garcia"]
+SEARCHES = ["oil leak", "P0420", "derek lin", "no such issue"]
+
+
+def make_vin(i: int) -> str:
+    return f"1HGCM8{i:011d}"
+
+
+def make_record(rng: random.Random) -> dict:
+    i = rng.randrange(len(ISSUES))
+    return {
+        "issue_summary": ISSUES[i],
+        "resolution": RESOLUTIONS[i],
+        "service_engineer": rng.choice(ENGINEERS),
+        "service_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "additional_notes": f"Mileage {rng.randint(5000, 150000)}",
+    }
+
+
+def generate(directory: str, vins: int, events: int, rng: random.Random):
+    # Written in one go: building it with LongTermStoreFile.put would rewrite the file once per VIN
+    data = {
+        make_vin(i): {"service_history": [make_record(rng) for _ in range(rng.randint(1, 3))]}
+        for i in range(vins)
+    }
+    long_term_file = os.path.join(directory, "long_term_store", "all_vins.json")
+    os.makedirs(os.path.dirname(long_term_file))
+    with open(long_term_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+    episodic_dir = os.path.join(directory, "auto_service_records")
+    history = [{"v": 1, "value": {"service_type": "Inspection", "service_notes": make_record(rng)["issue_summary"]}}
+               for _ in range(events)]
+    os.makedirs(episodic_dir)
+    with open(os.path.join(episodic_dir, "cust_789_1HGBH41JXMN109186.json"), 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    return long_term_file, episodic_dir
+
+
+def timed(fn, args_list):
+    latencies = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+def report(name: str, file_ms: float, sqlite_ms: float):
+    print(f"{name:<32} {file_ms:>12.2f} {sqlite_ms:>12.3f} {file_ms / sqlite_ms:>10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON file vs SQLite memory store benchmark")
+    parser.add_argument("--vins", type=int, default=100_000, help="VINs in the long-term store")
+    parser.add_argument("--events", type=int, default=500, help="Events in the benchmarked episodic history")
+    parser.add_argument("--file-ops", type=int, default=5, help="Repetitions per file store operation")
+    parser.add_argument("--sqlite-ops", type=int, default=1000, help="Repetitions per SQLite operation")
+    parser.add_argument("--dir", help="Working directory (default: a temporary directory, removed afterwards)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    directory = args.dir or tempfile.mkdtemp(prefix="memory_bench_")
+    try:
+        started = time.time()
+        long_term_file, episodic_dir = generate(directory, args.vins, args.events, rng)
+        print(f"Generated {args.vins:,} VINs ({os.path.getsize(long_term_file) / 1e6:.0f} MB) "
+              f"in {time.time() - started:.1f}s")
+
+        db_path = os.path.join(directory, "memory_store", "agentic_memory.db")
+        file_long_term = LongTermStoreFile(long_term_file)
+        file_episodic = EpisodicStoreFile(episodic_dir)
+        sqlite_long_term = LongTermStoreSQLite(db_path)
+        sqlite_episodic = EpisodicStoreSQLite(db_path)
+
+        started = time.time()
+        sqlite_long_term.import_file(long_term_file)
+        sqlite_episodic.import_dir(episodic_dir)
+        print(f"Migrated to SQLite in {time.time() - started:.1f}s ({os.path.getsize(db_path) / 1e6:.0f} MB)\n")
+
+        for query in SEARCHES:
+            assert file_long_term.search(query) == sqlite_long_term.search(query), query
+
+        def sample_vins(n):
+            return [(make_vin(rng.randrange(args.vins)),) for _ in range(n)]
+
+        def sample_puts(n):
+            return [(make_vin(rng.randrange(args.vins)), make_record(rng)) for _ in range(n)]
+
+        key = ("cust_789", "1HGBH41JXMN109186")
+        event = {"service_type": "Inspection", "service_notes": "Checked tire pressure"}
+        print(f"{'operation':<32} {'file ms/op':>12} {'sqlite ms/op':>12} {'speedup':>11}")
+        report("long-term get", timed(file_long_term.get, sample_vins(args.file_ops)),
+               timed(sqlite_long_term.get, sample_vins(args.sqlite_ops)))
+        report("long-term put (append issue)", timed(file_long_term.put, sample_puts(args.file_ops)),
+               timed(sqlite_long_term.put, sample_puts(args.sqlite_ops)))
+        for query in SEARCHES:
+            report(f"long-term search '{query}'", timed(file_long_term.search, [(query,)] * args.file_ops),
+                   timed(sqlite_long_term.search, [(query,)] * args.file_ops))
+        report(f"episodic get ({args.events} events)", timed(file_episodic.get, [(key,)] * args.file_ops),
+               timed(sqlite_episodic.get, [(key,)] * args.file_ops))
+        report(f"episodic put ({args.events} events)", timed(file_episodic.put, [(key, event)] * args.file_ops),
+               timed(sqlite_episodic.put, [(key, event)] * args.sqlite_ops))
+
+        sqlite_long_term.close()
+        sqlite_episodic.close()
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+'''
+Copy the JSON file stores into the SQLite memory store.
+
+    python migrate_memory_store.py
+    python migrate_memory_store.py --long-term-file long_term_store/all_vins.json \
+        --episodic-dir auto_service_records --db memory_store/agentic_memory.db
+
+The JSON files are left in place. Rerunning the migration replaces the
+entries it imported before.
+'''
+
+import argparse
+import os
+import time
+
+from agentic_memory.sqlite_store import DEFAULT_DB_PATH, EpisodicStoreSQLite, LongTermStoreSQLite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate LongTermStoreFile / EpisodicStoreFile data to SQLite")
+    parser.add_argument("--long-term-file", default="long_term_store/all_vins.json", help="LongTermStoreFile JSON file")
+    parser.add_argument("--episodic-dir", default="auto_service_records", help="EpisodicStoreFile directory")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database to create or update")
+    args = parser.parse_args()
+
+    if os.path.exists(args.long_term_file):
+        started = time.time()
+        long_term = LongTermStoreSQLite(args.db)
+        count = long_term.import_file(args.long_term_file)
+        long_term.close()
+        print(f"Imported {count} VINs from {args.long_term_file} in {time.time() - started:.1f}s")
+    else:
+        print(f"{args.long_term_file} not found, skipping long-term memory")
+
+    if os.path.isdir(args.episodic_dir):
+        started = time.time()
+        episodic = EpisodicStoreSQLite(args.db)
+        count = episodic.import_dir(args.episodic_dir)
+        episodic.close()
+        print(f"Imported {count} episodic events from {args.episodic_dir} in {time.time() - started:.1f}s")
+    else:
+        print(f"{args.episodic_dir} not found, skipping episodic memory")
+
+
+if __name__ == "__main__":
+    main()